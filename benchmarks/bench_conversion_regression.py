@@ -0,0 +1,339 @@
+# coding: utf-8
+"""
+Conversion-time regression benchmark. The script fits a small
+and a large instance of every estimator *sklearn-onnx* can convert,
+measures the conversion time, the peak memory, the number of nodes
+and the size of the initializers, and compares them with a baseline
+stored in *bench_conversion_regression_baseline.json*.
+It exits with an error code if one conversion is bigger than the
+baseline beyond a threshold. Timings are noisy, slower conversions
+are only reported unless option ``--timing`` is used.
+
+::
+
+    # compares with the baseline
+    python benchmarks/bench_conversion_regression.py
+    # restricted to a couple of models
+    python benchmarks/bench_conversion_regression.py -m SVC,SVR
+    # overwrites the baseline
+    python benchmarks/bench_conversion_regression.py --save
+    # also fails on slower conversions
+    python benchmarks/bench_conversion_regression.py --timing
+
+Timings depend on the machine, the baseline should be
+computed on the machine running the comparison.
+"""
+# License: MIT
+import argparse
+import inspect
+import json
+import os
+import statistics
+import sys
+import tracemalloc
+import warnings
+from time import perf_counter as time
+
+import numpy as np
+from sklearn.datasets import make_classification, make_regression
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from skl2onnx import convert_sklearn
+from skl2onnx._supported_operators import sklearn_operator_name_map
+from skl2onnx.algebra.type_helper import guess_initial_types
+from skl2onnx.common.data_types import (
+    Int64TensorType, StringTensorType)
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "bench_conversion_regression_baseline.json")
+
+# size of the training set, number of features, size of the models
+SIZES = {
+    'small': dict(n_obs=100, n_features=4, n_estimators=5,
+                  n_components=2, n_clusters=3, hidden=(10, )),
+    'large': dict(n_obs=2000, n_features=50, n_estimators=100,
+                  n_components=20, n_clusters=20, hidden=(100, 100)),
+}
+
+# models whose inputs cannot be generated by this script
+SKIPPED = {'DictVectorizer'}
+
+# metric: (relative threshold, absolute threshold),
+# these metrics do not depend on the machine load
+THRESHOLDS = {
+    'peak_memory': (0.25, 2 ** 20),
+    'nodes': (0., 0),
+    'initializer_bytes': (0.1, 1024),
+    # weights stored as node attributes (TreeEnsemble, SVM)
+    # are not initializers
+    'onnx_size': (0.1, 1024),
+}
+
+# timing thresholds, only reported unless option --timing is used
+TIMING_THRESHOLDS = {
+    'conversion_time': (1., 0.05),
+}
+
+
+##############################
+# Models and data.
+##############################
+
+def _sub_estimators(cl, classifier):
+    "Sub estimators for meta-estimators."
+    if classifier:
+        return LogisticRegression(), DecisionTreeClassifier(max_depth=3)
+    return LinearRegression(), DecisionTreeRegressor(max_depth=3)
+
+
+def make_instance(cl, size):
+    """
+    Creates an instance of *cl* for *size* (see *SIZES*),
+    returns the model and the training data.
+    """
+    conf = SIZES[size]
+    name = cl.__name__
+    n_obs = conf['n_obs']
+    n_features = conf['n_features']
+    classifier = ('Classifier' in name or name in {
+        'LogisticRegression', 'LogisticRegressionCV', 'LinearSVC',
+        'SVC', 'NuSVC', 'Perceptron', 'GaussianNB', 'BernoulliNB',
+        'MultinomialNB', 'ComplementNB', 'CategoricalNB',
+        'CalibratedClassifierCV', 'LinearDiscriminantAnalysis',
+        'NeighborhoodComponentsAnalysis', 'GridSearchCV', 'RFE', 'RFECV',
+        'SelectFromModel'} or name.startswith('Select') or
+        name == 'GenericUnivariateSelect')
+
+    # constructor parameters
+    params = inspect.signature(cl).parameters
+    kwargs = {}
+    for key in ['n_estimators', 'n_components', 'n_clusters']:
+        if key in params:
+            kwargs[key] = conf[key]
+    if 'hidden_layer_sizes' in params:
+        kwargs['hidden_layer_sizes'] = conf['hidden']
+    if 'max_iter' in params and name.startswith('HistGradientBoosting'):
+        kwargs['max_iter'] = conf['n_estimators']
+    if 'random_state' in params:
+        kwargs['random_state'] = 0
+    if name in {'BayesianGaussianMixture', 'GaussianMixture'}:
+        kwargs['n_components'] = 3
+    if name in {'PLSRegression', 'LinearDiscriminantAnalysis'}:
+        kwargs['n_components'] = 2
+    if name in {'SelectFdr', 'SelectFwe'}:
+        kwargs['alpha'] = 0.5
+    if name == 'VotingClassifier':
+        kwargs['flatten_transform'] = False
+    if name in {'SelectKBest'}:
+        kwargs['k'] = 2
+    if name == 'KBinsDiscretizer':
+        kwargs['encode'] = 'ordinal'
+    if name in {'VotingClassifier', 'VotingRegressor',
+                'StackingClassifier', 'StackingRegressor'}:
+        est = _sub_estimators(cl, classifier)
+        kwargs['estimators'] = [('lin', est[0]), ('dt', est[1])]
+    elif name in {'OneVsRestClassifier', 'SelectFromModel', 'RFE', 'RFECV'}:
+        kwargs['estimator'] = _sub_estimators(cl, classifier)[0]
+    elif name == 'GridSearchCV':
+        kwargs['estimator'] = LogisticRegression()
+        kwargs['param_grid'] = {'C': [0.1, 1.]}
+    model = cl(**kwargs)
+
+    # data
+    initial_types = None
+    if name in {'CountVectorizer', 'TfidfVectorizer'}:
+        rnd = np.random.RandomState(0)
+        words = ["w%d" % i for i in range(n_features * 10)]
+        X = np.array([" ".join(rnd.choice(words, 10))
+                      for i in range(n_obs)])
+        y = None
+        initial_types = [('X', StringTensorType([None, 1]))]
+    elif name in {'LabelEncoder', 'LabelBinarizer'}:
+        X = np.random.RandomState(0).randint(
+            0, n_features, n_obs).astype(np.int64)
+        y = None
+        initial_types = [('X', Int64TensorType([None]))]
+    elif name in {'OneHotEncoder', 'OrdinalEncoder', 'CategoricalNB',
+                  'TfidfTransformer'}:
+        X = np.random.RandomState(0).randint(
+            0, 5, (n_obs, n_features)).astype(np.int64)
+        y = X[:, 0] % 3
+        if name != 'CategoricalNB':
+            X = X.astype(np.float32)
+    elif classifier:
+        X, y = make_classification(
+            n_obs, n_features=n_features,
+            n_informative=max(n_features // 2, 2),
+            n_redundant=0, n_classes=3,
+            n_clusters_per_class=1, random_state=0)
+        X = np.abs(X).astype(np.float32)
+    else:
+        X, y = make_regression(n_obs, n_features=n_features,
+                               n_targets=2 if 'MultiTask' in name else 1,
+                               random_state=0)
+        X = np.abs(X).astype(np.float32)
+        if name in {'KNNImputer', 'SimpleImputer'}:
+            X[::7, 1] = np.nan
+    return model, X, y, initial_types
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure_conversion(model, initial_types, repeat=7):
+    """
+    Converts a model *repeat* times and returns the median conversion
+    time, the peak memory, the number of nodes, the size of the
+    initializers and the size of the model.
+    """
+    times = []
+    for r in range(repeat):
+        begin = time()
+        onx = convert_sklearn(model, initial_types=initial_types)
+        times.append(time() - begin)
+
+    tracemalloc.start()
+    try:
+        current = tracemalloc.get_traced_memory()[0]
+        convert_sklearn(model, initial_types=initial_types)
+        peak = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return dict(conversion_time=statistics.median(times), peak_memory=peak,
+                nodes=len(onx.graph.node),
+                initializer_bytes=sum(i.ByteSize()
+                                      for i in onx.graph.initializer),
+                onnx_size=onx.ByteSize())
+
+
+def bench(names=None, sizes=('small', 'large'), repeat=7, verbose=False):
+    """
+    Measures the conversion of every supported estimator.
+    Returns a dictionary ``{'<model>-<size>': metrics}``.
+    Failures are stored in key *error*.
+    """
+    classes = sorted(sklearn_operator_name_map,
+                     key=lambda cl: cl.__name__)
+    res = {}
+    for cl in classes:
+        name = cl.__name__
+        if names is not None and name not in names:
+            continue
+        if name in SKIPPED:
+            continue
+        for size in sizes:
+            key = "{}-{}".format(name, size)
+            try:
+                model, X, y, initial_types = make_instance(cl, size)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", (
+                        ConvergenceWarning, FutureWarning, UserWarning))
+                    if y is None:
+                        model.fit(X)
+                    else:
+                        model.fit(X, y)
+                    if initial_types is None:
+                        initial_types = guess_initial_types(X[:1], None)
+                    obs = measure_conversion(model, initial_types,
+                                             repeat=repeat)
+            except Exception as e:  # noqa
+                obs = dict(error="{}: {}".format(
+                    type(e).__name__, str(e).split('\n')[0]))
+            res[key] = obs
+            if verbose:
+                print(key, obs)
+    return res
+
+
+##############################
+# Comparison.
+##############################
+
+def compare(results, baseline, thresholds=None):
+    """
+    Compares *results* with *baseline* and returns the list
+    of regressions as strings. A metric regresses if it is above
+    the baseline by more than the relative and the absolute threshold.
+    A conversion failing while it succeeded in the baseline
+    is a regression.
+    """
+    if thresholds is None:
+        thresholds = THRESHOLDS
+    regressions = []
+    for key, obs in sorted(results.items()):
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        if 'error' in obs:
+            if 'error' not in base:
+                regressions.append("{}: conversion fails: {}".format(
+                    key, obs['error']))
+            continue
+        if 'error' in base:
+            continue
+        for metric, (rel, absolute) in thresholds.items():
+            old, new = base[metric], obs[metric]
+            if new > old * (1 + rel) and new - old > absolute:
+                regressions.append(
+                    "{}: {} {} -> {} (+{:.0f}%)".format(
+                        key, metric, old, new,
+                        (new - old) * 100. / max(old, 1e-10)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Conversion-time regression benchmark.")
+    parser.add_argument('-m', '--models', default=None,
+                        help="comma separated list of estimators")
+    parser.add_argument('-b', '--baseline', default=BASELINE,
+                        help="baseline file")
+    parser.add_argument('-r', '--repeat', default=7, type=int,
+                        help="number of conversions per measure")
+    parser.add_argument('--timing', action='store_true',
+                        help="fails on slower conversions as well")
+    parser.add_argument('--save', action='store_true',
+                        help="overwrites the baseline")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    names = None if args.models is None else set(args.models.split(','))
+    results = bench(names, repeat=args.repeat, verbose=args.verbose)
+
+    if args.save:
+        baseline = {}
+        if names is not None and os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print("Baseline saved in '{}'.".format(args.baseline))
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    new = sorted(set(results) - set(baseline))
+    if new:
+        print("Not in the baseline: {}".format(", ".join(new)))
+    regressions = compare(results, baseline)
+    slower = compare(results, baseline, TIMING_THRESHOLDS)
+    slower = [reg for reg in slower if reg not in regressions]
+    if args.timing:
+        regressions.extend(slower)
+    for reg in regressions:
+        print(reg)
+    if not args.timing:
+        for reg in slower:
+            print("warning: {}".format(reg))
+    print("{} regression(s), {} conversions.".format(
+        len(regressions), len(results)))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
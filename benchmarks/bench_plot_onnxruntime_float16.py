@@ -0,0 +1,214 @@
+# coding: utf-8
+"""
+Accuracy and throughput report for models converted with
+``dtype=numpy.float16`` compared to ``dtype=numpy.float32``.
+For every model, the report gives the size of the ONNX model,
+the maximum difference with *scikit-learn* (computed on the
+same rounded features) and the prediction time of onnxruntime
+for different batch sizes.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.datasets import make_classification
+from sklearn.decomposition import PCA
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.mixture import GaussianMixture
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType, Float16TensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, y, name):
+    "Trains model *name* and returns the functions to benchmark."
+    # index of the ONNX output to compare, classifiers and
+    # GaussianMixture return labels first
+    index = 0
+    if name == 'MLPRegressor':
+        model = MLPRegressor(hidden_layer_sizes=(512, 512), max_iter=5)
+        model.fit(X, y)
+        predict = model.predict
+    elif name == 'MLPClassifier':
+        model = MLPClassifier(hidden_layer_sizes=(512, 512), max_iter=5)
+        model.fit(X, y)
+        predict = model.predict_proba
+        index = 1
+    elif name == 'PCA':
+        model = PCA(n_components=10).fit(X)
+        predict = model.transform
+    elif name == 'LinearRegression':
+        model = LinearRegression().fit(X, y)
+        predict = model.predict
+    elif name == 'LogisticRegression':
+        model = LogisticRegression().fit(X, y)
+        predict = model.predict_proba
+        index = 1
+    elif name == 'KNeighborsRegressor':
+        model = KNeighborsRegressor().fit(X, y)
+        predict = model.predict
+    elif name == 'MultinomialNB':
+        model = MultinomialNB().fit(X, y)
+        predict = model.predict_proba
+        index = 1
+    elif name == 'GaussianMixture':
+        model = GaussianMixture(n_components=3).fit(X)
+        predict = model.predict_proba
+        index = 1
+    else:
+        raise ValueError("Unknown model '{}'.".format(name))
+
+    fcts = {}
+    sizes = {}
+    for dtype, tensor_type in [(np.float32, FloatTensorType),
+                               (np.float16, Float16TensorType)]:
+        options = ({id(model): {'zipmap': False}}
+                   if hasattr(model, 'classes_') else None)
+        onx = convert_sklearn(
+            model, initial_types=[('X', tensor_type([None, X.shape[1]]))],
+            dtype=dtype, options=options)
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt(X, sess=sess, index=index):
+            return sess.run(None, {'X': X})[index]
+
+        key = dtype.__name__
+        fcts[key] = predict_onnxrt
+        sizes[key] = len(onx.SerializeToString())
+    return predict, fcts, sizes
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        p = fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_obs, names, nfeat=50, repeat=20, verbose=False):
+    res = []
+    ntrain = 2000
+    X_train, y_train = make_classification(
+        ntrain, n_features=nfeat, n_informative=nfeat // 2, n_classes=3)
+    # MultinomialNB requires positive features
+    X_train = np.abs(X_train).astype(np.float16).astype(np.float64)
+
+    for name in names:
+        predict, fcts, sizes = fcts_model(X_train, y_train, name)
+
+        # accuracy on the training set, features are rounded to float16
+        # so that both conversions see the same inputs
+        X16 = X_train.astype(np.float16)
+        exp = predict(X16.astype(np.float64))
+        acc = {}
+        for key, fct in fcts.items():
+            got = fct(X16.astype(getattr(np, key)))
+            acc[key] = np.abs(got.astype(np.float64).ravel() -
+                              exp.ravel()).max()
+
+        for n in n_obs:
+            obs = dict(model=name, n_obs=n, nfeat=nfeat)
+            for key in fcts:
+                obs["size_" + key] = sizes[key]
+                obs["diff_" + key] = acc[key]
+
+            # creates different inputs to avoid caching in any ways
+            Xs = [np.abs(rand(n, nfeat)) for r in range(repeat)]
+            for key, fct in fcts.items():
+                Xd = [x.astype(getattr(np, key)) for x in Xs]
+                obs["time_" + key] = measure(fct, Xd)[0]
+            obs["speedup"] = obs["time_float32"] / obs["time_float16"]
+            res.append(obs)
+            if verbose:
+                print("bench", len(res), ":", obs)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    fig, ax = plt.subplots(1, 2, figsize=(12, 4))
+    for color, n in zip('brgyc', sorted(set(df.n_obs))):
+        subset = df[df.n_obs == n].set_index('model')
+        if verbose:
+            print(subset)
+        subset['speedup'].plot.bar(
+            ax=ax[0], color=color, alpha=0.5, label="N={}".format(n))
+    first = df[df.n_obs == min(df.n_obs)].set_index('model')
+    (first['size_float16'] / first['size_float32']).plot.bar(ax=ax[1])
+    ax[0].set_title("Speedup float16 / float32", fontsize='x-small')
+    ax[1].set_title("Model size float16 / float32", fontsize='x-small')
+    ax[0].legend(loc=0, fontsize='x-small')
+    plt.suptitle("Conversion with dtype=float16", fontsize=16)
+
+
+@ignore_warnings(category=(FutureWarning, ConvergenceWarning))
+def run_bench(repeat=20, verbose=False):
+    n_obs = [1, 100, 10000]
+    names = ['MLPRegressor', 'MLPClassifier', 'PCA', 'LinearRegression',
+             'LogisticRegression', 'KNeighborsRegressor', 'MultinomialNB',
+             'GaussianMixture']
+
+    start = time()
+    results = bench(n_obs, names, repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+    print(results_df[['model', 'n_obs', 'size_float32', 'size_float16',
+                      'diff_float32', 'diff_float16', 'speedup']])
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_float16.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_float16.png")
+    df.to_csv("bench_plot_onnxruntime_float16.csv", index=False)
+    plt.show()
@@ -0,0 +1,207 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on GaussianProcessRegressor,
+default graph against option ``optim='gemm'``.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+from numpy.testing import assert_almost_equal
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import DoubleTensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, y, return_std):
+    "GaussianProcessRegressor."
+    gp = GaussianProcessRegressor(C(1.) * RBF(1.), alpha=1e-2,
+                                  optimizer=None)
+    gp.fit(X, y)
+
+    initial_types = [('X', DoubleTensorType([None, X.shape[1]]))]
+    fcts = {}
+
+    def predict_skl_predict(X, model=gp):
+        return model.predict(X, return_std=return_std)
+
+    fcts['skl'] = predict_skl_predict
+
+    for name, optim in [('ort', None), ('ort_gemm', 'gemm')]:
+        try:
+            onx = convert_sklearn(
+                gp, initial_types=initial_types, dtype=np.float64,
+                options={GaussianProcessRegressor: {
+                    'optim': optim, 'return_std': return_std}})
+        except (AttributeError, RuntimeError) as e:
+            # The default graph relies on private attributes
+            # not available in every version of scikit-learn.
+            print("Unable to convert with optim=%r: %s" % (optim, e))
+            continue
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt_predict(X, sess=sess):
+            return sess.run(None, {'X': X})
+
+        fcts[name] = predict_onnxrt_predict
+    return fcts
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        p = fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_obs, n_features, n_trains, return_stds,
+          repeat=10, verbose=False):
+    res = []
+    for nfeat in n_features:
+        for ntrain in n_trains:
+            X_train = rand(ntrain, nfeat)
+            y_train = X_train.sum(axis=1) + rand(ntrain) * 0.1
+
+            for return_std in return_stds:
+                fcts = fcts_model(X_train, y_train, return_std)
+
+                for n in n_obs:
+                    obs = dict(n_obs=n, nfeat=nfeat, ntrain=ntrain,
+                               return_std=return_std)
+
+                    # creates different inputs to avoid caching in any ways
+                    Xs = [rand(n, nfeat) for r in range(repeat)]
+
+                    preds = {}
+                    for name, fct in fcts.items():
+                        obs["time_" + name], preds[name] = measure(fct, Xs)
+                    res.append(obs)
+                    if verbose:
+                        print("bench", len(res), ":", obs)
+
+                    # checks that all produce the same outputs
+                    exp = preds['skl']
+                    if not return_std:
+                        exp = [exp]
+                    for name in fcts:
+                        if name == 'skl':
+                            continue
+                        for e, g in zip(exp, preds[name]):
+                            assert_almost_equal(e.ravel(), g.ravel(),
+                                                decimal=5)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    nrows = max(len(set(df.return_std)) * len(set(df.n_obs)), 2)
+    ncols = max(len(set(df.nfeat)), 2)
+    fig, ax = plt.subplots(nrows, ncols,
+                           figsize=(ncols * 4, nrows * 4))
+    row = 0
+    for n_obs in sorted(set(df.n_obs)):
+        for return_std in sorted(set(df.return_std)):
+            pos = 0
+            for nfeat in sorted(set(df.nfeat)):
+                a = ax[row, pos]
+                if row == ax.shape[0] - 1:
+                    a.set_xlabel("N train", fontsize='x-small')
+                if pos == 0:
+                    a.set_ylabel(
+                        "Time (s) n_obs={}\nreturn_std={}".format(
+                            n_obs, return_std), fontsize='x-small')
+
+                subset = df[(df.nfeat == nfeat) & (df.n_obs == n_obs) &
+                            (df.return_std == return_std)]
+                if subset.shape[0] == 0:
+                    continue
+                subset = subset.sort_values("ntrain")
+                if verbose:
+                    print(subset)
+                subset.plot(x="ntrain", y="time_skl", label="skl", ax=a,
+                            logx=True, logy=True, c='b', style='--')
+                if "time_ort" in subset.columns:
+                    subset.plot(x="ntrain", y="time_ort", label="ort", ax=a,
+                                logx=True, logy=True, c='b')
+                subset.plot(x="ntrain", y="time_ort_gemm", label="ort gemm",
+                            ax=a, logx=True, logy=True, c='r')
+
+                a.legend(loc=0, fontsize='x-small')
+                if row == 0:
+                    a.set_title("nfeat={}".format(nfeat), fontsize='x-small')
+                pos += 1
+            row += 1
+
+    plt.suptitle(
+        "Benchmark for GaussianProcessRegressor sklearn/onnxruntime",
+        fontsize=16)
+
+
+@ignore_warnings(category=FutureWarning)
+def run_bench(repeat=100, verbose=False):
+    n_obs = [1, 10, 100]
+    n_features = [1, 10, 50]
+    n_trains = [10, 100, 1000]
+    return_stds = [False, True]
+
+    start = time()
+    results = bench(n_obs, n_features, n_trains, return_stds,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_gpr.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_gpr.png")
+    df.to_csv("bench_plot_onnxruntime_gpr.csv", index=False)
+    plt.show()
@@ -0,0 +1,178 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on MLPRegressor,
+every layer converted into MatMul + Add (default)
+against option ``optim='gemm'`` which produces one Gemm per layer.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+from numpy.testing import assert_almost_equal
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.neural_network import MLPRegressor
+from sklearn.exceptions import ConvergenceWarning
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, y, n_layers, width):
+    "MLPRegressor."
+    mlp = MLPRegressor(hidden_layer_sizes=(width, ) * n_layers,
+                       max_iter=5)
+    mlp.fit(X, y)
+
+    initial_types = [('X', FloatTensorType([None, X.shape[1]]))]
+    fcts = {}
+
+    def predict_skl_predict(X, model=mlp):
+        return model.predict(X)
+
+    fcts['skl'] = predict_skl_predict
+
+    for name, optim in [('ort', None), ('ort_gemm', 'gemm')]:
+        onx = convert_sklearn(
+            mlp, initial_types=initial_types,
+            options={MLPRegressor: {'optim': optim}})
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt_predict(X, sess=sess):
+            return sess.run(None, {'X': X})[0]
+
+        fcts[name] = predict_onnxrt_predict
+    return fcts
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        p = fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_obs, n_features, n_layerss, widths,
+          repeat=100, verbose=False):
+    res = []
+    for nfeat in n_features:
+        ntrain = 1000
+        X_train = rand(ntrain, nfeat).astype(np.float32)
+        y_train = X_train.sum(axis=1) + rand(ntrain) * 0.1
+
+        for n_layers in n_layerss:
+            for width in widths:
+                fcts = fcts_model(X_train, y_train, n_layers, width)
+
+                for n in n_obs:
+                    obs = dict(n_obs=n, nfeat=nfeat, n_layers=n_layers,
+                               width=width)
+
+                    # creates different inputs to avoid caching in any ways
+                    Xs = [rand(n, nfeat).astype(np.float32)
+                          for r in range(repeat)]
+
+                    for name, fct in fcts.items():
+                        obs["time_" + name] = measure(fct, Xs)[0]
+                    obs["speedup"] = obs["time_ort"] / obs["time_ort_gemm"]
+                    res.append(obs)
+                    if verbose:
+                        print("bench", len(res), ":", obs)
+
+                    # checks that all produce the same outputs,
+                    # measure may stop before the last input
+                    exp = fcts['skl'](Xs[0])
+                    for name in ['ort', 'ort_gemm']:
+                        assert_almost_equal(exp, fcts[name](Xs[0]).ravel(),
+                                            decimal=3)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for color, width in zip('brgyc', sorted(set(df.width))):
+        subset = df[df.width == width].sort_values("n_obs")
+        if verbose:
+            print(subset)
+        subset.plot(x="n_obs", y="time_ort",
+                    label="MatMul+Add width={}".format(width), ax=ax[0],
+                    logx=True, logy=True, c=color, style='--')
+        subset.plot(x="n_obs", y="time_ort_gemm",
+                    label="Gemm width={}".format(width), ax=ax[0],
+                    logx=True, logy=True, c=color)
+        subset.plot(x="n_obs", y="speedup",
+                    label="width={}".format(width), ax=ax[1],
+                    logx=True, c=color)
+    ax[0].set_title("Time (s)", fontsize='x-small')
+    ax[1].set_title("Speedup of Gemm", fontsize='x-small')
+    for a in ax:
+        a.set_xlabel("N obs", fontsize='x-small')
+        a.legend(loc=0, fontsize='x-small')
+    plt.suptitle("Benchmark for MLPRegressor MatMul+Add/Gemm", fontsize=16)
+
+
+@ignore_warnings(category=(FutureWarning, ConvergenceWarning))
+def run_bench(repeat=100, verbose=False):
+    n_obs = [1, 1024]
+    n_features = [50]
+    n_layerss = [4]
+    widths = [512]
+
+    start = time()
+    results = bench(n_obs, n_features, n_layerss, widths,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_mlp_gemm.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_mlp_gemm.png")
+    df.to_csv("bench_plot_onnxruntime_mlp_gemm.csv", index=False)
+    plt.show()
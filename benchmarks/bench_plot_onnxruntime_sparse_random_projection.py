@@ -0,0 +1,185 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on SparseRandomProjection,
+the components are converted into a dense matrix (default),
+a sparse initializer (``optim='sparse'``) or gathered
+features followed by a weighted sum (``optim='gather'``).
+The benchmark reports the size of every model and
+the prediction time.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+from numpy.testing import assert_almost_equal
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.random_projection import SparseRandomProjection
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, n_components):
+    "SparseRandomProjection."
+    model = SparseRandomProjection(n_components=n_components)
+    model.fit(X)
+
+    initial_types = [('X', FloatTensorType([None, X.shape[1]]))]
+    fcts = {}
+    sizes = {}
+
+    def predict_skl_predict(X, model=model):
+        return model.transform(X)
+
+    fcts['skl'] = predict_skl_predict
+
+    for name, optim in [('ort', None), ('ort_sparse', 'sparse'),
+                        ('ort_gather', 'gather')]:
+        onx = convert_sklearn(
+            model, initial_types=initial_types,
+            options={SparseRandomProjection: {'optim': optim}})
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt_predict(X, sess=sess):
+            return sess.run(None, {'X': X})[0]
+
+        fcts[name] = predict_onnxrt_predict
+        sizes[name] = len(onx.SerializeToString())
+    return fcts, sizes
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        p = fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_obs, n_features, n_componentss, repeat=20, verbose=False):
+    res = []
+    for nfeat in n_features:
+        X_train = rand(10, nfeat).astype(np.float32)
+
+        for n_components in n_componentss:
+            fcts, sizes = fcts_model(X_train, n_components)
+
+            for n in n_obs:
+                obs = dict(n_obs=n, nfeat=nfeat, n_components=n_components)
+                for name, size in sizes.items():
+                    obs["size_" + name] = size
+
+                # creates different inputs to avoid caching in any ways
+                Xs = [rand(n, nfeat).astype(np.float32)
+                      for r in range(repeat)]
+
+                for name, fct in fcts.items():
+                    obs["time_" + name] = measure(fct, Xs)[0]
+                for name in ['ort_sparse', 'ort_gather']:
+                    obs["speedup_" + name] = (
+                        obs["time_ort"] / obs["time_" + name])
+                res.append(obs)
+                if verbose:
+                    print("bench", len(res), ":", obs)
+
+                # checks that all produce the same outputs,
+                # measure may stop before the last input
+                exp = fcts['skl'](Xs[0])
+                for name in sizes:
+                    assert_almost_equal(exp, fcts[name](Xs[0]), decimal=3)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for color, nfeat in zip('brgyc', sorted(set(df.nfeat))):
+        subset = df[df.nfeat == nfeat].sort_values("n_obs")
+        if verbose:
+            print(subset)
+        subset.plot(x="n_obs", y="speedup_ort_sparse",
+                    label="sparse nfeat={}".format(nfeat), ax=ax[0],
+                    logx=True, c=color, style='--')
+        subset.plot(x="n_obs", y="speedup_ort_gather",
+                    label="gather nfeat={}".format(nfeat), ax=ax[0],
+                    logx=True, c=color)
+    first = df[df.n_obs == min(df.n_obs)].sort_values("nfeat")
+    for name, style in [('ort', '-'), ('ort_sparse', '--'),
+                        ('ort_gather', ':')]:
+        first.plot(x="nfeat", y="size_" + name, label=name, ax=ax[1],
+                   logx=True, logy=True, style=style)
+    ax[0].set_title("Speedup compared to a dense MatMul",
+                    fontsize='x-small')
+    ax[1].set_title("Model size (bytes)", fontsize='x-small')
+    ax[0].set_xlabel("N obs", fontsize='x-small')
+    ax[1].set_xlabel("N features", fontsize='x-small')
+    for a in ax:
+        a.legend(loc=0, fontsize='x-small')
+    plt.suptitle("Benchmark for SparseRandomProjection", fontsize=16)
+
+
+@ignore_warnings(category=FutureWarning)
+def run_bench(repeat=20, verbose=False):
+    n_obs = [1, 10, 100, 1000]
+    n_features = [1000, 10000]
+    n_componentss = [500]
+
+    start = time()
+    results = bench(n_obs, n_features, n_componentss,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_sparse_random_projection.time.csv",
+              index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_sparse_random_projection.png")
+    df.to_csv("bench_plot_onnxruntime_sparse_random_projection.csv",
+              index=False)
+    plt.show()
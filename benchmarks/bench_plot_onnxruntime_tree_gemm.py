@@ -0,0 +1,227 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on GradientBoostingRegressor,
+node TreeEnsembleRegressor against option ``optim='gemm'``
+which evaluates the trees with matrix multiplications.
+The benchmark looks for the batch size from which
+the second option becomes faster.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+from numpy.testing import assert_almost_equal
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.ensemble import GradientBoostingRegressor
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, y, max_depth, n_estimators):
+    "GradientBoostingRegressor."
+    gb = GradientBoostingRegressor(max_depth=max_depth,
+                                   n_estimators=n_estimators)
+    gb.fit(X, y)
+
+    initial_types = [('X', FloatTensorType([None, X.shape[1]]))]
+    fcts = {}
+
+    def predict_skl_predict(X, model=gb):
+        return model.predict(X)
+
+    fcts['skl'] = predict_skl_predict
+
+    for name, optim in [('ort', None), ('ort_gemm', 'gemm')]:
+        onx = convert_sklearn(
+            gb, initial_types=initial_types,
+            options={GradientBoostingRegressor: {'optim': optim}})
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt_predict(X, sess=sess):
+            return sess.run(None, {'X': X})[0]
+
+        fcts[name] = predict_onnxrt_predict
+    return fcts
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        p = fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_obs, n_features, max_depths, n_estimatorss,
+          repeat=10, verbose=False, max_memory=2 ** 30):
+    res = []
+    for nfeat in n_features:
+        ntrain = 10000
+        X_train = rand(ntrain, nfeat).astype(np.float32)
+        y_train = X_train.sum(axis=1) + rand(ntrain) * 0.1
+
+        for max_depth in max_depths:
+            for n_estimators in n_estimatorss:
+                fcts = fcts_model(X_train, y_train, max_depth, n_estimators)
+
+                for n in n_obs:
+                    # the GEMM form stores one value per tree, leaf
+                    # and observation, the largest batches do not fit
+                    # into memory
+                    size = n_estimators * 2 ** max_depth * n * 4
+                    if size > max_memory:
+                        if verbose:
+                            print("skip n_obs=%d max_depth=%d "
+                                  "n_estimators=%d" % (
+                                      n, max_depth, n_estimators))
+                        continue
+                    obs = dict(n_obs=n, nfeat=nfeat, max_depth=max_depth,
+                               n_estimators=n_estimators)
+
+                    # creates different inputs to avoid caching in any ways
+                    Xs = [rand(n, nfeat).astype(np.float32)
+                          for r in range(repeat)]
+
+                    for name, fct in fcts.items():
+                        obs["time_" + name] = measure(fct, Xs)[0]
+                    obs["speedup"] = obs["time_ort"] / obs["time_ort_gemm"]
+                    res.append(obs)
+                    if verbose:
+                        print("bench", len(res), ":", obs)
+
+                    # checks that all produce the same outputs,
+                    # measure may stop before the last input
+                    exp = fcts['skl'](Xs[0])
+                    for name in ['ort', 'ort_gemm']:
+                        assert_almost_equal(exp, fcts[name](Xs[0]).ravel(),
+                                            decimal=3)
+    return res
+
+
+def crossover(df):
+    """
+    Returns the smallest batch size for which
+    ``optim='gemm'`` is faster than the tree ensemble
+    kernel for every configuration.
+    """
+    rows = []
+    keys = ['nfeat', 'max_depth', 'n_estimators']
+    for values, subset in df.groupby(keys):
+        faster = subset[subset.speedup > 1].n_obs
+        row = dict(zip(keys, values))
+        row['crossover'] = faster.min() if faster.shape[0] > 0 else None
+        rows.append(row)
+    return pandas.DataFrame(rows)
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    nrows = max(len(set(df.max_depth)), 2)
+    ncols = max(len(set(df.n_estimators)), 2)
+    fig, ax = plt.subplots(nrows, ncols,
+                           figsize=(ncols * 4, nrows * 4))
+    row = 0
+    for max_depth in sorted(set(df.max_depth)):
+        pos = 0
+        for n_estimators in sorted(set(df.n_estimators)):
+            a = ax[row, pos]
+            if row == ax.shape[0] - 1:
+                a.set_xlabel("N obs", fontsize='x-small')
+            if pos == 0:
+                a.set_ylabel("Time (s) max_depth={}".format(max_depth),
+                             fontsize='x-small')
+
+            for color, nfeat in zip('brgyc', sorted(set(df.nfeat))):
+                subset = df[(df.max_depth == max_depth) &
+                            (df.n_estimators == n_estimators) &
+                            (df.nfeat == nfeat)]
+                if subset.shape[0] == 0:
+                    continue
+                subset = subset.sort_values("n_obs")
+                if verbose:
+                    print(subset)
+                subset.plot(x="n_obs", y="time_ort",
+                            label="ort nfeat={}".format(nfeat), ax=a,
+                            logx=True, logy=True, c=color, style='--')
+                subset.plot(x="n_obs", y="time_ort_gemm",
+                            label="ort gemm nfeat={}".format(nfeat), ax=a,
+                            logx=True, logy=True, c=color)
+
+            a.legend(loc=0, fontsize='x-small')
+            if row == 0:
+                a.set_title("n_estimators={}".format(n_estimators),
+                            fontsize='x-small')
+            pos += 1
+        row += 1
+
+    plt.suptitle(
+        "Benchmark for GradientBoostingRegressor TreeEnsemble/Gemm",
+        fontsize=16)
+
+
+@ignore_warnings(category=FutureWarning)
+def run_bench(repeat=20, verbose=False):
+    n_obs = [1, 10, 100, 1000, 10000]
+    n_features = [10, 50]
+    max_depths = [3, 6]
+    n_estimatorss = [10, 100, 1000]
+
+    start = time()
+    results = bench(n_obs, n_features, max_depths, n_estimatorss,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+    print(crossover(results_df))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_tree_gemm.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_tree_gemm.png")
+    df.to_csv("bench_plot_onnxruntime_tree_gemm.csv", index=False)
+    plt.show()
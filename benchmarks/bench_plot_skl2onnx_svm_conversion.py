@@ -0,0 +1,159 @@
+# coding: utf-8
+"""
+Benchmark of the conversion time of a SVR.
+The support vectors and the coefficients are given to
+the node attributes as numpy arrays. The benchmark measures
+the creation of the attribute holding the support vectors,
+the creation of the node and the whole conversion.
+"""
+# License: MIT
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.svm import SVR
+try:
+    # scikit-learn >= 0.22
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    # scikit-learn < 0.22
+    from sklearn.utils.testing import ignore_warnings
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from skl2onnx.proto.onnx_helper_modified import make_attribute, make_node
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_model(X, y):
+    "SVR with almost every observation as support vector."
+    model = SVR(epsilon=0., C=1.)
+    model.fit(X, y)
+
+    initial_types = [('X', FloatTensorType([None, X.shape[1]]))]
+    fcts = {}
+
+    def attribute(model=model):
+        return make_attribute(
+            'support_vectors', model.support_vectors_.ravel())
+
+    def node(model=model):
+        return make_node(
+            'SVMRegressor', ['X'], ['Y'], domain='ai.onnx.ml',
+            _dtype=np.float32,
+            coefficients=model.dual_coef_.ravel(),
+            support_vectors=model.support_vectors_.ravel(),
+            rho=model.intercept_)
+
+    def convert(model=model):
+        return convert_sklearn(model, initial_types=initial_types)
+
+    fcts['attribute'] = attribute
+    fcts['node'] = node
+    fcts['convert'] = convert
+    return model, fcts
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, repeat, max_time=5):
+    st = time()
+    repeated = 0
+    for r in range(repeat):
+        p = fct()
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than max_time
+    end = time()
+    return (end - st) / repeated, p
+
+
+def bench(n_trains, n_features, repeat=3, verbose=False):
+    res = []
+    for nfeat in n_features:
+        for ntrain in n_trains:
+            X = rand(ntrain, nfeat)
+            y = X.sum(axis=1) + rand(ntrain)
+            model, fcts = fcts_model(X, y)
+            obs = dict(ntrain=ntrain, nfeat=nfeat,
+                       n_support=model.support_vectors_.shape[0],
+                       size=model.support_vectors_.size)
+
+            for name, fct in fcts.items():
+                obs["time_" + name] = measure(fct, repeat)[0]
+            res.append(obs)
+            if verbose:
+                print("bench", len(res), ":", obs)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for color, nfeat in zip('brgyc', sorted(set(df.nfeat))):
+        subset = df[df.nfeat == nfeat].sort_values("size")
+        if verbose:
+            print(subset)
+        subset.plot(x="size", y="time_attribute",
+                    label="attribute nfeat={}".format(nfeat), ax=ax[0],
+                    logx=True, logy=True, c=color, style='--')
+        subset.plot(x="size", y="time_node",
+                    label="node nfeat={}".format(nfeat), ax=ax[0],
+                    logx=True, logy=True, c=color)
+        subset.plot(x="size", y="time_convert",
+                    label="nfeat={}".format(nfeat), ax=ax[1],
+                    logx=True, logy=True, c=color)
+    ax[0].set_title("make_attribute, make_node", fontsize='x-small')
+    ax[1].set_title("convert_sklearn", fontsize='x-small')
+    for a in ax:
+        a.set_xlabel("n_support x n_features", fontsize='x-small')
+        a.legend(loc=0, fontsize='x-small')
+    ax[0].set_ylabel("Time (s)", fontsize='x-small')
+    plt.suptitle("Conversion time for SVR", fontsize=16)
+
+
+@ignore_warnings(category=FutureWarning)
+def run_bench(repeat=3, verbose=False):
+    n_trains = [100, 1000, 5000, 10000]
+    n_features = [10, 100, 300]
+
+    start = time()
+    results = bench(n_trains, n_features, repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_skl2onnx_svm_conversion.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_skl2onnx_svm_conversion.png")
+    df.to_csv("bench_plot_skl2onnx_svm_conversion.csv", index=False)
+    plt.show()
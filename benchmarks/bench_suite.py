@@ -0,0 +1,329 @@
+# coding: utf-8
+"""
+Benchmark suite comparing *scikit-learn* and *onnxruntime*
+for any supported estimator or a list of pipelines
+over a grid of batch sizes, number of features and dtypes.
+For every configuration, the suite measures the conversion time,
+the size of the ONNX model, the prediction time of *scikit-learn*,
+the prediction time of *onnxruntime* if it is installed and
+the discrepancies between both. Results are saved as JSON or CSV
+to track regressions between releases.
+
+::
+
+    python benchmarks/bench_suite.py -m LogisticRegression,SVR \
+        -n 1,10,1000 -f 10,100 -d float32,float64 -o results.csv
+
+The suite can be called from python as well:
+
+::
+
+    from bench_suite import bench, save_results
+    res = bench([make_pipeline(StandardScaler(), LogisticRegression())],
+                n_obs=[1, 100], n_features=[10])
+    save_results(res, "results.json")
+"""
+# License: MIT
+import argparse
+import csv
+import json
+import traceback
+import warnings
+from time import perf_counter as time
+
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.datasets import make_classification, make_regression
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.utils import all_estimators
+import onnx
+import sklearn
+import skl2onnx
+from skl2onnx import to_onnx
+try:
+    import onnxruntime
+    from onnxruntime import InferenceSession
+except ImportError:
+    # the suite only measures the conversion
+    onnxruntime = None
+    InferenceSession = None
+
+
+##############################
+# Models and data.
+##############################
+
+def get_estimator(name):
+    "Returns an instance of the *scikit-learn* estimator *name*."
+    for est_name, cl in all_estimators():
+        if est_name == name:
+            return cl()
+    raise ValueError("Unknown estimator '{}'.".format(name))
+
+
+def model_name(model):
+    "Returns a short name for a model or a pipeline."
+    if hasattr(model, 'steps'):
+        return "+".join(model_name(step) for _, step in model.steps)
+    return model.__class__.__name__
+
+
+def make_data(model, n_obs, n_features, seed=0):
+    """
+    Generates a training set for *model*, a classification
+    dataset for a classifier, a regression dataset otherwise.
+    Features are positive for models such as *MultinomialNB*.
+    """
+    if is_classifier(model):
+        X, y = make_classification(
+            n_obs, n_features=n_features,
+            n_informative=max(n_features // 2, 2),
+            n_redundant=0, n_classes=3,
+            n_clusters_per_class=1, random_state=seed)
+    else:
+        X, y = make_regression(n_obs, n_features=n_features,
+                               random_state=seed)
+    return np.abs(X), y
+
+
+def prediction_method(model):
+    "Returns the method *scikit-learn* uses to compute the predictions."
+    if hasattr(model, 'predict'):
+        return model.predict
+    if hasattr(model, 'transform'):
+        return model.transform
+    raise TypeError("Unable to find a prediction method for {}.".format(
+        type(model)))
+
+
+##############################
+# Benchmarks
+##############################
+
+def clone_with_options(model, options):
+    """
+    Clones *model* and replaces in *options* every key equal to
+    the id of the model or one of its parameters (steps
+    of a pipeline for example) by the id of the cloned object.
+    Other keys (classes, names) are left unchanged.
+    Returns the cloned model and the new options.
+    """
+    cloned = clone(model)
+    if not options:
+        return cloned, options
+    pairs = [(model, cloned)]
+    if hasattr(model, 'get_params'):
+        new_params = cloned.get_params(deep=True)
+        pairs.extend((v, new_params[k])
+                     for k, v in model.get_params(deep=True).items())
+    ids = {id(old): id(new) for old, new in pairs}
+    new_options = {ids.get(k, k) if isinstance(k, int) else k: v
+                   for k, v in options.items()}
+    return cloned, new_options
+
+
+def measure(fct, X, repeat=10, max_time=1):
+    """
+    Calls *fct(X)* *repeat* times or until *max_time*
+    is reached and returns the average time, the minimum
+    time and the number of calls.
+    """
+    times = []
+    st = time()
+    for r in range(repeat):
+        begin = time()
+        fct(X)
+        times.append(time() - begin)
+        if time() - st >= max_time:
+            break  # stops if longer than max_time
+    return sum(times) / len(times), min(times), len(times)
+
+
+def _discrepancy(model, exp, got):
+    "Compares the predictions of scikit-learn and onnxruntime."
+    exp = np.asarray(exp)
+    got = np.asarray(got)
+    if is_classifier(model):
+        return dict(label_mismatch=int((exp.ravel() != got.ravel()).sum()))
+    return dict(max_abs_diff=float(np.abs(
+        exp.astype(np.float64).ravel() -
+        got.astype(np.float64).ravel()).max()))
+
+
+def bench_model(model, n_obs, n_features, dtype, ntrain=1000,
+                options=None, target_opset=None, repeat=10,
+                max_time=1, verbose=False):
+    """
+    Trains *model* with *n_features* features, converts it
+    with *dtype* and measures the prediction time for every batch size
+    in *n_obs*. Returns a list of dictionaries, one per batch size.
+    An error is stored in key *error* instead of raising an exception.
+    """
+    name = model_name(model)
+    common = dict(model=name, n_features=n_features,
+                  dtype=np.dtype(dtype).name)
+    try:
+        X, y = make_data(model, ntrain, n_features)
+        X = X.astype(dtype)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", (ConvergenceWarning,
+                                             FutureWarning))
+            model.fit(X, y)
+
+        begin = time()
+        onx = to_onnx(model, X[:1], dtype=dtype, options=options,
+                      target_opset=target_opset)
+        common['conversion_time'] = time() - begin
+        content = onx.SerializeToString()
+        common['onnx_size'] = len(content)
+        common['onnx_nodes'] = len(onx.graph.node)
+        sess = (InferenceSession(content)
+                if InferenceSession is not None else None)
+    except Exception as e:  # noqa
+        common['error'] = "{}: {}".format(type(e).__name__, e)
+        if verbose:
+            traceback.print_exc()
+        return [common]
+
+    input_name = None if sess is None else sess.get_inputs()[0].name
+    predict = prediction_method(model)
+    res = []
+    for n in n_obs:
+        obs = common.copy()
+        obs['n_obs'] = n
+        Xn = X[np.arange(n) % X.shape[0]]
+        t_mean, t_min, number = measure(predict, Xn, repeat, max_time)
+        obs.update(dict(skl_latency=t_mean, skl_latency_min=t_min,
+                        skl_throughput=n / t_mean, skl_number=number))
+        if sess is not None:
+            try:
+                def run(x):
+                    return sess.run(None, {input_name: x})
+
+                t_mean, t_min, number = measure(run, Xn, repeat, max_time)
+                obs.update(dict(ort_latency=t_mean, ort_latency_min=t_min,
+                                ort_throughput=n / t_mean,
+                                ort_number=number,
+                                speedup=obs['skl_latency'] / t_mean))
+                obs.update(_discrepancy(model, predict(Xn), run(Xn)[0]))
+            except Exception as e:  # noqa
+                obs['error'] = "{}: {}".format(type(e).__name__, e)
+        res.append(obs)
+        if verbose:
+            print("bench", obs)
+    return res
+
+
+def bench(models, n_obs=(1, 10, 100, 1000), n_features=(10, ),
+          dtypes=(np.float32, ), ntrain=1000, options=None,
+          target_opset=None, repeat=10, max_time=1, verbose=False):
+    """
+    Runs the benchmark over a grid of models, batch sizes,
+    number of features and dtypes.
+
+    :param models: list of estimators, pipelines or names of
+        *scikit-learn* estimators
+    :param n_obs: batch sizes
+    :param n_features: number of features
+    :param dtypes: conversion types (`np.float32`, `np.float64`)
+    :param ntrain: number of training observations
+    :param options: options given to the converter, the keys
+        may be the id of a model or a step, they are updated
+        to the id of the cloned estimators
+    :param target_opset: target opset
+    :param repeat: maximum number of predictions for every measure
+    :param max_time: maximum time in seconds for every measure
+    :param verbose: display progress
+    :return: list of dictionaries, one per configuration
+    """
+    res = []
+    for model in models:
+        if isinstance(model, str):
+            model = get_estimator(model)
+        for nf in n_features:
+            for dtype in dtypes:
+                cloned, cloned_options = clone_with_options(model, options)
+                res.extend(bench_model(
+                    cloned, n_obs, nf, dtype, ntrain=ntrain,
+                    options=cloned_options, target_opset=target_opset,
+                    repeat=repeat, max_time=max_time, verbose=verbose))
+    versions = versions_information()
+    for obs in res:
+        obs.update(versions)
+    return res
+
+
+def versions_information():
+    "Returns the version of every involved package."
+    return dict(
+        v_numpy=np.__version__, v_sklearn=sklearn.__version__,
+        v_onnx=onnx.__version__, v_skl2onnx=skl2onnx.__version__,
+        v_onnxruntime=(onnxruntime.__version__
+                       if onnxruntime is not None else None))
+
+
+##############################
+# Results.
+##############################
+
+def save_results(results, filename):
+    """
+    Saves *results* (returned by :func:`bench`) into JSON if
+    *filename* ends with ``.json``, into CSV otherwise.
+    """
+    if filename.endswith('.json'):
+        with open(filename, 'w') as f:
+            json.dump(results, f, indent=1)
+        return
+    columns = []
+    for obs in results:
+        for k in obs:
+            if k not in columns:
+                columns.append(k)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for obs in results:
+            writer.writerow(obs)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks scikit-learn against onnxruntime.")
+    parser.add_argument('-m', '--models', required=True,
+                        help="comma separated list of estimators")
+    parser.add_argument('-n', '--n_obs', default="1,10,100,1000",
+                        type=_int_list, help="batch sizes")
+    parser.add_argument('-f', '--n_features', default="10",
+                        type=_int_list, help="number of features")
+    parser.add_argument('-d', '--dtypes', default="float32",
+                        help="float32, float64 or both")
+    parser.add_argument('-t', '--ntrain', default=1000, type=int,
+                        help="number of training observations")
+    parser.add_argument('-r', '--repeat', default=10, type=int,
+                        help="maximum number of predictions per measure")
+    parser.add_argument('--max_time', default=1., type=float,
+                        help="maximum time (seconds) per measure")
+    parser.add_argument('--target_opset', default=None, type=int,
+                        help="target opset")
+    parser.add_argument('-o', '--output', default="bench_suite.csv",
+                        help="output file, .json or .csv")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    res = bench(args.models.split(','), n_obs=args.n_obs,
+                n_features=args.n_features,
+                dtypes=[getattr(np, d) for d in args.dtypes.split(',')],
+                ntrain=args.ntrain, target_opset=args.target_opset,
+                repeat=args.repeat, max_time=args.max_time,
+                verbose=args.verbose)
+    save_results(res, args.output)
+    return res
+
+
+if __name__ == '__main__':
+    main()
@@ -219,9 +219,11 @@ save_onnx_model(num_onnx, "pipeline_titanic_numerical.onnx")
 
 ################################
 # Let's compute the numerical features.
+# The function removes the inputs the numerical pipeline
+# does not need.
 
 sess = rt.InferenceSession("pipeline_titanic_numerical.onnx")
-numX = sess.run(None, inputs)
+numX = sess.run(None, {i.name: inputs[i.name] for i in sess.get_inputs()})
 print("numerical features", numX[0][:1])
 
 ###########################################
@@ -231,7 +233,7 @@ print(model_onnx)
 text_onnx = select_model_inputs_outputs(model_onnx, 'variable2')
 save_onnx_model(text_onnx, "pipeline_titanic_textual.onnx")
 sess = rt.InferenceSession("pipeline_titanic_textual.onnx")
-numT = sess.run(None, inputs)
+numT = sess.run(None, {i.name: inputs[i.name] for i in sess.get_inputs()})
 print("textual features", numT[0][:1])
 
 ##################################
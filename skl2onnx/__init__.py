@@ -21,6 +21,7 @@ from ._supported_operators import ( # noqa
 )
 from ._parse import update_registered_parser # noqa
 from .proto import get_latest_tested_opset_version # noqa
+from .helpers.autotune import to_onnx_autotune # noqa
 
 
 def supported_converters(from_sklearn=False):
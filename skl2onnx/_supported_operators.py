@@ -196,7 +196,8 @@ except ImportError:
         HistGradientBoostingRegressor = None
         HistGradientBoostingClassifier = None
 
-from sklearn.random_projection import GaussianRandomProjection
+from sklearn.random_projection import (
+    GaussianRandomProjection, SparseRandomProjection)
 
 from .common._registration import register_converter, register_shape_calculator
 
@@ -324,6 +325,7 @@ def build_sklearn_operator_name_map():
                 SelectPercentile,
                 SGDClassifier,
                 SimpleImputer,
+                SparseRandomProjection,
                 StackingClassifier,
                 StackingRegressor,
                 SVC,
@@ -376,7 +378,8 @@ def build_sklearn_operator_name_map():
 
 
 def update_registered_converter(model, alias, shape_fct, convert_fct,
-                                overwrite=True, parser=None, options=None):
+                                overwrite=True, parser=None, options=None,
+                                float16=False):
     """
     Registers or updates a converter for a new model so that
     it can be converted when inserted in a *scikit-learn* pipeline.
@@ -392,6 +395,8 @@ def update_registered_converter(model, alias, shape_fct, convert_fct,
         already exists
     :param parser: overwrites the parser as well if not empty
     :param options: registered options for this converter
+    :param float16: True if the converter supports a conversion
+        with ``dtype=numpy.float16``
 
     The alias is usually the library name followed by the model name.
     Example:
@@ -413,7 +418,7 @@ def update_registered_converter(model, alias, shape_fct, convert_fct,
                       "'{1}'.".format(model, sklearn_operator_name_map[model]))
     sklearn_operator_name_map[model] = alias
     register_converter(alias, convert_fct, overwrite=overwrite,
-                       options=options)
+                       options=options, float16=float16)
     register_shape_calculator(alias, shape_fct, overwrite=overwrite)
     if parser is not None:
         from ._parse import update_registered_parser
@@ -5,7 +5,8 @@
 # --------------------------------------------------------------------------
 from collections import OrderedDict
 import numpy as np
-from ..common.data_types import FloatTensorType, DoubleTensorType
+from ..common.data_types import (
+    FloatTensorType, DoubleTensorType, Float16TensorType)
 from .onnx_ops import (
     OnnxIdentity, OnnxScan, OnnxTranspose,
     OnnxSub, OnnxReduceSumSquare, OnnxSqueeze,
@@ -13,6 +14,14 @@ from .onnx_ops import (
 )
 
 
+def _tensor_type(dtype):
+    if dtype == np.float32:
+        return FloatTensorType
+    if dtype == np.float16:
+        return Float16TensorType
+    return DoubleTensorType
+
+
 def onnx_squareform_pdist(X, metric='sqeuclidean', dtype=None,
                           op_version=None, **kwargs):
     """
@@ -45,7 +54,7 @@ def _onnx_squareform_pdist_sqeuclidean(X, dtype=None, op_version=None,
                                op_version=op_version)
     flat = OnnxSqueeze(norm, output_names=['scan_out'], axes=[1],
                        op_version=op_version)
-    tensor_type = FloatTensorType if dtype == np.float32 else DoubleTensorType
+    tensor_type = _tensor_type(dtype)
     id_next.set_onnx_name_prefix('pdistsqe')
     scan_body = id_next.to_onnx(
         OrderedDict([('next_in', tensor_type()),
@@ -71,7 +80,7 @@ def onnx_cdist(XA, XB, metric='sqeuclidean', dtype=None,
     :param XA: array or OnnxOperatorMixin
     :param XB: array or OnnxOperatorMixin
     :param metric: distance type
-    :param dtype: *np.float32* or *np.float64*
+    :param dtype: *np.float32*, *np.float64* or *np.float16*
     :param op_version: opset version
     :param dim_in: dimension of the input vectorial space
         (if known)
@@ -115,7 +124,7 @@ def _onnx_cdist_begin(op_version):
 
 def _onnx_cdist_end(XA, XB, id_next, flat, dtype, op_version,
                     dim_in=None, dim_out=None, **kwargs):
-    tensor_type = FloatTensorType if dtype == np.float32 else DoubleTensorType
+    tensor_type = _tensor_type(dtype)
     id_next.set_onnx_name_prefix('cdistd')
     shape_in = (tensor_type() if dim_in is None
                 else tensor_type([None, dim_in]))
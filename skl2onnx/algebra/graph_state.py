@@ -91,6 +91,9 @@ class GraphState:
             elif dtype == np.float64:
                 ty = onnx_proto.TensorProto.DOUBLE
                 astype = np.float64
+            elif dtype == np.float16:
+                ty = onnx_proto.TensorProto.FLOAT16
+                astype = np.float16
             elif dtype == np.int64:
                 ty = onnx_proto.TensorProto.INT64
                 astype = np.int64
@@ -1,7 +1,10 @@
 """
 Place holder for all ONNX operators.
 """
+import json
+import os
 import sys
+import tempfile
 import onnx
 from .automation import get_rst_doc
 
@@ -92,15 +95,11 @@ def ClassFactory(class_name, op_name, inputs, outputs,
     return newclass
 
 
-def dynamic_class_creation():
+def _schema_metadata():
     """
-    Automatically generates classes for each of the operators
-    module *onnx* defines and described at
-    `Operators
-    <https://github.com/onnx/onnx/blob/master/docs/Operators.md>`_
-    and `Operators
-    <https://github.com/onnx/onnx/blob/master/docs/
-    Operators-ml.md>`_.
+    Reads the schemas module *onnx* defines and returns
+    the information needed to create every class,
+    one dictionary per class.
     """
     res = {}
     for schema in onnx.defs.get_all_schemas_with_history():
@@ -115,33 +114,134 @@ def dynamic_class_creation():
         else:
             res[schema.name] = schema
         res[schema.name + '_' + str(schema.since_version)] = schema
-    cls = {}
 
     def _c(obj, label, i):
         name = '%s%d' % (obj.name or label, i)
         tys = obj.typeStr or ''
         return (name, tys)
 
+    metadata = []
     for name in sorted(res):
         schema = res[name]
         doc = get_rst_doc(schema)
-        inputs = [_c(o, 'I', i) for i, o in enumerate(schema.inputs)]
-        outputs = [_c(o, 'O', i) for i, o in enumerate(schema.outputs)]
-        args = [p for p in schema.attributes]
-
         if '_' in name:
             class_name = "Onnx" + name
         else:
             class_name = "Onnx" + schema.name
+        metadata.append(dict(
+            class_name=class_name, op_name=schema.name,
+            inputs=[_c(o, 'I', i) for i, o in enumerate(schema.inputs)],
+            outputs=[_c(o, 'O', i) for i, o in enumerate(schema.outputs)],
+            input_range=[schema.min_input, schema.max_input],
+            output_range=[schema.min_output, schema.max_output],
+            domain=schema.domain,
+            attr_names=[p for p in schema.attributes],
+            doc="**Version**" + doc.split('**Version**')[-1],
+            deprecated=getattr(schema, 'deprecated', False),
+            since_version=schema.since_version))
+    return metadata
+
+
+def _default_cache_file():
+    """
+    Returns the file caching the schema metadata, it is located
+    in the folder defined by environment variable
+    *SKL2ONNX_CACHE_DIR*, the cache is disabled if the variable
+    is not defined or empty. The file name depends on the versions
+    of *onnx* and *skl2onnx*.
+    """
+    folder = os.environ.get('SKL2ONNX_CACHE_DIR', None)
+    if not folder:
+        return None
+    from .. import __version__
+    return os.path.join(folder, 'onnx_ops_{}_{}.json'.format(
+        onnx.__version__, __version__))
+
+
+def _load_schema_metadata(cache_file):
+    """
+    Loads the schema metadata from *cache_file*,
+    returns None if the file does not exist, cannot be read or
+    was computed with another version of *onnx*.
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(content, dict) or
+            content.get('onnx', None) != onnx.__version__):
+        return None
+    metadata = content.get('metadata', None)
+    if not isinstance(metadata, list):
+        return None
+    for meta in metadata:
+        meta['inputs'] = [tuple(i) for i in meta['inputs']]
+        meta['outputs'] = [tuple(o) for o in meta['outputs']]
+    return metadata
 
-        cl = ClassFactory(class_name, schema.name, inputs, outputs,
-                          [schema.min_input, schema.max_input],
-                          [schema.min_output, schema.max_output],
-                          schema.domain, args,
-                          "**Version**" + doc.split('**Version**')[-1],
-                          getattr(schema, 'deprecated', False),
-                          schema.since_version, {})
-        cls[class_name] = cl
+
+def _save_schema_metadata(cache_file, metadata):
+    """
+    Saves the schema metadata into *cache_file*. The file is
+    written under another name and then renamed so that
+    concurrent processes never read a partial file.
+    Errors are ignored, the cache is only an optimisation.
+    """
+    folder = os.path.dirname(os.path.abspath(cache_file))
+    try:
+        os.makedirs(folder, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(dict(onnx=onnx.__version__,
+                               metadata=metadata), f)
+            os.chmod(name, 0o644)
+            os.replace(name, cache_file)
+        except BaseException:
+            os.remove(name)
+            raise
+    except OSError:
+        pass
+
+
+def dynamic_class_creation(cache_file=None):
+    """
+    Automatically generates classes for each of the operators
+    module *onnx* defines and described at
+    `Operators
+    <https://github.com/onnx/onnx/blob/master/docs/Operators.md>`_
+    and `Operators
+    <https://github.com/onnx/onnx/blob/master/docs/
+    Operators-ml.md>`_.
+
+    :param cache_file: file caching the schema metadata
+        (input and output ranges, attribute names, since_version,
+        documentation), the schemas are read from *onnx* and the file
+        is created if it does not exist, the default value is given
+        by environment variable *SKL2ONNX_CACHE_DIR*, no file is
+        used if the variable is not defined
+    :return: dictionary *{class name: class}*
+    """
+    if cache_file is None:
+        cache_file = _default_cache_file()
+    metadata = None
+    if cache_file is not None:
+        metadata = _load_schema_metadata(cache_file)
+    if metadata is None:
+        metadata = _schema_metadata()
+        if cache_file is not None:
+            _save_schema_metadata(cache_file, metadata)
+
+    cls = {}
+    for meta in metadata:
+        cl = ClassFactory(meta['class_name'], meta['op_name'],
+                          meta['inputs'], meta['outputs'],
+                          meta['input_range'], meta['output_range'],
+                          meta['domain'], meta['attr_names'],
+                          meta['doc'], meta['deprecated'],
+                          meta['since_version'], {})
+        cls[meta['class_name']] = cl
 
     # Retrieves past classes.
     for name in cls:
@@ -18,7 +18,7 @@ import onnx.onnx_cpp2py_export.defs as C
 from onnxconverter_common.onnx_ops import __dict__ as dict_apply_operation
 from ..proto import TensorProto
 from ..proto.onnx_helper_modified import (
-    make_node, ValueInfoProto, make_tensor, make_attribute
+    make_node, ValueInfoProto, make_tensor, make_attribute, from_array
 )
 try:
     from ..proto import SparseTensorProto
@@ -140,11 +140,13 @@ class RawModelContainerNode(_WhiteBlackContainer):
             self.proto_dtype = onnx_proto.TensorProto.FLOAT
         elif dtype == np.float64:
             self.proto_dtype = onnx_proto.TensorProto.DOUBLE
+        elif dtype == np.float16:
+            self.proto_dtype = onnx_proto.TensorProto.FLOAT16
         elif dtype == np.int64:
             self.proto_dtype = onnx_proto.TensorProto.INT64
         else:
             raise ValueError("dtype should be either np.float32, "
-                             "np.float64, np.int64.")
+                             "np.float64, np.float16, np.int64.")
 
     @property
     def raw_model(self):
@@ -230,7 +232,7 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
         """
         if dtype is None:
             raise ValueError("dtype must be specified, it should be either "
-                             "np.float32 or np.float64.")
+                             "np.float32, np.float64 or np.float16.")
         _WhiteBlackContainer.__init__(
             self, white_op=white_op, black_op=black_op)
         # Inputs of ONNX graph. They are ValueInfoProto in ONNX.
@@ -256,17 +258,23 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
         self.options = options
         # All registered models.
         self.registered_models = registered_models
+        # Operator being converted, every added node or initializer
+        # is recorded in *emitted* under its full name.
+        self.current_operator = None
+        self.emitted = {}
 
         self.dtype = dtype
         if dtype == np.float32:
             self.proto_dtype = onnx_proto.TensorProto.FLOAT
         elif dtype == np.float64:
             self.proto_dtype = onnx_proto.TensorProto.DOUBLE
+        elif dtype == np.float16:
+            self.proto_dtype = onnx_proto.TensorProto.FLOAT16
         elif dtype == np.int64:
             self.proto_dtype = onnx_proto.TensorProto.INT64
         else:
             raise ValueError("dtype should be either np.float32, "
-                             "np.float64, np.int64.")
+                             "np.float64, np.float16, np.int64.")
 
     def __str__(self):
         """
@@ -362,7 +370,8 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
         :return: created tensor
         """
         if (can_cast and isinstance(content, (np.ndarray, coo_matrix)) and
-                onnx_type in (TensorProto.FLOAT, TensorProto.DOUBLE) and
+                onnx_type in (TensorProto.FLOAT, TensorProto.DOUBLE,
+                              TensorProto.FLOAT16) and
                 onnx_type != self.proto_dtype):
             content = content.astype(self.dtype)
             onnx_type = self.proto_dtype
@@ -376,6 +385,16 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
             tensor.name = name
             tensor.raw_data = content.raw_data
             tensor.dims.extend(content.dims)
+        elif (onnx_type in (TensorProto.FLOAT16, TensorProto.INT8) and
+                not isinstance(content, coo_matrix)):
+            # older versions of onnx expect the bits of every float16
+            # in int32_data and int8 are stored as varint in int32_data,
+            # from_array stores them in raw_data
+            tensor = from_array(
+                np.array(content, dtype=(
+                    np.float16 if onnx_type == TensorProto.FLOAT16
+                    else np.int8)).reshape(
+                        [] if shape is None else shape), name=name)
         elif shape is None and isinstance(
                 content, (np.float32, np.float64, np.int32, np.int64, float)):
             tensor = make_tensor(name, onnx_type, [], [content])
@@ -391,8 +410,8 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
             values_tensor = make_tensor(
                 name + "_v", data_type=onnx_type,
                 dims=(len(content.data), ), vals=content.data)
-            indices = [i * content.shape[1] + j
-                       for i, j in zip(content.row, content.col)]
+            indices = (content.row.astype(np.int64) * content.shape[1] +
+                       content.col)
             indices_tensor = make_tensor(
                 name=name + "_i", data_type=TensorProto.INT64,
                 dims=(len(indices), ), vals=indices)
@@ -406,6 +425,7 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
 
         if tensor is not None:
             self.initializers.append(tensor)
+            self._record_emitted('initializers', name)
             return tensor
         elif sparse_tensor is not None:
             self.add_node('Constant', [], [name], sparse_value=sparse_tensor,
@@ -415,6 +435,20 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
             raise RuntimeError(
                 "Either tensor or sparse_tensor should be defined.")
 
+    def _record_emitted(self, kind, name):
+        """
+        Stores the name of an initializer or the output names of a node
+        added by the operator being converted (see *current_operator*).
+        Node names may be empty or duplicated, output names are unique.
+        """
+        if self.current_operator is None:
+            return
+        key = self.current_operator.full_name
+        if key not in self.emitted:
+            self.emitted[key] = dict(operator=self.current_operator,
+                                     nodes=[], initializers=[])
+        self.emitted[key][kind].append(name)
+
     def add_value_info(self, variable):
         self.value_info.append(self._make_value_info(variable))
 
@@ -499,14 +533,16 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
             raise ValueError('Outputs must be a list of string but get [%s]'
                              % type_list)
         upd = {}
+        # attributes cannot store float16, they remain float32
+        attr_dtype = np.float32 if self.dtype == np.float16 else self.dtype
         for k, v in attrs.items():
             if v is None:
                 raise ValueError('Failed to create ONNX node. Undefined '
                                  'attribute pair (%s, %s) found' % (k, v))
             if (isinstance(v, np.ndarray) and
-                    v.dtype in (np.float32, np.float64) and
-                    v.dtype != self.dtype):
-                upd[k] = v.astype(self.dtype)
+                    v.dtype in (np.float32, np.float64, np.float16) and
+                    v.dtype != attr_dtype):
+                upd[k] = v.astype(attr_dtype)
 
         if upd:
             attrs.update(upd)
@@ -514,7 +550,7 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
             raise RuntimeError("dtype should not be a parameter.")
         try:
             node = make_node(op_type, inputs, outputs, name=name,
-                             _dtype=self.dtype, **attrs)
+                             _dtype=attr_dtype, **attrs)
         except ValueError as e:
             raise ValueError("Unable to create node '{}' with name='{}'."
                              "".format(op_type, name)) from e
@@ -522,6 +558,7 @@ class ModelComponentContainer(ModelContainer, _WhiteBlackContainer):
 
         self.node_domain_version_pair_sets.add((op_domain, op_version))
         self.nodes.append(node)
+        self._record_emitted('nodes', tuple(node.output))
         if (self.target_opset is not None and
                 op_version is not None and
                 op_version > self.target_opset_any_domain(op_domain)):
@@ -0,0 +1,148 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+
+@contextmanager
+def _no_profiling():
+    yield None
+
+
+class ConversionProfiler:
+    """
+    Collects the time, the allocated memory, the number of nodes
+    and initializers added by every phase of the conversion and
+    every converter (see parameter *profile* of
+    :func:`convert_sklearn <skl2onnx.convert_sklearn>`).
+
+    :param memory: measures the allocations with :mod:`tracemalloc`,
+        it slows down the conversion
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.phases = []
+        self.converters = []
+        self.total = None
+        self._started = False
+        self._peaks = []
+
+    def start(self):
+        "Starts tracing memory allocations if needed."
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self._begin = perf_counter()
+
+    def stop(self):
+        "Stops tracing memory allocations if the profiler started it."
+        self.total = perf_counter() - self._begin
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def record(self, obs, container=None):
+        """
+        Measures the code executed within the context and
+        stores the results into dictionary *obs*.
+        *container* is used to count the added nodes and initializers.
+        """
+        if container is not None:
+            n_nodes = len(container.nodes)
+            n_inits = len(container.initializers)
+        has_peak = self.memory and hasattr(tracemalloc, 'reset_peak')
+        if self.memory:
+            current = tracemalloc.get_traced_memory()[0]
+        if has_peak:
+            # the peak is global, the parent keeps the highest peak
+            # reached before this context resets it
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1],
+                                      tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(current)
+        begin = perf_counter()
+        try:
+            yield obs
+        finally:
+            obs['time'] = perf_counter() - begin
+            if self.memory:
+                current_end, peak = tracemalloc.get_traced_memory()
+                obs['memory'] = current_end - current
+            if has_peak:
+                peak = max(self._peaks.pop(), peak)
+                obs['memory_peak'] = peak - current
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            if container is not None:
+                obs['nodes'] = len(container.nodes) - n_nodes
+                obs['initializers'] = (
+                    len(container.initializers) - n_inits)
+
+    def phase(self, name, container=None):
+        "Measures one phase of the conversion."
+        obs = dict(phase=name)
+        self.phases.append(obs)
+        return self.record(obs, container)
+
+    def converter(self, operator, container):
+        "Measures the converter of one operator."
+        # operators added by the parser such as ZipMap
+        # have no raw operator
+        raw = operator.raw_operator
+        obs = dict(alias=operator.type,
+                   model=None if raw is None else type(raw).__name__,
+                   name=operator.full_name)
+        self.converters.append(obs)
+        return self.record(obs, container)
+
+    def report(self):
+        """
+        Returns the profiling information as a dictionary:
+
+        * *total*: total conversion time
+        * *phases*: one dictionary per phase
+        * *converters*: one dictionary per converted operator
+        * *summary*: the same information aggregated by alias
+        """
+        summary = {}
+        for obs in self.converters:
+            agg = summary.get(obs['alias'], None)
+            if agg is None:
+                agg = dict(model=obs['model'], count=0)
+                summary[obs['alias']] = agg
+            agg['count'] += 1
+            for k in ['time', 'memory', 'nodes', 'initializers']:
+                if k in obs:
+                    agg[k] = agg.get(k, 0) + obs[k]
+            if 'memory_peak' in obs:
+                agg['memory_peak'] = max(agg.get('memory_peak', 0),
+                                         obs['memory_peak'])
+        return dict(total=self.total, phases=self.phases,
+                    converters=self.converters, summary=summary)
+
+
+def profile_phase(profiler, name, container=None):
+    """
+    Returns a context measuring a phase of the conversion
+    or a context doing nothing if *profiler* is None.
+    """
+    if profiler is None:
+        return _no_profiling()
+    return profiler.phase(name, container)
+
+
+def profile_converter(profiler, operator, container):
+    """
+    Returns a context measuring a converter
+    or a context doing nothing if *profiler* is None.
+    """
+    if profiler is None:
+        return _no_profiling()
+    return profiler.converter(operator, container)
@@ -15,9 +15,10 @@ _converter_pool = {}
 
 class RegisteredConverter:
 
-    def __init__(self, fct, options):
+    def __init__(self, fct, options, float16=False):
         self._fct = fct
         self._options = options
+        self._float16 = float16
 
     def __call__(self, *args):
         if (len(args) == 3 and
@@ -31,6 +32,9 @@ class RegisteredConverter:
     def get_allowed_options(self):
         return self._options
 
+    def supports_float16(self):
+        return self._float16
+
 
 # This dictionary defines the shape calculators which can be invoked in
 # the conversion framework defined in _topology.py. A key in this
@@ -41,7 +45,7 @@ _shape_calculator_pool = {}
 
 
 def register_converter(operator_name, conversion_function, overwrite=False,
-                       options=None):
+                       options=None, float16=False):
     """
     :param operator_name: A unique operator ID. It is usually a string
                           but you can use a type as well
@@ -53,6 +57,8 @@ def register_converter(operator_name, conversion_function, overwrite=False,
                       to enable overwriting.
     :param options: supported options for this converter
         (dictionary {name: supported values or None})
+    :param float16: True if the converter supports a conversion
+        with ``dtype=numpy.float16``
     """
     if not overwrite and operator_name in _converter_pool:
         raise ValueError('We do not overwrite registered converter '
@@ -62,7 +68,7 @@ def register_converter(operator_name, conversion_function, overwrite=False,
         check_signature(conversion_function, _converter_pool[key]._fct,
                         skip=('operator', ))
     _converter_pool[operator_name] = RegisteredConverter(
-        conversion_function, options)
+        conversion_function, options, float16=float16)
 
 
 def get_converter(operator_name):
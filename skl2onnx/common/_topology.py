@@ -17,6 +17,7 @@ from onnxconverter_common.data_types import (  # noqa
     Int32TensorType, BooleanTensorType,
     DoubleTensorType,
 )
+from .data_types import Float16TensorType
 from ..proto import (
     get_opset_number_from_onnx,
     get_latest_tested_opset_version
@@ -28,6 +29,7 @@ from . import _registration
 from . import utils
 from .exceptions import MissingShapeCalculator, MissingConverter
 from ._container import ModelComponentContainer, _build_options
+from ._profiling import profile_converter, profile_phase
 from .interface import OperatorBase
 type_fct = type
 
@@ -227,6 +229,8 @@ class Operator(OperatorBase):
             return FloatTensorType
         if self.dtype == np.float64:
             return FloatTensorType
+        if self.dtype == np.float16:
+            return Float16TensorType
         raise NotImplementedError(
             "Unable to guess the tensor type from [{}].".format(self.dtype))
 
@@ -236,7 +240,10 @@ class Operator(OperatorBase):
             return onnx_proto.TensorProto.FLOAT
         if self.dtype == np.float64:
             return onnx_proto.TensorProto.DOUBLE
-        raise ValueError("dtype should be either np.float32 or np.float64.")
+        if self.dtype == np.float16:
+            return onnx_proto.TensorProto.FLOAT16
+        raise ValueError("dtype should be either np.float32, np.float64 "
+                         "or np.float16.")
 
 
 class Scope:
@@ -285,12 +292,14 @@ class Scope:
             self.tensor_type = FloatTensorType
         elif dtype == np.float64:
             self.tensor_type = DoubleTensorType
+        elif dtype == np.float16:
+            self.tensor_type = Float16TensorType
         elif dtype == np.int64:
             self.tensor_type = Int64TensorType
         else:
             raise NotImplementedError(
                 "dtype must be either np.float32, np.float64, "
-                "np.int64.")
+                "np.float16, np.int64.")
 
         # An one-to-many map from raw variable name to ONNX variable
         # names. It looks like
@@ -483,6 +492,11 @@ class Topology:
         # indirectly affects _infer_all_shapes and _prune functions.
         self.root_names = list()
 
+        # Output names of the nodes and names of the initializers
+        # every operator added to the ONNX graph, filled by
+        # *convert_topology*.
+        self.emitted = {}
+
         for k in self.custom_conversion_functions:
             if not callable(k):
                 raise TypeError("Keys in custom_conversion_functions must be "
@@ -683,6 +697,33 @@ class Topology:
             raise RuntimeError('Isolated operators exist: %s'
                                % unused_operators)
 
+    def _check_float16(self):
+        """
+        Raises an exception if the model is converted with
+        ``dtype=numpy.float16`` and one converter does not support it
+        (see parameter *float16* of :func:`register_converter`).
+        Custom converters are not checked.
+        """
+        unsupported = set()
+        for operator in self.unordered_operator_iterator():
+            if operator.dtype != np.float16:
+                continue
+            conv = _registration._converter_pool.get(operator.type, None)
+            if ((conv is not None and conv.supports_float16()) or
+                    operator.type in self.custom_conversion_functions or
+                    type(operator.raw_operator) in
+                    self.custom_conversion_functions):
+                continue
+            unsupported.add(operator.type)
+        if not unsupported:
+            return
+        msg = ("Conversion with dtype=numpy.float16 is not implemented "
+               "for converter(s) {}.".format(
+                   ", ".join("'{}'".format(t) for t in sorted(unsupported))))
+        if 'SklearnZipMap' in unsupported:
+            msg += " Option {'zipmap': False} removes operator ZipMap."
+        raise NotImplementedError(msg)
+
     def _initialize_graph_status_for_traversing(self):
         """
         Initialize the status of all variables and operators for
@@ -890,23 +931,32 @@ class Topology:
             for onnx_name in abandoned_variable_names:
                 scope.delete_local_variable(onnx_name)
 
-    def compile(self):
+    def compile(self, profiler=None):
         """
         This function aims at giving every operator enough information
         so that all operator conversions can happen independently. We
         also want to check, fix, and simplify the network structure
         here.
+
+        :param profiler: :class:`ConversionProfiler` measuring
+            every step or None
         """
-        self._prune()
-        self._resolve_duplicates()
-        self._fix_shapes()
-        self._infer_all_types()
-        self._check_structure()
+        with profile_phase(profiler, '_prune'):
+            self._prune()
+        with profile_phase(profiler, '_resolve_duplicates'):
+            self._resolve_duplicates()
+        self._check_float16()
+        with profile_phase(profiler, '_fix_shapes'):
+            self._fix_shapes()
+        with profile_phase(profiler, '_infer_all_types'):
+            self._infer_all_types()
+        with profile_phase(profiler, '_check_structure'):
+            self._check_structure()
 
 
 def convert_topology(topology, model_name, doc_string, target_opset,
                      channel_first_inputs=None, dtype=None,
-                     options=None):
+                     options=None, profiler=None):
     """
     This function is used to convert our Topology object defined in
     _parser.py into a ONNX model (type: ModelProto).
@@ -920,8 +970,10 @@ def convert_topology(topology, model_name, doc_string, target_opset,
         a dictionary is used to indicate different opset for
         different domains
     :param dtype: float type to use everywhere in the graph,
-        `np.float32` or `np.float64`
+        `np.float32`, `np.float64` or `np.float16`
     :param options: see :ref:`l-conv-options`
+    :param profiler: :class:`ConversionProfiler` measuring
+        every converter or None
     include '1.1.2', '1.2', and so on.
     :return: a ONNX ModelProto
     """
@@ -1028,74 +1080,86 @@ def convert_topology(topology, model_name, doc_string, target_opset,
 
     # Traverse the graph from roots to leaves
     # This loop could eventually be parallelized.
-    for operator in topology.topological_operator_iterator():
-        scope = next(scope for scope in topology.scopes
-                     if scope.name == operator.scope)
-        mtype = type(operator.raw_operator)
-        if mtype in topology.custom_conversion_functions:
-            conv = topology.custom_conversion_functions[mtype]
-        elif operator.type in topology.custom_conversion_functions:
-            conv = topology.custom_conversion_functions[operator.type]
-        elif hasattr(operator.raw_operator, "onnx_converter"):
-            conv = operator.raw_operator.onnx_converter()
-        else:
-            # Convert the selected operator into some ONNX objects and
-            # save them into the container
+    with profile_phase(profiler, 'converters', container):
+        for operator in topology.topological_operator_iterator():
+            scope = next(scope for scope in topology.scopes
+                         if scope.name == operator.scope)
+            mtype = type(operator.raw_operator)
+            if mtype in topology.custom_conversion_functions:
+                conv = topology.custom_conversion_functions[mtype]
+            elif operator.type in topology.custom_conversion_functions:
+                conv = topology.custom_conversion_functions[operator.type]
+            elif hasattr(operator.raw_operator, "onnx_converter"):
+                conv = operator.raw_operator.onnx_converter()
+            else:
+                # Convert the selected operator into some ONNX objects and
+                # save them into the container
+                try:
+                    conv = _registration.get_converter(operator.type)
+                except ValueError:
+                    raise MissingConverter(
+                        "Unable to find converter for alias '{}' type "
+                        "'{}'. You may raise an issue at "
+                        "https://github.com/onnx/sklearn-onnx/issues."
+                        "".format(operator.type, type(
+                            getattr(operator, 'raw_model', None))))
+            container.validate_options(operator)
+            container.current_operator = operator
             try:
-                conv = _registration.get_converter(operator.type)
-            except ValueError:
-                raise MissingConverter(
-                    "Unable to find converter for alias '{}' type "
-                    "'{}'. You may raise an issue at "
-                    "https://github.com/onnx/sklearn-onnx/issues."
-                    "".format(operator.type,
-                              type(getattr(operator, 'raw_model', None))))
-        container.validate_options(operator)
-        conv(scope, operator, container)
+                with profile_converter(profiler, operator, container):
+                    conv(scope, operator, container)
+            finally:
+                container.current_operator = None
+
+    # Nodes and initializers added by every operator,
+    # see skl2onnx.helpers.model_size_report.
+    topology.emitted = container.emitted
 
     # Create a graph from its main components
-    if container.target_opset_onnx < 9:
-        # When calling ModelComponentContainer's add_initializer(...),
-        # nothing is added into the input list. However, for ONNX target
-        # opset < 9, initializers should also be a part of model's
-        # (GraphProto) inputs. Thus, we create ValueInfoProto objects
-        # from initializers (type: TensorProto) directly and then add
-        # them into model's input list.
-        extra_inputs = []  # ValueInfoProto list of the initializers
-        for tensor in container.initializers:
-            # Sometimes (especially when creating optional input values
-            # such as RNN's initial hidden state), an initializer is also
-            # one of the original model's input, so it has been added into
-            # the container's input list. If this is the case, we need to
-            # skip one iteration to avoid duplicated inputs.
-            if tensor.name in [value_info.name for value_info in
-                               container.inputs]:
-                continue
+    with profile_phase(profiler, 'make_graph'):
+        if container.target_opset_onnx < 9:
+            # When calling ModelComponentContainer's add_initializer(...),
+            # nothing is added into the input list. However, for ONNX target
+            # opset < 9, initializers should also be a part of model's
+            # (GraphProto) inputs. Thus, we create ValueInfoProto objects
+            # from initializers (type: TensorProto) directly and then add
+            # them into model's input list.
+            extra_inputs = []  # ValueInfoProto list of the initializers
+            for tensor in container.initializers:
+                # Sometimes (especially when creating optional input values
+                # such as RNN's initial hidden state), an initializer is also
+                # one of the original model's input, so it has been added into
+                # the container's input list. If this is the case, we need to
+                # skip one iteration to avoid duplicated inputs.
+                if tensor.name in [value_info.name for value_info in
+                                   container.inputs]:
+                    continue
 
-            # Initializers are always tensors so we can just call
-            # make_tensor_value_info(...).
-            value_info = make_tensor_value_info(
-                tensor.name, tensor.data_type, tensor.dims)
-            extra_inputs.append(value_info)
-
-        # Before ONNX opset 9, initializers were needed to be passed in
-        # with inputs.
-        graph = make_graph(container.nodes, model_name,
-                           container.inputs + extra_inputs,
-                           container.outputs, container.initializers)
-    else:
-        # In ONNX opset 9 and above, initializers are included as
-        # operator inputs and therefore do not need to be passed as
-        # extra_inputs.
-        graph = make_graph(
-            container.nodes, model_name, container.inputs,
-            container.outputs, container.initializers)
+                # Initializers are always tensors so we can just call
+                # make_tensor_value_info(...).
+                value_info = make_tensor_value_info(
+                    tensor.name, tensor.data_type, tensor.dims)
+                extra_inputs.append(value_info)
+
+            # Before ONNX opset 9, initializers were needed to be passed in
+            # with inputs.
+            graph = make_graph(container.nodes, model_name,
+                               container.inputs + extra_inputs,
+                               container.outputs, container.initializers)
+        else:
+            # In ONNX opset 9 and above, initializers are included as
+            # operator inputs and therefore do not need to be passed as
+            # extra_inputs.
+            graph = make_graph(
+                container.nodes, model_name, container.inputs,
+                container.outputs, container.initializers)
 
     # Add extra information related to the graph
     graph.value_info.extend(container.value_info)
 
     # Create model
-    onnx_model = make_model(graph)
+    with profile_phase(profiler, 'make_model'):
+        onnx_model = make_model(graph)
 
     # Update domain version
     _update_domain_version(container, onnx_model)
@@ -14,6 +14,25 @@ from onnxconverter_common.data_types import (  # noqa
 from onnxconverter_common.data_types import find_type_conversion, onnx_built_with_ml  # noqa
 
 
+class Float16TensorType(TensorType):
+    """
+    Tensor of half floats (float16). It is used when a model
+    is converted with ``dtype=numpy.float16``.
+    """
+
+    def __init__(self, shape=None, color_space=None, doc_string='',
+                 denotation=None, channel_denotations=None):
+        super(Float16TensorType, self).__init__(
+            shape, doc_string, denotation, channel_denotations)
+        self.color_space = color_space
+
+    def _get_element_onnx_type(self):
+        return onnx_proto.TensorProto.FLOAT16
+
+    def __repr__(self):
+        return "Float16TensorType(shape={0})".format(self.shape)
+
+
 def _guess_type_proto(data_type, dims):
     # This could be moved to onnxconverter_common.
     for d in dims:
@@ -25,6 +44,8 @@ def _guess_type_proto(data_type, dims):
         return FloatTensorType(dims)
     if data_type == onnx_proto.TensorProto.DOUBLE:
         return DoubleTensorType(dims)
+    if data_type == onnx_proto.TensorProto.FLOAT16:
+        return Float16TensorType(dims)
     if data_type == onnx_proto.TensorProto.STRING:
         return StringTensorType(dims)
     if data_type == onnx_proto.TensorProto.INT64:
@@ -45,6 +66,8 @@ def _guess_type_proto_str(data_type, dims):
         return FloatTensorType(dims)
     if data_type == "tensor(double)":
         return DoubleTensorType(dims)
+    if data_type == "tensor(float16)":
+        return Float16TensorType(dims)
     if data_type == "tensor(string)":
         return StringTensorType(dims)
     if data_type == "tensor(int64)":
@@ -65,6 +88,8 @@ def _guess_numpy_type(data_type, dims):
         return FloatTensorType(dims)
     if data_type == np.float64:
         return DoubleTensorType(dims)
+    if data_type == np.float16:
+        return Float16TensorType(dims)
     if data_type in (np.str, str, object) or str(
         data_type) in ('<U1', ): # noqa
         return StringTensorType(dims)
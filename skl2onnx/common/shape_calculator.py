@@ -13,6 +13,7 @@ import six
 from .data_types import (
     BooleanTensorType,
     DoubleTensorType,
+    Float16TensorType,
     FloatTensorType,
     Int64TensorType,
     StringTensorType,
@@ -36,7 +37,7 @@ def calculate_linear_classifier_output_shapes(operator):
                                    output_count_range=[1, 2])
     check_input_and_output_types(operator, good_input_types=[
         BooleanTensorType, DoubleTensorType,
-        FloatTensorType, Int64TensorType])
+        FloatTensorType, Int64TensorType, Float16TensorType])
 
     if len(operator.inputs[0].type.shape) != 2:
         raise RuntimeError('Inputs must be a [N, C]-tensor.')
@@ -97,7 +98,7 @@ def calculate_linear_regressor_output_shapes(operator):
                                    output_count_range=1)
     check_input_and_output_types(operator, good_input_types=[
         BooleanTensorType, DoubleTensorType,
-        FloatTensorType, Int64TensorType])
+        FloatTensorType, Int64TensorType, Float16TensorType])
 
     N = operator.inputs[0].type.shape[0]
     if (hasattr(operator.raw_operator, 'coef_') and
@@ -194,27 +194,190 @@ def add_tree_to_attribute_pairs_hist_gradient_boosting(
         leaf_weights_are_counts,
         adjust_threshold_for_sklearn=False,
         dtype=None):
-    for i, node in enumerate(tree.nodes):
-        node_id = i
-        weight = node['value']
+    """
+    Adds a tree of a *HistGradientBoostingClassifier* or
+    a *HistGradientBoostingRegressor* to *attr_pairs*.
+    Every node holds a single value, the conversion
+    processes the structured array *tree.nodes* at once
+    instead of calling :func:`add_node` for every node.
+    """
+    nodes = tree.nodes
+    n_nodes = nodes.shape[0]
+    is_leaf = nodes['is_leaf'].astype(np.bool_)
+    is_branch = ~is_leaf
+    if 'num_threshold' in nodes.dtype.names:
+        # scikit-learn >= 0.24
+        thresholds = nodes['num_threshold'].astype(np.float64)
+    else:
+        thresholds = nodes['threshold'].astype(np.float64)
+    thresholds[is_leaf] = 0.
+    if adjust_threshold_for_sklearn:
+        for i in np.arange(n_nodes)[is_branch]:
+            thresholds[i] = sklearn_threshold(
+                thresholds[i], dtype, 'BRANCH_LEQ')
 
-        if node['is_leaf']:
-            mode = 'LEAF'
-            feat_id = 0
-            threshold = 0.
-            left_child_id = 0
-            right_child_id = 0
-            missing = False
+    attr_pairs['nodes_treeids'].extend([tree_id] * n_nodes)
+    attr_pairs['nodes_nodeids'].extend(range(n_nodes))
+    attr_pairs['nodes_featureids'].extend(
+        np.where(is_branch, nodes['feature_idx'], 0).tolist())
+    attr_pairs['nodes_modes'].extend(
+        np.where(is_branch, 'BRANCH_LEQ', 'LEAF').tolist())
+    attr_pairs['nodes_values'].extend(thresholds.tolist())
+    attr_pairs['nodes_truenodeids'].extend(
+        np.where(is_branch, nodes['left'], 0).tolist())
+    attr_pairs['nodes_falsenodeids'].extend(
+        np.where(is_branch, nodes['right'], 0).tolist())
+    attr_pairs['nodes_missing_value_tracks_true'].extend(
+        (is_branch & (nodes['missing_go_to_left'] != 0)).tolist())
+    attr_pairs['nodes_hitrates'].extend([1.] * n_nodes)
+
+    # A leaf holds a single value, counts are never normalized
+    # for gradient boosting.
+    leaves = np.arange(n_nodes)[is_leaf]
+    weights = (nodes['value'][is_leaf] * tree_weight).tolist()
+    prefix = 'class' if is_classifier else 'target'
+    attr_pairs[prefix + '_treeids'].extend([tree_id] * leaves.shape[0])
+    attr_pairs[prefix + '_nodeids'].extend(leaves.tolist())
+    attr_pairs[prefix + '_ids'].extend([weight_id_bias] * leaves.shape[0])
+    attr_pairs[prefix + '_weights'].extend(weights)
+
+
+def _leaf_output(attr_pairs, prefix):
+    """
+    Returns a dictionary ``{(tree_id, node_id): output}``,
+    every output is a sorted tuple of ``(class_id, weight)``.
+    """
+    outputs = {}
+    for tid, nid, cid, w in zip(attr_pairs[prefix + '_treeids'],
+                                attr_pairs[prefix + '_nodeids'],
+                                attr_pairs[prefix + '_ids'],
+                                attr_pairs[prefix + '_weights']):
+        key = (int(tid), int(nid))
+        if key not in outputs:
+            outputs[key] = []
+        outputs[key].append((int(cid), float(w)))
+    return {k: tuple(sorted(v)) for k, v in outputs.items()}
+
+
+def compact_tree_attribute_pairs(attr_pairs):
+    """
+    Reduces the size of the attributes of a node
+    *TreeEnsembleClassifier* or *TreeEnsembleRegressor*
+    built with the other functions of this module.
+    Every subtree whose leaves all return the same values
+    is replaced by a single leaf and the nodes are renumbered.
+    Attributes *nodes_hitrates* and *nodes_missing_value_tracks_true*
+    are removed if they are equal to their default value
+    (1 and False) for every node. *attr_pairs* is modified inplace.
+
+    :param attr_pairs: attributes
+    :return: dictionary with statistics, number of nodes and leaves
+        before and after the compaction, removed attributes
+    """
+    prefix = 'class' if 'class_treeids' in attr_pairs else 'target'
+    names = [k for k in attr_pairs if k.startswith('nodes_')]
+    n_nodes = len(attr_pairs['nodes_nodeids'])
+    modes = [m.decode('ascii') if isinstance(m, bytes) else m
+             for m in attr_pairs['nodes_modes']]
+    stats = dict(n_nodes_before=n_nodes,
+                 n_leaves_before=sum(1 for m in modes if m == 'LEAF'))
+
+    outputs = _leaf_output(attr_pairs, prefix)
+    position = {}
+    children = set()
+    for i in range(n_nodes):
+        key = (int(attr_pairs['nodes_treeids'][i]),
+               int(attr_pairs['nodes_nodeids'][i]))
+        position[key] = i
+        if modes[i] != 'LEAF':
+            children.add((key[0], int(attr_pairs['nodes_truenodeids'][i])))
+            children.add((key[0], int(attr_pairs['nodes_falsenodeids'][i])))
+
+    # Post-order traversal of every tree, a branch becomes a leaf
+    # if both its children are leaves returning the same output.
+    kept = []
+    for root in sorted(k for k in position if k not in children):
+        order = []
+        stack = [root]
+        while stack:
+            key = stack.pop()
+            order.append(key)
+            i = position[key]
+            if modes[i] != 'LEAF':
+                stack.append((key[0],
+                              int(attr_pairs['nodes_truenodeids'][i])))
+                stack.append((key[0],
+                              int(attr_pairs['nodes_falsenodeids'][i])))
+        for key in reversed(order):
+            i = position[key]
+            if modes[i] == 'LEAF':
+                continue
+            left = (key[0], int(attr_pairs['nodes_truenodeids'][i]))
+            right = (key[0], int(attr_pairs['nodes_falsenodeids'][i]))
+            if (modes[position[left]] == 'LEAF' and
+                    modes[position[right]] == 'LEAF' and
+                    outputs.get(left) == outputs.get(right)):
+                modes[i] = 'LEAF'
+                if left in outputs:
+                    outputs[key] = outputs[left]
+
+        # Nodes still reachable from the root.
+        stack = [root]
+        while stack:
+            key = stack.pop()
+            kept.append(key)
+            i = position[key]
+            if modes[i] != 'LEAF':
+                stack.append((key[0],
+                              int(attr_pairs['nodes_falsenodeids'][i])))
+                stack.append((key[0],
+                              int(attr_pairs['nodes_truenodeids'][i])))
+
+    # Renumbering, the nodes keep their original order.
+    kept.sort(key=lambda k: position[k])
+    new_ids = {}
+    counts = {}
+    for key in kept:
+        new_ids[key] = counts.get(key[0], 0)
+        counts[key[0]] = new_ids[key] + 1
+    new_attrs = {k: [] for k in names}
+    for key in kept:
+        i = position[key]
+        for k in names:
+            new_attrs[k].append(attr_pairs[k][i])
+        new_attrs['nodes_nodeids'][-1] = new_ids[key]
+        new_attrs['nodes_modes'][-1] = modes[i]
+        if modes[i] == 'LEAF':
+            new_attrs['nodes_featureids'][-1] = 0
+            new_attrs['nodes_values'][-1] = 0.
+            new_attrs['nodes_truenodeids'][-1] = 0
+            new_attrs['nodes_falsenodeids'][-1] = 0
         else:
-            mode = 'BRANCH_LEQ'
-            feat_id = node['feature_idx']
-            threshold = node['threshold']
-            left_child_id = node['left']
-            right_child_id = node['right']
-            missing = node['missing_go_to_left']
+            new_attrs['nodes_truenodeids'][-1] = new_ids[
+                key[0], int(attr_pairs['nodes_truenodeids'][i])]
+            new_attrs['nodes_falsenodeids'][-1] = new_ids[
+                key[0], int(attr_pairs['nodes_falsenodeids'][i])]
+    attr_pairs.update(new_attrs)
 
-        add_node(attr_pairs, is_classifier, tree_id, tree_weight, node_id,
-                 feat_id, mode, threshold, left_child_id, right_child_id,
-                 weight, weight_id_bias, leaf_weights_are_counts,
-                 adjust_threshold_for_sklearn=adjust_threshold_for_sklearn,
-                 dtype=dtype, nodes_missing_value_tracks_true=missing)
+    leaves = [k for k in kept if modes[position[k]] == 'LEAF']
+    for k in ['treeids', 'nodeids', 'ids', 'weights']:
+        attr_pairs['%s_%s' % (prefix, k)] = []
+    for key in leaves:
+        for cid, w in outputs.get(key, []):
+            attr_pairs[prefix + '_treeids'].append(key[0])
+            attr_pairs[prefix + '_nodeids'].append(new_ids[key])
+            attr_pairs[prefix + '_ids'].append(cid)
+            attr_pairs[prefix + '_weights'].append(w)
+
+    removed = []
+    if ('nodes_hitrates' in attr_pairs and
+            all(h == 1 for h in attr_pairs['nodes_hitrates'])):
+        removed.append('nodes_hitrates')
+    if ('nodes_missing_value_tracks_true' in attr_pairs and
+            not any(attr_pairs['nodes_missing_value_tracks_true'])):
+        removed.append('nodes_missing_value_tracks_true')
+    for k in removed:
+        del attr_pairs[k]
+    stats.update(dict(n_nodes_after=len(kept), n_leaves_after=len(leaves),
+                      removed_attributes=removed))
+    return stats
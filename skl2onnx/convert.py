@@ -8,6 +8,7 @@ from uuid import uuid4
 import numpy as np
 from .proto import get_latest_tested_opset_version
 from .common._topology import convert_topology
+from .common._profiling import ConversionProfiler, profile_phase
 from ._parse import parse_sklearn_model
 
 # Invoke the registration of all our converters and shape calculators.
@@ -20,7 +21,8 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
                     custom_shape_calculators=None,
                     custom_parsers=None, options=None,
                     dtype=np.float32, intermediate=False,
-                    white_op=None, black_op=None, final_types=None):
+                    white_op=None, black_op=None, final_types=None,
+                    profile=False):
     """
     This function produces an equivalent ONNX model of the given scikit-learn model.
     The supported converters is returned by function
@@ -50,7 +52,7 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
         *custom_parsers* is a dictionary ``{ type: fct_parser(scope, model, inputs, custom_parsers=None) }``
     :param options: specific options given to converters (see :ref:`l-conv-options`)
     :param dtype: float type to use everywhere in the graph,
-        `np.float32` or `np.float64`
+        `np.float32`, `np.float64` or `np.float16`
     :param intermediate: if True, the function returns the converted model and , and :class:`Topology`,
         it returns the converted model otherwise
     :param white_op: white list of ONNX nodes allowed while converting a pipeline,
@@ -60,6 +62,13 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
     :param final_types: a python list. Works the same way as initial_types
         but not mandatory, it is used to overwrites the type
         (if type is not None) and the name of every output.
+    :param profile: if True, the function measures the time, the allocated memory
+        (with :mod:`tracemalloc`), the number of nodes and initializers
+        added by every phase of the conversion and every converter,
+        ``profile='time'`` skips the memory to avoid its overhead,
+        the function returns the converted model and the report
+        (see :meth:`ConversionProfiler.report
+        <skl2onnx.common._profiling.ConversionProfiler.report>`)
     :return: An ONNX model (type: ModelProto) which is equivalent to the input scikit-learn model
 
     Example of *initial_types*:
@@ -138,27 +147,43 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
 
     target_opset = (target_opset
                     if target_opset else get_latest_tested_opset_version())
-    # Parse scikit-learn model as our internal data structure
-    # (i.e., Topology)
-    topology = parse_sklearn_model(
-        model, initial_types, target_opset, custom_conversion_functions,
-        custom_shape_calculators, custom_parsers, options=options,
-        dtype=dtype, white_op=white_op, black_op=black_op,
-        final_types=final_types)
-
-    # Infer variable shapes
-    topology.compile()
-
-    # Convert our Topology object into ONNX. The outcome is an ONNX model.
-    onnx_model = convert_topology(topology, name, doc_string, target_opset,
-                                  dtype=dtype, options=options)
-
-    return (onnx_model, topology) if intermediate else onnx_model
+    profiler = (ConversionProfiler(memory=profile != 'time')
+                if profile else None)
+    if profiler is not None:
+        profiler.start()
+    try:
+        # Parse scikit-learn model as our internal data structure
+        # (i.e., Topology)
+        with profile_phase(profiler, 'parse_sklearn_model'):
+            topology = parse_sklearn_model(
+                model, initial_types, target_opset,
+                custom_conversion_functions, custom_shape_calculators,
+                custom_parsers, options=options, dtype=dtype,
+                white_op=white_op, black_op=black_op,
+                final_types=final_types)
+
+        # Infer variable shapes
+        topology.compile(profiler=profiler)
+
+        # Convert our Topology object into ONNX.
+        # The outcome is an ONNX model.
+        onnx_model = convert_topology(
+            topology, name, doc_string, target_opset, dtype=dtype,
+            options=options, profiler=profiler)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+    res = (onnx_model, topology) if intermediate else (onnx_model, )
+    if profiler is not None:
+        res += (profiler.report(), )
+    return res if len(res) > 1 else res[0]
 
 
 def to_onnx(model, X=None, name=None, initial_types=None,
             target_opset=None, options=None, dtype=np.float32,
-            white_op=None, black_op=None, final_types=None):
+            white_op=None, black_op=None, final_types=None,
+            profile=False):
     """
     Calls :func:`convert_sklearn` with simplified parameters.
 
@@ -172,7 +197,7 @@ def to_onnx(model, X=None, name=None, initial_types=None,
         (see :ref:`l-conv-options`)
     :param name: name of the model
     :param dtype: float type to use everywhere in the graph,
-        `np.float32` or `np.float64`
+        `np.float32`, `np.float64` or `np.float16`
     :param white_op: white list of ONNX nodes allowed
         while converting a pipeline, if empty, all are allowed
     :param black_op: black list of ONNX nodes allowed
@@ -180,6 +205,9 @@ def to_onnx(model, X=None, name=None, initial_types=None,
     :param final_types: a python list. Works the same way as initial_types
         but not mandatory, it is used to overwrites the type
         (if type is not None) and the name of every output.
+    :param profile: profiles the conversion,
+        see :func:`convert_sklearn`, not implemented
+        for a model inheriting from :class:`OnnxOperatorMixin`
     :return: converted model
 
     This function checks if the model inherits from class
@@ -193,19 +221,22 @@ def to_onnx(model, X=None, name=None, initial_types=None,
         if options is not None:
             raise NotImplementedError(
                 "options not yet implemented for OnnxOperatorMixin.")
+        if profile:
+            raise NotImplementedError(
+                "profile not yet implemented for OnnxOperatorMixin.")
         return model.to_onnx(X=X, name=name, dtype=dtype,
                              target_opset=target_opset)
     if name is None:
         name = "ONNX(%s)" % model.__class__.__name__
     initial_types = guess_initial_types(X, initial_types)
-    if dtype not in (np.float32, np.float64):
+    if dtype not in (np.float32, np.float64, np.float16):
         raise NotImplementedError(
             "dtype should be real not {}".format(dtype))
     return convert_sklearn(model, initial_types=initial_types,
                            target_opset=target_opset,
                            name=name, options=options, dtype=dtype,
                            white_op=white_op, black_op=black_op,
-                           final_types=final_types)
+                           final_types=final_types, profile=profile)
 
 
 def wrap_as_onnx_mixin(model, target_opset=None):
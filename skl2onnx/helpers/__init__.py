@@ -6,3 +6,8 @@
 
 from .investigate import collect_intermediate_steps, compare_objects  # noqa
 from .investigate import enumerate_pipeline_models  # noqa
+from .investigate import run_intermediate_steps  # noqa
+from .quantization import calibrate_quantization  # noqa
+from .model_size import model_size_report  # noqa
+from .cost_estimation import estimate_inference_cost  # noqa
+from .onnx_numpy_runtime import OnnxNumpyInference  # noqa
@@ -0,0 +1,225 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import itertools
+from time import perf_counter
+import numpy
+from sklearn.base import is_classifier, is_regressor
+from .investigate import enumerate_pipeline_models
+from .quantization import _to_array
+from .._supported_operators import get_model_alias
+from ..common._registration import get_converter
+
+
+def enumerate_tunable_options(model, tuned_options=('optim', 'compact')):
+    """
+    Enumerates the options every model within a pipeline
+    may take among *tuned_options* according to its converter.
+    Options accepting any value (*allowed values* is None)
+    are skipped.
+
+    :param model: model or pipeline
+    :param tuned_options: option names
+    :return: iterator on tuple *(model, option name, allowed values)*
+    """
+    for _, m, _ in enumerate_pipeline_models(model):
+        try:
+            alias = get_model_alias(type(m))
+            conv = get_converter(alias)
+        except (KeyError, ValueError, RuntimeError):
+            continue
+        allowed = conv.get_allowed_options()
+        if not isinstance(allowed, dict):
+            continue
+        for name in tuned_options:
+            values = allowed.get(name, None)
+            if values is not None and len(values) > 1:
+                yield m, name, values
+
+
+def _expected_outputs(model, X):
+    "Computes the outputs an ONNX model should produce."
+    if is_classifier(model):
+        exp = [model.predict(X)]
+        if hasattr(model, 'predict_proba'):
+            try:
+                exp.append(model.predict_proba(X))
+            except AttributeError:
+                # SVC(probability=False)
+                exp.append(model.decision_function(X))
+        elif hasattr(model, 'decision_function'):
+            exp.append(model.decision_function(X))
+        return exp
+    if is_regressor(model) or not hasattr(model, 'transform'):
+        return [model.predict(X)]
+    return [model.transform(X)]
+
+
+def _compare_outputs(expected, got, tolerance):
+    """
+    Compares the expected outputs with the outputs of the ONNX
+    model, returns the maximum relative error for float outputs
+    and the proportion of rows which differ, a row differs
+    if a label is different or a float is not close enough.
+    The decision function of a binary classifier is a vector
+    but a converted model returns two columns, the scores are
+    not compared in that case.
+    """
+    max_error = 0.
+    mismatch = 0.
+    for exp, res in zip(expected, got):
+        exp = numpy.asarray(exp)
+        res = _to_array(res)
+        if exp.size != res.size:
+            if len(exp.shape) == 1 and res.shape == (exp.shape[0], 2):
+                # binary decision function, the converter produces
+                # two columns whose layout depends on the model,
+                # only the labels are compared
+                continue
+            raise ValueError("Shape mismatch {} != {}.".format(
+                exp.shape, res.shape))
+        exp = exp.reshape((exp.shape[0], -1))
+        res = res.reshape(exp.shape)
+        if exp.dtype.kind in 'fc':
+            diff = numpy.abs(exp.astype(numpy.float64) -
+                             res.astype(numpy.float64))
+            diff = diff.max(axis=1) / (numpy.abs(exp).max() + 1.)
+            max_error = max(max_error, float(diff.max()))
+            wrong = diff > tolerance
+        else:
+            wrong = (exp != res.astype(exp.dtype)).any(axis=1)
+        mismatch = max(mismatch, float(wrong.sum()) / exp.shape[0])
+    return max_error, mismatch
+
+
+def _onnxruntime(onx):
+    "Returns a function computing the outputs with onnxruntime."
+    from onnxruntime import InferenceSession
+    sess = InferenceSession(onx.SerializeToString())
+    name = sess.get_inputs()[0].name
+    return lambda X: sess.run(None, {name: X})
+
+
+def _numpy_runtime(onx):
+    "Returns a function computing the outputs with the numpy runtime."
+    from .onnx_numpy_runtime import OnnxNumpyInference
+    sess = OnnxNumpyInference(onx)
+    name = sess.input_names[0]
+    return lambda X: sess.run(None, {name: X})
+
+
+def to_onnx_autotune(model, X, options=None,
+                     tuned_options=('optim', 'compact'),
+                     dtypes=(numpy.float32, ), target_opset=None,
+                     runtime=None, repeat=10, tolerance=1e-4,
+                     row_tolerance=0.01, max_trials=100):
+    """
+    Converts a model with every combination of the options
+    its converters support, checks every ONNX graph produces
+    the same outputs as *scikit-learn*, measures the prediction
+    time and returns the fastest correct model.
+
+    :param model: fitted model or pipeline
+    :param X: sample used to check the outputs and measure
+        the prediction time, it also defines the input type
+        (see :func:`to_onnx <skl2onnx.to_onnx>`)
+    :param options: options given to the converter for every trial
+    :param tuned_options: option names to tune, an option is tuned
+        for every model whose converter supports it, options
+        changing the outputs such as *zipmap* or *raw_scores*
+        can be added but their graphs fail the comparison
+        with *scikit-learn* if they do not produce the same outputs
+    :param dtypes: float types to try (see *dtype* in
+        :func:`to_onnx <skl2onnx.to_onnx>`)
+    :param target_opset: to overwrite the default opset
+    :param runtime: function taking an ONNX model and returning
+        a function computing all outputs for an input,
+        *onnxruntime* is used if None, ``'numpy'`` selects
+        :class:`OnnxNumpyInference
+        <skl2onnx.helpers.onnx_numpy_runtime.OnnxNumpyInference>`,
+        it checks the outputs without *onnxruntime* but the
+        measured times then only rank the graphs for that runtime
+    :param repeat: number of predictions to measure for every trial
+    :param tolerance: maximum relative error for float outputs
+    :param row_tolerance: maximum proportion of rows which may
+        differ from *scikit-learn*'s predictions, float computation
+        may change a label or a probability when a feature is
+        very close to a threshold
+    :param max_trials: maximum number of converted models
+    :return: the fastest correct model and a report,
+        a dictionary with keys *options* (the options of the best
+        model, to give to :func:`to_onnx <skl2onnx.to_onnx>`),
+        *dtype*, *best* (the best trial) and *trials*
+        (one dictionary per trial)
+
+    ::
+
+        onx, report = to_onnx_autotune(knn, X[:100])
+        print(report['options'])
+        for trial in report['trials']:
+            print(trial)
+
+    The function raises a *RuntimeError* if no model is correct.
+    """
+    from ..convert import to_onnx
+    if runtime is None:
+        runtime = _onnxruntime
+    elif runtime == 'numpy':
+        runtime = _numpy_runtime
+
+    tunable = list(enumerate_tunable_options(model, tuned_options))
+    grid = list(itertools.product(*[values for _, _, values in tunable]))
+    trials = []
+    best = None
+    expected = {}
+    for dtype in dtypes:
+        Xd = X.astype(dtype)
+        if dtype not in expected:
+            expected[dtype] = _expected_outputs(model, Xd)
+        for values in grid:
+            if len(trials) >= max_trials:
+                break
+            opts = {} if options is None else {
+                k: v.copy() for k, v in options.items()}
+            desc = {}
+            for (m, name, _), value in zip(tunable, values):
+                opts.setdefault(id(m), {})[name] = value
+                desc["{}.{}".format(type(m).__name__, name)] = value
+            trial = dict(options=desc, dtype=numpy.dtype(dtype).name)
+            trials.append(trial)
+            try:
+                onx = to_onnx(model, Xd[:1], options=opts, dtype=dtype,
+                              target_opset=target_opset)
+                fct = runtime(onx)
+                got = fct(Xd)
+            except Exception as e:  # noqa
+                trial['error'] = "{}: {}".format(
+                    type(e).__name__, str(e).split('\n')[0])
+                continue
+            trial['size'] = onx.ByteSize()
+            try:
+                trial['max_error'], trial['mismatch'] = (
+                    _compare_outputs(expected[dtype], got, tolerance))
+            except ValueError as e:
+                trial['error'] = str(e)
+                continue
+            trial['correct'] = trial['mismatch'] <= row_tolerance
+            times = []
+            for r in range(repeat):
+                begin = perf_counter()
+                fct(Xd)
+                times.append(perf_counter() - begin)
+            trial['time'] = min(times)
+            if trial['correct'] and (
+                    best is None or trial['time'] < best[0]['time']):
+                best = trial, opts, dtype, onx
+
+    if best is None:
+        raise RuntimeError(
+            "No converted model produces the same outputs as "
+            "scikit-learn, see the trials:\n{}".format(
+                "\n".join(map(str, trials))))
+    trial, opts, dtype, onx = best
+    return onx, dict(options=opts, dtype=dtype, best=trial, trials=trials)
@@ -0,0 +1,397 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import numpy
+from onnx import shape_inference, TensorProto
+from onnx.helper import make_graph, make_model, make_tensor_value_info
+from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
+from onnx.numpy_helper import from_array, to_array
+
+
+# operators computing one operation per output element
+_elementwise_ops = {
+    'Abs', 'Add', 'And', 'Binarizer', 'Cast', 'Ceil', 'Clip', 'Div',
+    'Equal', 'Erf', 'Exp', 'Floor', 'Greater', 'Imputer', 'IsNaN',
+    'LabelEncoder', 'Less', 'Log', 'Max', 'Min', 'Mod', 'Mul', 'Neg',
+    'Not', 'Or', 'Pow', 'Reciprocal', 'Relu', 'Round', 'Sigmoid', 'Sign',
+    'Sqrt', 'Sub', 'Sum', 'Tanh', 'Where', 'Xor',
+}
+
+# operators computing one operation per input element
+_reduction_ops = {
+    'ArgMax', 'ArgMin', 'CumSum', 'ReduceL1', 'ReduceL2',
+    'ReduceLogSumExp', 'ReduceMax', 'ReduceMean', 'ReduceMin',
+    'ReduceProd', 'ReduceSum', 'ReduceSumSquare', 'TopK',
+}
+
+# operators moving data without any computation
+_copy_ops = {
+    'ArrayFeatureExtractor', 'Concat', 'Expand', 'Gather',
+    'GatherElements', 'OneHot', 'Slice', 'Split', 'Tile', 'Transpose',
+}
+
+# operators only changing the metadata of a tensor
+_free_ops = {
+    'Constant', 'ConstantOfShape', 'Flatten', 'Identity', 'Reshape',
+    'Shape', 'Size', 'Squeeze', 'Unsqueeze', 'ZipMap',
+}
+
+
+def _itemsize(elem_type):
+    dtype = TENSOR_TYPE_TO_NP_TYPE.get(elem_type, None)
+    if dtype is None or dtype == numpy.object_:
+        # strings, the size of a pointer
+        return 8
+    return numpy.dtype(dtype).itemsize
+
+
+def _numel(shape):
+    if shape is None or any(d is None for d in shape):
+        return None
+    return int(numpy.prod(shape)) if shape else 1
+
+
+def _nbytes(info):
+    "Returns the size in bytes of a result or None if unknown."
+    if info is None:
+        return None
+    n = _numel(info[0])
+    return None if n is None else n * _itemsize(info[1])
+
+
+def _get_attribute(node, name, default=None):
+    for att in node.attribute:
+        if att.name == name:
+            if att.type == att.INTS:
+                return list(att.ints)
+            if att.type == att.FLOATS:
+                return list(att.floats)
+            if att.type == att.STRINGS:
+                return list(att.strings)
+            if att.type == att.INT:
+                return att.i
+            if att.type == att.GRAPH:
+                return att.g
+            return att
+    return default
+
+
+def _attribute_bytes(node, prefix):
+    return sum(att.ByteSize() for att in node.attribute
+               if att.name.startswith(prefix))
+
+
+def _tree_depths(node, prefix='nodes_'):
+    """
+    Returns the maximum depth of every tree of a *TreeEnsemble*
+    (number of nodes visited on the longest path from the root
+    to a leaf) and the total number of nodes.
+    """
+    tree_ids = _get_attribute(node, prefix + 'treeids', [])
+    node_ids = _get_attribute(node, prefix + 'nodeids', [])
+    modes = _get_attribute(node, prefix + 'modes', [])
+    true_ids = _get_attribute(node, prefix + 'truenodeids', [])
+    false_ids = _get_attribute(node, prefix + 'falsenodeids', [])
+    children = {}
+    kids = set()
+    for i, (tid, nid) in enumerate(zip(tree_ids, node_ids)):
+        if modes[i] != b'LEAF':
+            children[tid, nid] = (true_ids[i], false_ids[i])
+            kids.add((tid, true_ids[i]))
+            kids.add((tid, false_ids[i]))
+    # the root is the first node without a parent
+    roots = {}
+    for tid, nid in zip(tree_ids, node_ids):
+        if tid not in roots and (tid, nid) not in kids:
+            roots[tid] = nid
+    depths = {}
+    for tid in sorted(set(tree_ids)):
+        depth = 0
+        stack = [(roots[tid], 1)] if tid in roots else []
+        while stack:
+            nid, d = stack.pop()
+            depth = max(depth, d)
+            for c in children.get((tid, nid), []):
+                stack.append((c, d + 1))
+        depths[tid] = depth
+    return depths, len(node_ids)
+
+
+def _ml_shapes(node, infos):
+    """
+    Infers the output shapes of operators from domain *ai.onnx.ml*
+    and *com.microsoft*, *onnx* cannot always do it.
+    Returns None if the operator is unknown.
+    """
+    inp = infos.get(node.input[0], None) if node.input else None
+    if inp is None:
+        return None
+    shape, elem = inp
+    rows = shape[0] if shape else None
+    op = node.op_type
+    if op in ('Scaler', 'Normalizer', 'Binarizer', 'Imputer'):
+        return [(shape, TensorProto.FLOAT)]
+    if op == 'LabelEncoder':
+        return [(shape, TensorProto.INT64 if _get_attribute(
+            node, 'keys_strings') else TensorProto.STRING)]
+    if op in ('TreeEnsembleClassifier', 'LinearClassifier',
+              'SVMClassifier'):
+        labels = (_get_attribute(node, 'classlabels_ints') or
+                  _get_attribute(node, 'classlabels_int64s'))
+        if labels:
+            label_type = TensorProto.INT64
+        else:
+            labels = _get_attribute(node, 'classlabels_strings', [])
+            label_type = TensorProto.STRING
+        return [((rows, ), label_type),
+                ((rows, len(labels)), TensorProto.FLOAT)]
+    if op == 'TreeEnsembleRegressor':
+        return [((rows, _get_attribute(node, 'n_targets', 1)),
+                 TensorProto.FLOAT)]
+    if op == 'LinearRegressor':
+        return [((rows, _get_attribute(node, 'targets', 1)),
+                 TensorProto.FLOAT)]
+    if op == 'SVMRegressor':
+        return [((rows, 1), TensorProto.FLOAT)]
+    if op == 'ArrayFeatureExtractor':
+        indices = infos.get(node.input[1], None)
+        n = None if indices is None else _numel(indices[0])
+        return [(tuple(shape[:-1]) + (n, ), elem)]
+    if op == 'FeatureVectorizer':
+        dims = _get_attribute(node, 'inputdimensions', [])
+        return [((rows, sum(dims)), TensorProto.FLOAT)]
+    if op == 'CDist':
+        other = infos.get(node.input[1], None)
+        return [((rows, None if other is None else other[0][0]), elem)]
+    return None
+
+
+def _onnx_shapes(node, infos, values, opsets, ir_version):
+    """
+    Runs *onnx* shape inference on a graph holding only *node*.
+    Known constant values are given as initializers so that
+    operators such as *Reshape* or *ConstantOfShape* can be inferred.
+    """
+    inputs = []
+    inits = []
+    for name in node.input:
+        if not name:
+            continue
+        if name in values:
+            inits.append(from_array(values[name], name=name))
+            continue
+        info = infos.get(name, None)
+        if info is None:
+            return None
+        inputs.append(make_tensor_value_info(name, info[1], info[0]))
+    graph = make_graph([node], 'cost', inputs, [], inits)
+    model = make_model(graph, opset_imports=opsets)
+    model.ir_version = ir_version
+    try:
+        inferred = shape_inference.infer_shapes(model)
+    except Exception:  # noqa
+        # onnx fails for some operators such as ZipMap
+        return None
+    found = {}
+    for vi in inferred.graph.value_info:
+        tt = vi.type.tensor_type
+        if not vi.type.HasField('tensor_type') or not tt.HasField('shape'):
+            continue
+        shape = tuple(d.dim_value if d.HasField('dim_value') else None
+                      for d in tt.shape.dim)
+        found[vi.name] = (shape, tt.elem_type)
+    return [found.get(name, None) for name in node.output]
+
+
+def _node_flops(node, ins, outs):
+    """
+    Estimates the number of operations for one node,
+    returns the number of operations and the bytes read from
+    the node attributes or None if the operator is unknown.
+    """
+    op = node.op_type
+    in_shape = ins[0][0] if ins and ins[0] is not None else None
+    out_n = _numel(outs[0][0]) if outs and outs[0] is not None else None
+    in_n = _numel(in_shape)
+    rows = None if not in_shape else _numel(in_shape[:-1])
+
+    if op in _free_ops or op in _copy_ops:
+        return 0, 0
+    if op in ('MatMul', 'Gemm'):
+        if in_shape is None or out_n is None:
+            return None, 0
+        flops = 2 * out_n * in_shape[-1]
+        if op == 'Gemm' and len(node.input) > 2:
+            flops += out_n
+        return flops, 0
+    if op in _elementwise_ops:
+        return out_n, 0
+    if op in _reduction_ops:
+        return in_n, 0
+    if op in ('Softmax', 'LogSoftmax', 'Normalizer', 'Scaler'):
+        return None if in_n is None else 3 * in_n, 0
+    if op in ('LinearClassifier', 'LinearRegressor'):
+        coef = _get_attribute(node, 'coefficients', [])
+        return (None if rows is None else 2 * rows * len(coef),
+                _attribute_bytes(node, 'coefficients'))
+    if op in ('SVMClassifier', 'SVMRegressor'):
+        sv = _get_attribute(node, 'support_vectors', [])
+        coef = _get_attribute(node, 'coefficients', [])
+        if rows is None:
+            return None, 0
+        # kernel between every row and every support vector
+        return (2 * rows * (len(sv) + len(coef)),
+                _attribute_bytes(node, 'support_vectors') +
+                _attribute_bytes(node, 'coefficients'))
+    if op in ('TreeEnsembleClassifier', 'TreeEnsembleRegressor'):
+        depths, n_nodes = _tree_depths(node)
+        visited = sum(depths.values())
+        per_node = _attribute_bytes(node, 'nodes_') / max(n_nodes, 1)
+        if rows is None:
+            return None, 0
+        return rows * visited, int(rows * visited * per_node)
+    if op == 'CDist':
+        if out_n is None or in_shape is None:
+            return None, 0
+        return 3 * out_n * in_shape[-1], 0
+    return None, 0
+
+
+def _scan_cost(node, infos, values, opsets, ir_version, batch_size):
+    """
+    Estimates the cost of a *Scan* node by estimating the cost
+    of one iteration of its body.
+    """
+    body = _get_attribute(node, 'body')
+    n_scan = _get_attribute(node, 'num_scan_inputs')
+    ins = [infos.get(name, None) for name in node.input]
+    n_states = len(ins) - n_scan
+    if any(i is None for i in ins):
+        return None, 0, 0, [None for o in node.output]
+    iterations = ins[n_states][0][0]
+    body_infos = dict(infos)
+    for i, vi in enumerate(body.input):
+        if i < n_states:
+            body_infos[vi.name] = ins[i]
+        else:
+            shape, elem = ins[i]
+            body_infos[vi.name] = (tuple(shape[1:]), elem)
+    res = _graph_cost(body, body_infos, dict(values), opsets, ir_version,
+                      batch_size)
+    outs = []
+    for i, vi in enumerate(body.output):
+        info = res['infos'].get(vi.name, None)
+        if i >= n_states and info is not None:
+            info = ((iterations, ) + tuple(info[0]), info[1])
+        outs.append(info)
+    cost = None if res['unknown'] else res['flops'] * iterations
+    return (cost, res['bytes_read'] * iterations,
+            res['bytes_written'] * iterations, outs)
+
+
+def _graph_cost(graph, infos, values, opsets, ir_version, batch_size):
+    "Estimates the cost of every node of a graph."
+    nodes = []
+    unknown = []
+    for node in graph.node:
+        ins = [infos.get(name, None) for name in node.input if name]
+        if node.op_type == 'Scan':
+            flops, br, bw, outs = _scan_cost(
+                node, infos, values, opsets, ir_version, batch_size)
+            att_bytes = 0
+        else:
+            outs = None
+            if node.domain in ('ai.onnx.ml', 'com.microsoft'):
+                outs = _ml_shapes(node, infos)
+            if outs is None:
+                outs = _onnx_shapes(node, infos, values, opsets, ir_version)
+            if outs is None:
+                outs = [None for o in node.output]
+            flops, att_bytes = _node_flops(node, ins, outs)
+            br = bw = 0
+        for name, info in zip(node.output, outs):
+            if info is not None:
+                infos[name] = info
+        if node.op_type == 'Shape' and ins and ins[0] is not None:
+            if all(d is not None for d in ins[0][0]):
+                values[node.output[0]] = numpy.array(ins[0][0],
+                                                     dtype=numpy.int64)
+        if node.op_type == 'Constant':
+            value = _get_attribute(node, 'value')
+            if value is not None and value.HasField('t'):
+                values[node.output[0]] = to_array(value.t)
+                infos[node.output[0]] = (tuple(value.t.dims),
+                                         value.t.data_type)
+
+        read = [_nbytes(i) for i in ins]
+        written = [_nbytes(o) for o in outs if o is not None]
+        obs = dict(name=node.name, op_type=node.op_type,
+                   domain=node.domain, flops=flops,
+                   bytes_read=br + att_bytes + sum(
+                       r for r in read if r is not None),
+                   bytes_written=bw + sum(
+                       w for w in written if w is not None),
+                   output_shapes=[None if o is None else o[0]
+                                  for o in outs])
+        if flops is None:
+            unknown.append(node.op_type)
+        nodes.append(obs)
+    return dict(nodes=nodes, infos=infos, unknown=unknown,
+                flops=sum(n['flops'] for n in nodes
+                          if n['flops'] is not None),
+                bytes_read=sum(n['bytes_read'] for n in nodes),
+                bytes_written=sum(n['bytes_written'] for n in nodes))
+
+
+def estimate_inference_cost(model, batch_size=1):
+    """
+    Estimates the cost of computing the predictions of
+    a converted model without running it.
+
+    :param model: *ONNX* model
+    :param batch_size: value given to every unknown dimension
+        of the inputs, the default value returns the cost of one row
+    :return: dictionary
+
+    Shapes are propagated node by node with *onnx* shape inference
+    and with dedicated rules for the operators of domain *ai.onnx.ml*
+    and *com.microsoft*. The returned dictionary has the following keys:
+
+    * *nodes*: one dictionary per node (name, op_type, domain,
+      flops, bytes_read, bytes_written, output_shapes)
+    * *flops*: total number of operations (additions, multiplications,
+      comparisons), *MatMul* or *Gemm* count two operations per
+      multiplication-addition, a *TreeEnsemble* counts one comparison
+      per visited node using the maximum depth of every tree,
+      a *SVM* counts the kernel between every row and every
+      support vector, a *Scan* multiplies the cost of its body
+      by the number of iterations (distances for *kNN* or
+      *GaussianProcess*)
+    * *bytes_read*, *bytes_written*: memory traffic, bytes read
+      include the coefficients stored as attributes
+    * *unknown*: operators the function cannot estimate,
+      their cost is not included in the total
+    """
+    graph = model.graph
+    infos = {}
+    values = {}
+    for inp in graph.input:
+        tt = inp.type.tensor_type
+        if not inp.type.HasField('tensor_type'):
+            continue
+        shape = tuple(d.dim_value if d.HasField('dim_value') and
+                      d.dim_value > 0 else batch_size
+                      for d in tt.shape.dim)
+        infos[inp.name] = (shape, tt.elem_type)
+    for init in graph.initializer:
+        infos[init.name] = (tuple(init.dims), init.data_type)
+        if _numel(init.dims) <= 16:
+            # small constants may be shapes or axes
+            values[init.name] = to_array(init)
+    res = _graph_cost(graph, infos, values, list(model.opset_import),
+                      model.ir_version, batch_size)
+    del res['infos']
+    res['batch_size'] = batch_size
+    return res
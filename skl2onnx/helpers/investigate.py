@@ -211,13 +211,17 @@ def _alter_model_for_debugging(skl_model, recursive=False):
                               "{}.".format(k, type(skl_model)))
 
 
-def collect_intermediate_steps(model, *args, **kwargs):
+def collect_intermediate_steps(model, *args, single_model=False, **kwargs):
     """
     Converts a scikit-learn model into ONNX with :func:`convert_sklearn`
     and returns intermediate results for each included operator.
 
     :param model: model or pipeline to convert
     :param args: arguments for :func:`convert_sklearn`
+    :param single_model: if False, every step receives its own
+        ONNX model in key *onnx_step*, if True, the function builds
+        one model exposing every intermediate output (key *onnx_all*),
+        it can be run once with :func:`run_intermediate_steps`
     :param kwargs: optional arguments for :func:`convert_sklearn`
 
     The model *model* is modified by the function,
@@ -252,12 +256,80 @@ def collect_intermediate_steps(model, *args, **kwargs):
             'model_onnx': model_onnx,
             'inputs': inputs,
             'outputs': outputs,
-            'onnx_step': select_model_inputs_outputs(
-                model_onnx, outputs=outputs)
+            'onnx_step': (None if single_model else
+                          select_model_inputs_outputs(
+                              model_onnx, outputs=outputs))
         })
+    if single_model:
+        onnx_all = _select_all_outputs(steps)
+        for step in steps:
+            step['onnx_all'] = onnx_all
     return steps
 
 
+def _select_all_outputs(steps):
+    """
+    Builds one model exposing the outputs of every step
+    returned by :func:`collect_intermediate_steps`.
+    """
+    from ..helpers.onnx_helper import select_model_inputs_outputs
+    outputs = []
+    for step in steps:
+        for out in step['outputs']:
+            if out not in outputs:
+                outputs.append(out)
+    return select_model_inputs_outputs(steps[0]['model_onnx'],
+                                       outputs=outputs)
+
+
+def run_intermediate_steps(steps, inputs, runtime='onnxruntime'):
+    """
+    Computes the intermediate outputs of every step returned
+    by :func:`collect_intermediate_steps` with *onnxruntime*.
+    The function loads one model exposing all intermediate
+    outputs and runs it once instead of loading one model per step.
+
+    :param steps: steps returned by :func:`collect_intermediate_steps`
+    :param inputs: dictionary ``{input name: value}``
+    :param runtime: ``'onnxruntime'`` or ``'numpy'`` to use
+        :class:`OnnxNumpyInference
+        <skl2onnx.helpers.onnx_numpy_runtime.OnnxNumpyInference>`
+        which does not require *onnxruntime*
+    :return: list, one list of outputs per step, in the same order
+        as key *outputs* of every step
+
+    ::
+
+        steps = collect_intermediate_steps(
+            model, "pipeline", initial_types, single_model=True)
+        model.transform(X)
+        results = run_intermediate_steps(steps, {'input': X})
+        for step, res in zip(steps, results):
+            skl = step['model']._debug.outputs['transform']
+            compare_objects(res[0], skl)
+    """
+    if len(steps) == 0:
+        return []
+    onnx_all = steps[0].get('onnx_all', None)
+    if onnx_all is None:
+        onnx_all = _select_all_outputs(steps)
+    if runtime == 'numpy':
+        from .onnx_numpy_runtime import OnnxNumpyInference
+        sess = OnnxNumpyInference(onnx_all)
+        input_names = sess.input_names
+        names = sess.output_names
+    elif runtime == 'onnxruntime':
+        from onnxruntime import InferenceSession
+        sess = InferenceSession(onnx_all.SerializeToString())
+        input_names = [i.name for i in sess.get_inputs()]
+        names = [o.name for o in sess.get_outputs()]
+    else:
+        raise ValueError("Unknown runtime '{}'.".format(runtime))
+    feeds = {name: inputs[name] for name in input_names}
+    values = dict(zip(names, sess.run(None, feeds)))
+    return [[values[out] for out in step['outputs']] for step in steps]
+
+
 def compare_objects(o1, o2):
     """
     Compares two objects assuming they are vectors or matrices.
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
+
+
+def _initializer_info(init):
+    "Returns a short description of an initializer."
+    dtype = TENSOR_TYPE_TO_NP_TYPE.get(init.data_type, None)
+    return dict(name=init.name, bytes=init.ByteSize(),
+                dtype=None if dtype is None else str(dtype),
+                shape=tuple(init.dims))
+
+
+def model_size_report(model, topology=None, top=10):
+    """
+    Tells which parts of a converted model take the most space.
+
+    :param model: *ONNX* model
+    :param topology: topology returned by :func:`convert_sklearn
+        <skl2onnx.convert_sklearn>` with ``intermediate=True``,
+        it is needed to aggregate the sizes by *scikit-learn* step
+    :param top: number of hotspots to return
+    :return: dictionary
+
+    The returned dictionary contains the following keys:
+
+    * *total*: size of the serialized model in bytes
+    * *initializers*: one dictionary per initializer
+      (name, bytes, dtype, shape)
+    * *attributes*: one dictionary per node attribute
+      (node, op_type, domain, attribute, bytes), attributes
+      such as ``nodes_values`` for a *TreeEnsemble* or
+      ``support_vectors`` for a *SVM* hold the coefficients
+    * *domains*: bytes per domain, an initializer is counted
+      in the domain of the first node using it
+    * *steps*: one dictionary per converted operator
+      (name, alias, model, nodes, initializers, bytes) if
+      *topology* is specified, None otherwise
+    * *hotspots*: the *top* biggest initializers and attributes
+
+    Every list is sorted by decreasing size.
+
+    ::
+
+        onx, topology = convert_sklearn(
+            pipe, initial_types=initial_types, intermediate=True)
+        report = model_size_report(onx, topology)
+        for step in report['steps']:
+            print(step['model'], step['bytes'])
+    """
+    graph = model.graph
+    initializers = {init.name: init for init in graph.initializer}
+    sparse = {init.values.name: init for init in graph.sparse_initializer}
+    nodes = {}
+    attributes = []
+    domains = {}
+    init_domain = {}
+    for node in graph.node:
+        # node names may be empty or duplicated, outputs are unique
+        nodes[tuple(node.output)] = node
+        domain = node.domain or 'ai.onnx'
+        domains[domain] = domains.get(domain, 0) + node.ByteSize()
+        for att in node.attribute:
+            attributes.append(dict(
+                node=node.name, op_type=node.op_type, domain=domain,
+                attribute=att.name, bytes=att.ByteSize()))
+        for name in node.input:
+            if name not in init_domain and (
+                    name in initializers or name in sparse):
+                init_domain[name] = domain
+    for name, domain in init_domain.items():
+        init = initializers.get(name, None) or sparse[name]
+        domains[domain] = domains.get(domain, 0) + init.ByteSize()
+
+    inits = [_initializer_info(init) for init in graph.initializer]
+    inits.extend(dict(name=name, bytes=init.ByteSize(), dtype=None,
+                      shape=tuple(init.dims))
+                 for name, init in sparse.items())
+
+    steps = None
+    if topology is not None:
+        steps = []
+        for name, emitted in topology.emitted.items():
+            operator = emitted['operator']
+            raw = operator.raw_operator
+            size = sum(nodes[n].ByteSize() for n in emitted['nodes']
+                       if n in nodes)
+            size += sum(initializers[n].ByteSize()
+                        for n in emitted['initializers']
+                        if n in initializers)
+            steps.append(dict(
+                name=name, alias=operator.type,
+                model=None if raw is None else type(raw).__name__,
+                nodes=len(emitted['nodes']),
+                initializers=len(emitted['initializers']),
+                bytes=size))
+        steps.sort(key=lambda obs: -obs['bytes'])
+
+    inits.sort(key=lambda obs: -obs['bytes'])
+    attributes.sort(key=lambda obs: -obs['bytes'])
+    hotspots = (
+        [dict(kind='initializer', name=obs['name'], bytes=obs['bytes'])
+         for obs in inits[:top]] +
+        [dict(kind='attribute', bytes=obs['bytes'],
+              name="{}.{}".format(obs['node'], obs['attribute']))
+         for obs in attributes[:top]])
+    hotspots.sort(key=lambda obs: -obs['bytes'])
+    return dict(total=model.ByteSize(), initializers=inits,
+                attributes=attributes, domains=domains, steps=steps,
+                hotspots=hotspots[:top])
@@ -83,72 +83,140 @@ def enumerate_model_initializers(model, add_node=False):
         yield (node.name, node) if add_node else node.name
 
 
+def _enumerate_node_inputs(node):
+    """
+    Enumerates the inputs of a node including the names
+    a subgraph (If, Loop, Scan) takes from the main graph.
+    """
+    for name in node.input:
+        yield name
+    for att in node.attribute:
+        graphs = list(att.graphs)
+        if att.HasField('g'):
+            graphs.append(att.g)
+        for g in graphs:
+            for sub in g.node:
+                for name in _enumerate_node_inputs(sub):
+                    yield name
+
+
+def _find_value_info(model, name, inferred=None):
+    """
+    Returns the type of a result as a *ValueInfoProto*
+    or None if the model does not give this information.
+    """
+    graph = model.graph if inferred is None else inferred.graph
+    for vi in [graph.input, graph.value_info, graph.output]:
+        for v in vi:
+            if v.name == name:
+                return v
+    return None
+
+
 def select_model_inputs_outputs(model, outputs=None, inputs=None):
     """
-    Takes a model and changes its outputs.
+    Takes a model and changes its inputs and outputs.
 
     :param model: *ONNX* model
-    :param inputs: new inputs
+    :param inputs: new inputs, the graph is cut at these results,
+        the nodes producing them are removed, None to keep
+        the inputs of the model
     :param outputs: new outputs
     :return: modified model
 
-    The function removes unneeded files.
+    The function removes unneeded nodes, initializers and inputs.
+    It walks the graph once backward from the new outputs
+    using an index of the node producing every result.
     """
-    if inputs is not None:
-        raise NotImplementedError("Parameter inputs cannot be empty.")
     if outputs is None:
         raise RuntimeError("Parameter outputs cannot be None.")
     if not isinstance(outputs, list):
         outputs = [outputs]
+    if inputs is not None and not isinstance(inputs, list):
+        inputs = [inputs]
+
+    # index of the node producing every result
+    producer = {}
+    for i, node in enumerate(model.graph.node):
+        for out in node.output:
+            if out:
+                producer[out] = i
+    initializers = {init.name: init for init in model.graph.initializer}
+    for init in model.graph.sparse_initializer:
+        initializers[init.values.name] = init
+    model_inputs = {inp.name: inp for inp in model.graph.input}
+    cut = set(inputs) if inputs is not None else set()
 
-    mark_var = {}
-    for out in enumerate_model_node_outputs(model):
-        mark_var[out] = 0
-    for inp in model.graph.input:
-        mark_var[inp.name] = 0
     for out in outputs:
-        if out not in mark_var:
+        if (out not in producer and out not in model_inputs and
+                out not in initializers):
             raise ValueError("Output '{}' not found in model.".format(out))
-        mark_var[out] = 1
-
-    nodes = model.graph.node[::-1]
-    mark_op = {}
-    for node in nodes:
-        mark_op[node.name] = 0
-
-    # We mark all the nodes we need to keep.
-    nb = 1
-    while nb > 0:
-        nb = 0
-        for node in nodes:
-            if mark_op[node.name] == 1:
-                continue
-            mod = False
-            for out in node.output:
-                if mark_var[out] == 1:
-                    mark_op[node.name] = 1
-                    mod = True
-                    break
-            if not mod:
-                continue
-
-            nb += 1
-            for inp in node.input:
-                if mark_var.get(inp, 0) == 1:
-                    continue
-                mark_var[inp] = 1
-                nb += 1
-
-    # All nodes verifies mark_op[node.name] == 1
-    keep_nodes = [node for node in nodes if mark_op[node.name] == 1]
+    for name in cut:
+        if (name not in producer and name not in model_inputs and
+                name not in initializers):
+            raise ValueError("Input '{}' not found in model.".format(name))
+
+    # backward traversal from the outputs
+    keep_nodes = set()
+    needed = set()
+    stack = list(outputs)
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        if name in cut or name not in producer:
+            continue
+        i = producer[name]
+        if i in keep_nodes:
+            continue
+        keep_nodes.add(i)
+        for inp in _enumerate_node_inputs(model.graph.node[i]):
+            if inp and inp not in needed:
+                stack.append(inp)
+
+    nodes = [node for i, node in enumerate(model.graph.node)
+             if i in keep_nodes]
+    new_inits = [init for init in model.graph.initializer
+                 if init.name in needed and init.name not in cut]
+
+    if inputs is None:
+        var_in = [inp for inp in model.graph.input
+                  if inp.name in needed]
+    else:
+        missing = [name for name in needed
+                   if (name not in producer and name not in cut and
+                       name not in initializers and
+                       name in model_inputs)]
+        if missing:
+            raise RuntimeError(
+                "Outputs {} depend on {} which are not in inputs.".format(
+                    outputs, sorted(missing)))
+        inferred = None
+        var_in = []
+        for name in inputs:
+            vi = _find_value_info(model, name)
+            if vi is None:
+                if inferred is None:
+                    inferred = shape_inference.infer_shapes(model)
+                vi = _find_value_info(model, name, inferred)
+            if vi is None:
+                raise RuntimeError(
+                    "Unable to guess the type of input '{}'.".format(name))
+            var_in.append(vi)
 
     var_out = []
     for out in outputs:
-        value_info = ValueInfoProto()
-        value_info.name = out
+        value_info = _find_value_info(model, out)
+        if value_info is None:
+            value_info = ValueInfoProto()
+            value_info.name = out
         var_out.append(value_info)
-    graph = make_graph(keep_nodes, model.graph.name, model.graph.input,
-                       var_out, model.graph.initializer)
+    graph = make_graph(nodes, model.graph.name, var_in,
+                       var_out, new_inits)
+    graph.sparse_initializer.extend([
+        init for init in model.graph.sparse_initializer
+        if init.values.name in needed and init.values.name not in cut])
     onnx_model = make_model(graph)
     onnx_model.ir_version = model.ir_version
     onnx_model.producer_name = model.producer_name
@@ -160,10 +228,6 @@ def select_model_inputs_outputs(model, outputs=None, inputs=None):
         values = {p.key: p.value for p in model.metadata_props}
         onnx.helper.set_model_props(onnx_model, values)
 
-    if len(onnx_model.graph.input) != len(model.graph.input):
-        raise RuntimeError("Input mismatch {} != {}".format(
-                        len(onnx_model.input), len(model.input)))
-
     # fix opset import
     for oimp in model.opset_import:
         op_set = onnx_model.opset_import.add()
@@ -0,0 +1,835 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+Executes a converted *ONNX* graph with *numpy*.
+The runtime is slow compared to *onnxruntime* but it only
+depends on *numpy* and *scipy*, it implements the operators
+this package produces.
+"""
+import re
+import numpy as np
+import onnx
+from onnx import numpy_helper, mapping
+from scipy.special import erf, erfinv
+from scipy.spatial.distance import cdist
+from .onnx_optimisation import (
+    _numpy_kernels, _node_attributes, _reduce, _sorted_nodes, _unary)
+
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, (list, tuple)):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _to_array(value):
+    if isinstance(value, onnx.TensorProto):
+        return numpy_helper.to_array(value)
+    return np.array(value)
+
+
+def _labels(atts, name='classlabels'):
+    "Returns the class labels of a classifier."
+    for suffix in ('_int64s', '_ints'):
+        if name + suffix in atts:
+            return np.array(atts[name + suffix], dtype=np.int64)
+    return np.array(_decode(atts[name + '_strings']), dtype=object)
+
+
+###########
+# Operators
+###########
+
+
+def _cast(atts, a):
+    to = atts['to']
+    if to == onnx.TensorProto.STRING:
+        return (a.astype(str).astype(object), )
+    dtype = mapping.TENSOR_TYPE_TO_NP_TYPE[to]
+    if a.dtype == object:
+        return (a.astype(str).astype(dtype), )
+    return (a.astype(dtype), )
+
+
+def _cumsum(atts, a, axis):
+    axis = int(np.array(axis).ravel()[0])
+    if atts.get('reverse', 0):
+        a = np.flip(a, axis=axis)
+    res = np.cumsum(a, axis=axis)
+    if atts.get('exclusive', 0):
+        res = res - a
+    if atts.get('reverse', 0):
+        res = np.flip(res, axis=axis)
+    return (res.astype(a.dtype), )
+
+
+def _dequantize_linear(atts, a, scale, zero_point=None):
+    axis = atts.get('axis', 1)
+    shape = [1] * len(a.shape)
+    if len(scale.shape) > 0:
+        shape[axis] = -1
+    res = a.astype(np.float32)
+    if zero_point is not None:
+        res = res - zero_point.astype(np.float32).reshape(shape)
+    return (res * scale.reshape(shape), )
+
+
+def _einsum(atts, *inputs):
+    return (np.einsum(_decode(atts['equation']), *inputs), )
+
+
+def _gather_elements(atts, a, indices):
+    return (np.take_along_axis(a, indices, axis=atts.get('axis', 0)), )
+
+
+def _log_softmax(atts, a):
+    axis = atts.get('axis', -1)
+    m = a - a.max(axis=axis, keepdims=True)
+    return (m - np.log(np.exp(m).sum(axis=axis, keepdims=True)), )
+
+
+def _lp_normalization(atts, a):
+    axis = atts.get('axis', -1)
+    if atts.get('p', 2) == 1:
+        norm = np.abs(a).sum(axis=axis, keepdims=True)
+    else:
+        norm = np.sqrt((a * a).sum(axis=axis, keepdims=True))
+    return ((a / np.where(norm == 0, 1, norm)).astype(a.dtype), )
+
+
+def _mod(atts, a, b):
+    if atts.get('fmod', 0):
+        return (np.fmod(a, b), )
+    return (np.mod(a, b), )
+
+
+def _one_hot(atts, indices, depth, values):
+    depth = int(np.array(depth).ravel()[0])
+    axis = atts.get('axis', -1)
+    indices = np.where(indices < 0, indices + depth, indices)
+    res = (indices[..., np.newaxis] == np.arange(depth))
+    res = np.moveaxis(res, -1, axis)
+    return (np.where(res, values[1], values[0]).astype(values.dtype), )
+
+
+def _sigmoid(x):
+    return 1. / (1. + np.exp(-x))
+
+
+def _softmax(atts, a):
+    axis = atts.get('axis', -1)
+    e = np.exp(a - a.max(axis=axis, keepdims=True))
+    return (e / e.sum(axis=axis, keepdims=True), )
+
+
+def _split(atts, a, split=None):
+    axis = atts.get('axis', 0)
+    if split is None:
+        split = atts.get('split', None)
+    if split is None:
+        n = atts['num_outputs']
+        size = (a.shape[axis] + n - 1) // n
+        split = [size] * (n - 1) + [a.shape[axis] - size * (n - 1)]
+    return tuple(np.split(a, np.cumsum(split)[:-1], axis=axis))
+
+
+def _topk(atts, a, k=None):
+    k = int(atts['k'] if k is None else np.array(k).ravel()[0])
+    axis = atts.get('axis', -1)
+    order = np.argsort(-a if atts.get('largest', 1) else a,
+                       axis=axis, kind='stable')
+    indices = np.take(order, np.arange(k), axis=axis)
+    return np.take_along_axis(a, indices, axis=axis), indices
+
+
+def _reduce_logsumexp(a, axis=None, keepdims=True):
+    m = a.max(axis=axis, keepdims=True)
+    res = np.log(np.exp(a - m).sum(axis=axis, keepdims=True)) + m
+    return res if keepdims else np.squeeze(res, axis=axis)
+
+
+# Kernels for domain ai.onnx, they complete the kernels
+# used to fold constants.
+_onnx_kernels = _numpy_kernels.copy()
+_onnx_kernels.update({
+    'Cast': _cast,
+    'Cos': _unary(np.cos),
+    'CumSum': _cumsum,
+    'DequantizeLinear': _dequantize_linear,
+    'Einsum': _einsum,
+    'Erf': _unary(erf),
+    'GatherElements': _gather_elements,
+    'GreaterOrEqual': lambda atts, a, b: (np.greater_equal(a, b), ),
+    'IsInf': lambda atts, a: (np.isinf(a), ),
+    'IsNaN': lambda atts, a: (np.isnan(a), ),
+    'LessOrEqual': lambda atts, a, b: (np.less_equal(a, b), ),
+    'LogSoftmax': _log_softmax,
+    'LpNormalization': _lp_normalization,
+    'Mod': _mod,
+    'NonZero': lambda atts, a: (np.array(np.nonzero(a), dtype=np.int64), ),
+    'OneHot': _one_hot,
+    'ReduceL1': _reduce(lambda a, **kw: np.sum(np.abs(a), **kw)),
+    'ReduceL2': _reduce(lambda a, **kw: np.sqrt(np.sum(a * a, **kw))),
+    'ReduceLogSum': _reduce(lambda a, **kw: np.log(np.sum(a, **kw))),
+    'ReduceLogSumExp': _reduce(_reduce_logsumexp),
+    'Relu': _unary(lambda a: np.maximum(a, 0)),
+    'Round': _unary(np.round),
+    'Sigmoid': _unary(_sigmoid),
+    'Sin': _unary(np.sin),
+    'Size': lambda atts, a: (np.array(a.size, dtype=np.int64), ),
+    'Softmax': _softmax,
+    'Split': _split,
+    'Tanh': _unary(np.tanh),
+    'TopK': _topk,
+    'Xor': lambda atts, a, b: (np.logical_xor(a, b), ),
+})
+
+
+def _post_transform(scores, name):
+    "Applies the post transform of a classifier or a regressor."
+    name = _decode(name)
+    if name == 'NONE':
+        return scores
+    if name == 'LOGISTIC':
+        return _sigmoid(scores)
+    if name == 'SOFTMAX':
+        return _softmax({}, scores)[0]
+    if name == 'SOFTMAX_ZERO':
+        e = np.where(scores == 0, 0,
+                     np.exp(scores - scores.max(axis=1, keepdims=True)))
+        s = e.sum(axis=1, keepdims=True)
+        return e / np.where(s == 0, 1, s)
+    if name == 'PROBIT':
+        return np.sqrt(2) * erfinv(scores * 2 - 1)
+    raise NotImplementedError(
+        "Unknown post_transform '{}'.".format(name))
+
+
+def _binary_scores(scores, all_positive, post_transform):
+    """
+    Completes the scores of a binary classifier producing
+    one score, follows what *onnxruntime* does.
+    """
+    if _decode(post_transform) == 'PROBIT':
+        return _post_transform(scores, post_transform)
+    if all_positive:
+        return np.hstack([1 - scores, scores])
+    if _decode(post_transform) == 'LOGISTIC':
+        return np.hstack([_sigmoid(-scores), _sigmoid(scores)])
+    return np.hstack([-scores, scores])
+
+
+def _array_feature_extractor(atts, a, indices):
+    res = np.take(a, indices.ravel(), axis=-1)
+    if len(a.shape) == 1:
+        res = res.reshape((1, -1))
+    return (res, )
+
+
+def _binarizer(atts, a):
+    return ((a > atts.get('threshold', 0.)).astype(a.dtype), )
+
+
+def _feature_vectorizer(atts, *args):
+    return (np.hstack([a.reshape((a.shape[0], -1)).astype(np.float32)
+                       for a in args]), )
+
+
+def _imputer(atts, a):
+    if 'imputed_value_floats' in atts:
+        values = np.array(atts['imputed_value_floats'], dtype=a.dtype)
+        replaced = atts.get('replaced_value_float', 0.)
+    else:
+        values = np.array(atts['imputed_value_int64s'], dtype=a.dtype)
+        replaced = atts.get('replaced_value_int64', 0)
+    mask = np.isnan(a) if np.isnan(replaced) else a == replaced
+    values = np.broadcast_to(values, a.shape[-1:])
+    return (np.where(mask, values, a), )
+
+
+def _label_encoder(atts, a):
+    if 'keys_strings' in atts:
+        keys = _decode(atts['keys_strings'])
+    elif 'keys_int64s' in atts:
+        keys = atts['keys_int64s']
+    else:
+        keys = atts['keys_floats']
+    if 'values_strings' in atts:
+        values = _decode(atts['values_strings'])
+        default, dtype = _decode(atts.get('default_string', '_Unused')), object
+    elif 'values_int64s' in atts:
+        values = atts['values_int64s']
+        default, dtype = atts.get('default_int64', -1), np.int64
+    else:
+        values = atts['values_floats']
+        default, dtype = atts.get('default_float', 0.), np.float32
+    mapped = dict(zip(keys, values))
+    res = np.array([mapped.get(v, default) for v in a.ravel().tolist()],
+                   dtype=dtype)
+    return (res.reshape(a.shape), )
+
+
+def _linear_classifier(atts, a):
+    labels = _labels(atts)
+    coef = np.array(atts['coefficients'], dtype=np.float64).reshape(
+        (-1, a.shape[1]))
+    scores = a.astype(np.float64) @ coef.T
+    if 'intercepts' in atts:
+        scores += np.array(atts['intercepts'], dtype=np.float64)
+    if coef.shape[0] == 1 and len(labels) == 2:
+        label = labels[(scores[:, 0] > 0).astype(np.int64)]
+        scores = _binary_scores(scores, False, atts['post_transform'])
+    else:
+        label = labels[scores.argmax(axis=1)]
+        scores = _post_transform(scores, atts.get('post_transform', 'NONE'))
+    return label, scores.astype(np.float32)
+
+
+def _linear_regressor(atts, a):
+    coef = np.array(atts['coefficients'], dtype=np.float64).reshape(
+        (atts.get('targets', 1), -1))
+    scores = a.astype(np.float64) @ coef.T
+    if 'intercepts' in atts:
+        scores += np.array(atts['intercepts'], dtype=np.float64)
+    scores = _post_transform(scores, atts.get('post_transform', 'NONE'))
+    return (scores.astype(np.float32), )
+
+
+def _normalizer(atts, a):
+    norm = _decode(atts['norm'])
+    a = a.astype(np.float32)
+    if norm == 'MAX':
+        div = a.max(axis=1, keepdims=True)
+    elif norm == 'L1':
+        div = np.abs(a).sum(axis=1, keepdims=True)
+    elif norm == 'L2':
+        div = np.sqrt((a * a).sum(axis=1, keepdims=True))
+    else:
+        raise NotImplementedError("Unknown norm '{}'.".format(norm))
+    return (a / np.where(div == 0, 1, div), )
+
+
+def _one_hot_encoder(atts, a):
+    if 'cats_int64s' in atts:
+        cats = np.array(atts['cats_int64s'], dtype=np.int64)
+        a = a.astype(np.int64)
+    else:
+        cats = np.array(_decode(atts['cats_strings']), dtype=object)
+    res = (a[..., np.newaxis] == cats).astype(np.float32)
+    if not atts.get('zeros', 1) and (res.sum(axis=-1) == 0).any():
+        raise RuntimeError("Unknown category in OneHotEncoder.")
+    return (res, )
+
+
+def _scaler(atts, a):
+    offset = np.array(atts.get('offset', [0.]), dtype=np.float32)
+    scale = np.array(atts.get('scale', [1.]), dtype=np.float32)
+    return (((a - offset) * scale).astype(np.float32), )
+
+
+def _svm_kernel(atts, a):
+    "Computes the kernel between inputs and support vectors."
+    kernel = _decode(atts.get('kernel_type', 'LINEAR'))
+    params = atts.get('kernel_params', [0., 0., 0.])
+    gamma, coef0, degree = params[0], params[1], params[2]
+    sv = np.array(atts['support_vectors'], dtype=np.float64).reshape(
+        (-1, a.shape[1]))
+    a = a.astype(np.float64)
+    if kernel == 'RBF':
+        return np.exp(-gamma * cdist(a, sv, 'sqeuclidean'))
+    dot = a @ sv.T
+    if kernel == 'LINEAR':
+        return dot
+    if kernel == 'POLY':
+        return (gamma * dot + coef0) ** int(degree)
+    if kernel == 'SIGMOID':
+        return np.tanh(gamma * dot + coef0)
+    raise NotImplementedError("Unknown kernel '{}'.".format(kernel))
+
+
+def _multiclass_probability(pairwise):
+    """
+    Converts pairwise probabilities into class probabilities
+    with the iterative method implemented in *libsvm*.
+    """
+    n, k = pairwise.shape[:2]
+    Q = -pairwise.transpose((0, 2, 1)) * pairwise
+    diag = (pairwise.transpose((0, 2, 1)) ** 2).sum(axis=2) - (
+        np.diagonal(pairwise, axis1=1, axis2=2) ** 2)
+    Q[:, np.arange(k), np.arange(k)] = diag
+    p = np.full((n, k), 1. / k)
+    eps = 0.005 / k
+    active = np.ones(n, dtype=bool)
+    for it in range(max(100, k)):
+        Qp = np.einsum('nij,nj->ni', Q, p)
+        pQp = (p * Qp).sum(axis=1)
+        active &= np.abs(Qp - pQp[:, np.newaxis]).max(axis=1) >= eps
+        if not active.any():
+            break
+        rows = np.arange(n)[active]
+        for t in range(k):
+            diff = (-Qp[rows, t] + pQp[rows]) / Q[rows, t, t]
+            p[rows, t] += diff
+            pQp[rows] = ((pQp[rows] + diff * (
+                diff * Q[rows, t, t] + 2 * Qp[rows, t])) /
+                (1 + diff) / (1 + diff))
+            Qp[rows] = ((Qp[rows] + diff[:, np.newaxis] * Q[rows, t]) /
+                        (1 + diff[:, np.newaxis]))
+            p[rows] /= (1 + diff[:, np.newaxis])
+    return p
+
+
+def _svm_classifier(atts, a):
+    labels = _labels(atts, 'classlabels')
+    n_classes = len(labels)
+    coef = np.array(atts['coefficients'], dtype=np.float64)
+    rho = np.array(atts['rho'], dtype=np.float64)
+    post_transform = atts.get('post_transform', 'NONE')
+    if 'vectors_per_class' not in atts:
+        # linear svm
+        coef = coef.reshape((-1, a.shape[1]))
+        scores = a.astype(np.float64) @ coef.T + rho
+        if scores.shape[1] == 1 and n_classes == 2:
+            label = labels[(scores[:, 0] > 0).astype(np.int64)]
+            scores = _binary_scores(scores, False, post_transform)
+        else:
+            label = labels[scores.argmax(axis=1)]
+            scores = _post_transform(scores, post_transform)
+        return label, scores.astype(np.float32)
+
+    kernel = _svm_kernel(atts, a)
+    n_sv = kernel.shape[1]
+    coef = coef.reshape((-1, n_sv))
+    per_class = atts['vectors_per_class']
+    starts = np.cumsum([0] + list(per_class))
+    decisions = []
+    votes = np.zeros((a.shape[0], n_classes), dtype=np.int64)
+    pairs = []
+    for i in range(n_classes):
+        si = slice(starts[i], starts[i + 1])
+        for j in range(i + 1, n_classes):
+            sj = slice(starts[j], starts[j + 1])
+            dec = (kernel[:, si] @ coef[j - 1, si] +
+                   kernel[:, sj] @ coef[i, sj] + rho[len(decisions)])
+            decisions.append(dec)
+            pairs.append((i, j))
+            votes[:, i] += dec > 0
+            votes[:, j] += dec <= 0
+    decisions = np.vstack(decisions).T
+
+    label = labels[votes.argmax(axis=1)]
+    prob_a = atts.get('prob_a', None)
+    if prob_a:
+        prob_b = np.array(atts['prob_b'], dtype=np.float64)
+        proba = 1. / (1. + np.exp(decisions * np.array(prob_a) + prob_b))
+        pairwise = np.zeros((a.shape[0], n_classes, n_classes))
+        for k, (i, j) in enumerate(pairs):
+            pairwise[:, i, j] = proba[:, k]
+            pairwise[:, j, i] = 1 - proba[:, k]
+        scores = _multiclass_probability(pairwise)
+    elif n_classes == 2:
+        scores = _binary_scores(decisions, False, post_transform)
+    else:
+        scores = _post_transform(decisions, post_transform)
+    return label, scores.astype(np.float32)
+
+
+def _svm_regressor(atts, a):
+    coef = np.array(atts['coefficients'], dtype=np.float64)
+    rho = np.array(atts['rho'], dtype=np.float64)
+    if atts.get('n_supports', 0) > 0:
+        scores = _svm_kernel(atts, a) @ coef + rho[0]
+    else:
+        scores = a.astype(np.float64) @ coef + rho[0]
+    if atts.get('one_class', 0):
+        scores = np.where(scores > 0, 1., -1.)
+    scores = _post_transform(scores.reshape((-1, 1)),
+                             atts.get('post_transform', 'NONE'))
+    return (scores.astype(np.float32), )
+
+
+class _TreeEnsemble:
+    """
+    Evaluates all trees of an ensemble at once,
+    every row of a batch and every tree moves down
+    by one level at each iteration.
+    """
+
+    _modes = {
+        'BRANCH_LEQ': np.less_equal, 'BRANCH_LT': np.less,
+        'BRANCH_GTE': np.greater_equal, 'BRANCH_GT': np.greater,
+        'BRANCH_EQ': np.equal, 'BRANCH_NEQ': np.not_equal}
+
+    def __init__(self, atts, prefix, n_targets):
+        tree_ids = atts['nodes_treeids']
+        node_ids = atts['nodes_nodeids']
+        position = {k: i for i, k in enumerate(zip(tree_ids, node_ids))}
+        modes = _decode(atts['nodes_modes'])
+        self.leaf = np.array([m == 'LEAF' for m in modes])
+        self.modes = modes
+        self.features = np.array(atts['nodes_featureids'], dtype=np.int64)
+        if 'nodes_values_as_tensor' in atts:
+            values = _to_array(atts['nodes_values_as_tensor'])
+        else:
+            values = atts['nodes_values']
+        self.values = np.array(values, dtype=np.float64)
+        self.true_pos = np.array([
+            0 if leaf else position[t, n] for t, n, leaf in zip(
+                tree_ids, atts['nodes_truenodeids'], self.leaf)])
+        self.false_pos = np.array([
+            0 if leaf else position[t, n] for t, n, leaf in zip(
+                tree_ids, atts['nodes_falsenodeids'], self.leaf)])
+        missing = atts.get('nodes_missing_value_tracks_true', None)
+        self.missing = (np.zeros(len(modes), dtype=bool) if not missing
+                        else np.array(missing, dtype=bool))
+        children = set(self.true_pos[~self.leaf]) | set(
+            self.false_pos[~self.leaf])
+        self.roots = np.array([i for i in range(len(modes))
+                               if i not in children])
+
+        if prefix + '_weights_as_tensor' in atts:
+            weights = _to_array(atts[prefix + '_weights_as_tensor'])
+        else:
+            weights = atts[prefix + '_weights']
+        self.target_ids = atts[prefix + '_ids']
+        self.weights = np.zeros((len(modes), n_targets), dtype=np.float64)
+        for t, n, c, w in zip(atts[prefix + '_treeids'],
+                              atts[prefix + '_nodeids'],
+                              self.target_ids, weights):
+            self.weights[position[t, n], c] += w
+        self.all_positive = all(w >= 0 for w in weights)
+
+    def leaves(self, a):
+        "Returns the leaf reached by every row in every tree."
+        a = a.reshape((a.shape[0], -1)).astype(np.float64)
+        pos = np.tile(self.roots, (a.shape[0], 1))
+        while True:
+            rows, trees = np.nonzero(~self.leaf[pos])
+            if len(rows) == 0:
+                return pos
+            nodes = pos[rows, trees]
+            x = a[rows, self.features[nodes]]
+            cond = self.missing[nodes] & np.isnan(x)
+            modes = [self.modes[n] for n in nodes]
+            for mode, fct in self._modes.items():
+                sel = np.array([m == mode for m in modes])
+                if sel.any():
+                    cond[sel] |= fct(x[sel], self.values[nodes[sel]])
+            pos[rows, trees] = np.where(
+                cond, self.true_pos[nodes], self.false_pos[nodes])
+
+    def scores(self, a, aggregate='SUM'):
+        weights = self.weights[self.leaves(a)]
+        if aggregate == 'MIN':
+            return weights.min(axis=1)
+        if aggregate == 'MAX':
+            return weights.max(axis=1)
+        res = weights.sum(axis=1)
+        if aggregate == 'AVERAGE':
+            res /= len(self.roots)
+        return res
+
+
+def _tree_ensemble_classifier(atts, a):
+    labels = _labels(atts)
+    trees = _TreeEnsemble(atts, 'class', len(labels))
+    scores = trees.scores(a)
+    base_values = atts.get('base_values', None)
+    post_transform = atts.get('post_transform', 'NONE')
+    if len(labels) == 2 and len(set(trees.target_ids)) == 1:
+        scores = scores[:, trees.target_ids[:1]]
+        if base_values:
+            scores += base_values[-1]
+        positive = scores[:, 0] > (0.5 if trees.all_positive else 0.)
+        label = labels[positive.astype(np.int64)]
+        scores = _binary_scores(scores, trees.all_positive, post_transform)
+        return label, scores.astype(np.float32)
+    if base_values:
+        scores += np.array(base_values)
+    label = labels[scores.argmax(axis=1)]
+    scores = _post_transform(scores, post_transform)
+    return label, scores.astype(np.float32)
+
+
+def _tree_ensemble_regressor(atts, a):
+    trees = _TreeEnsemble(atts, 'target', atts.get('n_targets', 1))
+    scores = trees.scores(
+        a, _decode(atts.get('aggregate_function', 'SUM')))
+    if atts.get('base_values', None):
+        scores += np.array(atts['base_values'])
+    scores = _post_transform(scores, atts.get('post_transform', 'NONE'))
+    return (scores.astype(np.float32), )
+
+
+def _zipmap(atts, a):
+    labels = _labels(atts).tolist()
+    return ([dict(zip(labels, row)) for row in a.tolist()], )
+
+
+# Kernels for domain ai.onnx.ml.
+_onnx_ml_kernels = {
+    'ArrayFeatureExtractor': _array_feature_extractor,
+    'Binarizer': _binarizer,
+    'FeatureVectorizer': _feature_vectorizer,
+    'Imputer': _imputer,
+    'LabelEncoder': _label_encoder,
+    'LinearClassifier': _linear_classifier,
+    'LinearRegressor': _linear_regressor,
+    'Normalizer': _normalizer,
+    'OneHotEncoder': _one_hot_encoder,
+    'Scaler': _scaler,
+    'SVMClassifier': _svm_classifier,
+    'SVMRegressor': _svm_regressor,
+    'TreeEnsembleClassifier': _tree_ensemble_classifier,
+    'TreeEnsembleRegressor': _tree_ensemble_regressor,
+    'ZipMap': _zipmap,
+}
+
+
+def _cdist(atts, a, b):
+    metric = _decode(atts.get('metric', 'sqeuclidean'))
+    return (cdist(a, b, metric=metric).astype(a.dtype), )
+
+
+def _tokenize(text, atts):
+    "Splits one string into tokens."
+    if 'tokenexp' in atts:
+        tokens = re.findall(_decode(atts['tokenexp']), text)
+    else:
+        separators = _decode(atts.get('separators', []))
+        if separators == ['']:
+            tokens = list(text)
+        else:
+            tokens = re.split('|'.join(separators), text)
+    mincharnum = atts.get('mincharnum', 1)
+    tokens = [t for t in tokens if len(t) >= mincharnum]
+    if atts.get('mark', 0):
+        tokens = ['\x02'] + tokens + ['\x03']
+    return tokens
+
+
+def _tokenizer(atts, a):
+    pad = _decode(atts['pad_value'])
+    tokens = [_tokenize(_decode(t), atts) for t in a.ravel().tolist()]
+    size = max([len(t) for t in tokens] + [0])
+    res = np.full((len(tokens), size), pad, dtype=object)
+    for i, t in enumerate(tokens):
+        res[i, :len(t)] = t
+    return (res.reshape(a.shape + (size, )), )
+
+
+def _tfidf_vectorizer(atts, a):
+    if 'pool_strings' in atts:
+        pool = _decode(atts['pool_strings'])
+    else:
+        pool = atts['pool_int64s']
+    counts = list(atts['ngram_counts']) + [len(pool)]
+    indexes = atts['ngram_indexes']
+    ngrams = {}
+    k = 0
+    for n in range(1, len(counts)):
+        for i in range(counts[n - 1], counts[n], n):
+            ngrams[tuple(pool[i: i + n])] = indexes[k]
+            k += 1
+    min_n = atts['min_gram_length']
+    max_n = atts['max_gram_length']
+    max_skip = atts.get('max_skip_count', 0)
+
+    rows = a.reshape((1, -1)) if len(a.shape) == 1 else a
+    res = np.zeros((rows.shape[0], max(indexes) + 1), dtype=np.float32)
+    for r, row in enumerate(rows.tolist()):
+        for n in range(min_n, max_n + 1):
+            for skip in range(max_skip + 1 if n > 1 else 1):
+                step = skip + 1
+                for i in range(len(row) - (n - 1) * step):
+                    col = ngrams.get(tuple(row[i: i + n * step: step]), None)
+                    if col is not None:
+                        res[r, col] += 1
+    mode = _decode(atts['mode'])
+    weights = np.array(atts.get('weights', None) or [1.] * res.shape[1],
+                       dtype=np.float32)
+    if mode == 'IDF':
+        res = (res > 0).astype(np.float32) * weights
+    elif mode == 'TFIDF':
+        res = res * weights
+    return (res.reshape((-1, )) if len(a.shape) == 1 else res, )
+
+
+def _string_normalizer(atts, a):
+    action = _decode(atts.get('case_change_action',
+                              atts.get('casechangeaction', 'NONE')))
+    sensitive = atts.get('is_case_sensitive', 0)
+    stopwords = set(_decode(atts.get('stopwords', [])))
+    if not sensitive:
+        stopwords = set(w.lower() for w in stopwords)
+    values = [_decode(v) for v in a.ravel().tolist()]
+    values = [v for v in values
+              if (v if sensitive else v.lower()) not in stopwords]
+    if action == 'LOWER':
+        values = [v.lower() for v in values]
+    elif action == 'UPPER':
+        values = [v.upper() for v in values]
+    res = np.array(values or [''], dtype=object)
+    return (res.reshape((1, -1)) if len(a.shape) == 2 else res, )
+
+
+# Kernels for domain com.microsoft.
+_onnx_ms_kernels = {
+    'CDist': _cdist,
+    'StringNormalizer': _string_normalizer,
+    'TfIdfVectorizer': _tfidf_vectorizer,
+    'Tokenizer': _tokenizer,
+}
+_onnx_kernels['StringNormalizer'] = _string_normalizer
+_onnx_kernels['TfIdfVectorizer'] = _tfidf_vectorizer
+
+_kernels = {'': _onnx_kernels, 'ai.onnx': _onnx_kernels,
+            'ai.onnx.ml': _onnx_ml_kernels,
+            'com.microsoft': _onnx_ms_kernels}
+
+
+#########
+# Runtime
+#########
+
+
+def _run_scan(node, atts, inputs, values):
+    "Runs operator *Scan* (opset >= 9)."
+    body = atts['body']
+    n_scan = atts['num_scan_inputs']
+    n_states = len(inputs) - n_scan
+    states = list(inputs[:n_states])
+    scans = inputs[n_states:]
+    in_axes = atts.get('scan_input_axes', [0] * n_scan)
+    in_dirs = atts.get('scan_input_directions', [0] * n_scan)
+    scans = [np.moveaxis(s, ax, 0) for s, ax in zip(scans, in_axes)]
+    scans = [s[::-1] if d else s for s, d in zip(scans, in_dirs)]
+    names = [i.name for i in body.input]
+    outputs = [o.name for o in body.output]
+    results = [[] for o in outputs[n_states:]]
+    for it in range(scans[0].shape[0] if scans else 0):
+        local = values.copy()
+        local.update(zip(names, states + [s[it] for s in scans]))
+        _run_graph(body, local)
+        states = [local[o] for o in outputs[:n_states]]
+        for res, o in zip(results, outputs[n_states:]):
+            res.append(local[o])
+    n_out = len(outputs) - n_states
+    out_axes = atts.get('scan_output_axes', [0] * n_out)
+    out_dirs = atts.get('scan_output_directions', [0] * n_out)
+    stacked = []
+    for res, ax, d in zip(results, out_axes, out_dirs):
+        res = np.stack(res[::-1] if d else res)
+        stacked.append(np.moveaxis(res, 0, ax))
+    return tuple(states + stacked)
+
+
+def _run_graph(graph, values):
+    """
+    Runs every node of a graph, *values* contains the inputs,
+    the initializers and every intermediate result once it is
+    computed.
+    """
+    for init in graph.initializer:
+        if init.name not in values:
+            values[init.name] = numpy_helper.to_array(init)
+    for node in _sorted_nodes(graph):
+        atts = _node_attributes(node)
+        inputs = [values[name] if name else None for name in node.input]
+        while inputs and inputs[-1] is None:
+            inputs.pop()
+        if node.op_type == 'Scan':
+            outputs = _run_scan(node, atts, inputs, values)
+        else:
+            kernels = _kernels.get(node.domain, None)
+            if kernels is None or node.op_type not in kernels:
+                raise NotImplementedError(
+                    "Operator '{}' from domain '{}' is not implemented "
+                    "by the numpy runtime.".format(
+                        node.op_type, node.domain))
+            if node.op_type == 'Split':
+                atts['num_outputs'] = len(node.output)
+            outputs = kernels[node.op_type](atts, *inputs)
+        for name, value in zip(node.output, outputs):
+            if name:
+                values[name] = value
+    return values
+
+
+def _concat_outputs(results):
+    if isinstance(results[0], list):
+        return [r for res in results for r in res]
+    return np.concatenate(results, axis=0)
+
+
+class OnnxNumpyInference:
+    """
+    Computes the outputs of an *ONNX* model with *numpy*.
+    It implements the operators this package produces and
+    follows the API of *onnxruntime*. It is meant to
+    check a conversion or to investigate a model where
+    *onnxruntime* is not available.
+
+    :param onnx_model: *ONNX* model or serialized model
+
+    ::
+
+        sess = OnnxNumpyInference(onx)
+        label, proba = sess.run(None, {'X': X})
+
+    Every node is computed for the whole batch at once.
+    """
+
+    def __init__(self, onnx_model):
+        if isinstance(onnx_model, bytes):
+            onnx_model = onnx.load_model_from_string(onnx_model)
+        self.onnx_model = onnx_model
+        graph = onnx_model.graph
+        inits = set(i.name for i in graph.initializer)
+        self.input_names = [i.name for i in graph.input
+                            if i.name not in inits]
+        self.output_names = [o.name for o in graph.output]
+        self._constants = {init.name: numpy_helper.to_array(init)
+                           for init in graph.initializer}
+
+    def run(self, output_names, inputs, intermediate=False,
+            batch_size=None):
+        """
+        Computes the outputs.
+
+        :param output_names: requested outputs or None for all
+        :param inputs: dictionary *{input name: array}*
+        :param intermediate: returns every intermediate result
+            in a dictionary if True
+        :param batch_size: splits the inputs into batches of
+            *batch_size* rows to bound the memory needed by
+            every node, the outputs are concatenated
+        :return: list of outputs or a dictionary
+            if *intermediate* is True
+        """
+        if output_names is None:
+            output_names = self.output_names
+        missing = set(self.input_names) - set(inputs)
+        if missing:
+            raise RuntimeError("Missing inputs {}.".format(sorted(missing)))
+        if batch_size is not None and not intermediate:
+            n = min(len(v) for v in inputs.values())
+            if n > batch_size:
+                batches = [
+                    self.run(output_names,
+                             {k: v[i: i + batch_size]
+                              for k, v in inputs.items()})
+                    for i in range(0, n, batch_size)]
+                return [_concat_outputs([b[k] for b in batches])
+                        for k in range(len(output_names))]
+        values = self._constants.copy()
+        values.update(inputs)
+        _run_graph(self.onnx_model.graph, values)
+        if intermediate:
+            return values
+        return [values[name] for name in output_names]
@@ -0,0 +1,813 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+Optimisations applied on a converted *ONNX* model.
+"""
+import numpy as np
+import onnx
+from onnx import numpy_helper, mapping, shape_inference
+from onnx.helper import get_attribute_value
+from ..common.tree_ensemble import compact_tree_attribute_pairs
+from ..proto.onnx_helper_modified import make_graph, make_model
+
+
+def _node_attributes(node):
+    """
+    Returns the attributes of a node as a dictionary.
+    """
+    return {att.name: get_attribute_value(att) for att in node.attribute}
+
+
+def _has_subgraph(node):
+    """
+    Tells if a node holds a subgraph (*Scan*, *Loop*, *If*).
+    """
+    return any(att.type in (onnx.AttributeProto.GRAPH,
+                            onnx.AttributeProto.GRAPHS)
+               for att in node.attribute)
+
+
+def _enumerate_subgraph_inputs(graph):
+    """
+    Enumerates every input name used by a node
+    of a graph or one of its subgraphs.
+    """
+    for node in graph.node:
+        for name in node.input:
+            yield name
+        for att in node.attribute:
+            if att.type == onnx.AttributeProto.GRAPH:
+                for name in _enumerate_subgraph_inputs(att.g):
+                    yield name
+            elif att.type == onnx.AttributeProto.GRAPHS:
+                for g in att.graphs:
+                    for name in _enumerate_subgraph_inputs(g):
+                        yield name
+
+
+def _sorted_nodes(graph):
+    """
+    Returns the nodes of a graph in topological order,
+    a converted graph may not be sorted.
+    """
+    producer = {}
+    for i, node in enumerate(graph.node):
+        for name in node.output:
+            producer[name] = i
+    order = []
+    status = {}
+    for start in range(len(graph.node)):
+        stack = [start]
+        while stack:
+            i = stack[-1]
+            if status.get(i, 0) == 2:
+                stack.pop()
+                continue
+            node = graph.node[i]
+            names = list(node.input)
+            if _has_subgraph(node):
+                for att in node.attribute:
+                    if att.type == onnx.AttributeProto.GRAPH:
+                        names.extend(_enumerate_subgraph_inputs(att.g))
+            pending = [producer[n] for n in names
+                       if n in producer and producer[n] != i and
+                       status.get(producer[n], 0) != 2]
+            if status.get(i, 0) == 0 and pending:
+                status[i] = 1
+                stack.extend(pending)
+                continue
+            if pending:
+                raise RuntimeError(
+                    "Graph contains a cycle around node '{}'.".format(
+                        node.name))
+            status[i] = 2
+            order.append(node)
+            stack.pop()
+    return order
+
+
+def _rebuild_model(model, nodes, initializers):
+    """
+    Creates a new model replacing the nodes and the initializers
+    of *model*, every other information is copied.
+    """
+    graph = make_graph(nodes, model.graph.name, model.graph.input,
+                       model.graph.output, initializers)
+    graph.value_info.extend(model.graph.value_info)
+    onnx_model = make_model(graph)
+    onnx_model.ir_version = model.ir_version
+    onnx_model.producer_name = model.producer_name
+    onnx_model.producer_version = model.producer_version
+    onnx_model.domain = model.domain
+    onnx_model.model_version = model.model_version
+    onnx_model.doc_string = model.doc_string
+    if len(model.metadata_props) > 0:
+        values = {p.key: p.value for p in model.metadata_props}
+        onnx.helper.set_model_props(onnx_model, values)
+    del onnx_model.opset_import[:]
+    for oimp in model.opset_import:
+        op_set = onnx_model.opset_import.add()
+        op_set.domain = oimp.domain
+        op_set.version = oimp.version
+    return onnx_model
+
+
+def _axes(atts, inputs, position=1):
+    """
+    Retrieves parameter *axes* which is an attribute
+    or an input depending on the opset.
+    """
+    if 'axes' in atts:
+        return tuple(atts['axes'])
+    if len(inputs) > position and inputs[position] is not None:
+        return tuple(int(i) for i in inputs[position])
+    return None
+
+
+def _binary(fct):
+    def _kernel(atts, a, b):
+        return (fct(a, b).astype(a.dtype), )
+    return _kernel
+
+
+def _unary(fct):
+    def _kernel(atts, a):
+        return (fct(a).astype(a.dtype), )
+    return _kernel
+
+
+def _compare(fct):
+    def _kernel(atts, a, b):
+        return (fct(a, b), )
+    return _kernel
+
+
+def _variadic(fct):
+    def _kernel(atts, *args):
+        res = args[0]
+        for a in args[1:]:
+            res = fct(res, a)
+        return (res.astype(args[0].dtype), )
+    return _kernel
+
+
+def _reduce(fct):
+    def _kernel(atts, *inputs):
+        axes = _axes(atts, inputs)
+        keepdims = atts.get('keepdims', 1) == 1
+        a = inputs[0]
+        return (fct(a, axis=axes, keepdims=keepdims).astype(a.dtype), )
+    return _kernel
+
+
+def _constant_of_shape(atts, shape):
+    value = atts.get('value', None)
+    value = (np.zeros((1, ), dtype=np.float32) if value is None
+             else numpy_helper.to_array(value))
+    return (np.full(tuple(int(d) for d in shape), value[0],
+                    dtype=value.dtype), )
+
+
+def _div(atts, a, b):
+    if np.issubdtype(a.dtype, np.integer):
+        return (np.trunc(a / b).astype(a.dtype), )
+    return ((a / b).astype(a.dtype), )
+
+
+def _arg(fct):
+    def _kernel(atts, a):
+        axis = atts.get('axis', 0)
+        res = fct(a, axis=axis)
+        if atts.get('keepdims', 1) == 1:
+            res = np.expand_dims(res, axis)
+        return (res.astype(np.int64), )
+    return _kernel
+
+
+def _cast(atts, a):
+    to = atts['to']
+    if to == onnx.TensorProto.STRING:
+        raise NotImplementedError("Cast to string is not folded.")
+    return (a.astype(mapping.TENSOR_TYPE_TO_NP_TYPE[to]), )
+
+
+def _clip(atts, a, *inputs):
+    amin = atts.get('min', None)
+    amax = atts.get('max', None)
+    if len(inputs) > 0 and inputs[0] is not None:
+        amin = inputs[0]
+    if len(inputs) > 1 and inputs[1] is not None:
+        amax = inputs[1]
+    if amin is not None:
+        a = np.maximum(a, amin)
+    if amax is not None:
+        a = np.minimum(a, amax)
+    return (a, )
+
+
+def _concat(atts, *args):
+    return (np.concatenate(args, axis=atts['axis']), )
+
+
+def _constant(atts):
+    if 'value' in atts:
+        return (numpy_helper.to_array(atts['value']), )
+    if 'value_float' in atts:
+        return (np.array(atts['value_float'], dtype=np.float32), )
+    if 'value_floats' in atts:
+        return (np.array(atts['value_floats'], dtype=np.float32), )
+    if 'value_int' in atts:
+        return (np.array(atts['value_int'], dtype=np.int64), )
+    if 'value_ints' in atts:
+        return (np.array(atts['value_ints'], dtype=np.int64), )
+    raise NotImplementedError("Only dense constants are folded.")
+
+
+def _expand(atts, a, shape):
+    return (a * np.ones(tuple(int(d) for d in shape), dtype=a.dtype), )
+
+
+def _flatten(atts, a):
+    axis = atts.get('axis', 1)
+    if axis < 0:
+        axis += len(a.shape)
+    new_shape = (1, -1) if axis == 0 else (
+        int(np.prod(a.shape[:axis])), -1)
+    return (a.reshape(new_shape), )
+
+
+def _gather(atts, a, indices):
+    return (np.take(a, indices, axis=atts.get('axis', 0)), )
+
+
+def _gemm(atts, a, b, c=None):
+    if atts.get('transA', 0):
+        a = a.T
+    if atts.get('transB', 0):
+        b = b.T
+    res = np.dot(a, b) * atts.get('alpha', 1.)
+    if c is not None:
+        res = res + c * atts.get('beta', 1.)
+    return (res.astype(a.dtype), )
+
+
+def _range(atts, start, limit, delta):
+    return (np.arange(start, limit, delta).astype(start.dtype), )
+
+
+def _reshape(atts, a, shape):
+    if atts.get('allowzero', 0) == 1:
+        return (a.reshape([int(d) for d in shape]), )
+    new_shape = [int(a.shape[i]) if d == 0 else int(d)
+                 for i, d in enumerate(shape)]
+    return (a.reshape(new_shape), )
+
+
+def _shape(atts, a):
+    return (np.array(a.shape, dtype=np.int64), )
+
+
+def _slice(atts, a, *inputs):
+    if 'starts' in atts:
+        starts = atts['starts']
+        ends = atts['ends']
+        axes = atts.get('axes', list(range(len(starts))))
+        steps = [1] * len(starts)
+    else:
+        starts, ends = inputs[0], inputs[1]
+        axes = (inputs[2] if len(inputs) > 2 and inputs[2] is not None
+                else list(range(len(starts))))
+        steps = (inputs[3] if len(inputs) > 3 and inputs[3] is not None
+                 else [1] * len(starts))
+    index = [slice(None)] * len(a.shape)
+    for s, e, ax, st in zip(starts, ends, axes, steps):
+        index[ax] = slice(int(s), int(e), int(st))
+    return (a[tuple(index)], )
+
+
+def _squeeze(atts, *inputs):
+    axes = _axes(atts, inputs)
+    return (np.squeeze(inputs[0], axis=axes), )
+
+
+def _tile(atts, a, repeats):
+    return (np.tile(a, tuple(int(r) for r in repeats)), )
+
+
+def _transpose(atts, a):
+    return (np.transpose(a, axes=atts.get('perm', None)), )
+
+
+def _unsqueeze(atts, *inputs):
+    axes = _axes(atts, inputs)
+    return (np.expand_dims(inputs[0], axis=axes), )
+
+
+def _where(atts, cond, a, b):
+    return (np.where(cond, a, b).astype(a.dtype), )
+
+
+# Kernels used to evaluate a node with numpy.
+_numpy_kernels = {
+    'Abs': _unary(np.abs),
+    'Add': _binary(np.add),
+    'And': _compare(np.logical_and),
+    'ArgMax': _arg(np.argmax),
+    'ArgMin': _arg(np.argmin),
+    'Cast': _cast,
+    'Ceil': _unary(np.ceil),
+    'Clip': _clip,
+    'Concat': _concat,
+    'Constant': _constant,
+    'ConstantOfShape': _constant_of_shape,
+    'Div': _div,
+    'Equal': _compare(np.equal),
+    'Exp': _unary(np.exp),
+    'Expand': _expand,
+    'Flatten': _flatten,
+    'Floor': _unary(np.floor),
+    'Gather': _gather,
+    'Gemm': _gemm,
+    'Greater': _compare(np.greater),
+    'Identity': lambda atts, a: (a, ),
+    'Less': _compare(np.less),
+    'Log': _unary(np.log),
+    'MatMul': _binary(np.matmul),
+    'Max': _variadic(np.maximum),
+    'Min': _variadic(np.minimum),
+    'Mul': _binary(np.multiply),
+    'Neg': _unary(np.negative),
+    'Not': lambda atts, a: (np.logical_not(a), ),
+    'Or': _compare(np.logical_or),
+    'Pow': _binary(np.power),
+    'Range': _range,
+    'Reciprocal': _unary(np.reciprocal),
+    'ReduceMax': _reduce(np.max),
+    'ReduceMean': _reduce(np.mean),
+    'ReduceMin': _reduce(np.min),
+    'ReduceProd': _reduce(np.prod),
+    'ReduceSum': _reduce(np.sum),
+    'ReduceSumSquare': _reduce(lambda a, **kw: np.sum(a * a, **kw)),
+    'Reshape': _reshape,
+    'Shape': _shape,
+    'Sign': _unary(np.sign),
+    'Slice': _slice,
+    'Sqrt': _unary(np.sqrt),
+    'Squeeze': _squeeze,
+    'Sub': _binary(np.subtract),
+    'Sum': _variadic(np.add),
+    'Tile': _tile,
+    'Transpose': _transpose,
+    'Unsqueeze': _unsqueeze,
+    'Where': _where,
+}
+
+
+def onnx_fold_constants(onnx_model, max_expansion=1024):
+    """
+    Evaluates every node whose inputs are all constants
+    (initializers or outputs of other constant nodes) with *numpy*
+    and replaces it by an initializer. Initializers which are
+    not used anymore are removed.
+
+    :param onnx_model: *ONNX* model
+    :param max_expansion: a folded result bigger than its inputs
+        by more than *max_expansion* bytes (*ConstantOfShape*, *Tile*,
+        *Expand*...) is not stored as an initializer, the node
+        producing it is kept to avoid increasing the model size
+    :return: new *ONNX* model
+
+    Only nodes from the main domain are folded.
+    Nodes producing an output of the graph and nodes holding
+    a subgraph are left unchanged. An initializer is considered
+    as a constant only if it is not an input of the graph
+    (``target_opset < 9``).
+
+    ::
+
+        from skl2onnx.helpers.onnx_optimisation import onnx_fold_constants
+
+        model_onnx = convert_sklearn(...)
+        model_onnx = onnx_fold_constants(model_onnx)
+    """
+    graph = onnx_model.graph
+    graph_inputs = set(i.name for i in graph.input)
+    graph_outputs = set(o.name for o in graph.output)
+    initializers = {}
+    constants = {}
+    for init in graph.initializer:
+        initializers[init.name] = init
+        if init.name not in graph_inputs:
+            constants[init.name] = numpy_helper.to_array(init)
+
+    nodes = []
+    producers = {}
+    for node in graph.node:
+        if (node.domain not in ('', 'ai.onnx') or
+                node.op_type not in _numpy_kernels or
+                _has_subgraph(node) or
+                (len(node.input) == 0 and node.op_type != 'Constant') or
+                any(o in graph_outputs for o in node.output) or
+                any(i and i not in constants for i in node.input)):
+            nodes.append(node)
+            continue
+        inputs = [constants[i] if i else None for i in node.input]
+        try:
+            results = _numpy_kernels[node.op_type](
+                _node_attributes(node), *inputs)
+        except (NotImplementedError, KeyError, ValueError, TypeError,
+                IndexError):
+            # The kernel does not support this configuration,
+            # the node is kept.
+            nodes.append(node)
+            continue
+        for name, value in zip(node.output, results):
+            constants[name] = np.asarray(value)
+            producers[name] = node
+
+    # Folded results are only stored if a remaining node needs them.
+    new_initializers = {}
+    kept = set()
+
+    def _materialize(name):
+        if name in new_initializers or name in kept or name == '':
+            return
+        if name not in producers:
+            if name in initializers:
+                new_initializers[name] = initializers[name]
+            return
+        node = producers[name]
+        value = constants[name]
+        size_inputs = sum(constants[i].nbytes for i in node.input if i)
+        if value.nbytes <= size_inputs + max_expansion:
+            new_initializers[name] = numpy_helper.from_array(
+                value, name=name)
+            return
+        kept.add(name)
+        for i in node.input:
+            _materialize(i)
+
+    for name in _enumerate_subgraph_inputs(
+            onnx.helper.make_graph(nodes, 'used', [], [])):
+        _materialize(name)
+    for name in graph_outputs | graph_inputs:
+        _materialize(name)
+
+    # Kept constant nodes only depend on constants,
+    # they can be placed first. Every node is visited once,
+    # nodes are never compared (protobuf equality is by value).
+    kept_nodes = [node for node in graph.node
+                  if any(o in kept for o in node.output)]
+    return _rebuild_model(onnx_model, kept_nodes + nodes,
+                          list(new_initializers.values()))
+
+
+# Casts from the first type to any type of the second element
+# do not lose any information.
+_lossless_casts = {
+    onnx.TensorProto.BOOL: {
+        onnx.TensorProto.INT8, onnx.TensorProto.INT16,
+        onnx.TensorProto.INT32, onnx.TensorProto.INT64,
+        onnx.TensorProto.UINT8, onnx.TensorProto.UINT16,
+        onnx.TensorProto.UINT32, onnx.TensorProto.UINT64,
+        onnx.TensorProto.FLOAT16, onnx.TensorProto.FLOAT,
+        onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.INT8: {
+        onnx.TensorProto.INT16, onnx.TensorProto.INT32,
+        onnx.TensorProto.INT64, onnx.TensorProto.FLOAT16,
+        onnx.TensorProto.FLOAT, onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.UINT8: {
+        onnx.TensorProto.INT16, onnx.TensorProto.INT32,
+        onnx.TensorProto.INT64, onnx.TensorProto.UINT16,
+        onnx.TensorProto.UINT32, onnx.TensorProto.UINT64,
+        onnx.TensorProto.FLOAT16, onnx.TensorProto.FLOAT,
+        onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.INT16: {
+        onnx.TensorProto.INT32, onnx.TensorProto.INT64,
+        onnx.TensorProto.FLOAT, onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.INT32: {
+        onnx.TensorProto.INT64, onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.FLOAT16: {
+        onnx.TensorProto.FLOAT, onnx.TensorProto.DOUBLE},
+    onnx.TensorProto.FLOAT: {onnx.TensorProto.DOUBLE},
+}
+
+
+def _infer_types(onnx_model):
+    """
+    Returns a dictionary *{name: (element type, shape)}* for every
+    known result of the main graph, the shape is None if unknown
+    and every unknown dimension is None.
+    """
+    def _shape(tensor_type):
+        if not tensor_type.HasField('shape'):
+            return None
+        return tuple(d.dim_value if d.HasField('dim_value') else None
+                     for d in tensor_type.shape.dim)
+
+    res = {}
+    for init in onnx_model.graph.initializer:
+        res[init.name] = (init.data_type, tuple(init.dims))
+    try:
+        inferred = shape_inference.infer_shapes(onnx_model)
+    except Exception:  # noqa
+        # Inferred types may be inconsistent with the declared outputs
+        # (ZipMap), the inference is run again without them.
+        light = onnx.ModelProto()
+        light.CopyFrom(onnx_model)
+        del light.graph.output[:]
+        try:
+            inferred = shape_inference.infer_shapes(light)
+        except Exception:  # noqa
+            # Shape inference fails for some custom domains.
+            inferred = onnx_model
+    for vi in (list(inferred.graph.input) + list(inferred.graph.output) +
+               list(inferred.graph.value_info)):
+        if vi.name in res or not vi.type.HasField('tensor_type'):
+            continue
+        tt = vi.type.tensor_type
+        if tt.elem_type == onnx.TensorProto.UNDEFINED:
+            continue
+        res[vi.name] = (tt.elem_type, _shape(tt))
+    for node in onnx_model.graph.node:
+        if (node.op_type == 'Cast' and node.domain in ('', 'ai.onnx') and
+                node.output[0] not in res):
+            to = [att.i for att in node.attribute if att.name == 'to'][0]
+            shape = res.get(node.input[0], (None, None))[1]
+            res[node.output[0]] = (to, shape)
+    return res
+
+
+def _rename_inputs(nodes, renames):
+    """
+    Replaces every input of every node and every subgraph
+    by its new name in dictionary *renames*.
+    """
+    for node in nodes:
+        for i, name in enumerate(node.input):
+            if name in renames:
+                node.input[i] = renames[name]
+        for att in node.attribute:
+            if att.type == onnx.AttributeProto.GRAPH:
+                _rename_inputs(att.g.node, renames)
+            elif att.type == onnx.AttributeProto.GRAPHS:
+                for g in att.graphs:
+                    _rename_inputs(g.node, renames)
+
+
+def _is_noop_reshape(node, types, constants):
+    """
+    Tells if a *Reshape* node keeps the shape of its input.
+    """
+    if len(node.input) < 2 or node.input[1] not in constants:
+        return False
+    if node.input[0] not in types or types[node.input[0]][1] is None:
+        return False
+    shape = types[node.input[0]][1]
+    new_shape = [int(d) for d in constants[node.input[1]]]
+    if len(shape) != len(new_shape):
+        return False
+    allowzero = any(att.name == 'allowzero' and att.i == 1
+                    for att in node.attribute)
+    unknown = 0
+    for d, nd in zip(shape, new_shape):
+        if nd == 0 and not allowzero:
+            continue
+        if d is not None and d == nd:
+            continue
+        if nd == -1:
+            unknown += 1
+            continue
+        return False
+    return unknown <= 1
+
+
+def onnx_remove_node_redundant(onnx_model, return_stats=False):
+    """
+    Removes nodes which do not change their input:
+    *Identity*, *Cast* to the type of the input, *Reshape*
+    to the shape of the input. Consecutive *Cast* nodes are merged
+    if the first one does not lose any information and consecutive
+    *Reshape* nodes are merged if the second one does not depend
+    on the intermediate shape. A *Cast* or a *Reshape* identical to
+    a previous one (same inputs and attributes) is removed as well.
+    The nodes are sorted in topological order and visited once.
+
+    :param onnx_model: *ONNX* model
+    :param return_stats: if True, the function returns the new model
+        and a dictionary with the number of removed nodes
+        for each operator type
+    :return: new *ONNX* model, and statistics
+        if *return_stats* is True
+
+    A node producing an output of the graph is only removed
+    if its input can be renamed, meaning it is produced by another
+    node and is not an input, an initializer or an output
+    of the graph. Types and shapes are given by
+    :epkg:`onnx` shape inference.
+
+    ::
+
+        from skl2onnx.helpers.onnx_optimisation import (
+            onnx_remove_node_redundant)
+
+        model_onnx = convert_sklearn(...)
+        model_onnx, stats = onnx_remove_node_redundant(
+            model_onnx, return_stats=True)
+        print(stats)  # {'Identity': 3, 'Cast': 1, ...}
+    """
+    onnx_model_copy = onnx.ModelProto()
+    onnx_model_copy.CopyFrom(onnx_model)
+    graph = onnx_model_copy.graph
+    types = _infer_types(onnx_model_copy)
+    graph_inputs = set(i.name for i in graph.input)
+    graph_outputs = set(o.name for o in graph.output)
+    constants = {init.name: numpy_helper.to_array(init)
+                 for init in graph.initializer
+                 if init.name not in graph_inputs and
+                 init.data_type == onnx.TensorProto.INT64}
+    stats = {}
+
+    # Nodes are sorted and visited once. *renames* maps
+    # the output of a removed node to the name replacing it,
+    # it is applied to the inputs of every node when it is visited.
+    # An output of the graph cannot be renamed, its producer is
+    # renamed instead once all nodes are visited (*late_renames*).
+    renames = {}
+    late_renames = {}
+    producers = {}
+    seen = {}
+    merged = []
+    nodes = []
+
+    def _bypass(node):
+        # Removes a node replacing its output by its input.
+        input_name = node.input[0]
+        output_name = node.output[0]
+        if output_name not in graph_outputs:
+            renames[output_name] = input_name
+        elif (input_name in producers and
+                input_name not in graph_outputs and
+                input_name not in graph_inputs and
+                input_name not in late_renames):
+            late_renames[input_name] = output_name
+        else:
+            return False
+        stats[node.op_type] = stats.get(node.op_type, 0) + 1
+        return True
+
+    def _is_noop(node):
+        if node.op_type == 'Identity':
+            return True
+        if node.op_type == 'Cast':
+            to = [att.i for att in node.attribute if att.name == 'to'][0]
+            return types.get(node.input[0], (None, None))[0] == to
+        return _is_noop_reshape(node, types, constants)
+
+    def _merge(node):
+        # Skips the previous node if it is a Cast or a Reshape
+        # the node does not need.
+        previous = producers.get(node.input[0], None)
+        if (previous is None or previous.op_type != node.op_type or
+                previous.domain not in ('', 'ai.onnx')):
+            return False
+        if node.op_type == 'Cast':
+            ptype = types.get(previous.input[0], (None, None))[0]
+            pto = [att.i for att in previous.attribute
+                   if att.name == 'to'][0]
+            if pto not in _lossless_casts.get(ptype, set()):
+                return False
+            # The first cast does not lose information,
+            # the second one can directly take the original input.
+        elif (node.input[1] not in constants or
+                0 in constants[node.input[1]]):
+            return False
+        node.input[0] = previous.input[0]
+        merged.append(previous)
+        return True
+
+    for node in _sorted_nodes(graph):
+        _rename_inputs([node], renames)
+        if (node.domain not in ('', 'ai.onnx') or
+                node.op_type not in ('Identity', 'Cast', 'Reshape')):
+            nodes.append(node)
+            producers.update((o, node) for o in node.output)
+            continue
+        if _is_noop(node) and _bypass(node):
+            continue
+        if (node.op_type != 'Identity' and _merge(node) and
+                _is_noop(node) and _bypass(node)):
+            continue
+        # The same computation was already done.
+        key = (node.op_type, tuple(node.input),
+               tuple(att.SerializeToString() for att in node.attribute))
+        if key in seen and node.output[0] not in graph_outputs:
+            renames[node.output[0]] = seen[key].output[0]
+            stats[node.op_type] = stats.get(node.op_type, 0) + 1
+            continue
+        seen[key] = node
+        nodes.append(node)
+        producers[node.output[0]] = node
+
+    if late_renames:
+        _rename_inputs(nodes, late_renames)
+        for node in nodes:
+            for i, name in enumerate(node.output):
+                if name in late_renames:
+                    node.output[i] = late_renames[name]
+
+    # Removes the merged nodes no longer used.
+    if merged:
+        counts = {}
+        for name in graph_outputs:
+            counts[name] = 1
+        for node in nodes:
+            for name in node.input:
+                counts[name] = counts.get(name, 0) + 1
+            if _has_subgraph(node):
+                for att in node.attribute:
+                    for g in ([att.g] if att.type == onnx.AttributeProto.GRAPH
+                              else att.graphs):
+                        for name in _enumerate_subgraph_inputs(g):
+                            counts[name] = counts.get(name, 0) + 1
+        merged = set(id(node) for node in merged)
+        removed = set()
+        for node in reversed(nodes):
+            if (id(node) not in merged or
+                    counts.get(node.output[0], 0) > 0):
+                continue
+            removed.add(id(node))
+            for name in node.input:
+                counts[name] -= 1
+            stats[node.op_type] = stats.get(node.op_type, 0) + 1
+        nodes = [node for node in nodes if id(node) not in removed]
+
+    used = set(_enumerate_subgraph_inputs(
+        onnx.helper.make_graph(nodes, 'used', [], [])))
+    used |= graph_outputs | graph_inputs
+    initializers = [init for init in graph.initializer if init.name in used]
+    new_model = _rebuild_model(onnx_model_copy, nodes, initializers)
+    if return_stats:
+        return new_model, stats
+    return new_model
+
+
+def onnx_compact_tree_ensembles(onnx_model, return_stats=False):
+    """
+    Compacts every node *TreeEnsembleClassifier* and
+    *TreeEnsembleRegressor* of a model: subtrees whose leaves
+    all return the same values are replaced by a single leaf,
+    attributes *nodes_hitrates* and *nodes_missing_value_tracks_true*
+    are removed if they only hold default values
+    (see :func:`compact_tree_attribute_pairs
+    <skl2onnx.common.tree_ensemble.compact_tree_attribute_pairs>`).
+    Option ``compact=True`` does the same at conversion time.
+
+    :param onnx_model: *ONNX* model
+    :param return_stats: if True, the function returns the new model
+        and a dictionary with the number of nodes and leaves
+        before and after the compaction, the removed attributes
+        and the size of the serialized model before and after
+    :return: new *ONNX* model, and statistics
+        if *return_stats* is True
+
+    ::
+
+        from skl2onnx.helpers.onnx_optimisation import (
+            onnx_compact_tree_ensembles)
+
+        model_onnx = convert_sklearn(...)
+        model_onnx, stats = onnx_compact_tree_ensembles(
+            model_onnx, return_stats=True)
+        print(stats)  # {'n_nodes_before': 1203, 'n_nodes_after': 811, ...}
+    """
+    stats = dict(n_nodes_before=0, n_nodes_after=0,
+                 n_leaves_before=0, n_leaves_after=0,
+                 removed_attributes=[])
+    nodes = []
+    for node in onnx_model.graph.node:
+        if (node.domain != 'ai.onnx.ml' or node.op_type not in (
+                'TreeEnsembleClassifier', 'TreeEnsembleRegressor')):
+            nodes.append(node)
+            continue
+        atts = _node_attributes(node)
+        st = compact_tree_attribute_pairs(atts)
+        for k, v in st.items():
+            if k == 'removed_attributes':
+                stats[k].extend(a for a in v if a not in stats[k])
+            else:
+                stats[k] += v
+        nodes.append(onnx.helper.make_node(
+            node.op_type, node.input, node.output, name=node.name,
+            domain=node.domain, **atts))
+
+    new_model = _rebuild_model(onnx_model, nodes,
+                               list(onnx_model.graph.initializer))
+    if return_stats:
+        stats['size_before'] = onnx_model.ByteSize()
+        stats['size_after'] = new_model.ByteSize()
+        return new_model, stats
+    return new_model
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import numpy
+from .investigate import enumerate_pipeline_models
+from .._supported_operators import get_model_alias
+from ..common._registration import get_converter
+
+
+def enumerate_quantizable_models(model):
+    """
+    Enumerates all models within a pipeline whose converter
+    supports option *quantize*.
+    """
+    for _, m, _ in enumerate_pipeline_models(model):
+        try:
+            alias = get_model_alias(type(m))
+            conv = get_converter(alias)
+        except (KeyError, ValueError, RuntimeError):
+            continue
+        allowed = conv.get_allowed_options()
+        if allowed is not None and 'quantize' in allowed:
+            yield m
+
+
+def _to_array(res):
+    "Converts the output of *onnxruntime* into an array."
+    if isinstance(res, list) and len(res) > 0 and isinstance(res[0], dict):
+        # ZipMap
+        keys = list(sorted(res[0]))
+        return numpy.array([[r[k] for k in keys] for r in res])
+    return numpy.asarray(res)
+
+
+def calibrate_quantization(model, X, quantize='int8', options=None,
+                           target_opset=None):
+    """
+    Converts *model* twice, with floats and with option
+    *quantize* enabled for every model supporting it,
+    runs both graphs with *onnxruntime* on sample *X* and reports
+    the error introduced by the quantization for every output.
+
+    :param model: fitted model
+    :param X: sample used to compute the outputs,
+        it also defines the input type (see :func:`to_onnx`)
+    :param quantize: value for option *quantize*
+    :param options: additional options given to the converter
+    :param target_opset: to overwrite the default opset
+    :return: dictionary with keys *options* (the options to
+        give to the converter to get the quantized model),
+        *size_float*, *size_quantized* (size of both serialized models),
+        *outputs* (for every output, the maximum and average absolute
+        errors and the maximum absolute error per column)
+
+    ::
+
+        report = calibrate_quantization(pipe, X[:100])
+        onx = to_onnx(pipe, X[:1], options=report['options'])
+    """
+    from onnxruntime import InferenceSession
+    from ..convert import to_onnx
+
+    quantized_options = {} if options is None else options.copy()
+    for m in enumerate_quantizable_models(model):
+        opts = quantized_options.get(id(m), {}).copy()
+        opts['quantize'] = quantize
+        quantized_options[id(m)] = opts
+    if len(quantized_options) == 0:
+        raise RuntimeError(
+            "No model in {} supports option quantize.".format(
+                type(model)))
+
+    onnxs = [to_onnx(model, X, options=opts, target_opset=target_opset)
+             for opts in [options, quantized_options]]
+    results = []
+    for onx in onnxs:
+        sess = InferenceSession(onx.SerializeToString())
+        name = sess.get_inputs()[0].name
+        results.append(sess.run(None, {name: X}))
+
+    outputs = {}
+    for o, exp, got in zip(onnxs[0].graph.output, results[0], results[1]):
+        exp = _to_array(exp)
+        got = _to_array(got)
+        if exp.dtype.kind not in 'fc':
+            # labels
+            outputs[o.name] = dict(
+                n_diff=int((exp != got).sum()), n=exp.shape[0])
+            continue
+        diff = numpy.abs(exp.astype(numpy.float64) -
+                         got.astype(numpy.float64))
+        outputs[o.name] = dict(
+            max_abs_error=float(diff.max()),
+            mean_abs_error=float(diff.mean()),
+            max_abs_error_column=(diff.max(axis=0)
+                                  if len(diff.shape) == 2 else None))
+    return dict(options=quantized_options,
+                size_float=len(onnxs[0].SerializeToString()),
+                size_quantized=len(onnxs[1].SerializeToString()),
+                outputs=outputs)
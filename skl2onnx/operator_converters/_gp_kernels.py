@@ -16,7 +16,8 @@ from ..algebra.onnx_ops import (
     OnnxTranspose, OnnxDiv, OnnxExp,
     OnnxShape, OnnxSin, OnnxPow,
     OnnxReduceSum, OnnxSqueeze,
-    OnnxIdentity, OnnxReduceSumSquare
+    OnnxIdentity, OnnxReduceSumSquare,
+    OnnxGemm, OnnxMax, OnnxMin, OnnxSqrt
 )
 from ..algebra.custom_ops import OnnxCDist
 from ..proto.onnx_helper_modified import from_array
@@ -298,6 +299,167 @@ def convert_kernel(kernel, X, output_names=None,
                        "class {}.".format(type(kernel)))
 
 
+def _sqeuclidean_gemm(X, x_train, scale=1., factor=1., offset=0.,
+                      dtype=None, op_version=None):
+    """
+    Returns the ONNX graph which computes
+    ``factor * cdist(X / scale, x_train / scale, 'sqeuclidean') + offset``.
+    Every term depending only on the training set is computed
+    once here, the graph is one *Gemm*, one *ReduceSumSquare*
+    and one *Add*.
+    """
+    scale = np.asarray(scale, dtype=np.float64)
+    x_train = np.asarray(x_train, dtype=np.float64)
+    x_scaled = x_train / scale
+    coef = (x_scaled / scale).T * (-2 * factor)
+    bias = (x_scaled ** 2).sum(axis=1) * factor + offset
+    cross = OnnxGemm(X, coef.astype(dtype), bias.astype(dtype),
+                     op_version=op_version)
+    if scale.size == 1:
+        norm = OnnxMul(
+            OnnxReduceSumSquare(X, axes=[1], keepdims=1,
+                                op_version=op_version),
+            np.array([factor / scale.ravel()[0] ** 2], dtype=dtype),
+            op_version=op_version)
+    else:
+        norm = OnnxMul(
+            OnnxReduceSumSquare(
+                OnnxMul(X, (1. / scale).astype(dtype),
+                        op_version=op_version),
+                axes=[1], keepdims=1, op_version=op_version),
+            np.array([factor], dtype=dtype), op_version=op_version)
+    return OnnxAdd(cross, norm, op_version=op_version)
+
+
+def _convert_kernel_gemm(kernel, X, x_train, dtype=None, op_version=None):
+    """
+    Returns the ONNX graph or a constant (numpy array)
+    for ``kernel(X, x_train)``.
+    """
+    if isinstance(kernel, (Sum, Product)):
+        k1 = _convert_kernel_gemm(kernel.k1, X, x_train, dtype=dtype,
+                                  op_version=op_version)
+        k2 = _convert_kernel_gemm(kernel.k2, X, x_train, dtype=dtype,
+                                  op_version=op_version)
+        if isinstance(kernel, Sum):
+            if isinstance(k1, np.ndarray) and isinstance(k2, np.ndarray):
+                return k1 + k2
+            return OnnxAdd(k1, k2, op_version=op_version)
+        if isinstance(k1, np.ndarray) and isinstance(k2, np.ndarray):
+            return k1 * k2
+        return OnnxMul(k1, k2, op_version=op_version)
+
+    if isinstance(kernel, ConstantKernel):
+        return np.array([kernel.constant_value], dtype=dtype)
+
+    if isinstance(kernel, RBF):
+        # K = exp(-0.5 * dists), dists >= 0
+        arg = _sqeuclidean_gemm(X, x_train, scale=kernel.length_scale,
+                                factor=-0.5, dtype=dtype,
+                                op_version=op_version)
+        return OnnxExp(OnnxMin(arg, np.array([0], dtype=dtype),
+                               op_version=op_version),
+                       op_version=op_version)
+
+    if isinstance(kernel, RationalQuadratic):
+        # K = (1 + dists / (2 * alpha * l^2)) ^ -alpha
+        base = _sqeuclidean_gemm(
+            X, x_train,
+            factor=1. / (2 * kernel.alpha * kernel.length_scale ** 2),
+            offset=1., dtype=dtype, op_version=op_version)
+        return OnnxPow(OnnxMax(base, np.array([1], dtype=dtype),
+                               op_version=op_version),
+                       np.array([-kernel.alpha], dtype=dtype),
+                       op_version=op_version)
+
+    if isinstance(kernel, ExpSineSquared):
+        # K = exp(-2 * (sin(pi / periodicity * dists) / l) ^ 2)
+        dist = OnnxSqrt(
+            OnnxMax(_sqeuclidean_gemm(X, x_train, dtype=dtype,
+                                      op_version=op_version),
+                    np.array([0], dtype=dtype), op_version=op_version),
+            op_version=op_version)
+        sin_of_arg = OnnxSin(
+            OnnxMul(dist, np.array([math.pi / kernel.periodicity],
+                                   dtype=dtype),
+                    op_version=op_version),
+            op_version=op_version)
+        return OnnxExp(
+            OnnxMul(OnnxMul(sin_of_arg, sin_of_arg, op_version=op_version),
+                    np.array([-2. / kernel.length_scale ** 2], dtype=dtype),
+                    op_version=op_version),
+            op_version=op_version)
+
+    if isinstance(kernel, DotProduct):
+        return OnnxGemm(X, np.asarray(x_train, dtype=dtype).T,
+                        np.array([kernel.sigma_0 ** 2], dtype=dtype),
+                        op_version=op_version)
+
+    raise RuntimeError("Unable to convert __call__ method for "
+                       "class {}.".format(type(kernel)))
+
+
+def convert_kernel_gemm(kernel, X, x_train, output_names=None,
+                        dtype=None, op_version=None):
+    """
+    Converts ``kernel(X, x_train)`` for a fixed training set.
+    Unlike :func:`convert_kernel`, every quantity depending only
+    on *x_train* (scaled training set, squared norms) is computed
+    at conversion time and distances are computed with a *Gemm*.
+    """
+    if op_version is None:
+        raise RuntimeError("op_version must not be None.")
+    res = _convert_kernel_gemm(kernel, X, x_train, dtype=dtype,
+                               op_version=op_version)
+    if isinstance(res, np.ndarray):
+        # Constant kernel.
+        x_train = np.asarray(x_train)
+        res = OnnxGemm(
+            X, np.zeros((x_train.shape[1], x_train.shape[0]), dtype=dtype),
+            res, op_version=op_version)
+    if output_names is None:
+        return res
+    return OnnxIdentity(res, output_names=output_names,
+                        op_version=op_version)
+
+
+def convert_kernel_diag_gemm(kernel, X, keepdims=0, dtype=None,
+                             op_version=None):
+    """
+    Returns the ONNX graph or a constant (numpy array)
+    for ``kernel.diag(X)``. Stationary kernels are constant
+    on the diagonal and do not need any node.
+    """
+    if isinstance(kernel, (Sum, Product)):
+        k1 = convert_kernel_diag_gemm(kernel.k1, X, keepdims=keepdims,
+                                      dtype=dtype, op_version=op_version)
+        k2 = convert_kernel_diag_gemm(kernel.k2, X, keepdims=keepdims,
+                                      dtype=dtype, op_version=op_version)
+        if isinstance(kernel, Sum):
+            if isinstance(k1, np.ndarray) and isinstance(k2, np.ndarray):
+                return k1 + k2
+            return OnnxAdd(k1, k2, op_version=op_version)
+        if isinstance(k1, np.ndarray) and isinstance(k2, np.ndarray):
+            return k1 * k2
+        return OnnxMul(k1, k2, op_version=op_version)
+
+    if isinstance(kernel, ConstantKernel):
+        return np.array([kernel.constant_value], dtype=dtype)
+
+    if isinstance(kernel, (RBF, ExpSineSquared, RationalQuadratic)):
+        return np.array([1], dtype=dtype)
+
+    if isinstance(kernel, DotProduct):
+        return OnnxAdd(
+            OnnxReduceSumSquare(X, axes=[1], keepdims=keepdims,
+                                op_version=op_version),
+            np.array([kernel.sigma_0 ** 2], dtype=dtype),
+            op_version=op_version)
+
+    raise RuntimeError("Unable to convert diag method for "
+                       "class {}.".format(type(kernel)))
+
+
 def _zero_vector_of_size(X, output_names=None, axis=0,
                          keepdims=None, dtype=None, op_version=None):
     if op_version is None:
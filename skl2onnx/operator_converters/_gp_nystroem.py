@@ -0,0 +1,100 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import numpy as np
+from scipy.linalg import eigh, inv, solve, solve_triangular
+
+
+def _select_inducing_points(kernel, X, n_components, tol=1e-8):
+    """
+    Selects at most *n_components* rows of *X* with a pivoted
+    Cholesky decomposition of ``kernel(X, X)``: every step picks
+    the point the least well approximated by the already selected
+    points. The kernel matrix is never computed entirely.
+    The selection stops when the residual diagonal is below
+    *tol* times its initial maximum.
+    Returns the indices of the selected points and
+    the factor *L* (``K(X, Z) = L L[indices].T``).
+    """
+    n = X.shape[0]
+    n_components = min(n_components, n)
+    diag = np.array(kernel.diag(X), dtype=np.float64)
+    tol = diag.max() * tol
+    L = np.zeros((n, n_components), dtype=np.float64)
+    indices = []
+    for k in range(n_components):
+        i = int(np.argmax(diag))
+        if diag[i] <= tol:
+            break
+        indices.append(i)
+        col = kernel(X, X[i:i + 1])[:, 0] - L[:, :k] @ L[i, :k]
+        L[:, k] = col / np.sqrt(diag[i])
+        diag -= L[:, k] ** 2
+        diag[indices] = 0
+    return np.array(indices, dtype=np.int64), L[:, :len(indices)]
+
+
+def fit_gpr_nystroem(model, kernel, n_components):
+    """
+    Computes a Nyström approximation (also known as
+    *Deterministic Training Conditional*) of a fitted
+    *GaussianProcessRegressor*. The kernel is approximated by
+    :math:`K(X, X_{train}) \\approx K(X, Z) K(Z, Z)^{-1} K(Z, X_{train})`
+    where *Z* is a subset of at most *n_components* training points.
+    The prediction becomes :math:`K(X, Z) w + \\mu` and the variance
+    :math:`diag(K(X, X)) - \\|K(X, Z) R\\|^2`, *w* and *R* only
+    depend on *Z*. The approximation is exact if *Z* is the whole
+    training set.
+
+    :param model: fitted *GaussianProcessRegressor*
+    :param kernel: kernel of the model
+    :param n_components: maximum number of inducing points
+    :return: dictionary with keys *points* (*Z*), *weights* (*w*,
+        scaled by ``_y_train_std``), *mean* and *var_factor* (*R*)
+    """
+    X_train = np.asarray(model.X_train_, dtype=np.float64)
+    indices, L = _select_inducing_points(kernel, X_train, n_components)
+    L_z = L[indices]
+
+    # Noise added to the diagonal of the kernel while training.
+    noise = np.ravel(np.asarray(model.alpha, dtype=np.float64))
+    if noise.size == 1:
+        noise = np.full(X_train.shape[0], noise[0])
+    y_train = np.asarray(model.y_train_, dtype=np.float64)
+    if len(y_train.shape) == 1:
+        y_train = y_train.reshape(y_train.shape + (1,))
+
+    # Whitened space: K(Z, X) = L_z L^T.
+    # Sigma = (K(Z, Z) + K(Z, X) noise^-1 K(X, Z))^-1
+    #       = L_z^-T B^-1 L_z^-1 with B = I + L^T noise^-1 L.
+    Ln = L / noise.reshape((-1, 1))
+    B = np.identity(L.shape[1]) + L.T @ Ln
+    w_white = solve(B, Ln.T @ y_train, assume_a='pos')
+    weights = solve_triangular(L_z.T, w_white, lower=False)
+    weights *= getattr(model, '_y_train_std', 1)
+
+    # K(Z, Z)^-1 - Sigma = L_z^-T (I - B^-1) L_z^-1
+    inner = np.identity(L.shape[1]) - inv(B)
+    eig, vec = eigh((inner + inner.T) / 2)
+    var_factor = solve_triangular(
+        L_z.T, vec * np.sqrt(np.maximum(eig, 0)), lower=False)
+    return dict(points=X_train[indices], weights=weights,
+                mean=np.ravel(model._y_train_mean),
+                var_factor=var_factor)
+
+
+def predict_gpr_nystroem(approx, kernel, X, y_train_std=1,
+                         return_std=False):
+    """
+    Computes the predictions of a Nyström approximation
+    returned by :func:`fit_gpr_nystroem` with :epkg:`numpy`.
+    """
+    K = kernel(X, approx['points'])
+    y_mean = K @ approx['weights'] + approx['mean']
+    if not return_std:
+        return y_mean
+    y_var = kernel.diag(X) - ((K @ approx['var_factor']) ** 2).sum(axis=1)
+    y_var = np.maximum(y_var, 0) * np.ravel(y_train_std) ** 2
+    return y_mean, np.sqrt(y_var)
@@ -0,0 +1,340 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+Converts the attributes of a *TreeEnsembleClassifier* or
+a *TreeEnsembleRegressor* into matrices so that the trees
+are evaluated with matrix multiplications (option ``optim='gemm'``).
+The option is experimental: the model is bigger and slower
+than a *TreeEnsemble* node with onnxruntime on CPU, it is meant
+for runtimes better at matrix multiplications than at branching.
+"""
+import numpy as np
+from ..common._apply_operation import (
+    apply_cast, apply_concat, apply_reshape, apply_sub, apply_transpose)
+from ..common.data_types import DoubleTensorType, FloatTensorType
+from ..common.utils_classifier import _finalize_converter_classes
+from ..proto import onnx_proto
+
+# Maximum number of coefficients of the padded tensor *paths*
+# (trees x leaves x internal nodes), 64 Mb with floats.
+MAX_GEMM_PATHS_SIZE = 2 ** 24
+
+
+def tree_ensemble_to_matrices(attr_pairs, dtype=np.float32):
+    """
+    Converts the attributes of a *TreeEnsembleClassifier* or
+    a *TreeEnsembleRegressor* into dense matrices.
+    Every tree is padded to the same number of internal nodes
+    *I* and leaves *L*. With *T* trees and *C* outputs,
+    the prediction is::
+
+        x = X.T[features]                        # (T I) x N
+        d = (x < thresholds) | (isnan(x) & missing)
+        d = d.reshape((T, I, N))
+        leaf = (paths @ d) > depths              # T x L x N
+        pred = (values @ leaf).sum(axis=0).T     # N x C
+        pred += base_values
+
+    *paths[t, l, i]* is 1 if leaf *l* is in the true subtree
+    of node *i*, -1 if it is in the false subtree, 0 otherwise,
+    *depths[t, l, 0]* is the number of true branches on the path
+    minus 0.5. The number of observations *N* is the last
+    dimension so that no transposition is needed between
+    the matrix multiplications. Thresholds are moved to the next
+    representable value so that ``x <= threshold`` becomes
+    ``x < thresholds``. The function raises an exception if
+    *T x L x I* is above *MAX_GEMM_PATHS_SIZE*, deep trees
+    should be converted without this option.
+
+    :param attr_pairs: attributes of the node
+    :param dtype: float type of the input
+    :return: dictionary with keys *features*, *thresholds*,
+        *missing*, *paths*, *depths*, *values*, *base_values*
+    """
+    prefix = 'class' if 'class_treeids' in attr_pairs else 'target'
+    n_nodes = len(attr_pairs['nodes_nodeids'])
+    modes = [m.decode('ascii') if isinstance(m, bytes) else m
+             for m in attr_pairs['nodes_modes']]
+    for m in modes:
+        if m not in ('BRANCH_LEQ', 'LEAF'):
+            raise NotImplementedError(
+                "Mode '{}' is not implemented with optim='gemm'.".format(m))
+    missing = attr_pairs.get('nodes_missing_value_tracks_true', None)
+    if missing is None or len(missing) == 0:
+        missing = [False] * n_nodes
+
+    # Structure of every tree.
+    position = {}
+    children = set()
+    for i in range(n_nodes):
+        key = (int(attr_pairs['nodes_treeids'][i]),
+               int(attr_pairs['nodes_nodeids'][i]))
+        position[key] = i
+        if modes[i] != 'LEAF':
+            children.add((key[0], int(attr_pairs['nodes_truenodeids'][i])))
+            children.add((key[0], int(attr_pairs['nodes_falsenodeids'][i])))
+    roots = sorted(k for k in position if k not in children)
+
+    trees = []
+    for root in roots:
+        internals = []
+        leaves = []
+        stack = [(root, [])]
+        while stack:
+            key, path = stack.pop()
+            i = position[key]
+            if modes[i] == 'LEAF':
+                leaves.append((key, path))
+                continue
+            index = len(internals)
+            internals.append(i)
+            stack.append(((key[0], int(attr_pairs['nodes_falsenodeids'][i])),
+                          path + [(index, -1)]))
+            stack.append(((key[0], int(attr_pairs['nodes_truenodeids'][i])),
+                          path + [(index, 1)]))
+        trees.append((internals, leaves))
+
+    # Leaves outputs.
+    ids = [int(i) for i in attr_pairs[prefix + '_ids']]
+    n_cols = max(ids) + 1 if ids else 1
+    if prefix == 'target':
+        n_cols = max(n_cols, int(attr_pairs.get('n_targets', 1)))
+    outputs = {}
+    for tid, nid, cid, w in zip(attr_pairs[prefix + '_treeids'],
+                                attr_pairs[prefix + '_nodeids'], ids,
+                                attr_pairs[prefix + '_weights']):
+        key = (int(tid), int(nid))
+        if key not in outputs:
+            outputs[key] = np.zeros(n_cols, dtype=np.float64)
+        outputs[key][cid] += w
+
+    n_trees = len(trees)
+    n_int = max(1, max(len(t[0]) for t in trees))
+    n_leaves = max(len(t[1]) for t in trees)
+    if n_trees * n_leaves * n_int > MAX_GEMM_PATHS_SIZE:
+        raise RuntimeError(
+            "Option optim='gemm' would create a tensor of {}x{}x{} "
+            "coefficients (trees x leaves x internal nodes), more than "
+            "the limit MAX_GEMM_PATHS_SIZE={}. The trees are too deep "
+            "for this option.".format(
+                n_trees, n_leaves, n_int, MAX_GEMM_PATHS_SIZE))
+    features = np.zeros((n_trees, n_int), dtype=np.int64)
+    thresholds = np.full((n_trees, n_int), np.inf, dtype=dtype)
+    miss = np.zeros((n_trees, n_int), dtype=np.bool_)
+    paths = np.zeros((n_trees, n_leaves, n_int), dtype=dtype)
+    # Padded leaves can never be reached.
+    depths = np.full((n_trees, n_leaves, 1), n_int + 1, dtype=dtype)
+    values = np.zeros((n_trees, n_cols, n_leaves), dtype=dtype)
+    for t, (internals, leaves) in enumerate(trees):
+        for k, i in enumerate(internals):
+            features[t, k] = int(attr_pairs['nodes_featureids'][i])
+            th = np.array([attr_pairs['nodes_values'][i]], dtype=np.float32)
+            th = th.astype(dtype)
+            thresholds[t, k] = np.nextafter(th, np.array([np.inf], dtype))[0]
+            miss[t, k] = bool(missing[i])
+        for k, (key, path) in enumerate(leaves):
+            for index, sign in path:
+                paths[t, k, index] = sign
+            depths[t, k, 0] = sum(1 for _, s in path if s > 0) - 0.5
+            if key in outputs:
+                values[t, :, k] = outputs[key]
+
+    base_values = attr_pairs.get('base_values', None)
+    if base_values is None or len(base_values) == 0:
+        base_values = None
+    else:
+        base_values = np.array(base_values, dtype=dtype)
+    return dict(features=features.ravel(),
+                thresholds=thresholds.reshape((-1, 1)),
+                missing=miss.reshape((-1, 1)), paths=paths, depths=depths,
+                values=values, base_values=base_values)
+
+
+def _add_initializer(scope, container, name, value):
+    name = scope.get_unique_variable_name(name)
+    if value.dtype == np.bool_:
+        proto_type = onnx_proto.TensorProto.BOOL
+    elif value.dtype == np.int64:
+        proto_type = onnx_proto.TensorProto.INT64
+    else:
+        proto_type = container.proto_dtype
+    container.add_initializer(name, proto_type, value.shape,
+                              value.ravel().tolist())
+    return name
+
+
+def convert_tree_ensemble_gemm(scope, operator, container, attr_pairs,
+                               output_names):
+    """
+    Adds the nodes evaluating the trees defined by *attr_pairs*
+    with matrix multiplications instead of a node
+    *TreeEnsembleClassifier* or *TreeEnsembleRegressor*
+    (see :func:`tree_ensemble_to_matrices`). The outputs are the
+    same, labels and probabilities for a classifier,
+    predictions for a regressor.
+    """
+    dtype = container.dtype
+    proto_dtype = container.proto_dtype
+    mats = tree_ensemble_to_matrices(attr_pairs, dtype=dtype)
+    n_trees, n_leaves, n_int = mats['paths'].shape
+
+    # Decision taken at every node.
+    input_name = operator.inputs[0].full_name
+    if type(operator.inputs[0].type) not in (
+            FloatTensorType, DoubleTensorType):
+        cast_input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, input_name, cast_input_name, container,
+                   to=proto_dtype)
+        input_name = cast_input_name
+    transposed_input_name = scope.get_unique_variable_name('transposed_input')
+    apply_transpose(scope, input_name, transposed_input_name, container,
+                    perm=(1, 0))
+    features_name = _add_initializer(
+        scope, container, 'tree_features', mats['features'])
+    gathered_name = scope.get_unique_variable_name('gathered')
+    container.add_node(
+        'Gather', [transposed_input_name, features_name], gathered_name,
+        axis=0, name=scope.get_unique_operator_name('Gather'))
+    thresholds_name = _add_initializer(
+        scope, container, 'tree_thresholds', mats['thresholds'])
+    decision_name = scope.get_unique_variable_name('decision')
+    container.add_node(
+        'Less', [gathered_name, thresholds_name], decision_name,
+        name=scope.get_unique_operator_name('Less'))
+    if mats['missing'].any():
+        missing_name = _add_initializer(
+            scope, container, 'tree_missing', mats['missing'])
+        isnan_name = scope.get_unique_variable_name('isnan')
+        container.add_node(
+            'IsNaN', gathered_name, isnan_name,
+            name=scope.get_unique_operator_name('IsNaN'))
+        and_name = scope.get_unique_variable_name('and')
+        container.add_node(
+            'And', [isnan_name, missing_name], and_name,
+            name=scope.get_unique_operator_name('And'))
+        or_name = scope.get_unique_variable_name('or')
+        container.add_node(
+            'Or', [decision_name, and_name], or_name,
+            name=scope.get_unique_operator_name('Or'))
+        decision_name = or_name
+    cast_decision_name = scope.get_unique_variable_name('cast_decision')
+    apply_cast(scope, decision_name, cast_decision_name, container,
+               to=proto_dtype)
+    reshaped_name = scope.get_unique_variable_name('reshaped_decision')
+    apply_reshape(scope, cast_decision_name, reshaped_name, container,
+                  desired_shape=(n_trees, n_int, -1))
+
+    # Selected leaves.
+    paths_name = _add_initializer(
+        scope, container, 'tree_paths', mats['paths'])
+    path_name = scope.get_unique_variable_name('path')
+    container.add_node(
+        'MatMul', [paths_name, reshaped_name], path_name,
+        name=scope.get_unique_operator_name('MatMul'))
+    depths_name = _add_initializer(
+        scope, container, 'tree_depths', mats['depths'])
+    leaf_name = scope.get_unique_variable_name('leaf')
+    container.add_node(
+        'Greater', [path_name, depths_name], leaf_name,
+        name=scope.get_unique_operator_name('Greater'))
+    cast_leaf_name = scope.get_unique_variable_name('cast_leaf')
+    apply_cast(scope, leaf_name, cast_leaf_name, container, to=proto_dtype)
+
+    # Sum of the leaves values.
+    values_name = _add_initializer(
+        scope, container, 'tree_values', mats['values'])
+    tree_pred_name = scope.get_unique_variable_name('tree_pred')
+    container.add_node(
+        'MatMul', [values_name, cast_leaf_name], tree_pred_name,
+        name=scope.get_unique_operator_name('MatMul'))
+
+    post_transform = attr_pairs.get('post_transform', 'NONE')
+    if isinstance(post_transform, bytes):
+        post_transform = post_transform.decode('ascii')
+    is_classifier = 'class_treeids' in attr_pairs
+    if not is_classifier and post_transform != 'NONE':
+        raise NotImplementedError(
+            "post_transform='{}' is not implemented with "
+            "optim='gemm'.".format(post_transform))
+
+    summed_name = scope.get_unique_variable_name('summed')
+    if container.target_opset < 13:
+        container.add_node(
+            'ReduceSum', tree_pred_name, summed_name, axes=[0], keepdims=0,
+            name=scope.get_unique_operator_name('ReduceSum'))
+    else:
+        axes_name = _add_initializer(
+            scope, container, 'axes', np.array([0], dtype=np.int64))
+        container.add_node(
+            'ReduceSum', [tree_pred_name, axes_name], summed_name,
+            keepdims=0, op_version=13,
+            name=scope.get_unique_operator_name('ReduceSum'))
+    scores_name = (scope.get_unique_variable_name('scores')
+                   if is_classifier or mats['base_values'] is not None
+                   else output_names[0])
+    apply_transpose(scope, summed_name, scores_name, container, perm=(1, 0))
+    if mats['base_values'] is not None:
+        base_name = _add_initializer(
+            scope, container, 'base_values', mats['base_values'])
+        biased_name = (scope.get_unique_variable_name('biased_scores')
+                       if is_classifier else output_names[0])
+        container.add_node(
+            'Add', [scores_name, base_name], biased_name,
+            name=scope.get_unique_operator_name('Add'))
+        scores_name = biased_name
+    if not is_classifier:
+        return
+
+    if 'classlabels_int64s' in attr_pairs:
+        classes = np.array(attr_pairs['classlabels_int64s'], dtype=np.int64)
+    else:
+        classes = np.array([c.decode('utf-8') if isinstance(c, bytes) else c
+                            for c in attr_pairs['classlabels_strings']])
+    binary = (len(classes) == 2 and
+              len(set(int(i) for i in attr_pairs['class_ids'])) == 1)
+    if binary:
+        # The scores only hold the positive class as
+        # TreeEnsembleClassifier does in that case.
+        neg_name = scope.get_unique_variable_name('neg_scores')
+        if (post_transform == 'NONE' and
+                all(w >= 0 for w in attr_pairs['class_weights'])):
+            one_name = _add_initializer(
+                scope, container, 'one', np.array([1], dtype=dtype))
+            apply_sub(scope, [one_name, scores_name], neg_name, container,
+                      broadcast=1)
+        else:
+            container.add_node(
+                'Neg', scores_name, neg_name,
+                name=scope.get_unique_operator_name('Neg'))
+        binary_name = scope.get_unique_variable_name('binary_scores')
+        apply_concat(scope, [neg_name, scores_name], binary_name,
+                     container, axis=1)
+        scores_name = binary_name
+
+    proba_name = output_names[1]
+    if post_transform == 'NONE':
+        container.add_node(
+            'Identity', scores_name, proba_name,
+            name=scope.get_unique_operator_name('Identity'))
+    elif post_transform == 'LOGISTIC':
+        container.add_node(
+            'Sigmoid', scores_name, proba_name,
+            name=scope.get_unique_operator_name('Sigmoid'))
+    elif post_transform == 'SOFTMAX':
+        container.add_node(
+            'Softmax', scores_name, proba_name, axis=1,
+            name=scope.get_unique_operator_name('Softmax'))
+    else:
+        raise NotImplementedError(
+            "post_transform='{}' is not implemented with "
+            "optim='gemm'.".format(post_transform))
+
+    argmax_name = scope.get_unique_variable_name('argmax')
+    container.add_node(
+        'ArgMax', proba_name, argmax_name, axis=1,
+        name=scope.get_unique_operator_name('ArgMax'))
+    _finalize_converter_classes(scope, argmax_name, output_names[0],
+                                container, classes)
@@ -13,6 +13,43 @@ from ..common._apply_operation import (
 from ..common._registration import register_converter
 from ..common._topology import FloatTensorType
 from ..proto import onnx_proto
+from .decision_tree import can_merge_decision_trees, merge_decision_trees
+
+
+def _check_features(model):
+    if (not (isinstance(model.max_features, float) and
+             model.max_features == 1.0)):
+        raise NotImplementedError(
+            "Not default values for max_features is "
+            "not supported with {} yet. "
+            "You may raise an issue at "
+            "https://github.com/onnx/sklearn-onnx/issues".format(
+                model.__class__.__name__))
+    if model.bootstrap_features:
+        raise NotImplementedError(
+            "bootstrap_features=True is "
+            "not supported with {} yet. "
+            "You may raise an issue at "
+            "https://github.com/onnx/sklearn-onnx/issues".format(
+                model.__class__.__name__))
+
+
+def _calculate_proba_trees(scope, operator, container, model):
+    """
+    Calculates class probability scores for a BaggingClassifier
+    of decision trees. All trees are merged into a single
+    TreeEnsembleClassifier node, every tree receives the weight
+    ``1 / n_estimators``.
+    """
+    final_proba_name = operator.outputs[1].full_name
+    n_estimators = len(model.estimators_)
+    label_name = scope.get_unique_variable_name('label')
+    merge_decision_trees(
+        scope, operator, container, model.estimators_,
+        [1. / n_estimators] * n_estimators,
+        [label_name, final_proba_name], n_classes=len(model.classes_),
+        features=model.estimators_features_)
+    return final_proba_name
 
 
 def _calculate_proba(scope, operator, container, model):
@@ -96,19 +133,10 @@ def convert_sklearn_bagging_classifier(scope, operator, container):
                 operator.raw_operator.__class__.__name__))
 
     bagging_op = operator.raw_operator
-    if (not (isinstance(bagging_op.max_features, float) and
-             bagging_op.max_features == 1.0)):
-        raise NotImplementedError(
-            "Not default values for max_features is "
-            "not supported with BaggingClassifier yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
-    if bagging_op.bootstrap_features:
-        raise NotImplementedError(
-            "bootstrap_features=True is "
-            "not supported with BaggingClassifier yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
+    merge_trees = can_merge_decision_trees(
+        bagging_op.estimators_, len(bagging_op.classes_))
+    if not merge_trees:
+        _check_features(bagging_op)
 
     classes = bagging_op.classes_
     output_shape = (-1,)
@@ -128,7 +156,11 @@ def convert_sklearn_bagging_classifier(scope, operator, container):
 
     container.add_initializer(classes_name, class_type, classes.shape, classes)
 
-    proba_name = _calculate_proba(scope, operator, container, bagging_op)
+    if merge_trees:
+        proba_name = _calculate_proba_trees(
+            scope, operator, container, bagging_op)
+    else:
+        proba_name = _calculate_proba(scope, operator, container, bagging_op)
     container.add_node(
         'ArgMax', proba_name, argmax_output_name,
         name=scope.get_unique_operator_name('ArgMax'), axis=1)
@@ -159,19 +191,15 @@ def convert_sklearn_bagging_regressor(scope, operator, container):
     Converter for BaggingRegressor.
     """
     bagging_op = operator.raw_operator
-    if (not (isinstance(bagging_op.max_features, float) and
-             bagging_op.max_features == 1.0)):
-        raise NotImplementedError(
-            "Not default values for max_features is "
-            "not supported with BaggingRegressor yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
-    if bagging_op.bootstrap_features:
-        raise NotImplementedError(
-            "bootstrap_features=True is "
-            "not supported with BaggingRegressor yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
+    if can_merge_decision_trees(bagging_op.estimators_):
+        n_estimators = len(bagging_op.estimators_)
+        merge_decision_trees(
+            scope, operator, container, bagging_op.estimators_,
+            [1. / n_estimators] * n_estimators,
+            operator.outputs[0].full_name,
+            features=bagging_op.estimators_features_)
+        return
+    _check_features(bagging_op)
     proba_list = []
     for index, estimator in enumerate(bagging_op.estimators_):
         op_type = sklearn_operator_name_map[type(estimator)]
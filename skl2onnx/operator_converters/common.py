@@ -4,8 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numpy as np
+from ..common._apply_operation import apply_cast, apply_mul
+from ..common._topology import Variable
 from ..common.data_types import (Int64TensorType, Int64Type, FloatTensorType,
-                                 FloatType, StringType)
+                                 FloatType, StringType, Float16TensorType)
+from ..proto import onnx_proto
 
 
 def convert_integer_to_float(scope, variable, container):
@@ -69,3 +73,114 @@ def concatenate_variables(scope, variables, container):
                            op_domain='ai.onnx.ml', **attrs)
 
         return concatenated_name
+
+
+def convert_float16_as_float32(converter, scope, operator, container):
+    """
+    Calls *converter* in float32 when the model is converted with
+    ``dtype=numpy.float16``. It is used for the converters whose
+    computation is numerically sensitive (exponential, log-sum-exp)
+    or relies on operators not implemented for float16 (*ai.onnx.ml*).
+    Every float16 input is cast into float32, the converter writes
+    float32 results which are cast into the expected float16 outputs.
+    """
+    inputs, outputs = operator.inputs, operator.outputs
+    new_inputs = []
+    for var in inputs:
+        if isinstance(var.type, Float16TensorType):
+            name = scope.get_unique_variable_name(var.onnx_name + '_float')
+            apply_cast(scope, var.full_name, name, container,
+                       to=onnx_proto.TensorProto.FLOAT)
+            var = Variable(name, name, scope.name,
+                           FloatTensorType(var.type.shape))
+        new_inputs.append(var)
+    new_outputs = []
+    casts = []
+    for var in outputs:
+        if isinstance(var.type, Float16TensorType):
+            name = scope.get_unique_variable_name(var.onnx_name + '_float')
+            casts.append((name, var.full_name))
+            var = Variable(name, name, scope.name,
+                           FloatTensorType(var.type.shape))
+        new_outputs.append(var)
+
+    dtype, proto_dtype = container.dtype, container.proto_dtype
+    operator.inputs, operator.outputs = new_inputs, new_outputs
+    container.dtype = np.float32
+    container.proto_dtype = onnx_proto.TensorProto.FLOAT
+    try:
+        converter(scope, operator, container)
+    finally:
+        operator.inputs, operator.outputs = inputs, outputs
+        container.dtype, container.proto_dtype = dtype, proto_dtype
+
+    for name, output_name in casts:
+        apply_cast(scope, name, output_name, container,
+                   to=onnx_proto.TensorProto.FLOAT16)
+
+
+def quantize_weight_int8(weight):
+    """
+    Quantizes matrix *weight* of shape *[C, K]*, multiplied
+    on the right of the inputs (``X @ weight``), into int8
+    with one scale per column (symmetric quantization,
+    no zero point). The function returns the quantized matrix
+    and the scales, ``weight ~ qweight * scale``.
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    scale = np.abs(weight).max(axis=0) / 127
+    scale[scale == 0] = 1
+    qweight = np.clip(np.round(weight / scale), -127, 127)
+    return qweight.astype(np.int8), scale
+
+
+def add_weight_initializer(scope, container, name, weight, quantize=None):
+    """
+    Adds matrix *weight* of shape *[C, K]*, multiplied on the right
+    of the inputs, into the graph and returns the name of the result
+    holding it. If *quantize* is ``'int8'``, the matrix is stored as
+    int8 with one scale per column and dequantized in the graph,
+    with a *DequantizeLinear* along axis 1 if the target opset
+    is >= 13, with a *Cast* followed by a *Mul* otherwise.
+    The runtime may fold these nodes into a constant, the gain is
+    on the size of the model.
+    """
+    weight = np.asarray(weight)
+    if quantize is None:
+        container.add_initializer(name, container.proto_dtype,
+                                  weight.shape, weight.ravel())
+        return name
+    if quantize != 'int8':
+        raise ValueError(
+            "Unexpected value for quantize={}.".format(quantize))
+    if len(weight.shape) != 2:
+        raise RuntimeError(
+            "Only matrices can be quantized not shape={}.".format(
+                weight.shape))
+
+    qweight, scale = quantize_weight_int8(weight)
+    qweight_name = scope.get_unique_variable_name(name + '_int8')
+    scale_name = scope.get_unique_variable_name(name + '_scale')
+    container.add_initializer(qweight_name, onnx_proto.TensorProto.INT8,
+                              qweight.shape, qweight.ravel())
+    if container.target_opset >= 13 and container.dtype == np.float32:
+        # per axis dequantization was introduced in opset 13
+        zero_name = scope.get_unique_variable_name(name + '_zero')
+        container.add_initializer(scale_name, onnx_proto.TensorProto.FLOAT,
+                                  [scale.shape[0]], scale)
+        container.add_initializer(
+            zero_name, onnx_proto.TensorProto.INT8, [scale.shape[0]],
+            np.zeros(scale.shape, dtype=np.int8))
+        container.add_node(
+            'DequantizeLinear', [qweight_name, scale_name, zero_name],
+            name, axis=1, op_version=13,
+            name=scope.get_unique_operator_name('DequantizeLinear'))
+    else:
+        cast_name = scope.get_unique_variable_name(name + '_cast')
+        apply_cast(scope, qweight_name, cast_name, container,
+                   to=container.proto_dtype)
+        container.add_initializer(scale_name, container.proto_dtype,
+                                  [1, scale.shape[0]], scale)
+        apply_mul(scope, [cast_name, scale_name], name, container,
+                  broadcast=1)
+    return name
@@ -7,6 +7,10 @@
 import numbers
 import numpy as np
 import six
+from sklearn.tree import (
+    DecisionTreeClassifier, DecisionTreeRegressor,
+    ExtraTreeClassifier, ExtraTreeRegressor,
+)
 from ..common._apply_operation import (
     apply_cast,
     apply_concat,
@@ -18,11 +22,13 @@ from ..common._registration import register_converter
 from ..common.data_types import BooleanTensorType, Int64TensorType
 from ..common.tree_ensemble import (
     add_tree_to_attribute_pairs,
+    compact_tree_attribute_pairs,
     get_default_tree_classifier_attribute_pairs,
     get_default_tree_regressor_attribute_pairs,
 )
 from ..common.utils_classifier import get_label_classes
 from ..proto import onnx_proto
+from ._tree_gemm import convert_tree_ensemble_gemm
 
 
 def populate_tree_attributes(model, name):
@@ -76,6 +82,108 @@ def populate_tree_attributes(model, name):
     return attrs
 
 
+class _HardVoteTree:
+    """
+    Wraps a fitted tree and replaces the values stored in every leaf
+    by the one hot encoding of the predicted class.
+    """
+
+    def __init__(self, tree):
+        self.node_count = tree.node_count
+        self.children_left = tree.children_left
+        self.children_right = tree.children_right
+        self.feature = tree.feature
+        self.threshold = tree.threshold
+        value = tree.value
+        self.value = np.zeros(value.shape, dtype=np.float64)
+        ind = np.argmax(value, axis=2)
+        for k in range(value.shape[1]):
+            self.value[np.arange(value.shape[0]), k, ind[:, k]] = 1.
+
+
+def can_merge_decision_trees(estimators, n_classes=None):
+    """
+    Tells if a list of fitted estimators can be converted into a
+    single *TreeEnsembleClassifier* or *TreeEnsembleRegressor* node
+    by :func:`merge_decision_trees`. Every estimator must be a
+    decision tree with the same number of outputs and, for classifiers,
+    a single output trained on the *n_classes* classes.
+    """
+    estimators = [est for est in estimators if est is not None]
+    if len(estimators) == 0:
+        return False
+    if n_classes is None:
+        allowed = (DecisionTreeRegressor, ExtraTreeRegressor)
+    else:
+        allowed = (DecisionTreeClassifier, ExtraTreeClassifier)
+    for est in estimators:
+        if type(est) not in allowed or not hasattr(est, 'tree_'):
+            return False
+        if est.n_outputs_ != estimators[0].n_outputs_:
+            return False
+        if n_classes is not None and (
+                est.n_outputs_ != 1 or len(est.classes_) != n_classes):
+            return False
+    return True
+
+
+def merge_decision_trees(scope, operator, container, estimators, weights,
+                         output_names, n_classes=None, features=None,
+                         hard=False):
+    """
+    Converts a list of decision trees into a single
+    *TreeEnsembleClassifier* or *TreeEnsembleRegressor* node,
+    the output is the weighted sum of every tree prediction.
+    This node replaces the many small nodes a meta-estimator
+    (bagging, voting) would produce if every tree were converted
+    independently.
+
+    :param estimators: fitted trees, :func:`can_merge_decision_trees`
+        must return True
+    :param weights: weight of every tree
+    :param output_names: names of the outputs, labels and
+        probabilities for a classifier, predictions for a regressor
+    :param n_classes: number of classes, None for a regressor
+    :param features: features used by every tree if it was trained
+        on a subset of the features (see *estimators_features_*)
+    :param hard: every tree votes for one class (hard voting)
+        instead of returning probabilities
+    """
+    is_classifier = n_classes is not None
+    if is_classifier:
+        op_type = 'TreeEnsembleClassifier'
+        attrs = get_default_tree_classifier_attribute_pairs()
+        attrs['classlabels_int64s'] = list(range(n_classes))
+    else:
+        op_type = 'TreeEnsembleRegressor'
+        attrs = get_default_tree_regressor_attribute_pairs()
+        attrs['n_targets'] = int(estimators[0].n_outputs_)
+    attrs['name'] = scope.get_unique_operator_name(op_type)
+
+    for tree_id, (est, weight) in enumerate(zip(estimators, weights)):
+        tree = est.tree_
+        if hard:
+            tree = _HardVoteTree(tree)
+        first = len(attrs['nodes_featureids'])
+        add_tree_to_attribute_pairs(
+            attrs, is_classifier, tree, tree_id, weight, 0,
+            is_classifier and not hard, True, dtype=container.dtype)
+        if features is not None:
+            feats = features[tree_id]
+            ids = attrs['nodes_featureids']
+            ids[first:] = [int(feats[i]) for i in ids[first:]]
+
+    input_name = operator.input_full_names
+    if type(operator.inputs[0].type) in (BooleanTensorType, Int64TensorType):
+        cast_input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, input_name, cast_input_name,
+                   container, to=onnx_proto.TensorProto.FLOAT)
+        input_name = cast_input_name
+    container.add_node(
+        op_type, input_name, output_names,
+        op_domain='ai.onnx.ml', **attrs)
+
+
 def predict(model, scope, operator, container,
             op_type, op_domain, op_version, is_ensemble=False):
     """Predict target and calculate probability scores."""
@@ -169,6 +277,15 @@ def convert_sklearn_decision_tree_classifier(
 
         add_tree_to_attribute_pairs(attrs, True, op.tree_, 0, 1., 0, True,
                                     True, dtype=container.dtype)
+        options = container.get_options(op, dict(compact=False, optim=None))
+        if options['compact']:
+            compact_tree_attribute_pairs(attrs)
+        if options['optim'] == 'gemm':
+            convert_tree_ensemble_gemm(
+                scope, operator, container, attrs,
+                [operator.outputs[0].full_name,
+                 operator.outputs[1].full_name])
+            return
         input_name = operator.input_full_names
         if type(operator.inputs[0].type) == BooleanTensorType:
             cast_input_name = scope.get_unique_variable_name('cast_input')
@@ -233,6 +350,13 @@ def convert_sklearn_decision_tree_regressor(
     attrs['n_targets'] = int(op.n_outputs_)
     add_tree_to_attribute_pairs(attrs, False, op.tree_, 0, 1., 0, False,
                                 True, dtype=container.dtype)
+    options = container.get_options(op, dict(compact=False, optim=None))
+    if options['compact']:
+        compact_tree_attribute_pairs(attrs)
+    if options['optim'] == 'gemm':
+        convert_tree_ensemble_gemm(scope, operator, container, attrs,
+                                   operator.output_full_names)
+        return
 
     input_name = operator.input_full_names
     if type(operator.inputs[0].type) in (BooleanTensorType, Int64TensorType):
@@ -250,12 +374,20 @@ def convert_sklearn_decision_tree_regressor(
 register_converter('SklearnDecisionTreeClassifier',
                    convert_sklearn_decision_tree_classifier,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnDecisionTreeRegressor',
-                   convert_sklearn_decision_tree_regressor)
+                   convert_sklearn_decision_tree_regressor,
+                   options={'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnExtraTreeClassifier',
                    convert_sklearn_decision_tree_classifier,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnExtraTreeRegressor',
-                   convert_sklearn_decision_tree_regressor)
+                   convert_sklearn_decision_tree_regressor,
+                   options={'compact': [False, True],
+                            'optim': [None, 'gemm']})
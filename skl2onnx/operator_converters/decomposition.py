@@ -9,6 +9,7 @@ from ..common._apply_operation import apply_cast, apply_div
 from ..common._apply_operation import apply_sqrt, apply_sub
 from ..common._registration import register_converter
 from ..common.data_types import Int64TensorType
+from .common import add_weight_initializer
 
 
 def convert_truncated_svd(scope, operator, container):
@@ -20,9 +21,15 @@ def convert_truncated_svd(scope, operator, container):
     transform_matrix = svd.components_.transpose()
     transform_matrix_name = scope.get_unique_variable_name('transform_matrix')
     # Put the transformation into an ONNX tensor
-    container.add_initializer(
-        transform_matrix_name, onnx_proto.TensorProto.FLOAT,
-        transform_matrix.shape, transform_matrix.flatten())
+    options = container.get_options(svd, dict(quantize=None))
+    if options['quantize'] is None:
+        container.add_initializer(
+            transform_matrix_name, onnx_proto.TensorProto.FLOAT,
+            transform_matrix.shape, transform_matrix.flatten())
+    else:
+        add_weight_initializer(
+            scope, container, transform_matrix_name, transform_matrix,
+            quantize=options['quantize'])
 
     input_name = operator.inputs[0].full_name
     if isinstance(operator.inputs[0].type, Int64TensorType):
@@ -78,6 +85,9 @@ def convert_truncated_svd(scope, operator, container):
                 name=scope.get_unique_operator_name('MatMul'))
 
 
-register_converter('SklearnIncrementalPCA', convert_truncated_svd)
-register_converter('SklearnPCA', convert_truncated_svd)
-register_converter('SklearnTruncatedSVD', convert_truncated_svd)
+register_converter('SklearnIncrementalPCA', convert_truncated_svd,
+                   options={'quantize': [None, 'int8']})
+register_converter('SklearnPCA', convert_truncated_svd,
+                   options={'quantize': [None, 'int8']}, float16=True)
+register_converter('SklearnTruncatedSVD', convert_truncated_svd,
+                   options={'quantize': [None, 'int8']}, float16=True)
@@ -18,6 +18,7 @@ from ..algebra.onnx_ops import (
     OnnxReduceSum, OnnxLog, OnnxReduceMax, OnnxEqual, OnnxCast
 )
 from ..proto import onnx_proto
+from .common import convert_float16_as_float32
 
 
 def convert_sklearn_gaussian_mixture(scope, operator, container):
@@ -28,6 +29,12 @@ def convert_sklearn_gaussian_mixture(scope, operator, container):
 
     * *covariance_type*
     """
+    if container.dtype == np.float16:
+        # the log-likelihood and the log-sum-exp are computed in float32
+        convert_float16_as_float32(convert_sklearn_gaussian_mixture,
+                                   scope, operator, container)
+        return
+
     X = operator.inputs[0]
     out = operator.outputs
     op = operator.raw_operator
@@ -224,7 +231,7 @@ def convert_sklearn_gaussian_mixture(scope, operator, container):
 
 
 register_converter('SklearnGaussianMixture', convert_sklearn_gaussian_mixture,
-                   options={'score_samples': [True, False]})
+                   options={'score_samples': [True, False]}, float16=True)
 register_converter('SklearnBayesianGaussianMixture',
                    convert_sklearn_gaussian_mixture,
-                   options={'score_samples': [True, False]})
+                   options={'score_samples': [True, False]}, float16=True)
@@ -4,11 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 import numpy as np
+from scipy.linalg import solve_triangular
 from sklearn.gaussian_process.kernels import ConstantKernel as C, RBF
 from ..common._registration import register_converter
 from ..algebra.onnx_ops import (
     OnnxAdd, OnnxSqrt, OnnxMatMul, OnnxSub, OnnxReduceSum,
-    OnnxMul, OnnxMax
+    OnnxMul, OnnxMax, OnnxReduceSumSquare
 )
 try:
     from ..algebra.onnx_ops import OnnxConstantOfShape
@@ -18,8 +19,154 @@ except ImportError:
 from ._gp_kernels import (
     convert_kernel_diag,
     convert_kernel,
+    convert_kernel_diag_gemm,
+    convert_kernel_gemm,
     _zero_vector_of_size
 )
+from ._gp_nystroem import fit_gpr_nystroem, predict_gpr_nystroem
+
+
+def _convert_gaussian_process_regressor_gemm(
+        op, kernel, X, out, return_std, dtype, op_version,
+        n_components=None):
+    """
+    Converts a fitted *GaussianProcessRegressor* with
+    every quantity depending only on the training set computed
+    at conversion time (option ``optim='gemm'``).
+    The kernel is evaluated with *Gemm* (see
+    :func:`convert_kernel_gemm`), the prediction is one *MatMul*
+    with ``alpha_`` scaled by ``_y_train_std``. The standard deviation
+    uses the inverse of the Cholesky decomposition ``L_``:
+    ``y_var = diag(K(X, X)) - ||K(X, X_train) L^{-T}||^2``.
+    If *n_components* is not None, the training set is replaced
+    by *n_components* inducing points (option ``nystroem``,
+    see :func:`fit_gpr_nystroem`).
+    """
+    y_train_std = getattr(op, '_y_train_std', 1)
+    if n_components is None:
+        points = op.X_train_
+        weights = op.alpha_ * y_train_std
+        if len(weights.shape) == 1:
+            weights = weights.reshape(weights.shape + (1,))
+        mean_y = np.ravel(op._y_train_mean)
+    else:
+        if (not isinstance(n_components, (int, np.integer)) or
+                n_components <= 0):
+            raise ValueError(
+                "Option 'nystroem' must be a positive integer not "
+                "{!r}.".format(n_components))
+        approx = fit_gpr_nystroem(op, kernel, n_components)
+        points = approx['points']
+        weights = approx['weights']
+        mean_y = approx['mean']
+
+    k_trans = convert_kernel_gemm(kernel, X, points, dtype=dtype,
+                                  op_version=op_version)
+    k_trans.set_onnx_name_prefix('kgpd')
+    y_mean = OnnxAdd(
+        OnnxMatMul(k_trans, weights.astype(dtype), op_version=op_version),
+        mean_y.astype(dtype), output_names=out[:1], op_version=op_version)
+    y_mean.set_onnx_name_prefix('gpr')
+    outputs = [y_mean]
+
+    if return_std:
+        if n_components is not None:
+            # K(X, Z) A K(Z, X) = ||K(X, Z) R||^2
+            k_inv = OnnxMatMul(
+                k_trans, approx['var_factor'].astype(dtype),
+                op_version=op_version)
+            k_dot = OnnxReduceSumSquare(k_inv, axes=[1], keepdims=0,
+                                        op_version=op_version)
+        elif getattr(op, 'L_', None) is not None:
+            # V = solve_triangular(L_, K_trans.T, lower=True)
+            # y_var -= np.einsum("ij,ji->i", V.T, V)
+            L_inv = solve_triangular(
+                op.L_, np.eye(op.L_.shape[0]), lower=True)
+            k_inv = OnnxMatMul(k_trans, L_inv.T.astype(dtype),
+                               op_version=op_version)
+            k_dot = OnnxReduceSumSquare(k_inv, axes=[1], keepdims=0,
+                                        op_version=op_version)
+        elif getattr(op, '_K_inv', None) is not None:
+            k_dot = OnnxReduceSum(
+                OnnxMul(OnnxMatMul(k_trans, op._K_inv.astype(dtype),
+                                   op_version=op_version),
+                        k_trans, op_version=op_version),
+                axes=[1], keepdims=0, op_version=op_version)
+        else:
+            raise RuntimeError(
+                "The method *predict* must be called once with parameter "
+                "return_std=True to compute internal variables.")
+
+        y_var = convert_kernel_diag_gemm(kernel, X, dtype=dtype,
+                                         op_version=op_version)
+        ys0_var = OnnxMax(OnnxSub(y_var, k_dot, op_version=op_version),
+                          np.array([0], dtype=dtype),
+                          op_version=op_version)
+        y_train_std = np.ravel(np.asarray(y_train_std, dtype=np.float64))
+        if y_train_std.size == 1 and y_train_std[0] != 1:
+            ys0_var = OnnxMul(ys0_var, (y_train_std ** 2).astype(dtype),
+                              op_version=op_version)
+        elif y_train_std.size > 1:
+            raise NotImplementedError(
+                "return_std is not implemented with optim='gemm' "
+                "for multiple targets.")
+        var = OnnxSqrt(ys0_var, output_names=out[1:], op_version=op_version)
+        var.set_onnx_name_prefix('gprv')
+        outputs.append(var)
+    return outputs
+
+
+def _get_fitted_kernel(op):
+    if hasattr(op, 'kernel_') and op.kernel_ is not None:
+        return op.kernel_
+    if op.kernel is None:
+        return (C(1.0, constant_value_bounds="fixed") *
+                RBF(1.0, length_scale_bounds="fixed"))
+    return op.kernel
+
+
+def evaluate_gpr_nystroem(model, X, n_components, return_std=False):
+    """
+    Measures the discrepancies between the predictions of a
+    *GaussianProcessRegressor* and its Nyström approximation
+    exported with option ``nystroem=n_components``
+    on a validation set *X*.
+
+    :param model: fitted *GaussianProcessRegressor*
+    :param X: validation set
+    :param n_components: maximum number of inducing points
+    :param return_std: compares the standard deviation as well
+    :return: dictionary with the number of inducing points,
+        the maximum absolute error, the mean absolute error and
+        the relative error (``||approx - exact|| / ||exact||``)
+        for the prediction (and the standard deviation)
+
+    ::
+
+        from skl2onnx.operator_converters.gaussian_process import (
+            evaluate_gpr_nystroem)
+
+        for m in [50, 100, 200]:
+            print(evaluate_gpr_nystroem(gpr, X_valid, m))
+    """
+    kernel = _get_fitted_kernel(model)
+    approx = fit_gpr_nystroem(model, kernel, n_components)
+    got = predict_gpr_nystroem(
+        approx, kernel, X, y_train_std=getattr(model, '_y_train_std', 1),
+        return_std=return_std)
+    exp = model.predict(X, return_std=return_std)
+    if not return_std:
+        got, exp = [got], [exp]
+    res = dict(n_components=approx['points'].shape[0],
+               n_train=model.X_train_.shape[0])
+    for name, g, e in zip(['mean', 'std'], got, exp):
+        diff = np.abs(np.ravel(g) - np.ravel(e))
+        res['max_abs_error_' + name] = diff.max()
+        res['mean_abs_error_' + name] = diff.mean()
+        norm = np.sqrt((np.ravel(e) ** 2).sum())
+        res['rel_error_' + name] = (
+            np.sqrt((diff ** 2).sum()) / norm if norm > 0 else np.nan)
+    return res
 
 
 def convert_gaussian_process_regressor(scope, operator, container):
@@ -32,6 +179,16 @@ def convert_gaussian_process_regressor(scope, operator, container):
     See example :ref:`l-gpr-example` to see how to
     use this converter which does not behave exactly
     as the others.
+    Option ``optim='gemm'`` computes every term depending only
+    on the training set at conversion time and evaluates
+    the kernel with a *Gemm*, it is usually faster than
+    the default graph or ``optim='cdist'``.
+    Option ``nystroem=m`` replaces the training set by *m* inducing
+    points (Nyström approximation), the cost of the prediction
+    becomes proportional to *m*, function :func:`evaluate_gpr_nystroem`
+    measures the approximation error on a validation set.
+    It implies ``optim='gemm'``, any other value for *optim* raises
+    an exception.
     """
     dtype = container.dtype
     if dtype is None:
@@ -45,14 +202,14 @@ def convert_gaussian_process_regressor(scope, operator, container):
 
     options = container.get_options(op, dict(return_cov=False,
                                              return_std=False,
-                                             optim=None))
-    if hasattr(op, 'kernel_') and op.kernel_ is not None:
-        kernel = op.kernel_
-    elif op.kernel is None:
-        kernel = (C(1.0, constant_value_bounds="fixed") *
-                  RBF(1.0, length_scale_bounds="fixed"))
-    else:
-        kernel = op.kernel
+                                             optim=None,
+                                             nystroem=None))
+    if options['nystroem'] is not None and options['optim'] not in (
+            None, 'gemm'):
+        raise ValueError(
+            "Option 'nystroem' is only implemented with optim='gemm' "
+            "not optim={!r}.".format(options['optim']))
+    kernel = _get_fitted_kernel(op)
 
     if not hasattr(op, "X_train_") or op.X_train_ is None:
         out0 = _zero_vector_of_size(X, keepdims=1, output_names=out[:1],
@@ -70,6 +227,12 @@ def convert_gaussian_process_regressor(scope, operator, container):
                     convert_kernel_diag(
                         kernel, X, dtype=dtype, op_version=opv),
                     output_names=out[1:], op_version=opv))
+    elif options['optim'] == 'gemm' or options['nystroem'] is not None:
+        if options['return_cov']:
+            raise NotImplementedError()
+        outputs = _convert_gaussian_process_regressor_gemm(
+            op, kernel, X, out, options['return_std'], dtype, opv,
+            n_components=options['nystroem'])
     else:
         out0 = _zero_vector_of_size(
             X, keepdims=1, dtype=dtype, op_version=opv)
@@ -159,4 +322,5 @@ if OnnxConstantOfShape is not None:
                        convert_gaussian_process_regressor,
                        options={'return_cov': [False, True],
                                 'return_std': [False, True],
-                                'optim': [None, 'cdist']})
+                                'optim': [None, 'cdist', 'gemm'],
+                                'nystroem': None})
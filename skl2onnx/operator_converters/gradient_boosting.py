@@ -11,9 +11,11 @@ from ..common._apply_operation import apply_cast
 from ..common.data_types import BooleanTensorType, Int64TensorType
 from ..common._registration import register_converter
 from ..common.tree_ensemble import add_tree_to_attribute_pairs
+from ..common.tree_ensemble import compact_tree_attribute_pairs
 from ..common.tree_ensemble import get_default_tree_classifier_attribute_pairs
 from ..common.tree_ensemble import get_default_tree_regressor_attribute_pairs
 from ..proto import onnx_proto
+from ._tree_gemm import convert_tree_ensemble_gemm
 
 
 def convert_sklearn_gradient_boosting_classifier(
@@ -48,7 +50,8 @@ def convert_sklearn_gradient_boosting_classifier(
             'issue at https://github.com/onnx/sklearn-onnx/issues.')
 
     attrs['base_values'] = [float(v) for v in base_values]
-    options = container.get_options(op, dict(raw_scores=False))
+    options = container.get_options(
+        op, dict(raw_scores=False, compact=False, optim=None))
     if not options['raw_scores']:
         attrs['post_transform'] = transform
 
@@ -80,6 +83,13 @@ def convert_sklearn_gradient_boosting_classifier(
                 add_tree_to_attribute_pairs(attrs, True, tree, tree_id,
                                             tree_weight, c, False, True,
                                             dtype=container.dtype)
+    if options['compact']:
+        compact_tree_attribute_pairs(attrs)
+    if options['optim'] == 'gemm':
+        convert_tree_ensemble_gemm(
+            scope, operator, container, attrs,
+            [operator.outputs[0].full_name, operator.outputs[1].full_name])
+        return
 
     input_name = operator.input_full_names
     if type(operator.inputs[0].type) == BooleanTensorType:
@@ -127,6 +137,13 @@ def convert_sklearn_gradient_boosting_regressor(
         tree_id = i
         add_tree_to_attribute_pairs(attrs, False, tree, tree_id, tree_weight,
                                     0, False, True, dtype=container.dtype)
+    options = container.get_options(op, dict(compact=False, optim=None))
+    if options['compact']:
+        compact_tree_attribute_pairs(attrs)
+    if options['optim'] == 'gemm':
+        convert_tree_ensemble_gemm(scope, operator, container, attrs,
+                                   operator.output_full_names)
+        return
 
     input_name = operator.input_full_names
     if type(operator.inputs[0].type) in (BooleanTensorType, Int64TensorType):
@@ -145,6 +162,10 @@ register_converter('SklearnGradientBoostingClassifier',
                    convert_sklearn_gradient_boosting_classifier,
                    options={'zipmap': [True, False],
                             'raw_scores': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnGradientBoostingRegressor',
-                   convert_sklearn_gradient_boosting_regressor)
+                   convert_sklearn_gradient_boosting_regressor,
+                   options={'compact': [False, True],
+                            'optim': [None, 'gemm']})
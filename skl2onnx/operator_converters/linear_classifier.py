@@ -18,9 +18,16 @@ from ..common._registration import register_converter
 from ..common.data_types import BooleanTensorType
 from ..common.utils_classifier import get_label_classes
 from ..proto import onnx_proto
+from .common import convert_float16_as_float32
 
 
 def convert_sklearn_linear_classifier(scope, operator, container):
+    if container.dtype == np.float16:
+        # operator LinearClassifier is not implemented for float16
+        convert_float16_as_float32(convert_sklearn_linear_classifier,
+                                   scope, operator, container)
+        return
+
     op = operator.raw_operator
     coefficients = op.coef_.flatten().astype(float).tolist()
     classes = get_label_classes(scope, op)
@@ -168,7 +175,9 @@ register_converter('SklearnLinearClassifier',
                    convert_sklearn_linear_classifier,
                    options={'zipmap': [True, False],
                             'nocl': [True, False],
-                            'raw_scores': [True, False]})
+                            'raw_scores': [True, False]},
+                   float16=True)
 register_converter('SklearnLinearSVC', convert_sklearn_linear_classifier,
                    options={'nocl': [True, False],
-                            'raw_scores': [True, False]})
+                            'raw_scores': [True, False]},
+                   float16=True)
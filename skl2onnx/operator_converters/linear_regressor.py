@@ -8,14 +8,54 @@ try:
 except ImportError:
     import collections as cabc
 import numpy as np
-from ..common._apply_operation import apply_cast
+from ..common._apply_operation import apply_add, apply_cast
 from ..common.data_types import BooleanTensorType, Int64TensorType
 from ..common._registration import register_converter
 from ..proto import onnx_proto
+from .common import add_weight_initializer
+
+
+def _convert_linear_regressor_matmul(scope, operator, container,
+                                     quantize=None):
+    """
+    Operator *LinearRegressor* is not implemented for float16
+    and stores its coefficients as attributes which cannot be
+    quantized, the prediction is computed with a *MatMul* and an *Add*.
+    """
+    op = operator.raw_operator
+    coef = np.asarray(op.coef_, dtype=container.dtype)
+    coef = coef.reshape((-1, 1)) if len(coef.shape) == 1 else coef.T
+    intercept = np.asarray(op.intercept_, dtype=container.dtype).ravel()
+
+    input_name = operator.inputs[0].full_name
+    if operator.inputs[0].type.__class__ != operator.outputs[0].type.__class__:
+        cast_input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, input_name, cast_input_name,
+                   container, to=container.proto_dtype)
+        input_name = cast_input_name
+
+    coef_name = scope.get_unique_variable_name('coef')
+    intercept_name = scope.get_unique_variable_name('intercept')
+    mul_result_name = scope.get_unique_variable_name('mul_result')
+    add_weight_initializer(scope, container, coef_name, coef,
+                           quantize=quantize)
+    container.add_initializer(intercept_name, container.proto_dtype,
+                              intercept.shape, intercept)
+    container.add_node(
+        'MatMul', [input_name, coef_name], mul_result_name,
+        name=scope.get_unique_operator_name('MatMul'))
+    apply_add(scope, [mul_result_name, intercept_name],
+              operator.outputs[0].full_name, container, broadcast=1)
 
 
 def convert_sklearn_linear_regressor(scope, operator, container):
     op = operator.raw_operator
+    options = container.get_options(op, dict(quantize=None))
+    if container.dtype == np.float16 or options['quantize'] is not None:
+        _convert_linear_regressor_matmul(scope, operator, container,
+                                         quantize=options['quantize'])
+        return
+
     op_type = 'LinearRegressor'
     dtype = container.dtype
     attrs = {'name': scope.get_unique_operator_name(op_type)}
@@ -41,5 +81,7 @@ def convert_sklearn_linear_regressor(scope, operator, container):
                        **attrs)
 
 
-register_converter('SklearnLinearRegressor', convert_sklearn_linear_regressor)
-register_converter('SklearnLinearSVR', convert_sklearn_linear_regressor)
+register_converter('SklearnLinearRegressor', convert_sklearn_linear_regressor,
+                   options={'quantize': [None, 'int8']}, float16=True)
+register_converter('SklearnLinearSVR', convert_sklearn_linear_regressor,
+                   options={'quantize': [None, 'int8']})
@@ -10,12 +10,17 @@ from ..common._apply_operation import (
     apply_reshape, apply_sub)
 from ..common._registration import register_converter
 from ..proto import onnx_proto
+from .common import add_weight_initializer
 
 
-def _forward_pass(scope, container, model, activations):
+def _forward_pass(scope, container, model, activations, optim=None,
+                  quantize=None):
     """
     Perform a forward pass on the network by computing the values of
     the neurons in the hidden layers and the output layer.
+    Every layer is a *MatMul* followed by an *Add* or a single *Gemm*
+    if *optim* is ``'gemm'``. The coefficients are stored as int8
+    if *quantize* is ``'int8'``.
     """
     activations_map = {
         'identity': 'Identity', 'tanh': 'Tanh', 'logistic': 'Sigmoid',
@@ -32,18 +37,29 @@ def _forward_pass(scope, container, model, activations):
         mul_result_name = scope.get_unique_variable_name('mul_result')
         add_result_name = scope.get_unique_variable_name('add_result')
 
-        container.add_initializer(
-            coefficient_name, container.proto_dtype,
-            model.coefs_[i].shape, model.coefs_[i].ravel())
-        container.add_initializer(
-            intercepts_name, container.proto_dtype,
-            [1, len(model.intercepts_[i])], model.intercepts_[i])
-
-        container.add_node(
-            'MatMul', [activations[i], coefficient_name],
-            mul_result_name, name=scope.get_unique_operator_name('MatMul'))
-        apply_add(scope, [mul_result_name, intercepts_name],
-                  add_result_name, container, broadcast=1)
+        add_weight_initializer(scope, container, coefficient_name,
+                               model.coefs_[i], quantize=quantize)
+        if optim == 'gemm':
+            # the bias is folded into the Gemm, alpha and beta keep
+            # their default value, make_node would store them as doubles
+            # if container.dtype is float64
+            container.add_initializer(
+                intercepts_name, container.proto_dtype,
+                [len(model.intercepts_[i])], model.intercepts_[i])
+            container.add_node(
+                'Gemm', [activations[i], coefficient_name, intercepts_name],
+                add_result_name, name=scope.get_unique_operator_name('Gemm'),
+                op_version=7 if container.target_opset < 11 else 11)
+        else:
+            container.add_initializer(
+                intercepts_name, container.proto_dtype,
+                [1, len(model.intercepts_[i])], model.intercepts_[i])
+            container.add_node(
+                'MatMul', [activations[i], coefficient_name],
+                mul_result_name,
+                name=scope.get_unique_operator_name('MatMul'))
+            apply_add(scope, [mul_result_name, intercepts_name],
+                      add_result_name, container, broadcast=1)
 
         # For the hidden layers
         if (i + 1) != (model.n_layers_ - 1):
@@ -58,10 +74,25 @@ def _forward_pass(scope, container, model, activations):
             activations.append(activations_result_name)
 
     # For the last layer
-    container.add_node(
-        activations_map[model.out_activation_], add_result_name,
-        out_activation_result_name,
-        name=scope.get_unique_operator_name(activations_map[model.activation]))
+    if (model.out_activation_ == 'softmax' and
+            container.dtype == np.float16):
+        # softmax is computed in float32
+        cast_result_name = scope.get_unique_variable_name('cast_result')
+        softmax_result_name = scope.get_unique_variable_name(
+            'softmax_result')
+        apply_cast(scope, add_result_name, cast_result_name, container,
+                   to=onnx_proto.TensorProto.FLOAT)
+        container.add_node(
+            'Softmax', cast_result_name, softmax_result_name,
+            name=scope.get_unique_operator_name('Softmax'))
+        apply_cast(scope, softmax_result_name, out_activation_result_name,
+                   container, to=container.proto_dtype)
+    else:
+        container.add_node(
+            activations_map[model.out_activation_], add_result_name,
+            out_activation_result_name,
+            name=scope.get_unique_operator_name(
+                activations_map[model.out_activation_]))
     activations.append(out_activation_result_name)
 
     return activations
@@ -78,7 +109,10 @@ def _predict(scope, input_name, container, model):
                container, to=container.proto_dtype)
 
     # forward propagate
-    activations = _forward_pass(scope, container, model, [cast_input_name])
+    options = container.get_options(model, dict(optim=None, quantize=None))
+    activations = _forward_pass(scope, container, model, [cast_input_name],
+                                optim=options['optim'],
+                                quantize=options['quantize'])
     return activations[-1]
 
 
@@ -127,6 +161,12 @@ def convert_sklearn_mlp_classifier(scope, operator, container):
     if mlp_op._label_binarizer.y_type_ == 'multilabel-indicator':
         binariser_output_name = scope.get_unique_variable_name(
             'binariser_output')
+        if container.dtype == np.float16:
+            # operator Binarizer is not implemented for float16
+            cast_pred_name = scope.get_unique_variable_name('cast_pred')
+            apply_cast(scope, y_pred, cast_pred_name, container,
+                       to=onnx_proto.TensorProto.FLOAT)
+            y_pred = cast_pred_name
 
         container.add_node('Binarizer', y_pred, binariser_output_name,
                            threshold=0.5, op_domain='ai.onnx.ml')
@@ -177,6 +217,12 @@ def convert_sklearn_mlp_regressor(scope, operator, container):
 register_converter('SklearnMLPClassifier',
                    convert_sklearn_mlp_classifier,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'optim': [None, 'gemm'],
+                            'quantize': [None, 'int8']},
+                   float16=True)
 register_converter('SklearnMLPRegressor',
-                   convert_sklearn_mlp_regressor)
+                   convert_sklearn_mlp_regressor,
+                   options={'optim': [None, 'gemm'],
+                            'quantize': [None, 'int8']},
+                   float16=True)
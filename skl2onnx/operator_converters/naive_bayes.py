@@ -14,6 +14,7 @@ from ..common._apply_operation import (
 from ..common.data_types import BooleanTensorType, Int64TensorType
 from ..common._registration import register_converter
 from ..common.utils_classifier import get_label_classes
+from .common import convert_float16_as_float32
 
 
 def _joint_log_likelihood_bernoulli(
@@ -345,6 +346,13 @@ def convert_sklearn_naive_bayes(scope, operator, container):
     #                     log_prob [M, C] -> EXP -> prob_tensor [M, C] -.
     #                                                                   |
     #         output_probability [M, C] <- ZIPMAP <---------------------'
+    if container.dtype == np.float16:
+        # the joint log-likelihood and the log-sum-exp are computed
+        # in float32
+        convert_float16_as_float32(convert_sklearn_naive_bayes,
+                                   scope, operator, container)
+        return
+
     float_dtype = container.dtype
     proto_type = container.proto_dtype
 
@@ -468,16 +476,19 @@ def convert_sklearn_naive_bayes(scope, operator, container):
 
 register_converter('SklearnBernoulliNB', convert_sklearn_naive_bayes,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False]},
+                   float16=True)
 register_converter('SklearnCategoricalNB', convert_sklearn_naive_bayes,
                    options={'zipmap': [True, False],
                             'nocl': [True, False]})
 register_converter('SklearnComplementNB', convert_sklearn_naive_bayes,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False]},
+                   float16=True)
 register_converter('SklearnGaussianNB', convert_sklearn_naive_bayes,
                    options={'zipmap': [True, False],
                             'nocl': [True, False]})
 register_converter('SklearnMultinomialNB', convert_sklearn_naive_bayes,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False]},
+                   float16=True)
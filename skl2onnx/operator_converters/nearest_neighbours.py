@@ -582,16 +582,17 @@ register_converter(
     options={'zipmap': [True, False],
              'nocl': [True, False],
              'raw_scores': [True, False],
-             'optim': [None, 'cdist']})
+             'optim': [None, 'cdist']},
+    float16=True)
 register_converter(
     'SklearnKNeighborsRegressor', convert_nearest_neighbors_regressor,
-    options={'optim': [None, 'cdist']})
+    options={'optim': [None, 'cdist']}, float16=True)
 register_converter(
     'SklearnKNeighborsTransformer', convert_k_neighbours_transformer,
     options={'optim': [None, 'cdist']})
 register_converter(
     'SklearnNearestNeighbors', convert_nearest_neighbors_transform,
-    options={'optim': [None, 'cdist']})
+    options={'optim': [None, 'cdist']}, float16=True)
 register_converter(
     'SklearnKNNImputer', convert_knn_imputer,
     options={'optim': [None, 'cdist']})
@@ -3,32 +3,153 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
+import numpy as np
 from sklearn.base import is_regressor
+from sklearn.linear_model import LogisticRegression, LogisticRegressionCV
 from ..proto import onnx_proto
 from ..common._apply_operation import (
+    apply_cast,
+    apply_clip,
     apply_concat,
+    apply_gemm,
     apply_identity,
     apply_mul,
+    apply_sigmoid,
 )
 from ..common._topology import FloatTensorType
+from ..common.data_types import DoubleTensorType
 from ..common._registration import register_converter
 from ..common._apply_operation import apply_normalization
-from ..common._apply_operation import apply_slice, apply_sub, apply_clip
+from ..common._apply_operation import apply_slice, apply_sub
 from ..common.utils_classifier import _finalize_converter_classes
 from .._supported_operators import sklearn_operator_name_map
 
 
-def convert_one_vs_rest_classifier(scope, operator, container):
+def _linear_activation(estimator, use_raw_scores):
     """
-    Converts a *OneVsRestClassifier* into *ONNX* format.
+    Returns the activation applied by the converter of a binary
+    linear *estimator* on its decision function to get the score
+    of the positive class: *None* (raw score), ``'sigmoid'``,
+    ``'sigmoid2'`` (sigmoid of twice the score) or ``'huber'``.
+    Returns *False* if the estimator is not a linear model
+    the stacked graph can handle.
     """
-    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
+    alias = sklearn_operator_name_map.get(type(estimator), None)
+    if alias in ('SklearnLinearRegressor', 'SklearnLinearSVR'):
+        return None
+    if alias not in ('SklearnLinearClassifier', 'SklearnLinearSVC',
+                     'SklearnSGDClassifier'):
+        return False
+    if len(estimator.classes_) != 2:
+        return False
+    if use_raw_scores:
+        return None
+    if isinstance(estimator, (LogisticRegression, LogisticRegressionCV)):
+        # scikit-learn applies a softmax on [-score, score]
+        # if multi_class='multinomial'.
+        if estimator.multi_class == 'multinomial':
+            return 'sigmoid2'
+        return 'sigmoid'
+    if alias == 'SklearnSGDClassifier':
+        if estimator.loss in ('log', 'log_loss'):
+            return 'sigmoid'
+        if estimator.loss == 'modified_huber':
+            return 'huber'
+        return None
+    if hasattr(estimator, 'predict_proba'):
+        # Other classifiers (LinearDiscriminantAnalysis, ...)
+        # keep the default graph.
+        return False
+    return None
+
+
+def _stack_linear_estimators(op, use_raw_scores, dtype):
+    """
+    Stacks the coefficients of every binary linear estimator
+    of a *OneVsRestClassifier* into a matrix of shape
+    *[n_features, n_classes]* and the intercepts into a vector.
+    The activation is folded into the coefficients when it is
+    possible. Returns *None* if one estimator cannot be stacked.
+    """
+    activations = set(_linear_activation(est, use_raw_scores)
+                      for est in op.estimators_)
+    if len(activations) != 1:
+        return None
+    activation = activations.pop()
+    if activation is False:
+        return None
+    coefs = []
+    intercepts = []
+    for est in op.estimators_:
+        coef = np.asarray(est.coef_)
+        intercept = np.ravel(np.asarray(est.intercept_))
+        if coef.size != coef.shape[-1] or intercept.size != 1:
+            return None
+        coefs.append(coef.ravel())
+        intercepts.append(intercept[0])
+    if len(set(c.shape[0] for c in coefs)) != 1:
+        return None
+    coef = np.vstack(coefs).T.astype(np.float64)
+    intercept = np.array(intercepts, dtype=np.float64)
+    if activation == 'sigmoid2':
+        coef *= 2
+        intercept *= 2
+        activation = 'sigmoid'
+    elif activation == 'huber':
+        # (clip(x, -1, 1) + 1) / 2 = clip(x / 2 + 0.5, 0, 1)
+        coef *= 0.5
+        intercept = intercept * 0.5 + 0.5
+    return coef.astype(dtype), intercept.astype(dtype), activation
+
+
+def _apply_stacked_linear_estimators(scope, operator, container, stacked,
+                                     output_name):
+    """
+    Computes the scores of every binary estimator
+    with a single *Gemm* followed by the activation.
+    """
+    coef, intercept, activation = stacked
+    input_name = operator.inputs[0].full_name
+    if not isinstance(operator.inputs[0].type,
+                      (FloatTensorType, DoubleTensorType)):
+        cast_input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, input_name, cast_input_name,
+                   container, to=container.proto_dtype)
+        input_name = cast_input_name
+
+    coef_name = scope.get_unique_variable_name('coef')
+    intercept_name = scope.get_unique_variable_name('intercept')
+    container.add_initializer(coef_name, container.proto_dtype,
+                              coef.shape, coef.ravel())
+    container.add_initializer(intercept_name, container.proto_dtype,
+                              intercept.shape, intercept)
+
+    if activation is None:
+        apply_gemm(scope, [input_name, coef_name, intercept_name],
+                   output_name, container)
+        return output_name
+
+    scores_name = scope.get_unique_variable_name('scores')
+    apply_gemm(scope, [input_name, coef_name, intercept_name],
+               scores_name, container)
+    if activation == 'sigmoid':
+        apply_sigmoid(scope, scores_name, output_name, container)
+    elif activation == 'huber':
+        apply_clip(scope, scores_name, output_name, container,
+                   min=np.array(0, dtype=container.dtype),
+                   max=np.array(1, dtype=container.dtype))
+    else:
         raise RuntimeError(
-            "Option 'nocl' is not implemented for operator '{}'.".format(
-                operator.raw_operator.__class__.__name__))
+            "Unexpected activation '{}'.".format(activation))
+    return output_name
+
+
+def _convert_estimators(scope, operator, container, use_raw_scores):
+    """
+    Converts every binary estimator and returns the names
+    of the variables holding the score of the positive class.
+    """
     op = operator.raw_operator
-    options = container.get_options(op, dict(raw_scores=False))
-    use_raw_scores = options['raw_scores']
     probs_names = []
     for i, estimator in enumerate(op.estimators_):
         op_type = sklearn_operator_name_map[type(estimator)]
@@ -63,11 +184,45 @@ def convert_one_vs_rest_classifier(scope, operator, container):
                         operator_name=scope.get_unique_operator_name('Slice'))
 
         probs_names.append(p1)
+    return probs_names
+
+
+def convert_one_vs_rest_classifier(scope, operator, container):
+    """
+    Converts a *OneVsRestClassifier* into *ONNX* format.
+    Option ``optim='stack'`` replaces the sub-graphs produced
+    for every binary linear estimator (*LogisticRegression*,
+    *SGDClassifier*, *LinearSVC*, *LinearRegression*...)
+    by a single *Gemm* computing the scores of all classes
+    with a stacked coefficient matrix followed by one activation.
+    The default graph is produced if one of the estimators
+    is not a linear model.
+    """
+    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
+        raise RuntimeError(
+            "Option 'nocl' is not implemented for operator '{}'.".format(
+                operator.raw_operator.__class__.__name__))
+    op = operator.raw_operator
+    options = container.get_options(
+        op, dict(raw_scores=False, optim=None))
+    use_raw_scores = options['raw_scores']
+    if options['optim'] == 'stack':
+        stacked = _stack_linear_estimators(
+            op, use_raw_scores, container.dtype)
+    else:
+        stacked = None
+    if stacked is None:
+        probs_names = _convert_estimators(
+            scope, operator, container, use_raw_scores)
 
     if op.multilabel_:
         # concatenates outputs
         conc_name = operator.outputs[1].full_name
-        apply_concat(scope, probs_names, conc_name, container, axis=1)
+        if stacked is None:
+            apply_concat(scope, probs_names, conc_name, container, axis=1)
+        else:
+            _apply_stacked_linear_estimators(
+                scope, operator, container, stacked, conc_name)
 
         # builds the labels (matrix with integer)
         # scikit-learn may use probabilities or raw score
@@ -92,7 +247,11 @@ def convert_one_vs_rest_classifier(scope, operator, container):
     else:
         # concatenates outputs
         conc_name = scope.get_unique_variable_name('concatenated')
-        apply_concat(scope, probs_names, conc_name, container, axis=1)
+        if stacked is None:
+            apply_concat(scope, probs_names, conc_name, container, axis=1)
+        else:
+            _apply_stacked_linear_estimators(
+                scope, operator, container, stacked, conc_name)
         if len(op.estimators_) == 1:
             zeroth_col_name = scope.get_unique_variable_name('zeroth_col')
             merged_prob_name = scope.get_unique_variable_name('merged_prob')
@@ -138,4 +297,5 @@ register_converter('SklearnOneVsRestClassifier',
                    convert_one_vs_rest_classifier,
                    options={'zipmap': [True, False],
                             'nocl': [True, False],
-                            'raw_scores': [True, False]})
+                            'raw_scores': [True, False],
+                            'optim': [None, 'stack']})
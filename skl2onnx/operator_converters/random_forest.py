@@ -18,11 +18,13 @@ from ..common._registration import register_converter
 from ..common.tree_ensemble import (
     add_tree_to_attribute_pairs,
     add_tree_to_attribute_pairs_hist_gradient_boosting,
+    compact_tree_attribute_pairs,
     get_default_tree_classifier_attribute_pairs,
     get_default_tree_regressor_attribute_pairs
 )
 from ..common.utils_classifier import get_label_classes
 from ..proto import onnx_proto
+from ._tree_gemm import convert_tree_ensemble_gemm
 from .decision_tree import predict
 
 
@@ -102,7 +104,8 @@ def convert_sklearn_random_forest_classifier(
             "Model should have attribute 'n_outputs_' or "
             "'n_trees_per_iteration_'.")
 
-    options = container.get_options(op, dict(raw_scores=False))
+    options = container.get_options(
+        op, dict(raw_scores=False, compact=False, optim=None))
     use_raw_scores = options['raw_scores']
 
     if n_outputs == 1 or hasattr(op, 'loss_'):
@@ -182,6 +185,15 @@ def convert_sklearn_random_forest_classifier(
                 "The converter cannot implement decision_function for "
                 "'{}'.".format(type(op)))
 
+        if options['compact']:
+            compact_tree_attribute_pairs(attr_pairs)
+        if options['optim'] == 'gemm':
+            convert_tree_ensemble_gemm(
+                scope, operator, container, attr_pairs,
+                [operator.outputs[0].full_name,
+                 operator.outputs[1].full_name])
+            return
+
         input_name = operator.input_full_names
         if type(operator.inputs[0].type) == BooleanTensorType:
             cast_input_name = scope.get_unique_variable_name('cast_input')
@@ -273,10 +285,18 @@ def convert_sklearn_random_forest_regressor_converter(
 
     if hasattr(op, '_baseline_prediction'):
         if isinstance(op._baseline_prediction, np.ndarray):
-            attrs['base_values'] = list(op._baseline_prediction)
+            attrs['base_values'] = list(op._baseline_prediction.ravel())
         else:
             attrs['base_values'] = [op._baseline_prediction]
 
+    options = container.get_options(op, dict(compact=False, optim=None))
+    if options['compact']:
+        compact_tree_attribute_pairs(attrs)
+    if options['optim'] == 'gemm':
+        convert_tree_ensemble_gemm(scope, operator, container, attrs,
+                                   operator.output_full_names)
+        return
+
     input_name = operator.input_full_names
     if type(operator.inputs[0].type) in (BooleanTensorType, Int64TensorType):
         cast_input_name = scope.get_unique_variable_name('cast_input')
@@ -295,23 +315,35 @@ register_converter('SklearnRandomForestClassifier',
                    convert_sklearn_random_forest_classifier,
                    options={'zipmap': [True, False],
                             'raw_scores': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnRandomForestRegressor',
-                   convert_sklearn_random_forest_regressor_converter)
+                   convert_sklearn_random_forest_regressor_converter,
+                   options={'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnExtraTreesClassifier',
                    convert_sklearn_random_forest_classifier,
                    options={'zipmap': [True, False],
                             'raw_scores': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnExtraTreesRegressor',
-                   convert_sklearn_random_forest_regressor_converter)
+                   convert_sklearn_random_forest_regressor_converter,
+                   options={'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnHistGradientBoostingClassifier',
                    convert_sklearn_random_forest_classifier,
                    options={'zipmap': [True, False],
                             'raw_scores': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
 register_converter('SklearnHistGradientBoostingRegressor',
                    convert_sklearn_random_forest_regressor_converter,
                    options={'zipmap': [True, False],
                             'raw_scores': [True, False],
-                            'nocl': [True, False]})
+                            'nocl': [True, False],
+                            'compact': [False, True],
+                            'optim': [None, 'gemm']})
@@ -3,21 +3,114 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, issparse
 from ..common._registration import register_converter
 from ..algebra.onnx_ops import OnnxMatMul
+from ..proto import onnx_proto
+from .common import add_weight_initializer
+
+
+def _convert_sparse_random_projection_gather(scope, operator, container):
+    """
+    Every component of a *SparseRandomProjection* only
+    involves a few features. The converter gathers them
+    (indices of shape *[K, M]*, *M* is the maximum number of non null
+    coefficients in a component, missing ones are padded with null
+    coefficients), multiplies them by the coefficients and sums
+    over the last axis.
+    """
+    op = operator.raw_operator
+    # components_ is dense if density=1
+    components = csr_matrix(op.components_)
+    n_components = components.shape[0]
+    nnz = np.diff(components.indptr)
+    max_nnz = max(nnz.max(), 1)
+    rows = np.repeat(np.arange(n_components), nnz)
+    cols = np.arange(components.nnz) - np.repeat(components.indptr[:-1], nnz)
+    indices = np.zeros((n_components, max_nnz), dtype=np.int32)
+    values = np.zeros((n_components, max_nnz), dtype=container.dtype)
+    indices[rows, cols] = components.indices
+    values[rows, cols] = components.data
+
+    indices_name = scope.get_unique_variable_name('indices')
+    values_name = scope.get_unique_variable_name('values')
+    gather_name = scope.get_unique_variable_name('gathered')
+    mul_name = scope.get_unique_variable_name('weighted')
+    container.add_initializer(indices_name, onnx_proto.TensorProto.INT32,
+                              indices.shape, indices.ravel())
+    container.add_initializer(values_name, container.proto_dtype,
+                              values.shape, values.ravel())
+    container.add_node(
+        'Gather', [operator.inputs[0].full_name, indices_name], gather_name,
+        axis=1, name=scope.get_unique_operator_name('Gather'))
+    container.add_node(
+        'Mul', [gather_name, values_name], mul_name,
+        name=scope.get_unique_operator_name('Mul'))
+    if container.target_opset < 13:
+        container.add_node(
+            'ReduceSum', mul_name, operator.outputs[0].full_name,
+            axes=[2], keepdims=0,
+            name=scope.get_unique_operator_name('ReduceSum'))
+    else:
+        axes_name = scope.get_unique_variable_name('axes')
+        container.add_initializer(axes_name, onnx_proto.TensorProto.INT64,
+                                  [1], [2])
+        container.add_node(
+            'ReduceSum', [mul_name, axes_name],
+            operator.outputs[0].full_name, keepdims=0, op_version=13,
+            name=scope.get_unique_operator_name('ReduceSum'))
 
 
 def convert_random_projection(scope, operator, container):
-    """Converter for PowerTransformer"""
+    """Converter for GaussianRandomProjection, SparseRandomProjection"""
     op_in = operator.inputs[0]
     op_out = operator.outputs[0].full_name
     op = operator.raw_operator
     opv = container.target_opset
+    options = container.get_options(op, dict(quantize=None))
+    components = op.components_
 
-    y = OnnxMatMul(op_in, op.components_.T.astype(container.dtype),
+    if operator.type == 'SklearnSparseRandomProjection':
+        optim = container.get_options(op, dict(optim=None))['optim']
+        if optim == 'gather':
+            _convert_sparse_random_projection_gather(
+                scope, operator, container)
+            return
+        if optim == 'sparse' and options['quantize'] is None:
+            if container.target_opset < 11:
+                raise RuntimeError(
+                    "optim='sparse' requires opset >= 11 (sparse "
+                    "initializers).")
+            components_name = scope.get_unique_variable_name('components')
+            container.add_initializer(
+                components_name, container.proto_dtype,
+                components.shape[::-1], coo_matrix(components.T))
+            container.add_node(
+                'MatMul', [op_in.full_name, components_name], op_out,
+                name=scope.get_unique_operator_name('MatMul'))
+            return
+        if issparse(components):
+            components = components.toarray()
+
+    if options['quantize'] is not None:
+        components_name = add_weight_initializer(
+            scope, container, scope.get_unique_variable_name('components'),
+            components.T, quantize=options['quantize'])
+        container.add_node(
+            'MatMul', [op_in.full_name, components_name], op_out,
+            name=scope.get_unique_operator_name('MatMul'))
+        return
+
+    y = OnnxMatMul(op_in, components.T.astype(container.dtype),
                    op_version=opv, output_names=[op_out])
     y.add_to(scope, container)
 
 
 register_converter(
-    'SklearnGaussianRandomProjection', convert_random_projection)
+    'SklearnGaussianRandomProjection', convert_random_projection,
+    options={'quantize': [None, 'int8']})
+register_converter(
+    'SklearnSparseRandomProjection', convert_random_projection,
+    options={'optim': [None, 'gather', 'sparse'],
+             'quantize': [None, 'int8']})
@@ -19,9 +19,143 @@ except ImportError:
     apply_less = None
 from ..common.data_types import BooleanTensorType, Int64TensorType
 from ..common._registration import register_converter
+from ..common.utils_classifier import _finalize_converter_classes
 from ..proto import onnx_proto
 
 
+def _svm_array(value):
+    """
+    Returns a flat array from a dense or sparse matrix. The converters
+    give arrays to the node attributes and not lists: the attribute
+    is filled in a single call instead of checking every element.
+    """
+    if isspmatrix(value):
+        value = value.toarray()
+    return np.asarray(value).ravel()
+
+
+def _linear_svm_decision(scope, operator, container, op, output_name):
+    """
+    Implements option ``optim='gemm'`` for a linear kernel.
+    The support vectors are folded into one weight matrix
+    ``coef_ = dual_coef_ @ support_vectors_`` (one row per pair
+    of classes for a classifier) and the decision function becomes
+    a single *Gemm* ``X @ coef_.T + intercept_``.
+    """
+    if op.kernel != 'linear':
+        raise RuntimeError(
+            "Option optim='gemm' only applies to a linear kernel "
+            "not '{}'.".format(op.kernel))
+    coef = op.coef_
+    if isspmatrix(coef):
+        coef = coef.toarray()
+    coef = np.asarray(coef, dtype=container.dtype)
+    intercept = np.asarray(op.intercept_, dtype=container.dtype).ravel()
+
+    input_name = operator.inputs[0].full_name
+    elem_type = operator.inputs[0].type.to_onnx_type().tensor_type.elem_type
+    if elem_type != container.proto_dtype:
+        cast_input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, input_name, cast_input_name,
+                   container, to=container.proto_dtype)
+        input_name = cast_input_name
+
+    coef_name = scope.get_unique_variable_name('coef')
+    intercept_name = scope.get_unique_variable_name('intercept')
+    container.add_initializer(coef_name, container.proto_dtype,
+                              coef.shape, coef.ravel())
+    container.add_initializer(intercept_name, container.proto_dtype,
+                              intercept.shape, intercept)
+    _gemm(scope, container, [input_name, coef_name, intercept_name],
+          output_name, transB=1)
+
+
+def _linear_svm_classifier(scope, operator, container, op,
+                           decision_name, label_name):
+    """
+    Computes the decision function of a linear *SVC* with
+    a *Gemm* (see :func:`_linear_svm_decision`) and the labels
+    the same way as *libsvm*: every pair of classes votes for one class,
+    the class with the most votes wins, the first one in case of ties.
+    The labels are not computed if *label_name* is None.
+    """
+    classes = np.array(op.classes_)
+    n_classes = len(classes)
+    pairs = [(i, j) for i in range(n_classes)
+             for j in range(i + 1, n_classes)]
+
+    gemm_name = scope.get_unique_variable_name('decision')
+    _linear_svm_decision(scope, operator, container, op, gemm_name)
+    positive_name = scope.get_unique_variable_name('positive')
+    if n_classes == 2:
+        # scikit-learn changes the sign of the decision function
+        # in the binary case, the output is the same as
+        # node SVMClassifier: [d, -d], the first class wins if d < 0.
+        neg_name = scope.get_unique_variable_name('neg_decision')
+        container.add_node(
+            'Neg', gemm_name, neg_name,
+            name=scope.get_unique_operator_name('Neg'), op_version=6)
+        apply_concat(scope, [gemm_name, neg_name], decision_name,
+                     container, axis=1)
+        apply_less(scope, [gemm_name, _zero(scope, container)],
+                   positive_name, container)
+    else:
+        container.add_node(
+            'Identity', gemm_name, decision_name,
+            name=scope.get_unique_operator_name('Identity'))
+        container.add_node(
+            'Greater', [gemm_name, _zero(scope, container)], positive_name,
+            name=scope.get_unique_operator_name('Greater'), op_version=9)
+    if label_name is None:
+        return
+
+    # votes = positive @ (first - second) + number of pairs
+    # a class is the second class of
+    vote = np.zeros((len(pairs), n_classes), dtype=container.dtype)
+    count = np.zeros((n_classes, ), dtype=container.dtype)
+    for k, (i, j) in enumerate(pairs):
+        vote[k, i] = 1
+        vote[k, j] = -1
+        count[j] += 1
+    vote_name = scope.get_unique_variable_name('vote')
+    count_name = scope.get_unique_variable_name('count')
+    container.add_initializer(vote_name, container.proto_dtype,
+                              vote.shape, vote.ravel())
+    container.add_initializer(count_name, container.proto_dtype,
+                              count.shape, count)
+    cast_positive_name = scope.get_unique_variable_name('cast_positive')
+    apply_cast(scope, positive_name, cast_positive_name, container,
+               to=container.proto_dtype)
+    votes_name = scope.get_unique_variable_name('votes')
+    _gemm(scope, container, [cast_positive_name, vote_name, count_name],
+          votes_name)
+    _svm_labels(scope, container, op, votes_name, label_name)
+
+
+def _svm_labels(scope, container, op, scores_name, label_name):
+    argmax_name = scope.get_unique_variable_name('argmax')
+    container.add_node(
+        'ArgMax', scores_name, argmax_name, axis=1,
+        name=scope.get_unique_operator_name('ArgMax'))
+    _finalize_converter_classes(scope, argmax_name, label_name,
+                                container, np.array(op.classes_))
+
+
+def _gemm(scope, container, inputs, output_name, transB=0):
+    # alpha and beta are left to their default value,
+    # make_node would store them as doubles if container.dtype is float64
+    container.add_node(
+        'Gemm', inputs, output_name, transB=transB,
+        name=scope.get_unique_operator_name('Gemm'),
+        op_version=7 if container.target_opset < 11 else 11)
+
+
+def _zero(scope, container):
+    zero_name = scope.get_unique_variable_name('zero')
+    container.add_initializer(zero_name, container.proto_dtype, [], [0])
+    return zero_name
+
+
 def convert_sklearn_svm_regressor(
         scope, operator, container,
         op_type='SVMRegressor', op_domain='ai.onnx.ml', op_version=1):
@@ -44,31 +178,24 @@ def convert_sklearn_svm_regressor(
     """
     svm_attrs = {'name': scope.get_unique_operator_name('SVM')}
     op = operator.raw_operator
-    if isinstance(op.dual_coef_, np.ndarray):
-        coef = op.dual_coef_.ravel().tolist()
-    else:
-        coef = op.dual_coef_
-    intercept = op.intercept_
-    if isinstance(op.support_vectors_, np.ndarray):
-        support_vectors = op.support_vectors_.ravel().tolist()
-    else:
-        support_vectors = op.support_vectors_
+    coef = _svm_array(op.dual_coef_)
+    intercept = _svm_array(op.intercept_)
+    support_vectors = _svm_array(op.support_vectors_)
 
     svm_attrs['kernel_type'] = op.kernel.upper()
     svm_attrs['kernel_params'] = [float(_) for _ in
                                   [op._gamma, op.coef0, op.degree]]
-    if isspmatrix(support_vectors):
-        svm_attrs['support_vectors'] = support_vectors.toarray().ravel()
-    else:
-        svm_attrs['support_vectors'] = support_vectors
-    if isspmatrix(coef):
-        svm_attrs['coefficients'] = coef.toarray().ravel()
-    else:
-        svm_attrs['coefficients'] = coef
+    svm_attrs['support_vectors'] = support_vectors
+    svm_attrs['coefficients'] = coef
     svm_attrs['rho'] = intercept
 
+    options = container.get_options(op, dict(optim=None))
     if operator.type in ['SklearnSVR', 'SklearnNuSVR'] or isinstance(
             op, (SVR, NuSVR)):
+        if options['optim'] == 'gemm':
+            _linear_svm_decision(scope, operator, container, op,
+                                 operator.outputs[0].full_name)
+            return
         svm_attrs['post_transform'] = 'NONE'
         svm_attrs['n_supports'] = len(op.support_)
 
@@ -99,9 +226,12 @@ def convert_sklearn_svm_regressor(
             input_name = cast_input_name
 
         svm_out = operator.output_full_names[1]
-        container.add_node(
-            op_type, input_name, svm_out,
-            op_domain=op_domain, op_version=op_version, **svm_attrs)
+        if options['optim'] == 'gemm':
+            _linear_svm_decision(scope, operator, container, op, svm_out)
+        else:
+            container.add_node(
+                op_type, input_name, svm_out,
+                op_domain=op_domain, op_version=op_version, **svm_attrs)
 
         pred = scope.get_unique_variable_name('float_prediction')
         container.add_node('Sign', svm_out, pred, op_version=9)
@@ -132,17 +262,9 @@ def convert_sklearn_svm_classifier(
     """
     svm_attrs = {'name': scope.get_unique_operator_name('SVMc')}
     op = operator.raw_operator
-    if isinstance(op.dual_coef_, np.ndarray):
-        coef = op.dual_coef_.ravel().tolist()
-    else:
-        coef = op.dual_coef_
-    intercept = op.intercept_
-    if isinstance(op.support_vectors_, np.ndarray):
-        support_vectors = op.support_vectors_.ravel().tolist()
-    elif isspmatrix(op.support_vectors_):
-        support_vectors = op.support_vectors_.toarray().ravel().tolist()
-    else:
-        support_vectors = op.support_vectors_
+    coef = _svm_array(op.dual_coef_)
+    intercept = _svm_array(op.intercept_)
+    support_vectors = _svm_array(op.support_vectors_)
 
     svm_attrs['kernel_type'] = op.kernel.upper()
     svm_attrs['kernel_params'] = [float(_) for _ in
@@ -151,26 +273,25 @@ def convert_sklearn_svm_classifier(
 
     if (operator.type in ['SklearnSVC', 'SklearnNuSVC'] or isinstance(
             op, (SVC, NuSVC))) and len(op.classes_) == 2:
-        if isspmatrix(coef):
-            coef_dense = coef.toarray().ravel()
-            svm_attrs['coefficients'] = [-v for v in coef_dense]
-        else:
-            svm_attrs['coefficients'] = [-v for v in coef]
-        svm_attrs['rho'] = [-v for v in intercept]
+        svm_attrs['coefficients'] = -coef
+        svm_attrs['rho'] = -intercept
     else:
-        if isspmatrix(coef):
-            svm_attrs['coefficients'] = coef.todense()
-        else:
-            svm_attrs['coefficients'] = coef
+        svm_attrs['coefficients'] = coef
         svm_attrs['rho'] = intercept
 
     handles_ovr = False
+    options = container.get_options(op, dict(optim=None))
+    break_ties = False
 
     if operator.type in ['SklearnSVC', 'SklearnNuSVC'] or isinstance(
             op, (SVC, NuSVC)):
 
         if len(op.probA_) > 0:
             svm_attrs['prob_a'] = op.probA_
+            if options['optim'] == 'gemm':
+                raise NotImplementedError(
+                    "Option optim='gemm' is not implemented when "
+                    "probability=True.")
         else:
             handles_ovr = True
         if len(op.probB_) > 0:
@@ -199,10 +320,21 @@ def convert_sklearn_svm_classifier(
         else:
             raise RuntimeError("Invalid class label type '%s'." % op.classes_)
 
-        container.add_node(
-            op_type, operator.inputs[0].full_name,
-            [label_name, probability_tensor_name],
-            op_domain=op_domain, op_version=op_version, **svm_attrs)
+        if options['optim'] == 'gemm':
+            # scikit-learn uses the decision function to predict
+            # when ties are broken
+            break_ties = (handles_ovr and len(op.classes_) > 2 and
+                          getattr(op, 'break_ties', False) and
+                          op.decision_function_shape == 'ovr')
+            if break_ties:
+                label_name = None
+            _linear_svm_classifier(scope, operator, container, op,
+                                   probability_tensor_name, label_name)
+        else:
+            container.add_node(
+                op_type, operator.inputs[0].full_name,
+                [label_name, probability_tensor_name],
+                op_domain=op_domain, op_version=op_version, **svm_attrs)
     else:
         raise ValueError("Unknown support vector machine model type found "
                          "'{0}'.".format(operator.type))
@@ -332,9 +464,16 @@ def convert_sklearn_svm_classifier(
         apply_add(
             scope, [conc_vote, final], output_name, container, broadcast=0)
 
+    if break_ties:
+        _svm_labels(scope, container, op, operator.outputs[1].full_name,
+                    operator.outputs[0].full_name)
+
 
-register_converter('SklearnOneClassSVM', convert_sklearn_svm_regressor)
+register_converter('SklearnOneClassSVM', convert_sklearn_svm_regressor,
+                   options={'optim': [None, 'gemm']})
 register_converter('SklearnSVC', convert_sklearn_svm_classifier,
                    options={'zipmap': [True, False],
-                            'nocl': [True, False]})
-register_converter('SklearnSVR', convert_sklearn_svm_regressor)
+                            'nocl': [True, False],
+                            'optim': [None, 'gemm']})
+register_converter('SklearnSVR', convert_sklearn_svm_regressor,
+                   options={'optim': [None, 'gemm']})
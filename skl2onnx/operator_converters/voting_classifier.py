@@ -4,6 +4,7 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numpy as np
 from onnx.helper import make_tensor
 from ..common._topology import FloatTensorType
 from ..common._registration import register_converter
@@ -11,26 +12,14 @@ from ..common._apply_operation import apply_mul
 from ..common.utils_classifier import _finalize_converter_classes
 from .._supported_operators import sklearn_operator_name_map
 from ..proto import onnx_proto
+from .decision_tree import can_merge_decision_trees, merge_decision_trees
 
 
-def convert_voting_classifier(scope, operator, container):
+def _calculate_proba(scope, operator, container, op, weights):
     """
-    Converts a *VotingClassifier* into *ONNX* format.
-
-    *predict_proba* is not defined by *scikit-learn* when ``voting='hard'``.
-    The converted model still defines a probability vector equal to the
-    highest probability obtained for each class over all estimators.
-
-    *scikit-learn* enables both modes, transformer and predictor
-    for the voting classifier. *ONNX* does not make this
-    distinction and always creates two outputs, labels
-    and probabilities.
+    Converts every estimator and computes the weighted sum
+    of their probabilities.
     """
-    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
-        raise RuntimeError(
-            "Option 'nocl' is not implemented for operator '{}'.".format(
-                operator.raw_operator.__class__.__name__))
-    op = operator.raw_operator
     n_classes = len(op.classes_)
 
     classes_ind_name = scope.get_unique_variable_name('classes_ind')
@@ -94,11 +83,7 @@ def convert_voting_classifier(scope, operator, container):
         else:
             prob_name = prob_name.onnx_name
 
-        if op.weights is not None:
-            val = op.weights[i] / op.weights.sum()
-        else:
-            val = 1. / len(op.estimators_)
-
+        val = weights[i]
         weights_name = scope.get_unique_variable_name('w%d' % i)
         container.add_initializer(
             weights_name, onnx_proto.TensorProto.FLOAT, [1], [val])
@@ -107,16 +92,59 @@ def convert_voting_classifier(scope, operator, container):
                   wprob_name, container, broadcast=1)
         probs_names.append(wprob_name)
 
-    if op.flatten_transform in (False, None):
-        container.add_node('Sum', probs_names,
-                           operator.outputs[1].full_name,
-                           name=scope.get_unique_operator_name('Sum'))
-    else:
+    container.add_node('Sum', probs_names,
+                       operator.outputs[1].full_name,
+                       name=scope.get_unique_operator_name('Sum'))
+
+
+def convert_voting_classifier(scope, operator, container):
+    """
+    Converts a *VotingClassifier* into *ONNX* format.
+
+    *predict_proba* is not defined by *scikit-learn* when ``voting='hard'``.
+    The converted model still defines a probability vector equal to the
+    highest probability obtained for each class over all estimators.
+
+    *scikit-learn* enables both modes, transformer and predictor
+    for the voting classifier. *ONNX* does not make this
+    distinction and always creates two outputs, labels
+    and probabilities.
+
+    If all estimators are decision trees, they are merged
+    into a single *TreeEnsembleClassifier* node.
+    """
+    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
+        raise RuntimeError(
+            "Option 'nocl' is not implemented for operator '{}'.".format(
+                operator.raw_operator.__class__.__name__))
+    op = operator.raw_operator
+    n_classes = len(op.classes_)
+
+    if op.flatten_transform not in (False, None):
         raise NotImplementedError(
             "flatten_transform==True is not implemented yet. "
             "You may raise an issue at "
             "https://github.com/onnx/sklearn-onnx/issues.")
 
+    if op.weights is not None:
+        weights = np.asarray(op.weights, dtype=np.float64)
+        weights = list(weights / weights.sum())
+    else:
+        weights = [1. / len(op.estimators_)] * len(op.estimators_)
+
+    if can_merge_decision_trees(op.estimators_, n_classes):
+        # All estimators are trees, they are merged into a single node.
+        estimators = [(est, w) for est, w in zip(op.estimators_, weights)
+                      if est is not None]
+        merge_decision_trees(
+            scope, operator, container,
+            [est for est, w in estimators], [w for est, w in estimators],
+            [scope.get_unique_variable_name('label'),
+             operator.outputs[1].full_name],
+            n_classes=n_classes, hard=op.voting == 'hard')
+    else:
+        _calculate_proba(scope, operator, container, op, weights)
+
     # labels
     label_name = scope.get_unique_variable_name('label_name')
     container.add_node('ArgMax', operator.outputs[1].full_name, label_name,
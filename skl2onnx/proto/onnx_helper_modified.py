@@ -65,9 +65,10 @@ def make_node(
     if domain is not None:
         node.domain = domain
     if kwargs:
-        node.attribute.extend(
-            make_attribute(key, value, dtype=_dtype, domain=domain)
-            for key, value in sorted(kwargs.items()))
+        # Attributes are created inside the node to avoid a copy.
+        for key, value in sorted(kwargs.items()):
+            make_attribute(key, value, dtype=_dtype, domain=domain,
+                           attr=node.attribute.add())
     return node
 
 
@@ -76,16 +77,19 @@ def make_attribute(
         value,  # type: Any
         dtype=None,  # type: [np.float32, np.float64]
         domain='',  # type: Text
-        doc_string=None  # type: Optional[Text]
+        doc_string=None,  # type: Optional[Text]
+        attr=None  # type: Optional[AttributeProto]
         ):  # type: (...) -> AttributeProto
-    """Makes an AttributeProto based on the value type."""
+    """Makes an AttributeProto based on the value type,
+    *attr* is filled and returned if specified."""
     def getshape(obj):
         if hasattr(obj, 'shape'):
             return obj.shape
         else:
             return (len(obj), )
 
-    attr = AttributeProto()
+    if attr is None:
+        attr = AttributeProto()
     attr.name = key
     if doc_string:
         attr.doc_string = doc_string
@@ -131,9 +135,22 @@ def make_attribute(
     elif isinstance(value, GraphProto):
         attr.g.CopyFrom(value)
         attr.type = AttributeProto.GRAPH
+    # numpy arrays, the type is given by the array and
+    # does not need to be checked for every element
+    elif (isinstance(value, np.ndarray) and value.size > 0 and
+            value.dtype in (np.float32, np.float64)):
+        if use_float64 and value.dtype == np.float64:
+            attr.type = AttributeProto.TENSOR
+            attr.t.CopyFrom(from_array(value.ravel(), name=key))
+        else:
+            attr.floats.extend(value.ravel().tolist())
+            attr.type = AttributeProto.FLOATS
+    elif (isinstance(value, np.ndarray) and value.size > 0 and
+            value.dtype in (np.int32, np.int64)):
+        attr.ints.extend(value.ravel().tolist())
+        attr.type = AttributeProto.INTS
     # third, iterable cases
     elif is_iterable:
-        byte_array = [_to_bytes_or_false(v) for v in value]
         if all(isinstance(v, np.float32) for v in value):
             attr.floats.extend(value)
             attr.type = AttributeProto.FLOATS
@@ -180,8 +197,8 @@ def make_attribute(
             # Turn np.int32/64 into Python built-in int.
             attr.ints.extend(int(v) for v in value)
             attr.type = AttributeProto.INTS
-        elif all(map(lambda bytes_or_false: bytes_or_false is not False,
-                     byte_array)):
+        elif all(_to_bytes_or_false(v) is not False for v in value):
+            byte_array = [_to_bytes_or_false(v) for v in value]
             attr.strings.extend(cast(List[bytes], byte_array))
             attr.type = AttributeProto.STRINGS
         elif all(isinstance(v, TensorProto) for v in value):
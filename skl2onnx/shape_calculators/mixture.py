@@ -6,7 +6,7 @@
 
 from ..common._registration import register_shape_calculator
 from ..common.data_types import (
-    FloatTensorType, Int64TensorType, DoubleTensorType
+    FloatTensorType, Int64TensorType, DoubleTensorType, Float16TensorType
 )
 from ..common.utils import (
     check_input_and_output_numbers,
@@ -19,7 +19,8 @@ def calculate_gaussian_mixture_output_shapes(operator):
                                    output_count_range=[2, 3])
     check_input_and_output_types(
         operator, good_input_types=[
-            FloatTensorType, Int64TensorType, DoubleTensorType])
+            FloatTensorType, Int64TensorType, DoubleTensorType,
+            Float16TensorType])
 
     if len(operator.inputs[0].type.shape) != 2:
         raise RuntimeError('Input must be a [N, C]-tensor')
@@ -8,7 +8,7 @@ import copy
 import numpy as np
 from ..common._registration import register_shape_calculator
 from ..common.data_types import (
-    FloatTensorType, Int64TensorType, DoubleTensorType
+    FloatTensorType, Int64TensorType, DoubleTensorType, Float16TensorType
 )
 from ..common.utils import check_input_and_output_numbers
 from ..common.utils import check_input_and_output_types
@@ -36,7 +36,8 @@ def calculate_sklearn_nearest_neighbours(operator):
                                    output_count_range=[1, 2])
     check_input_and_output_types(
         operator, good_input_types=[
-            FloatTensorType, Int64TensorType, DoubleTensorType])
+            FloatTensorType, Int64TensorType, DoubleTensorType,
+            Float16TensorType])
 
     N = operator.inputs[0].type.shape[0]
     neighbours = operator.raw_operator.n_neighbors
@@ -49,7 +50,8 @@ def calculate_sklearn_nearest_neighbours_regressor(operator):
                                    output_count_range=[1, 2])
     check_input_and_output_types(
         operator, good_input_types=[
-            FloatTensorType, Int64TensorType, DoubleTensorType])
+            FloatTensorType, Int64TensorType, DoubleTensorType,
+            Float16TensorType])
 
     N = operator.inputs[0].type.shape[0]
     if (hasattr(operator.raw_operator, '_y') and
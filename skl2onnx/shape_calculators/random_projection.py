@@ -18,3 +18,5 @@ def random_projection_shape_calculator(operator):
 
 register_shape_calculator('SklearnGaussianRandomProjection',
                           random_projection_shape_calculator)
+register_shape_calculator('SklearnSparseRandomProjection',
+                          random_projection_shape_calculator)
@@ -6,7 +6,7 @@
 
 from ..common._registration import register_shape_calculator
 from ..common.data_types import (
-    FloatTensorType, Int64TensorType, DoubleTensorType
+    FloatTensorType, Int64TensorType, DoubleTensorType, Float16TensorType
 )
 from ..common.utils import check_input_and_output_numbers
 from ..common.utils import check_input_and_output_types
@@ -23,8 +23,10 @@ def calculate_sklearn_truncated_svd_output_shapes(operator):
                                    output_count_range=1)
     check_input_and_output_types(
         operator, good_input_types=[
-            FloatTensorType, Int64TensorType, DoubleTensorType],
-        good_output_types=[FloatTensorType, DoubleTensorType])
+            FloatTensorType, Int64TensorType, DoubleTensorType,
+            Float16TensorType],
+        good_output_types=[FloatTensorType, DoubleTensorType,
+                           Float16TensorType])
 
     if len(operator.inputs[0].type.shape) != 2:
         raise RuntimeError('Only 2-D tensor(s) can be input(s).')
@@ -0,0 +1,83 @@
+"""
+Tests the cache of the schemas used to create the ONNX operators.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from numpy.testing import assert_almost_equal
+import onnx
+from onnxruntime import InferenceSession
+from skl2onnx.algebra.onnx_ops import dynamic_class_creation
+from test_utils import TARGET_OPSET
+
+
+class TestAlgebraOnnxOpsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = os.path.join(self.folder, 'sub', 'onnx_ops.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _same_classes(self, cls1, cls2):
+        self.assertEqual(set(cls1), set(cls2))
+        for name, cl in cls1.items():
+            for att in ['expected_inputs', 'expected_outputs',
+                        'operator_name', 'input_range', 'output_range',
+                        'domain', 'is_deprecated', 'since_version',
+                        'attr_names', '__doc__']:
+                self.assertEqual(getattr(cl, att),
+                                 getattr(cls2[name], att))
+            self.assertEqual(set(cl.past_version),
+                             set(cls2[name].past_version))
+
+    def test_cache(self):
+        expected = dynamic_class_creation()
+        created = dynamic_class_creation(self.cache)
+        self.assertTrue(os.path.exists(self.cache))
+        loaded = dynamic_class_creation(self.cache)
+        self._same_classes(expected, created)
+        self._same_classes(expected, loaded)
+
+        cl = loaded['OnnxAdd']
+        X = numpy.array([[1, 2]], dtype=numpy.float32)
+        onx = cl('X', X, output_names=['Y'], op_version=TARGET_OPSET)
+        model = onx.to_onnx({'X': X}, target_opset=TARGET_OPSET)
+        got = InferenceSession(model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(X * 2, got[0])
+
+    def test_cache_used_or_ignored(self):
+        dynamic_class_creation(self.cache)
+        with open(self.cache, 'r') as f:
+            content = json.load(f)
+        for meta in content['metadata']:
+            if meta['class_name'] == 'OnnxAbs':
+                meta['doc'] = 'cached'
+        with open(self.cache, 'w') as f:
+            json.dump(content, f)
+        self.assertEqual(
+            dynamic_class_creation(self.cache)['OnnxAbs'].__doc__, 'cached')
+
+        # another version of onnx
+        content['onnx'] = onnx.__version__ + '.dev'
+        with open(self.cache, 'w') as f:
+            json.dump(content, f)
+        self.assertNotEqual(
+            dynamic_class_creation(self.cache)['OnnxAbs'].__doc__, 'cached')
+        with open(self.cache, 'r') as f:
+            self.assertEqual(json.load(f)['onnx'], onnx.__version__)
+
+        # corrupted file
+        with open(self.cache, 'w') as f:
+            f.write('{"onnx":')
+        cls = dynamic_class_creation(self.cache)
+        self.assertIn('OnnxAbs', cls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests function to_onnx_autotune.
+"""
+import unittest
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from onnxruntime import InferenceSession
+from skl2onnx import to_onnx, to_onnx_autotune
+from skl2onnx.helpers.autotune import enumerate_tunable_options
+from test_utils import TARGET_OPSET
+
+
+class TestAutotune(unittest.TestCase):
+
+    def _data(self):
+        X, y = load_iris(return_X_y=True)
+        return X.astype(numpy.float32), y
+
+    def test_enumerate_tunable_options(self):
+        X, y = self._data()
+        model = make_pipeline(StandardScaler(), KNeighborsClassifier())
+        model.fit(X, y)
+        tunable = list(enumerate_tunable_options(model))
+        self.assertEqual(len(tunable), 1)
+        self.assertIs(tunable[0][0], model.steps[1][1])
+        self.assertEqual(tunable[0][1:], ('optim', [None, 'cdist']))
+        tunable = list(enumerate_tunable_options(
+            model, ('optim', 'zipmap', 'tokenexp')))
+        self.assertEqual([t[1] for t in tunable], ['optim', 'zipmap'])
+
+    def test_autotune_knn(self):
+        X, y = self._data()
+        model = KNeighborsClassifier().fit(X, y)
+        onx, report = to_onnx_autotune(model, X, target_opset=TARGET_OPSET,
+                                       repeat=2)
+        self.assertEqual(len(report['trials']), 2)
+        self.assertEqual(
+            [t['options'] for t in report['trials']],
+            [{'KNeighborsClassifier.optim': None},
+             {'KNeighborsClassifier.optim': 'cdist'}])
+        best = report['best']
+        self.assertTrue(best['correct'])
+        for trial in report['trials']:
+            if trial.get('correct', False):
+                self.assertGreaterEqual(trial['time'], best['time'])
+        self.assertIn(id(model), report['options'])
+        self.assertEqual(report['dtype'], numpy.float32)
+
+        # the options reproduce the best model
+        onx2 = to_onnx(model, X[:1], options=report['options'],
+                       target_opset=TARGET_OPSET)
+        self.assertEqual(len(onx.graph.node), len(onx2.graph.node))
+        sess = InferenceSession(onx.SerializeToString())
+        got = sess.run(None, {'X': X})
+        self.assertLess((got[0] != model.predict(X)).sum(), 3)
+
+    def test_autotune_runtime(self):
+        X, y = self._data()
+        model = make_pipeline(
+            StandardScaler(),
+            RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0))
+        model.fit(X, y)
+        calls = []
+
+        def runtime(onx):
+            calls.append(onx)
+            sess = InferenceSession(onx.SerializeToString())
+            return lambda X: sess.run(None, {'X': X})
+
+        # float32 thresholds may change the path of a few rows
+        onx, report = to_onnx_autotune(model, X, target_opset=TARGET_OPSET,
+                                       runtime=runtime, repeat=2,
+                                       row_tolerance=0.05)
+        self.assertEqual(len(report['trials']), 4)
+        self.assertEqual(len(calls), 4)
+        got = runtime(onx)(X)[0]
+        diff = numpy.abs(got.ravel() - model.predict(X))
+        self.assertLessEqual((diff > 1e-4).sum(), 7)
+
+        onx, report = to_onnx_autotune(model, X, target_opset=TARGET_OPSET,
+                                       runtime=runtime, repeat=2,
+                                       row_tolerance=0.05, max_trials=1)
+        self.assertEqual(len(report['trials']), 1)
+
+    def test_autotune_binary_svc(self):
+        X, y = self._data()
+        y = (y == 1).astype(numpy.int64)
+        for model in [SVC(), SVC(kernel='linear')]:
+            with self.subTest(kernel=model.kernel):
+                model.fit(X, y)
+                onx, report = to_onnx_autotune(
+                    model, X, target_opset=TARGET_OPSET, repeat=1,
+                    row_tolerance=0.05)
+                self.assertTrue(report['best']['correct'])
+                for trial in report['trials']:
+                    # optim='gemm' only applies to a linear kernel
+                    self.assertNotIn('Shape mismatch',
+                                     trial.get('error', ''))
+                got = InferenceSession(onx.SerializeToString()).run(
+                    None, {'X': X})
+                self.assertEqual(got[1].shape, (X.shape[0], 2))
+                self.assertLess((got[0] != model.predict(X)).sum(), 8)
+
+    def test_autotune_fails(self):
+        X, y = self._data()
+        model = KNeighborsClassifier().fit(X, y)
+        with self.assertRaises(RuntimeError):
+            to_onnx_autotune(model, X, target_opset=TARGET_OPSET,
+                             tolerance=-1, repeat=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Smoke test for benchmark benchmarks/bench_suite.py.
+"""
+import os
+import sys
+import unittest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from test_utils import TARGET_OPSET
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from bench_suite import bench, clone_with_options  # noqa
+
+
+class TestBenchSuite(unittest.TestCase):
+
+    def test_clone_with_options(self):
+        model = make_pipeline(StandardScaler(), LogisticRegression())
+        options = {id(model.steps[1][1]): {'zipmap': False},
+                   StandardScaler: {'div': 'div'}}
+        cloned, new_options = clone_with_options(model, options)
+        self.assertIsNot(cloned.steps[1][1], model.steps[1][1])
+        self.assertEqual(new_options,
+                         {id(cloned.steps[1][1]): {'zipmap': False},
+                          StandardScaler: {'div': 'div'}})
+
+    def test_bench_options(self):
+        model = make_pipeline(StandardScaler(), LogisticRegression())
+        res = bench([model], n_obs=[1, 10], target_opset=TARGET_OPSET,
+                    repeat=2, max_time=0.1, ntrain=50)
+        self.assertEqual(len(res), 2)
+        for obs in res:
+            self.assertNotIn('error', obs)
+            self.assertEqual(obs['model'], 'StandardScaler+LogisticRegression')
+            self.assertIn('ort_latency', obs)
+        res_opt = bench([model], n_obs=[1], target_opset=TARGET_OPSET,
+                        repeat=2, max_time=0.1, ntrain=50,
+                        options={id(model.steps[1][1]): {'zipmap': False}})
+        self.assertNotIn('error', res_opt[0])
+        # no ZipMap node
+        self.assertLess(res_opt[0]['onnx_nodes'], res[0]['onnx_nodes'])
+
+
+if __name__ == "__main__":
+    unittest.main()
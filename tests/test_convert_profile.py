@@ -0,0 +1,86 @@
+"""
+Tests parameter profile of convert_sklearn.
+"""
+import tracemalloc
+import unittest
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from skl2onnx import convert_sklearn, to_onnx, wrap_as_onnx_mixin
+from skl2onnx.common.data_types import FloatTensorType
+from test_utils import TARGET_OPSET
+
+
+class TestConvertProfile(unittest.TestCase):
+
+    def _model(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        model = make_pipeline(StandardScaler(), PCA(n_components=3),
+                              StandardScaler(), LogisticRegression())
+        return model.fit(X, y), X
+
+    def test_profile(self):
+        model, X = self._model()
+        onx, report = convert_sklearn(
+            model, initial_types=[('X', FloatTensorType([None, 4]))],
+            target_opset=TARGET_OPSET, profile=True)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(
+            [p['phase'] for p in report['phases']],
+            ['parse_sklearn_model', '_prune', '_resolve_duplicates',
+             '_fix_shapes', '_infer_all_types', '_check_structure',
+             'converters', 'make_graph', 'make_model'])
+        for obs in report['phases'] + report['converters']:
+            self.assertGreaterEqual(obs['time'], 0)
+            self.assertIn('memory', obs)
+
+        converters = report['converters']
+        self.assertEqual([c['model'] for c in converters],
+                         ['StandardScaler', 'PCA', 'StandardScaler',
+                          'LogisticRegression', None])
+        self.assertEqual(converters[-1]['alias'], 'SklearnZipMap')
+        nodes = sum(c['nodes'] for c in converters)
+        inits = sum(c['initializers'] for c in converters)
+        self.assertEqual(nodes, len(onx.graph.node))
+        self.assertEqual(inits, len(onx.graph.initializer))
+        self.assertEqual(report['phases'][6]['nodes'], nodes)
+
+        summary = report['summary']
+        self.assertEqual(summary['SklearnScaler']['count'], 2)
+        self.assertEqual(summary['SklearnPCA']['count'], 1)
+        self.assertEqual(summary['SklearnPCA']['initializers'], 2)
+        self.assertGreater(report['total'], 0)
+
+    def test_profile_time_intermediate(self):
+        model, X = self._model()
+        onx, topology, report = convert_sklearn(
+            model, initial_types=[('X', FloatTensorType([None, 4]))],
+            target_opset=TARGET_OPSET, profile='time', intermediate=True)
+        self.assertEqual(len(report['converters']), 5)
+        for obs in report['phases'] + report['converters']:
+            self.assertNotIn('memory', obs)
+        self.assertEqual(len(list(topology.topological_operator_iterator())),
+                         5)
+
+    def test_profile_to_onnx(self):
+        model, X = self._model()
+        onx = to_onnx(model, X, target_opset=TARGET_OPSET)
+        onx2, report = to_onnx(model, X, target_opset=TARGET_OPSET,
+                               profile=True)
+        self.assertEqual(len(onx.graph.node), len(onx2.graph.node))
+        self.assertEqual(len(report['converters']), 5)
+
+    def test_profile_to_onnx_mixin(self):
+        X = load_iris(return_X_y=True)[0].astype(numpy.float32)
+        model = wrap_as_onnx_mixin(StandardScaler().fit(X),
+                                   target_opset=TARGET_OPSET)
+        with self.assertRaises(NotImplementedError):
+            to_onnx(model, X, target_opset=TARGET_OPSET, profile=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests function estimate_inference_cost.
+"""
+import unittest
+import numpy
+from onnx import TensorProto
+from onnx.helper import (
+    make_graph, make_model, make_node, make_tensor_value_info)
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.neural_network import MLPRegressor
+from sklearn.svm import SVR
+from skl2onnx import to_onnx
+from skl2onnx.helpers import estimate_inference_cost
+from test_utils import TARGET_OPSET
+
+
+class TestCostEstimation(unittest.TestCase):
+
+    def _convert(self, model):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        model.fit(X, y)
+        return to_onnx(model, X[:1], target_opset=TARGET_OPSET)
+
+    def test_cost_mlp(self):
+        onx = self._convert(MLPRegressor(hidden_layer_sizes=(20, ),
+                                         max_iter=10))
+        cost = estimate_inference_cost(onx)
+        matmul = [n for n in cost['nodes'] if n['op_type'] == 'MatMul']
+        self.assertEqual([n['flops'] for n in matmul],
+                         [2 * 4 * 20, 2 * 20 * 1])
+        self.assertEqual(matmul[0]['output_shapes'], [(1, 20)])
+        self.assertEqual(cost['unknown'], [])
+        self.assertEqual(cost['batch_size'], 1)
+
+        cost10 = estimate_inference_cost(onx, batch_size=10)
+        self.assertEqual(cost10['flops'], cost['flops'] * 10)
+        self.assertGreater(cost10['bytes_read'], cost['bytes_read'])
+
+    def test_cost_trees(self):
+        onx = self._convert(RandomForestRegressor(
+            n_estimators=4, max_depth=3, random_state=0))
+        cost = estimate_inference_cost(onx, batch_size=5)
+        node = cost['nodes'][0]
+        self.assertEqual(node['op_type'], 'TreeEnsembleRegressor')
+        # at most 4 nodes visited per tree with max_depth=3
+        self.assertEqual(node['flops'], 5 * 4 * 4)
+        self.assertEqual(node['output_shapes'], [(5, 1)])
+
+    def test_cost_deep_trees(self):
+        model = RandomForestRegressor(n_estimators=50, random_state=0)
+        onx = self._convert(model)
+        cost = estimate_inference_cost(onx, batch_size=2)
+        node = cost['nodes'][0]
+        expected = sum(e.tree_.max_depth + 1 for e in model.estimators_)
+        self.assertEqual(node['flops'], 2 * expected)
+
+    def test_cost_svm(self):
+        model = SVR()
+        onx = self._convert(model)
+        cost = estimate_inference_cost(onx)
+        node = [n for n in cost['nodes'] if n['op_type'] == 'SVMRegressor']
+        n_sv = model.support_vectors_.shape[0]
+        self.assertEqual(node[0]['flops'], 2 * (n_sv * 4 + n_sv))
+
+    def test_cost_knn_scan(self):
+        onx = self._convert(KNeighborsRegressor())
+        cost = estimate_inference_cost(onx, batch_size=2)
+        scan = [n for n in cost['nodes'] if n['op_type'] == 'Scan']
+        self.assertEqual(len(scan), 1)
+        # one difference and one squared sum per training observation
+        self.assertEqual(scan[0]['flops'], 2 * 2 * 150 * 4)
+        self.assertEqual(scan[0]['output_shapes'][1], (150, 2))
+        self.assertEqual(cost['unknown'], [])
+
+    def test_cost_unknown(self):
+        node = make_node('Conv', ['X', 'W'], ['Y'])
+        graph = make_graph(
+            [node], 'g',
+            [make_tensor_value_info('X', TensorProto.FLOAT, [None, 1, 4, 4]),
+             make_tensor_value_info('W', TensorProto.FLOAT, [1, 1, 2, 2])],
+            [make_tensor_value_info('Y', TensorProto.FLOAT, None)])
+        cost = estimate_inference_cost(make_model(graph))
+        self.assertEqual(cost['unknown'], ['Conv'])
+        self.assertIsNone(cost['nodes'][0]['flops'])
+        self.assertEqual(cost['nodes'][0]['output_shapes'], [(1, 1, 3, 3)])
+        self.assertEqual(cost['flops'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 import numpy
 from numpy.testing import assert_almost_equal
@@ -13,7 +14,8 @@ from sklearn.preprocessing import RobustScaler, StandardScaler
 import onnxruntime
 from skl2onnx import convert_sklearn
 from skl2onnx.helpers import collect_intermediate_steps, compare_objects
-from skl2onnx.helpers import enumerate_pipeline_models
+from skl2onnx.helpers import (
+    enumerate_pipeline_models, run_intermediate_steps)
 from skl2onnx.helpers.investigate import _alter_model_for_debugging
 from skl2onnx.common import MissingShapeCalculator
 from skl2onnx.common.data_types import (
@@ -204,6 +206,53 @@ class TestInvestigate(unittest.TestCase):
             assert_almost_equal(onnx_output, skl_outputs, decimal=6)
             compare_objects(onnx_output, skl_outputs)
 
+    def test_simple_pipeline_single_model(self):
+        data = load_iris()
+        X, y = data.data.astype(numpy.float32), data.target
+        model = Pipeline([("scaler1", StandardScaler()),
+                          ("scaler2", RobustScaler()),
+                          ("lr", LogisticRegression())])
+        model.fit(X, y)
+        model2 = pickle.loads(pickle.dumps(model))
+
+        steps = collect_intermediate_steps(
+            model, "pipeline",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            single_model=True)
+        self.assertEqual(len(steps), 3)
+        onnx_all = steps[0]['onnx_all']
+        for step in steps:
+            self.assertIs(step['onnx_all'], onnx_all)
+            self.assertIsNone(step['onnx_step'])
+        outputs = [o.name for o in onnx_all.graph.output]
+        self.assertEqual(len(outputs), len(set(outputs)))
+        self.assertEqual(
+            len(onnx_all.graph.initializer),
+            len(steps[0]['model_onnx'].graph.initializer))
+
+        model.predict(X)
+        model.predict_proba(X)
+        results = run_intermediate_steps(steps, {'input': X})
+        self.assertEqual(len(results), 3)
+        for step, res in zip(steps, results):
+            self.assertEqual(len(res), len(step['outputs']))
+            dbg_outputs = step['model']._debug.outputs
+            if 'transform' in dbg_outputs:
+                assert_almost_equal(res[0], dbg_outputs['transform'],
+                                    decimal=5)
+            else:
+                assert_almost_equal(res[0], dbg_outputs['predict'])
+                assert_almost_equal(res[1], dbg_outputs['predict_proba'],
+                                    decimal=5)
+
+        # the function also works with one model per step
+        steps = collect_intermediate_steps(
+            model2, "pipeline",
+            [("input", FloatTensorType([None, X.shape[1]]))])
+        results2 = run_intermediate_steps(steps, {'input': X})
+        for r1, r2 in zip(results, results2):
+            assert_almost_equal(r1[0], r2[0])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests function model_size_report.
+"""
+import unittest
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from skl2onnx.helpers import model_size_report
+from test_utils import TARGET_OPSET
+
+
+class TestModelSizeReport(unittest.TestCase):
+
+    def _convert(self, model):
+        X, y = load_iris(return_X_y=True)
+        model.fit(X.astype(numpy.float32), y)
+        return convert_sklearn(
+            model, initial_types=[('X', FloatTensorType([None, 4]))],
+            target_opset=TARGET_OPSET, intermediate=True)
+
+    def test_model_size_report_steps(self):
+        model = make_pipeline(
+            StandardScaler(), PCA(n_components=3),
+            RandomForestClassifier(n_estimators=10, random_state=0))
+        onx, topology = self._convert(model)
+        report = model_size_report(onx, topology, top=5)
+
+        self.assertEqual(report['total'], onx.ByteSize())
+        steps = report['steps']
+        self.assertEqual(
+            [s['model'] for s in steps],
+            ['RandomForestClassifier', 'PCA', None, 'StandardScaler'])
+        self.assertEqual(sum(s['nodes'] for s in steps),
+                         len(onx.graph.node))
+        self.assertEqual(sum(s['initializers'] for s in steps),
+                         len(onx.graph.initializer))
+        self.assertEqual(steps[1]['initializers'], 2)
+        self.assertLess(sum(s['bytes'] for s in steps), report['total'])
+
+        domains = report['domains']
+        self.assertEqual(set(domains), {'ai.onnx', 'ai.onnx.ml'})
+        self.assertGreater(domains['ai.onnx.ml'], domains['ai.onnx'])
+
+        init_names = [i['name'] for i in report['initializers']]
+        self.assertEqual(set(init_names),
+                         set(i.name for i in onx.graph.initializer))
+        sizes = [i['bytes'] for i in report['initializers']]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+        self.assertEqual(len(report['hotspots']), 5)
+        self.assertEqual(report['hotspots'][0]['kind'], 'attribute')
+        self.assertTrue(report['hotspots'][0]['name'].startswith(
+            'TreeEnsembleClassifier.nodes_'))
+
+    def test_model_size_report_node_names(self):
+        model = make_pipeline(StandardScaler(), PCA(n_components=3))
+        onx, topology = self._convert(model)
+        expected = model_size_report(onx, topology)['steps']
+        self.assertEqual(sum(s['bytes'] for s in expected),
+                         sum(n.ByteSize() for n in onx.graph.node) +
+                         sum(i.ByteSize() for i in onx.graph.initializer))
+        # node names may be empty
+        for node in onx.graph.node:
+            node.name = ''
+        steps = model_size_report(onx, topology)['steps']
+        self.assertEqual([s['name'] for s in steps],
+                         [s['name'] for s in expected])
+        self.assertEqual([s['nodes'] for s in steps],
+                         [s['nodes'] for s in expected])
+        self.assertEqual(sum(s['bytes'] for s in steps),
+                         sum(n.ByteSize() for n in onx.graph.node) +
+                         sum(i.ByteSize() for i in onx.graph.initializer))
+
+    def test_model_size_report_svm(self):
+        onx, topology = self._convert(SVC())
+        report = model_size_report(onx)
+        self.assertIsNone(report['steps'])
+        attributes = {a['attribute']: a for a in report['attributes']
+                      if a['op_type'] == 'SVMClassifier'}
+        self.assertIn('support_vectors', attributes)
+        self.assertEqual(report['hotspots'][0]['name'],
+                         attributes['support_vectors']['node'] +
+                         '.support_vectors')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,11 @@ import unittest
 from distutils.version import StrictVersion
 import numpy
 import onnx
+from onnx import TensorProto
+from onnx.helper import (
+    make_graph, make_model, make_node, make_tensor_value_info)
+from onnx.numpy_helper import from_array
+from numpy.testing import assert_almost_equal
 from sklearn import __version__ as sklearn_version
 from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import Binarizer, StandardScaler, OneHotEncoder
@@ -35,6 +40,13 @@ class TestOnnxHelper(unittest.TestCase):
         session = InferenceSession(save_onnx_model(model))
         return lambda X: session.run(None, {"input": X})[0]
 
+    def get_session(self, model):
+        try:
+            from onnxruntime import InferenceSession
+        except ImportError:
+            return None
+        return InferenceSession(save_onnx_model(model))
+
     def test_onnx_helper_load_save(self):
         model = make_pipeline(StandardScaler(), Binarizer(threshold=0.5))
         X = numpy.array([[0.1, 1.1], [0.2, 2.2]])
@@ -99,6 +111,79 @@ class TestOnnxHelper(unittest.TestCase):
         vals = {p.key: p.value for p in new_model.metadata_props}
         assert vals == meta
 
+    def _two_branches(self):
+        # two branches, every node has the same name or no name
+        cst = numpy.array([2], dtype=numpy.float32)
+        nodes = [
+            make_node('Mul', ['X', 'two'], ['XM'], name='same'),
+            make_node('Add', ['XM', 'one'], ['Z'], name='same'),
+            make_node('Sub', ['Y', 'three'], ['W']),
+            make_node('Neg', ['W'], ['WN']),
+        ]
+        inits = [from_array(cst, name='two'),
+                 from_array(cst - 1, name='one'),
+                 from_array(cst + 1, name='three'),
+                 from_array(cst, name='unused')]
+        graph = make_graph(
+            nodes, 'branches',
+            [make_tensor_value_info('X', TensorProto.FLOAT, [None, 2]),
+             make_tensor_value_info('Y', TensorProto.FLOAT, [None, 2])],
+            [make_tensor_value_info('Z', TensorProto.FLOAT, [None, 2]),
+             make_tensor_value_info('WN', TensorProto.FLOAT, [None, 2])],
+            inits)
+        model = make_model(graph)
+        model.opset_import[0].version = 11
+        model.ir_version = 6
+        return model
+
+    def test_select_outputs_prune(self):
+        model = self._two_branches()
+        new_model = select_model_inputs_outputs(model, "Z")
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Mul', 'Add'])
+        self.assertEqual([i.name for i in new_model.graph.input], ['X'])
+        self.assertEqual(
+            sorted(i.name for i in new_model.graph.initializer),
+            ['one', 'two'])
+        self.assertEqual(new_model.graph.output[0].type.tensor_type.elem_type,
+                         TensorProto.FLOAT)
+
+        new_model = select_model_inputs_outputs(model, ["XM", "W"])
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Mul', 'Sub'])
+        self.assertEqual([i.name for i in new_model.graph.input], ['X', 'Y'])
+        X = numpy.array([[0, 1], [2, 3]], dtype=numpy.float32)
+        sess = self.get_session(new_model)
+        if sess is not None:
+            xm, w = sess.run(None, {'X': X, 'Y': X})
+            assert_almost_equal(xm, X * 2)
+            assert_almost_equal(w, X - 3)
+
+    def test_select_inputs(self):
+        model = self._two_branches()
+        new_model = select_model_inputs_outputs(model, "Z", inputs="XM")
+        self.assertEqual([n.op_type for n in new_model.graph.node], ['Add'])
+        self.assertEqual([i.name for i in new_model.graph.input], ['XM'])
+        self.assertEqual([i.name for i in new_model.graph.initializer],
+                         ['one'])
+        X = numpy.array([[0, 1], [2, 3]], dtype=numpy.float32)
+        sess = self.get_session(new_model)
+        if sess is not None:
+            got = sess.run(None, {'XM': X})[0]
+            assert_almost_equal(got, X + 1)
+
+        new_model = select_model_inputs_outputs(
+            model, ["Z", "WN"], inputs=["XM", "Y"])
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Add', 'Sub', 'Neg'])
+
+        with self.assertRaises(RuntimeError):
+            select_model_inputs_outputs(model, ["Z", "WN"], inputs=["XM"])
+        with self.assertRaises(ValueError):
+            select_model_inputs_outputs(model, "Z", inputs=["XX"])
+        with self.assertRaises(ValueError):
+            select_model_inputs_outputs(model, "ZZ")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+"""
+Tests the numpy runtime.
+"""
+import unittest
+import numpy
+from numpy.testing import assert_almost_equal
+from onnx import helper, TensorProto
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from onnxruntime import InferenceSession
+from skl2onnx import convert_sklearn, to_onnx, to_onnx_autotune
+from skl2onnx.common.data_types import FloatTensorType, StringTensorType
+from skl2onnx.helpers import (
+    OnnxNumpyInference, collect_intermediate_steps, run_intermediate_steps)
+from test_utils import TARGET_OPSET
+
+
+class TestOnnxNumpyRuntime(unittest.TestCase):
+
+    def _data(self, binary=False):
+        X, y = load_iris(return_X_y=True)
+        if binary:
+            y = (y == 1).astype(numpy.int64)
+        return X.astype(numpy.float32), y
+
+    def _check(self, model, X, options=None):
+        onx = to_onnx(model, X[:1], target_opset=TARGET_OPSET,
+                      options=options)
+        name = onx.graph.input[0].name
+        expected = InferenceSession(onx.SerializeToString()).run(
+            None, {name: X})
+        got = OnnxNumpyInference(onx).run(None, {name: X})
+        self.assertEqual(len(expected), len(got))
+        for exp, res in zip(expected, got):
+            if isinstance(exp, list):
+                self.assertEqual(list(exp[0]), list(res[0]))
+                exp = [[d[k] for k in sorted(d)] for d in exp]
+                res = [[d[k] for k in sorted(d)] for d in res]
+            exp = numpy.asarray(exp)
+            res = numpy.asarray(res)
+            self.assertEqual(exp.dtype, res.dtype)
+            if exp.dtype.kind == 'f':
+                assert_almost_equal(exp, res, decimal=4)
+            else:
+                self.assertEqual(exp.tolist(), res.tolist())
+        return onx
+
+    def test_linear_mlp(self):
+        X, y = self._data()
+        for model in [LogisticRegression(max_iter=500),
+                      MLPClassifier(max_iter=50, random_state=0)]:
+            with self.subTest(model=type(model).__name__):
+                model.fit(X, y)
+                self._check(model, X)
+                self._check(model, X, {id(model): {'zipmap': False}})
+
+    def test_svm(self):
+        for binary in [False, True]:
+            X, y = self._data(binary)
+            for model in [SVC(), SVC(probability=True, random_state=0)]:
+                with self.subTest(binary=binary, model=model):
+                    model.fit(X, y)
+                    self._check(model, X, {id(model): {'zipmap': False}})
+
+    def test_tree_ensembles(self):
+        X, y = self._data(binary=True)
+        model = RandomForestClassifier(n_estimators=5, random_state=0)
+        model.fit(X, y)
+        self._check(model, X)
+        y = numpy.array(['a', 'b', 'c'])[self._data()[1]]
+        model.fit(X, y)
+        self._check(model, X)
+        model = RandomForestRegressor(n_estimators=5, random_state=0)
+        model.fit(X, y == 'b')
+        self._check(model, X)
+
+    def test_knn_scan_pipeline(self):
+        X, y = self._data()
+        model = make_pipeline(StandardScaler(), KNeighborsClassifier())
+        model.fit(X, y)
+        onx = self._check(model, X)
+        self.assertIn('Scan', [n.op_type for n in onx.graph.node])
+
+    def test_tfidf(self):
+        corpus = numpy.array([
+            "This is the first document.",
+            "This document is the second document.",
+            "And this is the third one.",
+            "Is this the first document?"]).reshape((-1, 1))
+        model = TfidfVectorizer(ngram_range=(1, 2)).fit(corpus.ravel())
+        onx = convert_sklearn(
+            model, initial_types=[('X', StringTensorType([None, 1]))],
+            target_opset=TARGET_OPSET)
+        got = OnnxNumpyInference(onx).run(None, {'X': corpus})[0]
+        assert_almost_equal(model.transform(corpus.ravel()).toarray(),
+                            got, decimal=5)
+
+    def test_batch_intermediate(self):
+        X, y = self._data()
+        model = LogisticRegression(max_iter=500).fit(X, y)
+        onx = to_onnx(model, X[:1], target_opset=TARGET_OPSET,
+                      options={id(model): {'zipmap': False}})
+        sess = OnnxNumpyInference(onx)
+        self.assertEqual(sess.input_names, ['X'])
+        expected = sess.run(None, {'X': X})
+        got = sess.run(None, {'X': X}, batch_size=40)
+        self.assertEqual(got[0].tolist(), expected[0].tolist())
+        assert_almost_equal(got[1], expected[1])
+        values = sess.run(None, {'X': X}, intermediate=True)
+        for node in onx.graph.node:
+            for name in node.output:
+                self.assertIn(name, values)
+        with self.assertRaises(RuntimeError):
+            sess.run(None, {})
+
+    def test_unknown_operator(self):
+        node = helper.make_node('Unique', ['X'], ['Y'])
+        graph = helper.make_graph(
+            [node], 'g',
+            [helper.make_tensor_value_info('X', TensorProto.FLOAT, None)],
+            [helper.make_tensor_value_info('Y', TensorProto.FLOAT, None)])
+        sess = OnnxNumpyInference(helper.make_model(graph))
+        with self.assertRaises(NotImplementedError):
+            sess.run(None, {'X': numpy.array([1.], dtype=numpy.float32)})
+
+    def test_reused_by_helpers(self):
+        X, y = self._data()
+        model = make_pipeline(StandardScaler(), LogisticRegression())
+        model.fit(X, y)
+        steps = collect_intermediate_steps(
+            model, "pipeline", [("input", FloatTensorType([None, 4]))],
+            single_model=True)
+        expected = run_intermediate_steps(steps, {'input': X})
+        got = run_intermediate_steps(steps, {'input': X}, runtime='numpy')
+        for exp, res in zip(expected, got):
+            assert_almost_equal(exp[0], res[0], decimal=5)
+
+        onx, report = to_onnx_autotune(
+            KNeighborsClassifier().fit(X, y), X,
+            target_opset=TARGET_OPSET, runtime='numpy', repeat=1)
+        self.assertEqual(len(report['trials']), 2)
+        self.assertTrue(report['best']['correct'])
+
+
+if __name__ == "__main__":
+    unittest.main()
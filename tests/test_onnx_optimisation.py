@@ -0,0 +1,297 @@
+"""
+Tests on functions in *onnx_optimisation*.
+"""
+import unittest
+import numpy
+from numpy.testing import assert_almost_equal
+from onnx import helper, numpy_helper, TensorProto
+from onnxruntime import InferenceSession
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel as CK
+from skl2onnx import to_onnx
+from sklearn.ensemble import VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from skl2onnx.helpers.onnx_optimisation import (
+    onnx_compact_tree_ensembles, onnx_fold_constants,
+    onnx_remove_node_redundant)
+from test_utils import TARGET_OPSET
+
+
+class TestOnnxOptimisation(unittest.TestCase):
+
+    def _make_model(self):
+        cst = numpy.array([[1., 2.], [3., 4.], [5., 6.]],
+                          dtype=numpy.float32)
+        nodes = [
+            helper.make_node('Transpose', ['cst'], ['cstT']),
+            helper.make_node('Cast', ['cstT'], ['cstT64'],
+                             to=TensorProto.DOUBLE),
+            helper.make_node('Cast', ['cstT64'], ['cstT32'],
+                             to=TensorProto.FLOAT),
+            helper.make_node('Mul', ['cstT32', 'two'], ['cst2']),
+            helper.make_node('MatMul', ['X', 'cst2'], ['Y']),
+        ]
+        graph = helper.make_graph(
+            nodes, 'fold',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 3])],
+            [numpy_helper.from_array(cst, name='cst'),
+             numpy_helper.from_array(
+                 numpy.array([2], dtype=numpy.float32), name='two')])
+        return helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+
+    def test_onnx_fold_constants(self):
+        model = self._make_model()
+        new_model = onnx_fold_constants(model)
+        self.assertEqual(len(new_model.graph.node), 1)
+        self.assertEqual(new_model.graph.node[0].op_type, 'MatMul')
+        self.assertEqual(len(new_model.graph.initializer), 1)
+        self.assertEqual(new_model.graph.initializer[0].name, 'cst2')
+        self.assertEqual(new_model.opset_import[0].version, 11)
+
+        X = numpy.array([[1, 2], [3, 4]], dtype=numpy.float32)
+        exp = InferenceSession(model.SerializeToString()).run(
+            None, {'X': X})
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(exp[0], got[0])
+
+    def test_onnx_fold_constants_expansion(self):
+        nodes = [
+            helper.make_node('ConstantOfShape', ['shape'], ['zeros'],
+                             value=helper.make_tensor(
+                                 'value', TensorProto.FLOAT, [1], [1.])),
+            helper.make_node('Add', ['X', 'zeros'], ['Y']),
+        ]
+        graph = helper.make_graph(
+            nodes, 'fold',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 1000])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 1000])],
+            [numpy_helper.from_array(
+                numpy.array([1000], dtype=numpy.int64), name='shape')])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+        new_model = onnx_fold_constants(model)
+        self.assertEqual(len(new_model.graph.node), 2)
+        new_model = onnx_fold_constants(model, max_expansion=4000)
+        self.assertEqual(len(new_model.graph.node), 1)
+        self.assertEqual(new_model.graph.initializer[0].name, 'zeros')
+
+    def test_onnx_fold_constants_gpr(self):
+        X = numpy.random.rand(20, 3).astype(numpy.float32)
+        y = X.sum(axis=1)
+        model = GaussianProcessRegressor(CK(2.) * RBF(1.)).fit(X, y)
+        model_onnx = to_onnx(model, X[:1], target_opset=TARGET_OPSET)
+        new_model = onnx_fold_constants(model_onnx)
+        self.assertLess(len(new_model.graph.node),
+                        len(model_onnx.graph.node))
+        exp = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'X': X})
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(exp[0], got[0])
+
+    def test_onnx_remove_node_redundant(self):
+        nodes = [
+            helper.make_node('Identity', ['X'], ['X1']),
+            helper.make_node('Cast', ['X1'], ['X2'], to=TensorProto.FLOAT),
+            helper.make_node('Cast', ['X2'], ['X3'], to=TensorProto.DOUBLE),
+            helper.make_node('Cast', ['X3'], ['X4'], to=TensorProto.FLOAT),
+            helper.make_node('Reshape', ['X4', 'shape'], ['X5']),
+            helper.make_node('Abs', ['X5'], ['Y0']),
+            helper.make_node('Identity', ['Y0'], ['Y']),
+        ]
+        graph = helper.make_graph(
+            nodes, 'redundant',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 2])],
+            [numpy_helper.from_array(
+                numpy.array([-1, 2], dtype=numpy.int64), name='shape')])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+        new_model, stats = onnx_remove_node_redundant(
+            model, return_stats=True)
+        self.assertEqual(stats, {'Identity': 2, 'Cast': 3, 'Reshape': 1})
+        self.assertEqual(len(new_model.graph.node), 1)
+        self.assertEqual(list(new_model.graph.node[0].input), ['X'])
+        self.assertEqual(list(new_model.graph.node[0].output), ['Y'])
+        self.assertEqual(len(new_model.graph.initializer), 0)
+
+        X = numpy.array([[1, -2], [3, -4]], dtype=numpy.float32)
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(numpy.abs(X), got[0])
+
+    def test_onnx_remove_node_redundant_lossy_cast(self):
+        nodes = [
+            helper.make_node('Cast', ['X'], ['Xi'], to=TensorProto.INT64),
+            helper.make_node('Cast', ['Xi'], ['Y'], to=TensorProto.FLOAT),
+        ]
+        graph = helper.make_graph(
+            nodes, 'lossy',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 2])])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+        new_model, stats = onnx_remove_node_redundant(
+            model, return_stats=True)
+        self.assertEqual(stats, {})
+        self.assertEqual(len(new_model.graph.node), 2)
+
+    def test_onnx_remove_node_redundant_duplicates(self):
+        nodes = [
+            helper.make_node('Cast', ['X'], ['X1'], to=TensorProto.DOUBLE),
+            helper.make_node('Cast', ['X'], ['X2'], to=TensorProto.DOUBLE),
+            helper.make_node('Cast', ['X'], ['X3'], to=TensorProto.INT64),
+            helper.make_node('Add', ['X1', 'X2'], ['Y0']),
+        ]
+        # a long chain of Identity nodes
+        for i in range(2000):
+            nodes.append(helper.make_node(
+                'Identity', ['Y%d' % i], ['Y%d' % (i + 1)]))
+        nodes.append(helper.make_node('Abs', ['Y2000'], ['Y']))
+        graph = helper.make_graph(
+            nodes, 'duplicates',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.DOUBLE, [None, 2]),
+             helper.make_tensor_value_info(
+                'X3', TensorProto.INT64, [None, 2])])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+        new_model, stats = onnx_remove_node_redundant(
+            model, return_stats=True)
+        self.assertEqual(stats, {'Cast': 1, 'Identity': 2000})
+        self.assertEqual([n.op_type for n in new_model.graph.node],
+                         ['Cast', 'Cast', 'Add', 'Abs'])
+        self.assertEqual(list(new_model.graph.node[2].input), ['X1', 'X1'])
+        self.assertEqual(list(new_model.graph.node[3].input), ['Y0'])
+
+        X = numpy.array([[1, -2], [3, -4]], dtype=numpy.float32)
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(numpy.abs(X * 2).astype(numpy.float64), got[0])
+
+    def test_onnx_remove_node_redundant_unsorted(self):
+        # the nodes are not sorted in topological order
+        nodes = [
+            helper.make_node('Add', ['Xi', 'Xi'], ['Y']),
+            helper.make_node('Identity', ['X'], ['Xi']),
+        ]
+        graph = helper.make_graph(
+            nodes, 'unsorted',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 2])])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11)])
+        new_model, stats = onnx_remove_node_redundant(
+            model, return_stats=True)
+        self.assertEqual(stats, {'Identity': 1})
+        self.assertEqual(len(new_model.graph.node), 1)
+        self.assertEqual(list(new_model.graph.node[0].input), ['X', 'X'])
+        X = numpy.array([[1, -2], [3, -4]], dtype=numpy.float32)
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(X * 2, got[0])
+
+    def test_onnx_remove_node_redundant_ovr(self):
+        X = numpy.random.rand(20, 3).astype(numpy.float32)
+        y = (X.sum(axis=1) > 1.5).astype(numpy.int64)
+        model = OneVsRestClassifier(LogisticRegression()).fit(X, y)
+        model_onnx = to_onnx(model, X[:1], target_opset=TARGET_OPSET)
+        new_model, stats = onnx_remove_node_redundant(
+            model_onnx, return_stats=True)
+        self.assertGreater(sum(stats.values()), 0)
+        self.assertEqual(
+            len(model_onnx.graph.node) - sum(stats.values()),
+            len(new_model.graph.node))
+        exp = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'X': X})
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(exp[0], got[0])
+        self.assertEqual(exp[1], got[1])
+
+    def test_onnx_compact_tree_ensembles(self):
+        # x0 <= 0.5 ? (x1 <= 0.5 ? 1 : 1) : 2
+        node = helper.make_node(
+            'TreeEnsembleRegressor', ['X'], ['Y'], domain='ai.onnx.ml',
+            n_targets=1, post_transform='NONE',
+            nodes_treeids=[0, 0, 0, 0, 0],
+            nodes_nodeids=[0, 1, 2, 3, 4],
+            nodes_featureids=[0, 1, 0, 0, 0],
+            nodes_modes=['BRANCH_LEQ', 'BRANCH_LEQ', 'LEAF', 'LEAF', 'LEAF'],
+            nodes_values=[0.5, 0.5, 0., 0., 0.],
+            nodes_truenodeids=[1, 2, 0, 0, 0],
+            nodes_falsenodeids=[4, 3, 0, 0, 0],
+            nodes_hitrates=[1., 1., 1., 1., 1.],
+            nodes_missing_value_tracks_true=[0, 0, 0, 0, 0],
+            target_treeids=[0, 0, 0], target_nodeids=[2, 3, 4],
+            target_ids=[0, 0, 0], target_weights=[1., 1., 2.])
+        graph = helper.make_graph(
+            [node], 'tree',
+            [helper.make_tensor_value_info(
+                'X', TensorProto.FLOAT, [None, 2])],
+            [helper.make_tensor_value_info(
+                'Y', TensorProto.FLOAT, [None, 1])])
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid('', 11),
+                                  helper.make_opsetid('ai.onnx.ml', 1)])
+        new_model, stats = onnx_compact_tree_ensembles(
+            model, return_stats=True)
+        self.assertEqual(stats['n_nodes_before'], 5)
+        self.assertEqual(stats['n_nodes_after'], 3)
+        self.assertEqual(stats['n_leaves_after'], 2)
+        self.assertEqual(
+            stats['removed_attributes'],
+            ['nodes_hitrates', 'nodes_missing_value_tracks_true'])
+        self.assertLess(stats['size_after'], stats['size_before'])
+        atts = {a.name: a for a in new_model.graph.node[0].attribute}
+        self.assertNotIn('nodes_hitrates', atts)
+        self.assertEqual(list(atts['nodes_truenodeids'].ints), [1, 0, 0])
+        self.assertEqual(list(atts['nodes_falsenodeids'].ints), [2, 0, 0])
+
+        X = numpy.array([[0, 0], [0, 1], [1, 0]], dtype=numpy.float32)
+        exp = InferenceSession(model.SerializeToString()).run(
+            None, {'X': X})
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(exp[0], got[0])
+
+    def test_onnx_compact_tree_ensembles_voting(self):
+        X = numpy.random.rand(100, 3).astype(numpy.float32)
+        y = (X.sum(axis=1) > 1.5).astype(numpy.int64)
+        model = VotingClassifier(
+            [('dt1', DecisionTreeClassifier()),
+             ('dt2', DecisionTreeClassifier(max_depth=3))],
+            voting='hard', flatten_transform=False).fit(X, y)
+        model_onnx = to_onnx(model, X[:1], target_opset=TARGET_OPSET,
+                             options={id(model): {'zipmap': False}})
+        new_model, stats = onnx_compact_tree_ensembles(
+            model_onnx, return_stats=True)
+        self.assertLessEqual(stats['n_nodes_after'], stats['n_nodes_before'])
+        self.assertLess(stats['size_after'], stats['size_before'])
+        exp = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'X': X})
+        got = InferenceSession(new_model.SerializeToString()).run(
+            None, {'X': X})
+        assert_almost_equal(exp[0], got[0])
+        assert_almost_equal(exp[1], got[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
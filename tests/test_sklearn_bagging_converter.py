@@ -330,6 +330,39 @@ class TestSklearnBaggingConverter(unittest.TestCase):
             "<= StrictVersion('0.2.1')",
         )
 
+    def test_bagging_classifier_trees_merged(self):
+        model, X = fit_classification_model(
+            BaggingClassifier(n_estimators=15, max_features=0.5,
+                              bootstrap_features=True), 3)
+        model_onnx = convert_sklearn(
+            model, "bagging classifier",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            dtype=np.float32, target_opset=TARGET_OPSET)
+        tree_nodes = [n for n in model_onnx.graph.node
+                      if n.op_type == 'TreeEnsembleClassifier']
+        self.assertEqual(len(tree_nodes), 1)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnBaggingClassifierTreesMerged",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+            "<= StrictVersion('0.2.1')")
+
+    def test_bagging_regressor_trees_merged(self):
+        model, X = fit_regression_model(
+            BaggingRegressor(n_estimators=15, max_features=0.5))
+        model_onnx = convert_sklearn(
+            model, "bagging regressor",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            dtype=np.float32, target_opset=TARGET_OPSET)
+        self.assertEqual(
+            [n.op_type for n in model_onnx.graph.node],
+            ['TreeEnsembleRegressor'])
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnBaggingRegressorTreesMerged-Dec4",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+            "<= StrictVersion('0.2.1')")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,7 @@ import unittest
 from distutils.version import StrictVersion
 import numpy as np
 from pandas import DataFrame
+from onnx.defs import onnx_opset_version
 from sklearn.tree import (
     DecisionTreeClassifier, DecisionTreeRegressor,
     ExtraTreeClassifier, ExtraTreeRegressor
@@ -16,6 +17,7 @@ from sklearn.datasets import make_classification
 from skl2onnx.common.data_types import onnx_built_with_ml
 from skl2onnx.common.data_types import (
     BooleanTensorType,
+    DoubleTensorType,
     FloatTensorType,
     Int64TensorType,
 )
@@ -285,6 +287,93 @@ class TestSklearnDecisionTreeModels(unittest.TestCase):
             allow_failure="StrictVersion(onnxruntime.__version__)"
                           " <= StrictVersion('0.2.1')")
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_decision_tree_classifier_compact(self):
+        model, X = fit_classification_model(DecisionTreeClassifier(), 3)
+        model_onnx = convert_sklearn(
+            model, "decision tree",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET,
+            options={id(model): {'compact': True}})
+        atts = set(a.name for a in model_onnx.graph.node[0].attribute)
+        self.assertNotIn('nodes_hitrates', atts)
+        self.assertNotIn('nodes_missing_value_tracks_true', atts)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnDecisionTreeClassifierCompact")
+
+    def test_decision_tree_regressor_compact(self):
+        model, X = fit_regression_model(DecisionTreeRegressor())
+        model_onnx = convert_sklearn(
+            model, "decision tree",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET,
+            options={id(model): {'compact': True}})
+        atts = set(a.name for a in model_onnx.graph.node[0].attribute)
+        self.assertNotIn('nodes_hitrates', atts)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnDecisionTreeRegressorCompact-Dec4")
+
+    def test_decision_tree_classifier_gemm(self):
+        for n_classes in [2, 3]:
+            with self.subTest(n_classes=n_classes):
+                model, X = fit_classification_model(
+                    DecisionTreeClassifier(max_depth=4), n_classes)
+                model_onnx = convert_sklearn(
+                    model, "decision tree",
+                    [("input", FloatTensorType([None, X.shape[1]]))],
+                    target_opset=TARGET_OPSET,
+                    options={id(model): {'optim': 'gemm'}})
+                ops = set(n.op_type for n in model_onnx.graph.node)
+                self.assertNotIn('TreeEnsembleClassifier', ops)
+                self.assertIn('MatMul', ops)
+                dump_data_and_model(
+                    X, model, model_onnx,
+                    basename="SklearnDecisionTreeClassifierGemm%d" %
+                             n_classes)
+
+    def test_decision_tree_regressor_gemm(self):
+        model, X = fit_regression_model(DecisionTreeRegressor(max_depth=5))
+        model_onnx = convert_sklearn(
+            model, "decision tree",
+            [("input", DoubleTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET, dtype=np.float64,
+            options={id(model): {'optim': 'gemm'}})
+        ops = set(n.op_type for n in model_onnx.graph.node)
+        self.assertNotIn('TreeEnsembleRegressor', ops)
+        dump_data_and_model(
+            X.astype(np.float64), model, model_onnx,
+            basename="SklearnDecisionTreeRegressorGemm64-Dec4")
+
+    @unittest.skipIf(onnx_opset_version() < 13, reason="ReduceSum-13")
+    def test_decision_tree_classifier_gemm_opset13(self):
+        model, X = fit_classification_model(
+            DecisionTreeClassifier(max_depth=4), 3)
+        model_onnx = convert_sklearn(
+            model, "decision tree",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            target_opset=13, options={id(model): {'optim': 'gemm'},
+                                      DecisionTreeClassifier:
+                                      {'zipmap': False}})
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'input': X})
+        self.assertEqual(got[0].tolist(), model.predict(X).tolist())
+        np.testing.assert_almost_equal(got[1], model.predict_proba(X))
+
+    def test_decision_tree_regressor_gemm_too_big(self):
+        rng = np.random.RandomState(0)
+        X = rng.rand(5000, 4).astype(np.float32)
+        model = DecisionTreeRegressor().fit(X, rng.rand(5000))
+        with self.assertRaises(RuntimeError) as cm:
+            convert_sklearn(
+                model, "decision tree",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                target_opset=TARGET_OPSET,
+                options={id(model): {'optim': 'gemm'}})
+        self.assertIn('MAX_GEMM_PATHS_SIZE', str(cm.exception))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,215 @@
+"""
+Tests conversion with dtype=numpy.float16.
+"""
+import unittest
+import numpy
+from numpy.testing import assert_almost_equal
+from onnx import TensorProto
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.mixture import GaussianMixture
+from sklearn.naive_bayes import BernoulliNB, ComplementNB, MultinomialNB
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+try:
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    from sklearn.utils.testing import ignore_warnings
+from sklearn.exceptions import ConvergenceWarning
+from onnxruntime import InferenceSession
+from skl2onnx import (
+    convert_sklearn, to_onnx, update_registered_converter)
+from skl2onnx.common.shape_calculator import (
+    calculate_linear_regressor_output_shapes)
+from skl2onnx.common.data_types import Float16TensorType
+from skl2onnx.operator_converters.linear_regressor import (
+    convert_sklearn_linear_regressor)
+from test_utils import TARGET_OPSET
+
+
+class TestSklearnFloat16(unittest.TestCase):
+
+    def _data(self):
+        X, y = load_iris(return_X_y=True)
+        # the expected values are computed on the same rounded features
+        X16 = X.astype(numpy.float16)
+        return X16.astype(numpy.float64), y, X16
+
+    def _convert(self, model, X16, options=None):
+        model_onnx = convert_sklearn(
+            model, "float16",
+            [("X", Float16TensorType([None, X16.shape[1]]))],
+            dtype=numpy.float16, options=options,
+            target_opset=TARGET_OPSET)
+        self.assertEqual(model_onnx.graph.input[0].type.tensor_type.elem_type,
+                         TensorProto.FLOAT16)
+        sess = InferenceSession(model_onnx.SerializeToString())
+        return model_onnx, sess.run(None, {'X': X16})
+
+    def _check_float16_outputs(self, model_onnx, index):
+        for i in index:
+            self.assertEqual(
+                model_onnx.graph.output[i].type.tensor_type.elem_type,
+                TensorProto.FLOAT16)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_mlp_regressor(self):
+        X, y, X16 = self._data()
+        model = MLPRegressor(random_state=0, max_iter=200).fit(X, y)
+        for optim in [None, 'gemm']:
+            with self.subTest(optim=optim):
+                model_onnx, got = self._convert(
+                    model, X16, options={id(model): {'optim': optim}})
+                self._check_float16_outputs(model_onnx, [0])
+                inits = set(i.data_type for i in model_onnx.graph.initializer
+                            if i.data_type != TensorProto.INT64)
+                self.assertEqual(inits, {TensorProto.FLOAT16})
+                assert_almost_equal(model.predict(X), got[0].ravel(),
+                                    decimal=1)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_mlp_classifier(self):
+        X, y, X16 = self._data()
+        model = MLPClassifier(random_state=0, max_iter=200).fit(X, y)
+        model_onnx, got = self._convert(
+            model, X16, options={id(model): {'zipmap': False}})
+        self._check_float16_outputs(model_onnx, [1])
+        # softmax is computed in float32
+        softmax = [n for n in model_onnx.graph.node
+                   if n.op_type == 'Softmax']
+        self.assertEqual(len(softmax), 1)
+        casts = {n.output[0]: n for n in model_onnx.graph.node
+                 if n.op_type == 'Cast'}
+        self.assertIn(softmax[0].input[0], casts)
+        self.assertEqual(casts[softmax[0].input[0]].attribute[0].i,
+                         TensorProto.FLOAT)
+        assert_almost_equal(model.predict_proba(X), got[1], decimal=2)
+        self.assertLess((model.predict(X) != got[0]).sum(), 3)
+
+    def test_pca_truncated_svd(self):
+        X, y, X16 = self._data()
+        for model in [PCA(n_components=2), TruncatedSVD(n_components=2)]:
+            with self.subTest(model=model.__class__.__name__):
+                model.fit(X)
+                model_onnx, got = self._convert(model, X16)
+                self._check_float16_outputs(model_onnx, [0])
+                assert_almost_equal(model.transform(X), got[0], decimal=1)
+
+    def test_linear_regression(self):
+        X, y, X16 = self._data()
+        model = LinearRegression().fit(X, y)
+        model_onnx, got = self._convert(model, X16)
+        self._check_float16_outputs(model_onnx, [0])
+        ops = set(n.op_type for n in model_onnx.graph.node)
+        self.assertNotIn('LinearRegressor', ops)
+        assert_almost_equal(model.predict(X), got[0].ravel(), decimal=2)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_logistic_regression(self):
+        X, y, X16 = self._data()
+        model = LogisticRegression(max_iter=500).fit(X, y)
+        model_onnx, got = self._convert(
+            model, X16, options={id(model): {'zipmap': False}})
+        self._check_float16_outputs(model_onnx, [1])
+        assert_almost_equal(model.predict_proba(X), got[1], decimal=2)
+        assert_almost_equal(model.predict(X), got[0])
+
+    def test_kneighbors_regressor(self):
+        X, y, X16 = self._data()
+        model = KNeighborsRegressor().fit(X, y)
+        model_onnx, got = self._convert(model, X16)
+        self._check_float16_outputs(model_onnx, [0])
+        # float16 may change the order of two neighbours at almost
+        # the same distance
+        diff = numpy.abs(model.predict(X) - got[0].ravel())
+        self.assertLess((diff > 1e-2).sum(), 3)
+
+    def test_naive_bayes(self):
+        X, y, X16 = self._data()
+        for model in [BernoulliNB(), ComplementNB(), MultinomialNB()]:
+            with self.subTest(model=model.__class__.__name__):
+                model.fit(X, y)
+                model_onnx, got = self._convert(
+                    model, X16, options={id(model): {'zipmap': False}})
+                self._check_float16_outputs(model_onnx, [1])
+                # the computation happens in float32
+                inits = set(i.data_type
+                            for i in model_onnx.graph.initializer)
+                self.assertNotIn(TensorProto.FLOAT16, inits)
+                assert_almost_equal(model.predict_proba(X), got[1],
+                                    decimal=3)
+                assert_almost_equal(model.predict(X), got[0])
+
+    def test_gaussian_mixture(self):
+        X, y, X16 = self._data()
+        model = GaussianMixture(n_components=3, random_state=0).fit(X)
+        model_onnx, got = self._convert(model, X16)
+        self._check_float16_outputs(model_onnx, [1])
+        inits = set(i.data_type for i in model_onnx.graph.initializer)
+        self.assertNotIn(TensorProto.FLOAT16, inits)
+        assert_almost_equal(model.predict_proba(X), got[1], decimal=3)
+        assert_almost_equal(model.predict(X), got[0].ravel())
+
+    def test_to_onnx(self):
+        X, y, X16 = self._data()
+        model = LinearRegression().fit(X, y)
+        model_onnx = to_onnx(model, X16, dtype=numpy.float16,
+                             target_opset=TARGET_OPSET)
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'X': X16})[0]
+        self.assertEqual(got.dtype, numpy.float16)
+
+    def test_unsupported(self):
+        X, y, X16 = self._data()
+        for model in [SVC(), StandardScaler(),
+                      RandomForestClassifier(n_estimators=3)]:
+            with self.subTest(model=model.__class__.__name__):
+                model.fit(X, y)
+                options = {id(model): {'zipmap': False}}
+                if isinstance(model, StandardScaler):
+                    options = None
+                with self.assertRaises(NotImplementedError) as cm:
+                    self._convert(model, X16, options=options)
+                self.assertIn("'Sklearn{}'".format(
+                    model.__class__.__name__.replace('Standard', '')),
+                    str(cm.exception))
+
+    def test_register_float16(self):
+
+        class LinearRegressionFloat16(LinearRegression):
+            pass
+
+        X, y, X16 = self._data()
+        model = LinearRegressionFloat16().fit(X, y)
+        update_registered_converter(
+            LinearRegressionFloat16, 'LinearRegressionFloat16',
+            calculate_linear_regressor_output_shapes,
+            convert_sklearn_linear_regressor,
+            options={'quantize': [None, 'int8']})
+        with self.assertRaises(NotImplementedError):
+            self._convert(model, X16)
+        update_registered_converter(
+            LinearRegressionFloat16, 'LinearRegressionFloat16',
+            calculate_linear_regressor_output_shapes,
+            convert_sklearn_linear_regressor,
+            options={'quantize': [None, 'int8']}, float16=True)
+        model_onnx, got = self._convert(model, X16)
+        self._check_float16_outputs(model_onnx, [0])
+        assert_almost_equal(model.predict(X), got[0].ravel(), decimal=2)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_zipmap(self):
+        X, y, X16 = self._data()
+        model = LogisticRegression(max_iter=500).fit(X, y)
+        with self.assertRaises(NotImplementedError) as cm:
+            self._convert(model, X16)
+        self.assertIn("'SklearnZipMap'", str(cm.exception))
+        self.assertIn("'zipmap': False", str(cm.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,7 +22,7 @@ from skl2onnx.common.data_types import FloatTensorType, DoubleTensorType
 from skl2onnx import to_onnx
 from skl2onnx.proto import get_latest_tested_opset_version
 from skl2onnx.operator_converters.gaussian_process import (
-    convert_kernel, convert_kernel_diag
+    convert_kernel, convert_kernel_diag, evaluate_gpr_nystroem
 )
 from onnxruntime import InferenceSession
 from onnxruntime import __version__ as ort_version
@@ -832,6 +832,122 @@ class TestSklearnGaussianProcess(unittest.TestCase):
         self.assertTrue(model_onnx is not None)
         self.check_outputs(gp, model_onnx, X_test, {})
 
+    def test_gpr_fitted_gemm(self):
+        data = load_iris()
+        X = data.data
+        y = data.target
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, random_state=0)
+        kernels = [C(2.) * RBF(1.), RBF([1., 2., 0.5, 1.]),
+                   RationalQuadratic(), C(1.) + DotProduct(),
+                   C(3.)]
+        for kernel in kernels:
+            for normalize_y in [False, True]:
+                with self.subTest(kernel=kernel, normalize_y=normalize_y):
+                    gp = GaussianProcessRegressor(
+                        kernel=kernel, alpha=10., optimizer=None,
+                        normalize_y=normalize_y)
+                    gp.fit(X_train, y_train)
+                    options = {GaussianProcessRegressor: {
+                        'optim': 'gemm', 'return_std': True}}
+                    model_onnx = to_onnx(
+                        gp, initial_types=[
+                            ('X', DoubleTensorType([None, None]))],
+                        options=options, dtype=np.float64,
+                        target_opset=TARGET_OPSET)
+                    self.check_outputs(
+                        gp, model_onnx, X_test,
+                        predict_attributes={'return_std': True})
+
+                    model_onnx = to_onnx(
+                        gp, initial_types=[
+                            ('X', FloatTensorType([None, None]))],
+                        options=options, dtype=np.float32,
+                        target_opset=TARGET_OPSET)
+                    self.check_outputs(
+                        gp, model_onnx, X_test.astype(np.float32),
+                        predict_attributes={'return_std': True},
+                        decimal=3)
+
+    def test_gpr_fitted_gemm_exp_sine_squared(self):
+        X_train = np.random.rand(30, 1)
+        y_train = np.sin(X_train[:, 0] * 6)
+        gp = GaussianProcessRegressor(kernel=ExpSineSquared(), alpha=1.,
+                                      optimizer=None)
+        gp.fit(X_train, y_train)
+        model_onnx = to_onnx(
+            gp, initial_types=[('X', DoubleTensorType([None, None]))],
+            options={GaussianProcessRegressor: {'optim': 'gemm',
+                                                'return_std': True}},
+            dtype=np.float64, target_opset=TARGET_OPSET)
+        self.assertNotIn('Scan', [n.op_type for n in model_onnx.graph.node])
+        self.check_outputs(gp, model_onnx, X_train,
+                           predict_attributes={'return_std': True})
+
+    def test_gpr_fitted_nystroem(self):
+        rnd = np.random.RandomState(0)
+        X_train = rnd.rand(100, 3)
+        y_train = np.sin(X_train.sum(axis=1) * 3)
+        X_valid = rnd.rand(20, 3)
+        gp = GaussianProcessRegressor(kernel=C(1.) * RBF(0.5), alpha=1e-2,
+                                      optimizer=None, normalize_y=True)
+        gp.fit(X_train, y_train)
+
+        errors = [evaluate_gpr_nystroem(gp, X_valid, m, return_std=True)
+                  for m in [5, 20, 100]]
+        self.assertEqual(errors[0]['n_components'], 5)
+        self.assertEqual(errors[0]['n_train'], 100)
+        self.assertGreater(errors[0]['rel_error_mean'],
+                           errors[1]['rel_error_mean'])
+        self.assertLess(errors[-1]['max_abs_error_mean'], 1e-5)
+        self.assertLess(errors[-1]['max_abs_error_std'], 1e-5)
+
+        options = {GaussianProcessRegressor: {'nystroem': 20,
+                                              'return_std': True}}
+        model_onnx = to_onnx(
+            gp, initial_types=[('X', DoubleTensorType([None, None]))],
+            options=options, dtype=np.float64, target_opset=TARGET_OPSET)
+        inits = {i.name: i for i in model_onnx.graph.initializer}
+        self.assertFalse(any(i.dims == [3, 100] for i in inits.values()))
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'X': X_valid})
+        exp = gp.predict(X_valid, return_std=True)
+        diff_mean = np.abs(got[0].ravel() - exp[0]).max()
+        diff_std = np.abs(got[1].ravel() - exp[1]).max()
+        assert_almost_equal(diff_mean, errors[1]['max_abs_error_mean'])
+        assert_almost_equal(diff_std, errors[1]['max_abs_error_std'])
+
+        options = {GaussianProcessRegressor: {'nystroem': 100,
+                                              'return_std': True}}
+        model_onnx = to_onnx(
+            gp, initial_types=[('X', DoubleTensorType([None, None]))],
+            options=options, dtype=np.float64, target_opset=TARGET_OPSET)
+        self.check_outputs(gp, model_onnx, X_valid,
+                           predict_attributes={'return_std': True})
+
+        options = {GaussianProcessRegressor: {'nystroem': 0}}
+        self.assertRaises(
+            ValueError, to_onnx, gp,
+            initial_types=[('X', DoubleTensorType([None, None]))],
+            options=options, dtype=np.float64, target_opset=TARGET_OPSET)
+
+        options = {GaussianProcessRegressor: {'nystroem': 20,
+                                              'optim': 'cdist'}}
+        self.assertRaises(
+            ValueError, to_onnx, gp,
+            initial_types=[('X', DoubleTensorType([None, None]))],
+            options=options, dtype=np.float64, target_opset=TARGET_OPSET)
+
+        options = {GaussianProcessRegressor: {'nystroem': 20,
+                                              'optim': 'gemm'}}
+        model_onnx = to_onnx(
+            gp, initial_types=[('X', DoubleTensorType([None, None]))],
+            options=options, dtype=np.float64, target_opset=TARGET_OPSET)
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'X': X_valid})
+        diff_mean = np.abs(got[0].ravel() - exp[0]).max()
+        assert_almost_equal(diff_mean, errors[1]['max_abs_error_mean'])
+
 
 if __name__ == "__main__":
     unittest.main()
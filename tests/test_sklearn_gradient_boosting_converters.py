@@ -388,6 +388,22 @@ class TestSklearnGradientBoostingModels(unittest.TestCase):
                           " <= StrictVersion('0.2.1')"
         )
 
+    def test_gradient_boosting_regressor_gemm(self):
+        model, X = fit_regression_model(
+            GradientBoostingRegressor(n_estimators=10, max_depth=3))
+        model_onnx = convert_sklearn(
+            model,
+            "gradient boosting regression",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'optim': 'gemm'}})
+        ops = set(n.op_type for n in model_onnx.graph.node)
+        self.assertNotIn('TreeEnsembleRegressor', ops)
+        dump_data_and_model(
+            X,
+            model,
+            model_onnx,
+            basename="SklearnGradientBoostingRegressorGemm-Dec4")
+
 
 if __name__ == "__main__":
     unittest.main()
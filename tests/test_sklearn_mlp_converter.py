@@ -349,6 +349,59 @@ class TestSklearnMLPConverters(unittest.TestCase):
         assert_almost_equal(res[1], model.predict_proba(X_test), decimal=5)
         assert_almost_equal(res[0], model.predict(X_test), decimal=5)
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_model_mlp_classifier_multiclass_gemm(self):
+        model, X_test = fit_classification_model(
+            MLPClassifier(random_state=42, hidden_layer_sizes=(10, 5)), 4)
+        model_onnx = convert_sklearn(
+            model,
+            "scikit-learn MLPClassifier",
+            [("input", FloatTensorType([None, X_test.shape[1]]))],
+            options={MLPClassifier: {'optim': 'gemm'}},
+            target_opset=TARGET_OPSET
+        )
+        ops = [node.op_type for node in model_onnx.graph.node]
+        self.assertEqual(ops.count('Gemm'), 3)
+        self.assertNotIn('MatMul', ops)
+        # the last activation is named after out_activation_
+        softmax = [node for node in model_onnx.graph.node
+                   if node.op_type == 'Softmax']
+        self.assertEqual(len(softmax), 1)
+        self.assertTrue(softmax[0].name.startswith('Softmax'))
+        dump_data_and_model(
+            X_test,
+            model,
+            model_onnx,
+            basename="SklearnMLPClassifierMultiClassGemm",
+            allow_failure="StrictVersion("
+            "onnxruntime.__version__)<= StrictVersion('0.2.1')",
+        )
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_model_mlp_regressor_gemm(self):
+        model, X_test = fit_regression_model(
+            MLPRegressor(random_state=42, activation="tanh"))
+        model_onnx = convert_sklearn(
+            model,
+            "scikit-learn MLPRegressor",
+            [("input", FloatTensorType([None, X_test.shape[1]]))],
+            options={MLPRegressor: {'optim': 'gemm'}},
+            target_opset=TARGET_OPSET
+        )
+        ops = [node.op_type for node in model_onnx.graph.node]
+        self.assertEqual(ops.count('Gemm'), 2)
+        self.assertNotIn('MatMul', ops)
+        dump_data_and_model(
+            X_test,
+            model,
+            model_onnx,
+            basename="SklearnMLPRegressorGemm-Dec4",
+            allow_failure="StrictVersion("
+            "onnxruntime.__version__)<= StrictVersion('0.2.1')",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,7 +6,11 @@ from sklearn.ensemble import (
     GradientBoostingClassifier,
     GradientBoostingRegressor,
 )
-from sklearn.linear_model import LogisticRegression, LinearRegression
+from sklearn.linear_model import (
+    LogisticRegression,
+    LinearRegression,
+    SGDClassifier,
+)
 from sklearn.multiclass import OneVsRestClassifier
 from sklearn.neural_network import MLPClassifier, MLPRegressor
 from skl2onnx import convert_sklearn
@@ -408,6 +412,79 @@ class TestOneVsRestClassifierConverter(unittest.TestCase):
             "<= StrictVersion('0.2.1')",
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_classification_float_stack(self):
+        model, X = fit_classification_model(
+            OneVsRestClassifier(LogisticRegression()), 5)
+        model_onnx = convert_sklearn(
+            model, "ovr classification",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'optim': 'stack'}},
+            target_opset=TARGET_OPSET)
+        self.assertIsNotNone(model_onnx)
+        types = [n.op_type for n in model_onnx.graph.node]
+        self.assertEqual(types.count('Gemm'), 1)
+        self.assertNotIn('LinearClassifier', types)
+        self.assertNotIn('Slice', types)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnOVRClassificationFloatStack",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+            "<= StrictVersion('0.2.1')")
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_classification_int_stack_sgd(self):
+        model, X = fit_classification_model(
+            OneVsRestClassifier(
+                SGDClassifier(loss='modified_huber', random_state=0)),
+            4, is_int=True)
+        model_onnx = convert_sklearn(
+            model, "ovr classification",
+            [("input", Int64TensorType([None, X.shape[1]]))],
+            options={id(model): {'optim': 'stack', 'raw_scores': True,
+                                 'zipmap': False}},
+            target_opset=TARGET_OPSET)
+        types = [n.op_type for n in model_onnx.graph.node]
+        self.assertEqual(types.count('Gemm'), 1)
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'input': X})
+        assert_almost_equal(got[1], model.decision_function(X), decimal=4)
+        assert_almost_equal(got[0], model.predict(X))
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_regression_float_stack(self):
+        model, X = fit_classification_model(
+            OneVsRestClassifier(LinearRegression()), 3, random_state=11)
+        model_onnx = convert_sklearn(
+            model, "ovr regression",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'optim': 'stack'}},
+            target_opset=TARGET_OPSET)
+        types = [n.op_type for n in model_onnx.graph.node]
+        self.assertEqual(types.count('Gemm'), 1)
+        self.assertNotIn('LinearRegressor', types)
+        dump_data_and_model(
+            X[:5], model, model_onnx,
+            basename="SklearnOVRRegressionFloatStack-Out0",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+            "<= StrictVersion('0.2.1')")
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_classification_stack_fallback(self):
+        model, X = fit_classification_model(
+            OneVsRestClassifier(MLPClassifier()), 3)
+        model_onnx = convert_sklearn(
+            model, "ovr classification",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'optim': 'stack'}},
+            target_opset=TARGET_OPSET)
+        types = [n.op_type for n in model_onnx.graph.node]
+        self.assertEqual(types.count('Slice'), 3)
+
 
 if __name__ == "__main__":
     unittest.main()
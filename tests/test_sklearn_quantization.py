@@ -0,0 +1,132 @@
+"""
+Tests option quantize='int8'.
+"""
+import unittest
+import warnings
+import numpy
+from numpy.testing import assert_almost_equal
+from onnx import TensorProto
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.linear_model import LinearRegression
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.random_projection import GaussianRandomProjection
+try:
+    from sklearn.utils._testing import ignore_warnings
+except ImportError:
+    from sklearn.utils.testing import ignore_warnings
+from sklearn.exceptions import ConvergenceWarning
+from onnxruntime import InferenceSession
+from skl2onnx import to_onnx
+from skl2onnx.helpers import calibrate_quantization
+from skl2onnx.operator_converters.common import quantize_weight_int8
+from test_utils import TARGET_OPSET
+
+
+class TestSklearnQuantization(unittest.TestCase):
+
+    def _data(self, n_features=40):
+        rnd = numpy.random.RandomState(0)
+        X = rnd.randn(200, n_features).astype(numpy.float32)
+        y = X[:, :5].sum(axis=1)
+        return X, y
+
+    def _check(self, model, X, decimal=1, dtype=numpy.float32,
+               target_opset=TARGET_OPSET, check_size=True):
+        exp = to_onnx(model, X, dtype=dtype, target_opset=target_opset)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            onx = to_onnx(model, X, dtype=dtype, target_opset=target_opset,
+                          options={id(model): {'quantize': 'int8'}})
+        inits = [i for i in onx.graph.initializer
+                 if i.data_type == TensorProto.INT8]
+        self.assertGreater(len(inits), 0)
+        if check_size:
+            self.assertLess(len(onx.SerializeToString()),
+                            len(exp.SerializeToString()) / 2)
+        ops = set(n.op_type for n in onx.graph.node)
+        if target_opset >= 13 and dtype == numpy.float32:
+            self.assertIn('DequantizeLinear', ops)
+        else:
+            self.assertNotIn('DequantizeLinear', ops)
+        sess = InferenceSession(exp.SerializeToString())
+        expected = sess.run(None, {'X': X})[0]
+        sess = InferenceSession(onx.SerializeToString())
+        got = sess.run(None, {'X': X})[0]
+        assert_almost_equal(expected, got, decimal=decimal)
+
+    def test_quantize_weight_int8(self):
+        w = numpy.array([[1., -2., 0.], [0.5, 1., 0.]])
+        q, scale = quantize_weight_int8(w)
+        self.assertEqual(q.dtype, numpy.int8)
+        self.assertEqual(q.max(), 127)
+        self.assertEqual(q.min(), -127)
+        assert_almost_equal(scale, [1. / 127, 2. / 127, 1.])
+        assert_almost_equal(q * scale, w, decimal=2)
+
+    def test_pca_truncated_svd(self):
+        X, y = self._data()
+        for model in [PCA(n_components=20),
+                      TruncatedSVD(n_components=20)]:
+            for opset in sorted({TARGET_OPSET, 13}):
+                with self.subTest(model=model.__class__.__name__,
+                                  opset=opset):
+                    model.fit(X)
+                    self._check(model, X, target_opset=opset)
+
+    def test_pca_double(self):
+        X, y = self._data()
+        model = PCA(n_components=20).fit(X)
+        self._check(model, X.astype(numpy.float64), dtype=numpy.float64)
+
+    def test_gaussian_random_projection(self):
+        X, y = self._data()
+        model = GaussianRandomProjection(n_components=20).fit(X)
+        self._check(model, X)
+
+    def test_linear_regression(self):
+        X, y = self._data()
+        model = LinearRegression().fit(X, y)
+        # the graph is bigger than the coefficients
+        self._check(model, X, decimal=2, check_size=False)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_mlp_regressor(self):
+        X, y = self._data()
+        model = MLPRegressor(hidden_layer_sizes=(50,), max_iter=50,
+                             random_state=0).fit(X, y)
+        self._check(model, X)
+
+    @ignore_warnings(category=(ConvergenceWarning, FutureWarning))
+    def test_calibrate_quantization(self):
+        X, y = self._data()
+        model = make_pipeline(
+            PCA(n_components=20),
+            MLPClassifier(max_iter=50, random_state=0))
+        model.fit(X, (y > 0).astype(numpy.int64))
+        report = calibrate_quantization(model, X, target_opset=TARGET_OPSET)
+        self.assertEqual(len(report['options']), 2)
+        self.assertLess(report['size_quantized'], report['size_float'] / 2)
+        outputs = report['outputs']
+        self.assertEqual(set(outputs),
+                         {'output_label', 'output_probability'})
+        self.assertLess(outputs['output_label']['n_diff'], 5)
+        proba = outputs['output_probability']
+        self.assertLess(proba['max_abs_error'], 0.05)
+        self.assertEqual(proba['max_abs_error_column'].shape, (2, ))
+
+        onx = to_onnx(model, X[:1], options=report['options'],
+                      target_opset=TARGET_OPSET)
+        self.assertEqual(len(onx.SerializeToString()),
+                         report['size_quantized'])
+
+    def test_calibrate_quantization_not_supported(self):
+        X, y = self._data()
+        model = make_pipeline(StandardScaler()).fit(X)
+        with self.assertRaises(RuntimeError):
+            calibrate_quantization(model, X)
+
+
+if __name__ == "__main__":
+    unittest.main()
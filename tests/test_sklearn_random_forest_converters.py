@@ -136,6 +136,36 @@ class TestSklearnTreeEnsembleModels(unittest.TestCase):
                           " <= StrictVersion('0.2.1')",
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_random_forest_classifier_gemm(self):
+        model, X = fit_classification_model(
+            RandomForestClassifier(n_estimators=5, max_depth=4), 3)
+        model_onnx = convert_sklearn(
+            model, "random forest",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET,
+            options={id(model): {'optim': 'gemm'}})
+        ops = set(n.op_type for n in model_onnx.graph.node)
+        self.assertNotIn('TreeEnsembleClassifier', ops)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnRandomForestClassifierGemm")
+
+    def test_random_forest_regressor_gemm(self):
+        model, X = fit_regression_model(
+            RandomForestRegressor(n_estimators=5, max_depth=4))
+        model_onnx = convert_sklearn(
+            model, "random forest",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET,
+            options={id(model): {'optim': 'gemm'}})
+        ops = set(n.op_type for n in model_onnx.graph.node)
+        self.assertNotIn('TreeEnsembleRegressor', ops)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnRandomForestRegressorGemm-Dec4")
+
     def test_random_forest_regressor_mismatched_estimator_counts(self):
         model = RandomForestRegressor(n_estimators=3)
         X = [[0, 1], [1, 1], [2, 0]]
@@ -8,7 +8,9 @@ import unittest
 from distutils.version import StrictVersion
 import numpy as np
 import onnxruntime
-from sklearn.random_projection import GaussianRandomProjection
+from sklearn.random_projection import (
+    GaussianRandomProjection, SparseRandomProjection)
+from onnxruntime import InferenceSession
 from skl2onnx import convert_sklearn, to_onnx
 from skl2onnx.common.data_types import FloatTensorType
 from test_utils import dump_data_and_model, TARGET_OPSET
@@ -45,6 +47,70 @@ class TestSklearnRandomProjection(unittest.TestCase):
         dump_data_and_model(X, model,
                             model_onnx, basename="GaussianRandomProjection64")
 
+    @unittest.skipIf(TARGET_OPSET < 9 or nort, reason="MatMul not available")
+    def test_sparse_random_projection_float32(self):
+        rng = np.random.RandomState(42)
+        pt = SparseRandomProjection(n_components=4, random_state=0)
+        X = rng.rand(10, 50)
+        model = pt.fit(X)
+        model_onnx = convert_sklearn(
+            model, "scikit-learn SparseRandomProjection",
+            [("inputs", FloatTensorType([None, X.shape[1]]))],
+            target_opset=TARGET_OPSET)
+        self.assertIsNotNone(model_onnx)
+        dump_data_and_model(X.astype(np.float32), model,
+                            model_onnx, basename="SparseRandomProjection")
+
+    def _check_sparse_random_projection(self, optim, op_types, dtype):
+        rng = np.random.RandomState(42)
+        X = rng.rand(20, 1000).astype(dtype)
+        model = SparseRandomProjection(n_components=30, random_state=0)
+        model.fit(X)
+        dense = to_onnx(model, X[:1], dtype=dtype, target_opset=TARGET_OPSET)
+        model_onnx = to_onnx(model, X[:1], dtype=dtype,
+                             target_opset=TARGET_OPSET,
+                             options={id(model): {'optim': optim}})
+        self.assertEqual(set(n.op_type for n in model_onnx.graph.node),
+                         op_types)
+        self.assertLess(len(model_onnx.SerializeToString()) * 5,
+                        len(dense.SerializeToString()))
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'X': X})[0]
+        self.assertEqual(got.dtype, dtype)
+        np.testing.assert_almost_equal(model.transform(X), got, decimal=4)
+
+    @unittest.skipIf(TARGET_OPSET < 11, reason="Gather")
+    def test_sparse_random_projection_gather(self):
+        for dtype in [np.float32, np.float64]:
+            with self.subTest(dtype=dtype):
+                self._check_sparse_random_projection(
+                    'gather', {'Gather', 'Mul', 'ReduceSum'}, dtype)
+
+    @unittest.skipIf(TARGET_OPSET < 11, reason="sparse initializer")
+    def test_sparse_random_projection_sparse(self):
+        for dtype in [np.float32, np.float64]:
+            with self.subTest(dtype=dtype):
+                self._check_sparse_random_projection(
+                    'sparse', {'Constant', 'MatMul'}, dtype)
+
+    @unittest.skipIf(TARGET_OPSET < 11, reason="sparse initializer")
+    def test_sparse_random_projection_density_1(self):
+        # components_ is a dense array if density=1
+        rng = np.random.RandomState(42)
+        X = rng.rand(20, 50).astype(np.float32)
+        model = SparseRandomProjection(
+            n_components=5, density=1, random_state=0).fit(X)
+        self.assertIsInstance(model.components_, np.ndarray)
+        for optim in [None, 'gather', 'sparse']:
+            with self.subTest(optim=optim):
+                model_onnx = to_onnx(
+                    model, X[:1], target_opset=TARGET_OPSET,
+                    options={id(model): {'optim': optim}})
+                sess = InferenceSession(model_onnx.SerializeToString())
+                got = sess.run(None, {'X': X})[0]
+                np.testing.assert_almost_equal(
+                    model.transform(X), got, decimal=4)
+
 
 if __name__ == "__main__":
     unittest.main()
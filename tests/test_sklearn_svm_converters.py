@@ -4,6 +4,7 @@ Tests scikit-linear converter.
 import unittest
 from distutils.version import StrictVersion
 import numpy
+from scipy.sparse import csr_matrix
 from sklearn.datasets import load_iris
 from sklearn.svm import SVC, SVR, NuSVC, NuSVR, OneClassSVM
 try:
@@ -14,12 +15,13 @@ except ImportError:
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import (
     BooleanTensorType,
+    DoubleTensorType,
     FloatTensorType,
     Int64TensorType,
 )
 from skl2onnx.operator_converters.ada_boost import _scikit_learn_before_022
 import onnx
-from onnxruntime import __version__ as ort_version
+from onnxruntime import InferenceSession, __version__ as ort_version
 from test_utils import dump_data_and_model, fit_regression_model
 
 
@@ -508,6 +510,118 @@ class TestSklearnSVM(unittest.TestCase):
             allow_failure="StrictVersion(onnxruntime.__version__)"
                           " < StrictVersion('0.5.0')")
 
+    def test_convert_svc_multi_sparse(self):
+        iris = load_iris()
+        X = iris.data[:, :3]
+        model = SVC(probability=False, decision_function_shape="ovo")
+        model.fit(csr_matrix(X), iris.target)
+        X = X[::10].astype(numpy.float32)
+        model_onnx = convert_sklearn(
+            model, "SVC", [("input", FloatTensorType([None, X.shape[1]]))])
+        atts = {a.name: a for a in model_onnx.graph.node[0].attribute}
+        self.assertEqual(atts['support_vectors'].type,
+                         onnx.AttributeProto.FLOATS)
+        self.assertEqual(len(atts['coefficients'].floats),
+                         model.dual_coef_.shape[0] *
+                         model.dual_coef_.shape[1])
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnMclSVCSparse-Dec4",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " < StrictVersion('0.5.0')")
+
+    def _check_gemm(self, model_onnx):
+        ops = set(node.op_type for node in model_onnx.graph.node)
+        self.assertIn('Gemm', ops)
+        self.assertNotIn('SVMClassifier', ops)
+        self.assertNotIn('SVMRegressor', ops)
+
+    def test_convert_svc_binary_linear_gemm(self):
+        model, X = self._fit_binary_classification(
+            SVC(kernel='linear', decision_function_shape='ovo'))
+        model_onnx = convert_sklearn(
+            model, "SVC", [("input", FloatTensorType([None, X.shape[1]]))],
+            options={SVC: {'optim': 'gemm'}})
+        self._check_gemm(model_onnx)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnBinSVCLinearGemm-NoProbOpp",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " < StrictVersion('0.5.0')")
+
+    def test_convert_svc_multi_linear_gemm(self):
+        for dfs in ['ovo', 'ovr']:
+            with self.subTest(decision_function_shape=dfs):
+                model, X = self._fit_multi_classification(
+                    SVC(kernel='linear', decision_function_shape=dfs), 4)
+                model_onnx = convert_sklearn(
+                    model, "SVC",
+                    [("input", FloatTensorType([None, X.shape[1]]))],
+                    options={SVC: {'optim': 'gemm'}})
+                self._check_gemm(model_onnx)
+                dump_data_and_model(
+                    X, model, model_onnx,
+                    basename="SklearnMcSVCLinearGemm%s-Dec4" % dfs,
+                    allow_failure="StrictVersion(onnxruntime.__version__)"
+                                  " < StrictVersion('0.5.0')")
+
+    @unittest.skipIf(_scikit_learn_before_022(),
+                     reason="break_ties introduced after 0.22")
+    def test_convert_svc_multi_linear_gemm_break_ties(self):
+        model, X = self._fit_multi_classification(
+            NuSVC(kernel='linear', nu=0.1, break_ties=True), 4)
+        model_onnx = convert_sklearn(
+            model, "NuSVC", [("input", FloatTensorType([None, X.shape[1]]))],
+            options={NuSVC: {'optim': 'gemm'}})
+        self._check_gemm(model_onnx)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnMcNuSVCLinearGemmBT-Dec4",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " < StrictVersion('0.5.0')")
+
+    def test_convert_svc_linear_gemm_double_input(self):
+        model, X = self._fit_binary_classification(SVC(kernel='linear'))
+        model_onnx = convert_sklearn(
+            model, "SVC", [("input", DoubleTensorType([None, X.shape[1]]))],
+            options={SVC: {'optim': 'gemm'}})
+        self._check_gemm(model_onnx)
+        sess = InferenceSession(model_onnx.SerializeToString())
+        got = sess.run(None, {'input': X.astype(numpy.float64)})
+        self.assertEqual(got[0].tolist(), model.predict(X).tolist())
+
+    def test_convert_svc_linear_gemm_not_linear(self):
+        model, X = self._fit_binary_classification(SVC())
+        with self.assertRaises(RuntimeError):
+            convert_sklearn(
+                model, "SVC",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                options={SVC: {'optim': 'gemm'}})
+
+    def test_convert_svr_linear_gemm(self):
+        model, X = self._fit_binary_classification(SVR(kernel="linear"))
+        model_onnx = convert_sklearn(
+            model, "SVR", [("input", FloatTensorType([None, X.shape[1]]))],
+            options={SVR: {'optim': 'gemm'}})
+        self._check_gemm(model_onnx)
+        dump_data_and_model(X, model, model_onnx,
+                            basename="SklearnRegSVRLinearGemm-Dec3")
+
+    @unittest.skipIf(
+        StrictVersion(onnx.__version__) < StrictVersion("1.4.1"),
+        reason="operator sign available since opset 9")
+    def test_convert_oneclasssvm_linear_gemm(self):
+        model, X = self._fit_one_class_svm(OneClassSVM(kernel='linear'))
+        model_onnx = convert_sklearn(
+            model, "OCSVM", [("input", FloatTensorType([None, X.shape[1]]))],
+            options={OneClassSVM: {'optim': 'gemm'}})
+        self._check_gemm(model_onnx)
+        dump_data_and_model(
+            X, model, model_onnx,
+            basename="SklearnBinOneClassSVMLinearGemm-Dec2",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " < StrictVersion('0.5.0')")
+
 
 if __name__ == "__main__":
     unittest.main()
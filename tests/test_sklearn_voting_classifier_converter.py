@@ -4,7 +4,7 @@ import numpy
 import onnx
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
 from sklearn.ensemble import VotingClassifier
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
@@ -310,6 +310,63 @@ class TestVotingClassifierConverter(unittest.TestCase):
             target_opset=TARGET_OPSET
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_voting_soft_multi_trees_merged(self):
+        model = VotingClassifier(
+            voting="soft",
+            flatten_transform=False,
+            weights=numpy.array([1, 2, 4]),
+            estimators=[
+                ("dt", DecisionTreeClassifier(max_depth=3)),
+                ("dt2", DecisionTreeClassifier(max_depth=5)),
+                ("et", ExtraTreeClassifier(max_depth=4)),
+            ],
+        )
+        dump_multiple_classification(
+            model,
+            suffix="TreesMergedSoft",
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " <= StrictVersion('0.2.1')",
+            target_opset=TARGET_OPSET
+        )
+        model_onnx = convert_sklearn(
+            model, "voting classifier",
+            [("input", FloatTensorType([None, 2]))],
+            target_opset=TARGET_OPSET)
+        tree_nodes = [n for n in model_onnx.graph.node
+                      if n.op_type == 'TreeEnsembleClassifier']
+        self.assertEqual(len(tree_nodes), 1)
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_voting_hard_multi_trees_merged(self):
+        model = VotingClassifier(
+            voting="hard",
+            flatten_transform=False,
+            weights=numpy.array([1, 2, 4]),
+            estimators=[
+                ("dt", DecisionTreeClassifier(max_depth=3)),
+                ("dt2", DecisionTreeClassifier(max_depth=5)),
+                ("et", ExtraTreeClassifier(max_depth=4)),
+            ],
+        )
+        dump_multiple_classification(
+            model,
+            suffix="TreesMergedHard",
+            comparable_outputs=[0],
+            allow_failure="StrictVersion(onnxruntime.__version__)"
+                          " <= StrictVersion('0.5.0')",
+            target_opset=TARGET_OPSET
+        )
+        model_onnx = convert_sklearn(
+            model, "voting classifier",
+            [("input", FloatTensorType([None, 2]))],
+            target_opset=TARGET_OPSET)
+        tree_nodes = [n for n in model_onnx.graph.node
+                      if n.op_type == 'TreeEnsembleClassifier']
+        self.assertEqual(len(tree_nodes), 1)
+
 
 if __name__ == "__main__":
     unittest.main()